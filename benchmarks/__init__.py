@@ -0,0 +1,6 @@
+"""
+Benchmarks cho services/ (chạy offline, không cần Blockfrost).
+
+Chạy từ thư mục gốc repo:
+    python -m benchmarks.bench_offline_services
+"""
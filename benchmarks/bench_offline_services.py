@@ -0,0 +1,91 @@
+"""
+Benchmark: services chạy end-to-end trên OfflineLedgerContext
+=============================================================
+MintService, TransactionService, ConsolidationService, NFTService build + ký +
+submit transaction thật (CBOR đầy đủ) vào ledger trong bộ nhớ, không gọi mạng.
+In số transaction/giây cho từng thao tác.
+
+Chạy:
+    python -m benchmarks.bench_offline_services [--rounds 20]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from pycardano.crypto.bip32 import HDWallet
+
+from chain.offline_ledger import OfflineLedgerContext
+from config.blockfrost import set_chain_context
+from services.consolidation_service import ConsolidationService
+from services.mint_service import MintService
+from services.nft_service import NFTService
+from services.transaction_service import TransactionService
+from wallet.wallet_manager import WalletManager
+
+
+def run(rounds: int):
+    ledger = OfflineLedgerContext()
+    # Mọi service/wallet tạo sau đây đều nhận ledger offline từ get_blockfrost_context()
+    set_chain_context(ledger)
+
+    wallet = WalletManager(mnemonic=HDWallet.generate_mnemonic())
+    for _ in range(rounds * 4):
+        ledger.fund(wallet.get_address(), 50_000_000)
+
+    # ConsolidationService chỉ gom ADA: dùng ví riêng không giữ token
+    ada_wallet = WalletManager(mnemonic=HDWallet.generate_mnemonic())
+
+    def consolidate(i):
+        for _ in range(3):
+            ledger.fund(ada_wallet.get_address(), 5_000_000)
+        return consolidation.consolidate(min_utxo_threshold=2, wait_confirm=False)
+
+    mint = MintService(wallet)
+    tx_service = TransactionService(wallet)
+    consolidation = ConsolidationService(ada_wallet)
+    nft = NFTService(wallet)
+    policy_id = mint._create_policy()[1]
+
+    operations = [
+        ("MintService.mint_token", lambda i: mint.mint_token(f"FT{i}", 1000)),
+        ("MintService.mint_multiple_nfts", lambda i: mint.mint_multiple_nfts(
+            [{"name": f"NFT{i}_{j}"} for j in range(5)])),
+        ("MintService.burn_token", lambda i: mint.burn_token(policy_id, f"NFT{i}_0")),
+        ("TransactionService.send_ada", lambda i: tx_service.send_ada(
+            wallet.get_address(), 2_000_000, wait_confirm=False)),
+        ("NFTService.mint_nft", lambda i: nft.mint_nft(f"Art{i}", "ipfs://bench")),
+        ("ConsolidationService.consolidate", consolidate),
+    ]
+
+    print(f"{'thao tác':34} {'tx/s':>8} {'ms/tx':>8}")
+    for name, op in operations:
+        start = time.perf_counter()
+        for i in range(rounds):
+            tx_id = op(i)
+            assert tx_id and tx_id != "ERROR", f"{name} thất bại"
+        elapsed = time.perf_counter() - start
+        print(f"{name:34} {rounds / elapsed:8.1f} {elapsed / rounds * 1000:8.2f}")
+    print(f"ledger: {ledger.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    # Services ghi keys/ và data/policies/ theo thư mục hiện tại: chạy trong thư mục tạm
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        os.makedirs("keys")
+        try:
+            run(args.rounds)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
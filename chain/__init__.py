@@ -0,0 +1,58 @@
+# chain/__init__.py
+# Các lớp bọc (wrapper) quanh ChainContext của PyCardano: cache, thống kê, ...
+# Dùng chung cho services/, wallet/ và các backend trong course/, course_final/.
+
+from chain.base import ChainContextWrapper
+from chain.utxo_cache import AssetLocationCache, CachedChainContext, UTxOCache, asset_unit
+from chain.asset_lookup import AssetLookupChainContext, fetch_utxo_for_asset
+from chain.utxo_store import SnapshotChainContext, SQLiteUTxOStore
+from chain.scheduler import BACKGROUND, INTERACTIVE, BlockfrostScheduler, background, priority
+from chain.offline_ledger import OfflineLedgerContext
+from chain.cassette import Cassette, CassetteMissError
+from chain.exunits_cache import ExUnitsCache, ExUnitsCacheChainContext
+from chain.local_evaluator import (
+    LocalEvaluationChainContext,
+    LocalEvaluationUnsupported,
+    LocalPlutusEvaluator,
+    evaluate_many,
+    slot_to_posix_ms,
+)
+from chain.utxo_stream import iter_address_utxos, iter_utxos
+from chain.singleflight import SingleFlight, SingleFlightChainContext
+from chain.async_context import AsyncBlockFrostChainContext, AsyncChainContextBridge
+from chain.follower import AddressIndex, BlockRef, ChainFollower
+
+__all__ = [
+    "ChainContextWrapper",
+    "CachedChainContext",
+    "UTxOCache",
+    "AssetLocationCache",
+    "AssetLookupChainContext",
+    "asset_unit",
+    "fetch_utxo_for_asset",
+    "SQLiteUTxOStore",
+    "SnapshotChainContext",
+    "SingleFlight",
+    "BlockfrostScheduler",
+    "INTERACTIVE",
+    "BACKGROUND",
+    "priority",
+    "background",
+    "SingleFlightChainContext",
+    "OfflineLedgerContext",
+    "Cassette",
+    "CassetteMissError",
+    "ExUnitsCache",
+    "ExUnitsCacheChainContext",
+    "LocalPlutusEvaluator",
+    "LocalEvaluationChainContext",
+    "LocalEvaluationUnsupported",
+    "evaluate_many",
+    "iter_address_utxos",
+    "iter_utxos",
+    "AsyncBlockFrostChainContext",
+    "AsyncChainContextBridge",
+    "AddressIndex",
+    "BlockRef",
+    "ChainFollower",
+]
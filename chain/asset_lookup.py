@@ -0,0 +1,92 @@
+# chain/asset_lookup.py
+# Tìm UTxO đang giữ một asset (vd: NFT) bằng 1-2 request Blockfrost hẹp
+# (/assets/{asset}/addresses + /addresses/{address}/utxos/{asset})
+# thay vì tải toàn bộ UTxO của địa chỉ rồi duyệt.
+
+from typing import Dict, Optional, Union
+
+from blockfrost import ApiError
+from pycardano import AssetName, ChainContext, ScriptHash, UTxO
+
+from chain.async_context import utxo_from_json
+from chain.base import ChainContextWrapper
+from chain.utxo_cache import AssetLocationCache, asset_unit
+
+
+def fetch_utxo_for_asset(api, unit: str, get_script=None) -> Optional[UTxO]:
+    """
+    UTxO hiện tại đang giữ asset `unit` (policy_id hex + asset_name hex), hoặc None.
+
+    Args:
+        api: BlockFrostApi.
+        unit: Asset ID dạng Blockfrost (xem chain.utxo_cache.asset_unit).
+        get_script: Hàm lấy reference script theo hash (vd: ChainContextWrapper.script).
+    """
+    try:
+        holders = api.asset_addresses(unit, return_type="json")
+    except ApiError as e:
+        if e.status_code == 404:
+            return None
+        raise
+    for holder in holders:
+        if int(holder["quantity"]) <= 0:
+            continue
+        try:
+            items = api.address_utxos_asset(holder["address"], unit, return_type="json")
+        except ApiError as e:
+            # Index địa chỉ có thể chậm hơn index asset một chút
+            if e.status_code == 404:
+                continue
+            raise
+        if items:
+            item = items[0]
+            script = None
+            if item.get("reference_script_hash") and get_script is not None:
+                script = get_script(item["reference_script_hash"])
+            return utxo_from_json(holder["address"], item, script)
+    return None
+
+
+class AssetLookupChainContext(ChainContextWrapper):
+    """
+    ChainContext có thêm `utxo_for_asset(policy_id, asset_name)`.
+
+    Với Blockfrost (context bên trong có `api`), vị trí asset được hỏi trực tiếp
+    qua `fetch_utxo_for_asset`; context khác (vd: OfflineLedgerContext) phải tự
+    cài `utxo_for_asset`. Kết quả được cache trong AssetLocationCache và cập
+    nhật ngay khi transaction đi qua `submit_tx_cbor`.
+
+    Args:
+        inner: ChainContext bên trong.
+        cache: AssetLocationCache dùng chung (tuỳ chọn).
+    """
+
+    def __init__(self, inner: ChainContext, cache: Optional[AssetLocationCache] = None):
+        super().__init__(inner)
+        self.asset_cache = cache or AssetLocationCache()
+
+    def utxo_for_asset(
+        self,
+        policy_id: Union[ScriptHash, bytes, str],
+        asset_name: Union[AssetName, bytes, str],
+    ) -> Optional[UTxO]:
+        """UTxO đang giữ asset, hoặc None nếu asset không tồn tại / đã burn."""
+        unit = asset_unit(policy_id, asset_name)
+        hit, utxo = self.asset_cache.lookup(unit)
+        if hit:
+            return utxo
+        api = getattr(self._inner, "api", None)
+        if api is not None:
+            utxo = fetch_utxo_for_asset(api, unit, self.script)
+        else:
+            utxo = self._inner.utxo_for_asset(policy_id, asset_name)
+        self.asset_cache.put(unit, utxo)
+        return utxo
+
+    def submit_tx_cbor(self, cbor: Union[bytes, str]) -> str:
+        tx_hash = self._inner.submit_tx_cbor(cbor)
+        self.asset_cache.apply_tx(cbor)
+        return tx_hash
+
+    def asset_stats(self) -> Dict[str, Union[int, float]]:
+        return self.asset_cache.stats()
@@ -0,0 +1,482 @@
+# chain/async_context.py
+# Chain context Blockfrost chạy trên asyncio (httpx.AsyncClient), không chặn event loop.
+
+import asyncio
+import time
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Union
+
+import cbor2
+import httpx
+from pycardano import (
+    Address,
+    Asset,
+    AssetName,
+    ChainContext,
+    DatumHash,
+    ExecutionUnits,
+    GenesisParameters,
+    MultiAsset,
+    NativeScript,
+    PlutusScript,
+    ProtocolParameters,
+    RawCBOR,
+    ScriptHash,
+    TransactionFailedException,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    Value,
+    script_hash,
+)
+from pycardano.backend.base import ALONZO_COINS_PER_UTXO_WORD
+from pycardano.hash import SCRIPT_HASH_SIZE
+from pycardano.network import Network
+
+from chain.scheduler import BlockfrostScheduler
+from chain.singleflight import SingleFlight
+from chain.utxo_cache import AssetLocationCache, UTxOCache, asset_unit
+from chain.utxo_store import SQLiteUTxOStore, tx_changes
+
+# Blockfrost trả tối đa 100 phần tử mỗi trang
+_PAGE_SIZE = 100
+
+
+class AsyncBlockFrostChainContext:
+    """
+    Phiên bản asyncio của BlockFrostChainContext.
+
+    Cùng bề mặt với ChainContext nhưng các hàm đều là coroutine:
+    `utxos`, `protocol_param`, `genesis_param`, `last_block_slot`, `epoch`,
+    `submit_tx_cbor`, `evaluate_tx_cbor`, và `utxo_for_asset`. Dùng một httpx.AsyncClient
+    (keep-alive, tối đa `pool_size` kết nối) cho mọi request.
+
+    Args:
+        project_id: Blockfrost project ID.
+        base_url: Base URL Blockfrost (vd: ApiUrls.preprod.value).
+        pool_size: Số kết nối tối đa trong pool.
+        cache: UTxOCache dùng chung (tuỳ chọn).
+        flight: SingleFlight dùng chung (tuỳ chọn), gộp các truy vấn trùng đang chạy.
+        scheduler: BlockfrostScheduler dùng chung (tuỳ chọn): rate limit, ưu tiên, retry 429/5xx.
+        snapshot: SQLiteUTxOStore dùng chung (tuỳ chọn): đọc UTxO từ đĩa, chỉ tải phần thay đổi
+            từ block height đã đồng bộ (xem chain/utxo_store.py).
+        snapshot_interval: Khoảng thời gian tối thiểu giữa hai lần delta sync snapshot (giây).
+        asset_cache: AssetLocationCache dùng chung (tuỳ chọn) cho `utxo_for_asset`.
+        transport: httpx transport tuỳ chỉnh (dùng cho benchmark/mock).
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        base_url: str,
+        pool_size: int = 10,
+        cache: Optional[UTxOCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        flight: Optional[SingleFlight] = None,
+        scheduler: Optional[BlockfrostScheduler] = None,
+        snapshot: Optional[SQLiteUTxOStore] = None,
+        snapshot_interval: float = 2.0,
+        asset_cache: Optional[AssetLocationCache] = None,
+    ):
+        self._base_url = base_url
+        self._network = Network.MAINNET if "mainnet" in base_url else Network.TESTNET
+        self.cache = cache
+        self.flight = flight or SingleFlight()
+        self.scheduler = scheduler or BlockfrostScheduler()
+        self.snapshot = snapshot
+        self.snapshot_interval = snapshot_interval
+        self.asset_cache = asset_cache or AssetLocationCache()
+        self._client = httpx.AsyncClient(
+            base_url=f"{base_url}/v0",
+            headers={"project_id": project_id or ""},
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(30.0),
+            transport=transport,
+        )
+        self._epoch_info: Optional[Dict[str, Any]] = None
+        self._protocol_param: Optional[ProtocolParameters] = None
+        self._genesis_param: Optional[GenesisParameters] = None
+        self._param_lock = asyncio.Lock()
+
+    @property
+    def network(self) -> Network:
+        return self._network
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    # ---------------- HTTP ----------------
+    async def _get(self, path: str, **params) -> Any:
+        response = await self.scheduler.call_async(
+            lambda: self._client.get(path, params=params or None)
+        )
+        if response.status_code != 200:
+            raise _api_error(response)
+        return response.json()
+
+    async def _post_cbor(self, path: str, data: Union[bytes, str]) -> Any:
+        response = await self.scheduler.call_async(
+            lambda: self._client.post(
+                path, content=data, headers={"Content-Type": "application/cbor"}
+            )
+        )
+        if response.status_code != 200:
+            raise _api_error(response)
+        return response.json()
+
+    # ---------------- EPOCH / PARAMS ----------------
+    async def _check_epoch_and_update(self) -> bool:
+        if self._epoch_info is None or int(time.time()) >= self._epoch_info["end_time"]:
+            self._epoch_info = await self._get("/epochs/latest")
+            return True
+        return False
+
+    async def epoch(self) -> int:
+        await self._check_epoch_and_update()
+        return self._epoch_info["epoch"]
+
+    async def last_block_slot(self) -> int:
+        block = await self.flight.do_async(("last_block_slot",), lambda: self._get("/blocks/latest"))
+        return block["slot"]
+
+    async def protocol_param(self) -> ProtocolParameters:
+        async with self._param_lock:
+            if await self._check_epoch_and_update() or self._protocol_param is None:
+                params = await self._get("/epochs/latest/parameters")
+                self._protocol_param = protocol_param_from_json(params)
+        return self._protocol_param
+
+    async def genesis_param(self) -> GenesisParameters:
+        # Genesis không đổi theo epoch: tải một lần
+        async with self._param_lock:
+            if self._genesis_param is None:
+                self._genesis_param = GenesisParameters(**await self._get("/genesis"))
+        return self._genesis_param
+
+    # ---------------- UTXO ----------------
+    async def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        if self.cache is not None:
+            cached = self.cache.get(address)
+            if cached is not None:
+                return cached
+
+        # Các request cùng địa chỉ đang chạy đồng thời chỉ gọi Blockfrost một lần
+        utxos = await self.flight.do_async(
+            ("utxos", str(address)), lambda: self._fetch_utxos(address)
+        )
+        if self.cache is not None:
+            self.cache.put(address, utxos)
+        return list(utxos)
+
+    async def _fetch_utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        if self.snapshot is not None:
+            if not self.snapshot.is_fresh(address, self.snapshot_interval):
+                await self.sync_snapshot(address)
+            # Đọc + decode CBOR có thể lâu với địa chỉ lớn: chạy ngoài event loop
+            return await asyncio.to_thread(self.snapshot.utxos, address)
+        return await self._fetch_utxos_direct(str(address))
+
+    async def _get_pages(self, path: str, **params) -> List[Dict[str, Any]]:
+        """GET mọi trang của một endpoint dạng list (404 = rỗng)."""
+        results = []
+        page = 1
+        while True:
+            try:
+                items = await self._get(path, count=_PAGE_SIZE, page=page, **params)
+            except BlockFrostAsyncError as e:
+                if e.status_code == 404:
+                    break
+                raise
+            results.extend(items)
+            if len(items) < _PAGE_SIZE:
+                break
+            page += 1
+        return results
+
+    async def _to_utxo(self, address: str, item: Dict[str, Any]) -> UTxO:
+        script = None
+        if item.get("reference_script_hash"):
+            script = await self._get_script(item["reference_script_hash"])
+        return utxo_from_json(address, item, script)
+
+    async def utxo_for_asset(
+        self,
+        policy_id: Union[ScriptHash, bytes, str],
+        asset_name: Union[AssetName, bytes, str],
+    ) -> Optional[UTxO]:
+        """
+        UTxO đang giữ asset (vd: NFT), hoặc None nếu không tồn tại / đã burn.
+        Chỉ gọi /assets/{asset}/addresses và /addresses/{address}/utxos/{asset}
+        (xem chain/asset_lookup.py), kết quả được cache theo asset.
+        """
+        unit = asset_unit(policy_id, asset_name)
+        hit, utxo = self.asset_cache.lookup(unit)
+        if hit:
+            return utxo
+        utxo = await self.flight.do_async(("asset", unit), lambda: self._fetch_utxo_for_asset(unit))
+        self.asset_cache.put(unit, utxo)
+        return utxo
+
+    async def _fetch_utxo_for_asset(self, unit: str) -> Optional[UTxO]:
+        for holder in await self._get_pages(f"/assets/{unit}/addresses"):
+            if int(holder["quantity"]) <= 0:
+                continue
+            items = await self._get_pages(f"/addresses/{holder['address']}/utxos/{unit}")
+            if items:
+                return await self._to_utxo(holder["address"], items[0])
+        return None
+
+    async def sync_snapshot(self, address: Union[str, Address]) -> int:
+        """
+        Đồng bộ snapshot SQLite của địa chỉ tới tip: full sync lần đầu, sau đó
+        chỉ áp dụng các transaction từ block height đã xử lý. Trả về số tx đã áp dụng.
+        """
+        address = str(address)
+        height = self.snapshot.height(address)
+        tip = (await self._get("/blocks/latest"))["height"]
+
+        if height is None:
+            utxos = await self._fetch_utxos_direct(address)
+            await asyncio.to_thread(self.snapshot.replace, address, utxos, tip)
+            return 0
+        if tip <= height:
+            self.snapshot.touch(address)
+            return 0
+
+        txs = await self._get_pages(
+            f"/addresses/{address}/transactions", **{"from": str(height + 1), "to": str(tip)}
+        )
+        # Tải input/output của các tx song song, áp dụng theo đúng thứ tự on-chain
+        tx_utxos = await asyncio.gather(*(self._get(f"/txs/{tx['tx_hash']}/utxos") for tx in txs))
+        changes = []
+        for tx, detail in zip(txs, tx_utxos):
+            spent, created = tx_changes(address, tx["tx_hash"], detail)
+            changes.append((spent, [await self._to_utxo(address, item) for item in created]))
+        await asyncio.to_thread(self.snapshot.apply, address, changes, tip)
+        return len(changes)
+
+    async def _fetch_utxos_direct(self, address: str) -> List[UTxO]:
+        return [
+            await self._to_utxo(address, item)
+            for item in await self._get_pages(f"/addresses/{address}/utxos")
+        ]
+
+    async def _get_script(self, script_hash: str):
+        return await self.flight.do_async(
+            ("script", script_hash), lambda: self._fetch_script(script_hash)
+        )
+
+    async def _fetch_script(self, script_hash: str):
+        script_type = (await self._get(f"/scripts/{script_hash}"))["type"]
+        if script_type.lower().startswith("plutusv"):
+            cbor = (await self._get(f"/scripts/{script_hash}/cbor"))["cbor"]
+            # Blockfrost có thể trả script bọc CBOR hai lần
+            return fix_plutus_script(
+                script_hash, PlutusScript.from_version(int(script_type[-1]), bytes.fromhex(cbor))
+            )
+        script_json = (await self._get(f"/scripts/{script_hash}/json"))["json"]
+        return NativeScript.from_dict(script_json)
+
+    # ---------------- SUBMIT / EVALUATE ----------------
+    async def submit_tx_cbor(self, cbor: Union[bytes, str]) -> str:
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        try:
+            tx_hash = await self._post_cbor("/tx/submit", cbor)
+        except BlockFrostAsyncError as e:
+            raise TransactionFailedException(
+                f"Failed to submit transaction. Error code: {e.status_code}. Error message: {e.message}"
+            ) from e
+        if self.cache is not None:
+            self.cache.invalidate_tx(cbor)
+        if self.snapshot is not None:
+            self.snapshot.mark_spent(cbor)
+        self.asset_cache.apply_tx(cbor)
+        return tx_hash
+
+    async def evaluate_tx_cbor(self, cbor: Union[bytes, str]) -> Dict[str, ExecutionUnits]:
+        if isinstance(cbor, bytes):
+            cbor = cbor.hex()
+        result = await self._post_cbor("/utils/txs/evaluate", cbor)
+        evaluation = (result.get("result") or {}).get("EvaluationResult")
+        if evaluation is None:
+            raise TransactionFailedException(result)
+        return {
+            k: ExecutionUnits(v["memory"], v["steps"]) for k, v in evaluation.items()
+        }
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        return self.cache.stats() if self.cache is not None else None
+
+    def flight_stats(self) -> Dict[str, int]:
+        return self.flight.stats()
+
+    def scheduler_stats(self) -> Dict[str, Any]:
+        return self.scheduler.stats()
+
+    def snapshot_stats(self) -> Optional[Dict[str, Any]]:
+        return self.snapshot.stats() if self.snapshot is not None else None
+
+    def asset_stats(self) -> Dict[str, Any]:
+        return self.asset_cache.stats()
+
+
+class AsyncChainContextBridge(ChainContext):
+    """
+    ChainContext đồng bộ để TransactionBuilder dùng trong worker thread.
+
+    Mọi lời gọi được chuyển sang AsyncBlockFrostChainContext trên event loop
+    chính (`run_coroutine_threadsafe`), nên I/O vẫn là async còn phần build
+    (CPU) chạy ngoài event loop. Không được gọi từ chính thread của event loop.
+    """
+
+    def __init__(self, async_context: AsyncBlockFrostChainContext, loop: asyncio.AbstractEventLoop):
+        self._async = async_context
+        self._loop = loop
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    @property
+    def network(self) -> Network:
+        return self._async.network
+
+    @property
+    def epoch(self) -> int:
+        return self._run(self._async.epoch())
+
+    @property
+    def last_block_slot(self) -> int:
+        return self._run(self._async.last_block_slot())
+
+    @property
+    def protocol_param(self) -> ProtocolParameters:
+        # Không gọi mạng trừ khi đã sang epoch mới
+        return self._run(self._async.protocol_param())
+
+    @property
+    def genesis_param(self) -> GenesisParameters:
+        return self._run(self._async.genesis_param())
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        return self._run(self._async.utxos(address))
+
+    def utxo_for_asset(self, policy_id, asset_name) -> Optional[UTxO]:
+        return self._run(self._async.utxo_for_asset(policy_id, asset_name))
+
+    def submit_tx_cbor(self, cbor: Union[bytes, str]) -> str:
+        return self._run(self._async.submit_tx_cbor(cbor))
+
+    def evaluate_tx_cbor(self, cbor: Union[bytes, str]) -> Dict[str, ExecutionUnits]:
+        return self._run(self._async.evaluate_tx_cbor(cbor))
+
+
+class BlockFrostAsyncError(Exception):
+    """Lỗi HTTP từ Blockfrost (tương đương blockfrost.ApiError)."""
+
+    def __init__(self, status_code: int, message: Optional[str] = None):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+def _api_error(response: httpx.Response) -> BlockFrostAsyncError:
+    try:
+        message = response.json().get("message")
+    except Exception:
+        message = response.text
+    return BlockFrostAsyncError(response.status_code, message)
+
+
+def utxo_from_json(address: Union[str, Address], item: Dict[str, Any], script=None) -> UTxO:
+    """Chuyển một phần tử JSON của /addresses/{address}/utxos thành pycardano.UTxO."""
+    if isinstance(address, str):
+        address = Address.from_primitive(address)
+    tx_in = TransactionInput.from_primitive([item["tx_hash"], item["output_index"]])
+    lovelace = 0
+    multi_assets = MultiAsset()
+    for amount in item["amount"]:
+        if amount["unit"] == "lovelace":
+            lovelace = int(amount["quantity"])
+        else:
+            data = bytes.fromhex(amount["unit"])
+            policy_id = ScriptHash(data[:SCRIPT_HASH_SIZE])
+            asset_name = AssetName(data[SCRIPT_HASH_SIZE:])
+            if policy_id not in multi_assets:
+                multi_assets[policy_id] = Asset()
+            multi_assets[policy_id][asset_name] = int(amount["quantity"])
+
+    inline_datum = item.get("inline_datum")
+    datum_hash = (
+        DatumHash.from_primitive(item["data_hash"])
+        if item.get("data_hash") and inline_datum is None
+        else None
+    )
+    datum = RawCBOR(bytes.fromhex(inline_datum)) if inline_datum is not None else None
+
+    tx_out = TransactionOutput(
+        address,
+        amount=Value(lovelace, multi_assets),
+        datum_hash=datum_hash,
+        datum=datum,
+        script=script,
+    )
+    return UTxO(tx_in, tx_out)
+
+
+def fix_plutus_script(expected_hash: str, script: PlutusScript) -> PlutusScript:
+    """
+    Script Plutus đúng với `expected_hash`: bỏ lớp CBOR thừa nếu Blockfrost
+    trả script bọc hai lần (hash không khớp script được tham chiếu).
+    """
+    if str(script_hash(script)) == expected_hash:
+        return script
+    unwrapped = script.__class__(cbor2.loads(script))
+    if str(script_hash(unwrapped)) == expected_hash:
+        return unwrapped
+    raise ValueError(f"Script {expected_hash} không khớp hash (kể cả sau khi bỏ lớp CBOR thừa)")
+
+
+def protocol_param_from_json(params: Dict[str, Any]) -> ProtocolParameters:
+    """
+    Chuyển JSON /epochs/latest/parameters thành ProtocolParameters.
+
+    Cùng cách map trường như BlockFrostChainContext.protocol_param (pycardano
+    0.19), viết lại ở đây để không phụ thuộc phần nội bộ của pycardano.
+    """
+    return ProtocolParameters(
+        min_fee_constant=int(params["min_fee_b"]),
+        min_fee_coefficient=int(params["min_fee_a"]),
+        max_block_size=int(params["max_block_size"]),
+        max_tx_size=int(params["max_tx_size"]),
+        max_block_header_size=int(params["max_block_header_size"]),
+        key_deposit=int(params["key_deposit"]),
+        pool_deposit=int(params["pool_deposit"]),
+        pool_influence=Fraction(params["a0"]),
+        monetary_expansion=Fraction(params["rho"]),
+        treasury_expansion=Fraction(params["tau"]),
+        decentralization_param=Fraction(params.get("decentralisation_param") or 0),
+        extra_entropy=params.get("extra_entropy"),
+        protocol_major_version=int(params["protocol_major_ver"]),
+        protocol_minor_version=int(params["protocol_minor_ver"]),
+        min_utxo=int(params.get("min_utxo") or 0),
+        min_pool_cost=int(params["min_pool_cost"]),
+        price_mem=Fraction(params["price_mem"]),
+        price_step=Fraction(params["price_step"]),
+        max_tx_ex_mem=int(params["max_tx_ex_mem"]),
+        max_tx_ex_steps=int(params["max_tx_ex_steps"]),
+        max_block_ex_mem=int(params["max_block_ex_mem"]),
+        max_block_ex_steps=int(params["max_block_ex_steps"]),
+        max_val_size=int(params["max_val_size"]),
+        collateral_percent=int(params["collateral_percent"]),
+        max_collateral_inputs=int(params["max_collateral_inputs"]),
+        coins_per_utxo_word=int(params.get("coins_per_utxo_word") or 0) or ALONZO_COINS_PER_UTXO_WORD,
+        coins_per_utxo_byte=int(params["coins_per_utxo_size"]),
+        cost_models={name: dict(model) for name, model in (params.get("cost_models") or {}).items()},
+        maximum_reference_scripts_size={"bytes": 200000},
+        min_fee_reference_scripts={
+            "base": params.get("min_fee_ref_script_cost_per_byte"),
+            "range": 200000,
+            "multiplier": 1,
+        },
+    )
@@ -0,0 +1,89 @@
+# chain/base.py
+# Lớp cơ sở cho các wrapper bọc quanh một ChainContext có sẵn.
+
+from typing import Dict, Iterator, List, Union
+
+from pycardano import Address, ChainContext, ExecutionUnits, UTxO
+
+
+class ChainContextWrapper(ChainContext):
+    """
+    ChainContext chuyển tiếp mọi lời gọi xuống context bên trong.
+
+    Các wrapper (cache, ...) chỉ cần override những hàm muốn can thiệp.
+    Thuộc tính không thuộc interface ChainContext (vd: `api` của Blockfrost)
+    cũng được chuyển tiếp qua __getattr__.
+    """
+
+    def __init__(self, inner: ChainContext):
+        self._inner = inner
+
+    @property
+    def inner(self) -> ChainContext:
+        return self._inner
+
+    @property
+    def protocol_param(self):
+        return self._inner.protocol_param
+
+    @property
+    def genesis_param(self):
+        return self._inner.genesis_param
+
+    @property
+    def network(self):
+        return self._inner.network
+
+    @property
+    def epoch(self) -> int:
+        return self._inner.epoch
+
+    @property
+    def last_block_slot(self) -> int:
+        return self._inner.last_block_slot
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        return self._inner.utxos(address)
+
+    def submit_tx_cbor(self, cbor: Union[bytes, str]) -> str:
+        return self._inner.submit_tx_cbor(cbor)
+
+    def evaluate_tx_cbor(self, cbor: Union[bytes, str]) -> Dict[str, ExecutionUnits]:
+        return self._inner.evaluate_tx_cbor(cbor)
+
+    def stream_utxos(self, address: Union[str, Address], page_size: int = 100, concurrency: int = 4) -> Iterator[UTxO]:
+        """
+        UTxO của `address` theo từng trang (dùng qua chain.utxo_stream.iter_utxos).
+
+        Wrapper giữ dữ liệu UTxO (cache, snapshot) override hàm này. Mặc định
+        chuyển xuống context bên trong; tới context Blockfrost ở đáy thì tải
+        từng trang, context khác (vd: OfflineLedgerContext) dùng `utxos(address)`.
+        """
+        if isinstance(self._inner, ChainContextWrapper):
+            return self._inner.stream_utxos(address, page_size, concurrency)
+        api = getattr(self._inner, "api", None)
+        if api is None:
+            return iter(self._inner.utxos(address))
+        # Import muộn: chain.utxo_stream import các module dùng lớp này
+        from chain.utxo_stream import stream_api_utxos
+
+        return stream_api_utxos(api, address, page_size, concurrency, self.script)
+
+    def script(self, script_hash: str):
+        """
+        Reference script theo hash, khi dựng UTxO từ JSON Blockfrost.
+
+        Mặc định chuyển xuống context bên trong; context Blockfrost ở đáy được
+        hỏi qua API công khai (chain.utxo_stream.fetch_script).
+        """
+        if isinstance(self._inner, ChainContextWrapper):
+            return self._inner.script(script_hash)
+        from chain.utxo_stream import fetch_script
+
+        return fetch_script(self._inner.api, script_hash)
+
+    def __getattr__(self, name):
+        # Chỉ được gọi khi thuộc tính không có trên wrapper
+        if name == "_inner":
+            raise AttributeError(name)
+        return getattr(self._inner, name)
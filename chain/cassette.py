@@ -0,0 +1,182 @@
+# chain/cassette.py
+# Ghi lại (record) mọi request/response Blockfrost ra file cassette, rồi phát lại
+# (replay) offline để đo CPU của luồng build và số lời gọi upstream một cách tất định.
+
+import atexit
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Đoạn path dài (địa chỉ, hash, asset) được gom lại khi thống kê theo endpoint
+_ID_SEGMENT = re.compile(r"^[0-9a-zA-Z_]{20,}$")
+
+
+class CassetteMissError(Exception):
+    """Replay gặp request không có trong cassette (cần record lại)."""
+
+
+class Cassette:
+    """
+    Cassette record/replay cho các request HTTP tới Blockfrost.
+
+    - record: gửi request thật qua session, lưu (method, url, params) ->
+      (status, body, latency) và ghi ra file gzip JSON khi `save()`/thoát.
+    - replay: trả response đã ghi theo đúng thứ tự cho từng request, không
+      gọi mạng. `realtime=True` thì ngủ đúng latency đã ghi, ngược lại trả ngay.
+
+    Body của POST (tx/submit, evaluate) không nằm trong key vì CBOR thay đổi
+    theo thời gian (tên token, TTL); response được phát lại theo thứ tự ghi.
+
+    Args:
+        path: Đường dẫn file cassette (.json.gz).
+        mode: "record" hoặc "replay".
+        realtime: Replay với latency gốc (True) hoặc bằng 0 (False).
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY, realtime: bool = False):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"❌ Cassette mode không hợp lệ: {mode!r} (record | replay)")
+        self.path = path
+        self.mode = mode
+        self.realtime = realtime
+        self.meta: Dict[str, Any] = {}
+        self._interactions: List[Dict[str, Any]] = []
+        self._queues: Dict[Tuple, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._last: Dict[Tuple, Dict[str, Any]] = {}
+        self._calls: Counter = Counter()
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            self._load()
+        else:
+            atexit.register(self.save)
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """
+        Tạo cassette từ biến môi trường, None nếu không bật:
+        BLOCKFROST_CASSETTE (đường dẫn), BLOCKFROST_CASSETTE_MODE (record | replay),
+        BLOCKFROST_CASSETTE_REALTIME (1 = giữ latency gốc khi replay).
+        """
+        path = os.getenv("BLOCKFROST_CASSETTE")
+        if not path:
+            return None
+        return cls(
+            path,
+            mode=os.getenv("BLOCKFROST_CASSETTE_MODE", REPLAY).lower(),
+            realtime=os.getenv("BLOCKFROST_CASSETTE_REALTIME", "0") == "1",
+        )
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    # ---------------- FILE ----------------
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        self.meta = data.get("meta", {})
+        self._interactions = data["interactions"]
+        for item in self._interactions:
+            self._queues[_key(item["method"], item["url"], item["params"])].append(item)
+
+    def save(self):
+        """Ghi cassette ra file (chỉ ở chế độ record)."""
+        if self.mode != RECORD:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            data = {"version": 1, "meta": self.meta, "interactions": self._interactions}
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    # ---------------- HTTP ----------------
+    def request(self, session, method: str, url: str, **kwargs) -> requests.Response:
+        """Thay cho `session.get/post(url, **kwargs)` của blockfrost-python."""
+        params = _params(kwargs.get("params"))
+        key = _key(method, url, params)
+        with self._lock:
+            self._calls[_endpoint(method, url)] += 1
+
+        if self.mode == RECORD:
+            start = time.perf_counter()
+            response = getattr(session, method)(url, **kwargs)
+            latency = time.perf_counter() - start
+            with self._lock:
+                self._interactions.append({
+                    "method": method,
+                    "url": url,
+                    "params": params,
+                    "status": response.status_code,
+                    "body": response.text,
+                    "latency": round(latency, 4),
+                })
+            return response
+
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                item = queue.popleft()
+                self._last[key] = item
+            else:
+                # Luồng gọi nhiều hơn lúc ghi: phát lại response cuối cùng của request đó
+                item = self._last.get(key)
+        if item is None:
+            raise CassetteMissError(f"Không có trong cassette: {method.upper()} {url} {params}")
+        if self.realtime:
+            time.sleep(item["latency"])
+        return _response(url, item)
+
+    # ---------------- METRICS ----------------
+    def recorded_calls(self) -> Dict[str, int]:
+        """Số lời gọi theo endpoint lúc record."""
+        return dict(Counter(_endpoint(i["method"], i["url"]) for i in self._interactions))
+
+    def stats(self) -> Dict[str, Any]:
+        """Số lời gọi theo endpoint của lần chạy hiện tại (và lúc record nếu đang replay)."""
+        with self._lock:
+            calls = dict(self._calls)
+        result = {"mode": self.mode, "calls": calls, "total": sum(calls.values())}
+        if self.replaying:
+            recorded = self.recorded_calls()
+            result["recorded"] = recorded
+            result["recorded_total"] = sum(recorded.values())
+        return result
+
+
+def _params(params: Any) -> List[List[Any]]:
+    if not params:
+        return []
+    return sorted([str(k), str(v)] for k, v in dict(params).items())
+
+
+def _key(method: str, url: str, params: List[List[Any]]) -> Tuple:
+    return method, url, tuple(tuple(p) for p in params)
+
+
+def _endpoint(method: str, url: str) -> str:
+    """'get /addresses/{}/utxos' — bỏ base URL và gom các đoạn id."""
+    path = urlsplit(url).path.split("/v0", 1)[-1]
+    segments = ["{}" if _ID_SEGMENT.match(s) else s for s in path.split("/")]
+    return f"{method} {'/'.join(segments)}"
+
+
+def _response(url: str, item: Dict[str, Any]) -> requests.Response:
+    response = requests.models.Response()
+    response.status_code = item["status"]
+    response._content = item["body"].encode("utf-8")
+    response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    response.encoding = "utf-8"
+    response.url = url
+    return response
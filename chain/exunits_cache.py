@@ -0,0 +1,250 @@
+# chain/exunits_cache.py
+# Cache ex-units của redeemer Plutus theo "hình dạng" transaction, đặt trước evaluate_tx.
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+from cbor2 import CBORTag
+from pycardano import (
+    ChainContext,
+    ExecutionUnits,
+    PlutusData,
+    RawPlutusData,
+    RedeemerMap,
+    RedeemerTag,
+    Transaction,
+    plutus_script_hash,
+)
+from pycardano.cbor import cbor2
+from pycardano.serialization import default_encoder
+
+from chain.base import ChainContextWrapper
+
+
+def _bucket(size: int, step: int) -> int:
+    """Làm tròn lên bội số của `step` (gộp các kích thước gần nhau vào một key)."""
+    return -(-size // step) * step
+
+
+def _cbor_size(value: Any) -> int:
+    return len(cbor2.dumps(value, default=default_encoder))
+
+
+def _constructor(data: Any) -> Hashable:
+    """Constructor của redeemer: CONSTR_ID, hoặc suy ra từ tag CBOR (121.. / 1280.. / 102)."""
+    if isinstance(data, PlutusData):
+        return data.CONSTR_ID
+    if isinstance(data, RawPlutusData):
+        data = data.data
+    if isinstance(data, CBORTag):
+        if 121 <= data.tag <= 127:
+            return data.tag - 121
+        if 1280 <= data.tag <= 1400:
+            return data.tag - 1280 + 7
+        if data.tag == 102:
+            return data.value[0]
+        return ("tag", data.tag)
+    return type(data).__name__
+
+
+def _redeemers(tx: Transaction) -> List[Tuple[RedeemerTag, int, Any]]:
+    """(tag, index, data) của các redeemer trong transaction."""
+    redeemers = tx.transaction_witness_set.redeemer
+    if not redeemers:
+        return []
+    if isinstance(redeemers, RedeemerMap):
+        return [(key.tag, key.index, value.data) for key, value in redeemers.items()]
+    return [(r.tag, r.index, r.data) for r in redeemers]
+
+
+def _scripts(tx: Transaction) -> Tuple:
+    """Script có thể chạy cho redeemer không phải mint: script trong witness + reference input."""
+    witness = tx.transaction_witness_set
+    hashes = set()
+    for scripts in (witness.plutus_v1_script, witness.plutus_v2_script, witness.plutus_v3_script):
+        for script in scripts or []:
+            hashes.add(plutus_script_hash(script).payload.hex())
+    for tx_in in tx.transaction_body.reference_inputs or []:
+        hashes.add(f"{tx_in.transaction_id}#{tx_in.index}")
+    return tuple(sorted(hashes))
+
+
+class ExUnitsCache:
+    """
+    Ex-units đã evaluate của các redeemer Plutus, theo cấu trúc transaction.
+
+    Chi phí của validator CIP-68 chỉ phụ thuộc vào hình dạng transaction
+    (số input/output, asset, kích thước datum/redeemer), không phụ thuộc
+    giá trị cụ thể. Mỗi redeemer được cache theo key:
+
+        (tag:index, script hash, constructor của redeemer, fingerprint của tx)
+
+    Fingerprint gồm số input / reference input / required signer, từng output
+    (loại địa chỉ, số asset, kích thước CBOR làm tròn lên `size_bucket` byte)
+    và shape của phần mint. Transaction chỉ được bỏ qua evaluate khi mọi
+    redeemer đều hit; ex-units trả về là giá trị lớn nhất từng đo được nhân
+    thêm `margin` (0.1 = +10%).
+
+    Args:
+        margin: Biên an toàn cộng thêm vào ex-units lấy từ cache.
+        max_entries: Số key tối đa (LRU). 0 = tắt cache.
+        size_bucket: Độ chia (byte) khi làm tròn kích thước output/redeemer.
+    """
+
+    def __init__(self, margin: float = 0.1, max_entries: int = 256, size_bucket: int = 64):
+        self.margin = margin
+        self.max_entries = max_entries
+        self.size_bucket = size_bucket
+        self._entries: "OrderedDict[Hashable, Tuple[int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # skipped: số lần evaluate được bỏ qua; evaluations: số lần phải evaluate thật
+        self.skipped = 0
+        self.evaluations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def fingerprint(self, tx: Transaction) -> Tuple:
+        """Cấu trúc của transaction, bỏ qua giá trị cụ thể (tx id, lovelace, fee, ...)."""
+        body = tx.transaction_body
+        outputs = tuple(
+            (
+                type(output.address.payment_part).__name__,
+                sum(len(assets) for assets in (output.amount.multi_asset or {}).values())
+                if hasattr(output.amount, "multi_asset") else 0,
+                _bucket(len(output.to_cbor()), self.size_bucket),
+            )
+            for output in body.outputs
+        )
+        mint = tuple(
+            (policy_id.payload.hex(), tuple(sorted(qty > 0 for qty in assets.values())))
+            for policy_id, assets in sorted((body.mint or {}).items(), key=lambda item: item[0].payload)
+        )
+        return (
+            len(body.inputs),
+            len(body.reference_inputs or []),
+            len(body.required_signers or []),
+            len(body.withdraws or {}),
+            len(body.certificates or []),
+            outputs,
+            mint,
+        )
+
+    def keys(self, tx: Transaction) -> Dict[str, Hashable]:
+        """Key cache cho từng redeemer, theo key "tag:index" mà evaluate_tx trả về."""
+        fingerprint = self.fingerprint(tx)
+        policies = sorted(policy_id.payload.hex() for policy_id in (tx.transaction_body.mint or {}))
+        scripts = None
+        keys = {}
+        for tag, index, data in _redeemers(tx):
+            name = f"{tag.name.lower()}:{index}"
+            if tag == RedeemerTag.MINT and index < len(policies):
+                script = policies[index]
+            else:
+                # Input không mang thông tin script: dùng tập script của tx
+                if scripts is None:
+                    scripts = _scripts(tx)
+                script = scripts
+            keys[name] = (
+                name, script, _constructor(data), _bucket(_cbor_size(data), self.size_bucket), fingerprint,
+            )
+        return keys
+
+    def get(self, keys: Dict[str, Hashable]) -> Optional[Dict[str, ExecutionUnits]]:
+        """Ex-units (đã cộng margin) nếu mọi redeemer đều có trong cache, ngược lại None."""
+        if not (self.enabled and keys):
+            return None
+        with self._lock:
+            cached = {name: self._entries.get(key) for name, key in keys.items()}
+            if any(units is None for units in cached.values()):
+                return None
+            for key in keys.values():
+                self._entries.move_to_end(key)
+            self.skipped += 1
+        scale = 1 + self.margin
+        # Object mới mỗi lần: TransactionBuilder nhân buffer trực tiếp lên ExecutionUnits
+        return {
+            name: ExecutionUnits(math.ceil(mem * scale), math.ceil(steps * scale))
+            for name, (mem, steps) in cached.items()
+        }
+
+    def put(self, keys: Dict[str, Hashable], result: Dict[str, ExecutionUnits]):
+        """Ghi kết quả evaluate thật, giữ giá trị lớn nhất từng thấy cho mỗi key."""
+        with self._lock:
+            self.evaluations += 1
+            if not self.enabled:
+                return
+            for name, key in keys.items():
+                units = result.get(name)
+                if units is None:
+                    continue
+                previous = self._entries.get(key, (0, 0))
+                self._entries[key] = (max(previous[0], units.mem), max(previous[1], units.steps))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def covers(self, tx: Transaction) -> bool:
+        """Transaction có thể bỏ qua evaluate hay không (không tính vào thống kê)."""
+        if not self.enabled:
+            return False
+        keys = self.keys(tx)
+        with self._lock:
+            return bool(keys) and all(key in self._entries for key in keys.values())
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            total = self.skipped + self.evaluations
+            return {
+                "skipped": self.skipped,
+                "evaluations": self.evaluations,
+                "skip_rate": round(self.skipped / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+                "margin": self.margin,
+                "max_entries": self.max_entries,
+            }
+
+
+class ExUnitsCacheChainContext(ChainContextWrapper):
+    """
+    ChainContext trả ex-units từ ExUnitsCache, chỉ evaluate thật (remote) khi miss.
+
+    TransactionBuilder gọi `evaluate_tx(tx)` ở mỗi lần build có script, nên
+    với cache hit, build không còn round trip tới Blockfrost cho evaluate.
+    Kết quả của mỗi lần evaluate thật được ghi vào cache.
+    """
+
+    def __init__(self, inner: ChainContext, cache: Optional[ExUnitsCache] = None):
+        super().__init__(inner)
+        self.exunits_cache = cache or ExUnitsCache()
+
+    def evaluate_tx(self, tx: Transaction) -> Dict[str, ExecutionUnits]:
+        keys = self.exunits_cache.keys(tx)
+        cached = self.exunits_cache.get(keys)
+        if cached is not None:
+            return cached
+        result = self._inner.evaluate_tx(tx)
+        self.exunits_cache.put(keys, result)
+        return result
+
+    def evaluate_tx_cbor(self, cbor: Union[bytes, str]) -> Dict[str, ExecutionUnits]:
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        tx = Transaction.from_cbor(cbor)
+        keys = self.exunits_cache.keys(tx)
+        cached = self.exunits_cache.get(keys)
+        if cached is not None:
+            return cached
+        result = self._inner.evaluate_tx_cbor(cbor)
+        self.exunits_cache.put(keys, result)
+        return result
+
+    def exunits_stats(self) -> Dict[str, Union[int, float]]:
+        return self.exunits_cache.stats()
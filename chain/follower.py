@@ -0,0 +1,290 @@
+# chain/follower.py
+# Theo dõi chain từng block cho một tập địa chỉ (vd: store address của CIP-68):
+# giữ chỉ mục UTxO tại một tip đã biết và undo của k block gần nhất để xử lý rollback.
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from pycardano import Address, UTxO
+
+from chain.async_context import AsyncBlockFrostChainContext, BlockFrostAsyncError
+from chain.scheduler import background
+from chain.utxo_store import UTxOKey, tx_changes
+
+# Không import config.logging_config: package chain/ còn được dùng từ các ví dụ
+# trong course/ có module config riêng (trùng tên package config/ của repo)
+logger = logging.getLogger(__name__)
+
+# Số block tối đa lấy trong một lần poll (/blocks/{hash}/next trả tối đa 100)
+_MAX_BLOCKS_PER_POLL = 100
+
+# Listener nhận (added, removed) mỗi khi chỉ mục thay đổi (kể cả khi rollback)
+IndexListener = Callable[[List[UTxO], List[UTxO]], None]
+
+
+class BlockRef(NamedTuple):
+    height: int
+    hash: str
+
+
+class AddressIndex:
+    """
+    Chỉ mục UTxO của một tập địa chỉ, nhất quán tại `tip`.
+
+    Mỗi block được áp dụng kèm undo (UTxO bị xoá, key được thêm) và chỉ giữ
+    `depth` block gần nhất; rollback sâu hơn thì phải `reset` lại từ đầu.
+    Đọc/ghi được bảo vệ bởi lock nên có thể đọc từ worker thread (TransactionBuilder).
+
+    Args:
+        addresses: Các địa chỉ được theo dõi.
+        depth: Số block giữ undo (độ sâu rollback tối đa xử lý được).
+    """
+
+    def __init__(self, addresses: Iterable[Union[str, Address]], depth: int = 10):
+        self.addresses = [str(a) for a in addresses]
+        self.depth = depth
+        self.tip: Optional[BlockRef] = None
+        self._utxos: Dict[UTxOKey, UTxO] = {}
+        self._undo: Deque[Tuple[BlockRef, List[UTxO], List[UTxOKey]]] = deque()
+        self._listeners: List[IndexListener] = []
+        self._lock = threading.Lock()
+        self.blocks_applied = 0
+        self.rollbacks = 0
+        self.resets = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.tip is not None
+
+    def subscribe(self, listener: IndexListener):
+        """Đăng ký listener(added, removed), gọi sau mỗi thay đổi của chỉ mục."""
+        self._listeners.append(listener)
+
+    # ---------------- ĐỌC ----------------
+    def utxos(self, address: Optional[Union[str, Address]] = None) -> List[UTxO]:
+        """UTxO tại tip hiện tại (của một địa chỉ, hoặc tất cả)."""
+        return self.snapshot(address)[1]
+
+    def snapshot(self, address: Optional[Union[str, Address]] = None) -> Tuple[Optional[BlockRef], List[UTxO]]:
+        """(tip, UTxO) đọc cùng lúc, nhất quán với nhau."""
+        with self._lock:
+            utxos = list(self._utxos.values())
+            tip = self.tip
+        if address is not None:
+            address = str(address)
+            utxos = [u for u in utxos if str(u.output.address) == address]
+        return tip, utxos
+
+    def blocks(self) -> List[BlockRef]:
+        """Các block còn giữ undo, cũ nhất trước."""
+        with self._lock:
+            return [block for block, _, _ in self._undo]
+
+    # ---------------- GHI ----------------
+    def reset(self, tip: BlockRef, utxos: Iterable[UTxO]):
+        """Nạp lại toàn bộ chỉ mục tại `tip` (bootstrap hoặc rollback quá sâu)."""
+        with self._lock:
+            removed = list(self._utxos.values())
+            self._utxos = {_key(u): u for u in utxos}
+            self._undo.clear()
+            self.tip = tip
+            added = list(self._utxos.values())
+            self.resets += 1
+        self._emit(added, removed)
+
+    def apply_block(self, block: BlockRef, changes: Sequence[Tuple[Sequence[UTxOKey], Sequence[UTxO]]]):
+        """Áp dụng lần lượt (spent, created) của các transaction trong block."""
+        added: List[UTxO] = []
+        removed: List[UTxO] = []
+        with self._lock:
+            for spent, created in changes:
+                for key in spent:
+                    utxo = self._utxos.pop(tuple(key), None)
+                    if utxo is not None:
+                        removed.append(utxo)
+                for utxo in created:
+                    self._utxos[_key(utxo)] = utxo
+                    added.append(utxo)
+            self._undo.append((block, removed, [_key(u) for u in added]))
+            while len(self._undo) > self.depth:
+                self._undo.popleft()
+            self.tip = block
+            self.blocks_applied += 1
+        if added or removed:
+            self._emit(added, removed)
+
+    def rollback(self, height: int) -> bool:
+        """
+        Quay chỉ mục về block `height` bằng undo. Trả về False nếu block đó
+        không còn trong undo (cần reset).
+        """
+        added: List[UTxO] = []
+        removed: List[UTxO] = []
+        with self._lock:
+            if not any(block.height == height for block, _, _ in self._undo):
+                return False
+            while self._undo and self._undo[-1][0].height > height:
+                _, spent, created_keys = self._undo.pop()
+                for key in created_keys:
+                    utxo = self._utxos.pop(key, None)
+                    if utxo is not None:
+                        removed.append(utxo)
+                for utxo in spent:
+                    self._utxos[_key(utxo)] = utxo
+                    added.append(utxo)
+            self.tip = self._undo[-1][0]
+            self.rollbacks += 1
+        self._emit(added, removed)
+        return True
+
+    def _emit(self, added: List[UTxO], removed: List[UTxO]):
+        for listener in self._listeners:
+            listener(added, removed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tip": self.tip._asdict() if self.tip else None,
+                "utxos": len(self._utxos),
+                "undo_blocks": len(self._undo),
+                "blocks_applied": self.blocks_applied,
+                "rollbacks": self.rollbacks,
+                "resets": self.resets,
+            }
+
+
+class ChainFollower:
+    """
+    Task nền theo dõi block mới qua Blockfrost và cập nhật một AddressIndex.
+
+    Mỗi lần poll:
+    1. Nếu block tại tip của chỉ mục không còn trên chain → rollback về block
+       chung gần nhất (hoặc bootstrap lại nếu sâu hơn `depth`).
+    2. Lấy các block tiếp theo (`/blocks/{hash}/next`), các transaction của
+       địa chỉ theo dõi trong khoảng height đó, rồi áp dụng từng block theo thứ tự.
+
+    Mọi request chạy với ưu tiên nền (chain.scheduler.background).
+
+    Args:
+        context: AsyncBlockFrostChainContext dùng chung với ứng dụng.
+        index: AddressIndex cần cập nhật.
+        interval: Khoảng thời gian giữa hai lần poll (giây).
+    """
+
+    def __init__(self, context: AsyncBlockFrostChainContext, index: AddressIndex, interval: float = 10.0):
+        self.context = context
+        self.index = index
+        self.interval = interval
+        self.polls = 0
+        self.errors = 0
+
+    async def bootstrap(self):
+        """
+        Nạp toàn bộ UTxO của các địa chỉ theo dõi.
+
+        Tip được lấy trước, UTxO tải thẳng từ Blockfrost sau (không qua cache
+        UTxO / snapshot, vốn có thể cũ hơn tip): UTxO không cũ hơn tip, và các
+        block sau tip được poll áp dụng lại mà không đổi kết quả (tiêu UTxO
+        đã mất / thêm UTxO đã có là không đổi).
+        """
+        with background():
+            tip = _block_ref(await self.context._get("/blocks/latest"))
+            utxos = []
+            for address in self.index.addresses:
+                utxos.extend(await self.context._fetch_utxos_direct(address))
+        self.index.reset(tip, utxos)
+        logger.info(f"🧭 Chain follower bootstrap tại block {tip.height}: {len(utxos)} UTxO")
+
+    async def poll(self) -> int:
+        """Đồng bộ chỉ mục tới tip hiện tại. Trả về số block đã áp dụng."""
+        self.polls += 1
+        with background():
+            if not self.index.ready:
+                await self.bootstrap()
+                return 0
+            latest = _block_ref(await self.context._get("/blocks/latest"))
+            if latest == self.index.tip:
+                return 0
+            if not await self._is_on_chain(self.index.tip):
+                await self._rollback()
+                if not self.index.ready:
+                    return 0
+
+            raw_blocks = await self.context._get(
+                f"/blocks/{self.index.tip.hash}/next", count=_MAX_BLOCKS_PER_POLL
+            )
+            # Chain vừa đổi nhánh giữa hai request: để lần poll sau xử lý rollback
+            if not raw_blocks or raw_blocks[0]["previous_block"] != self.index.tip.hash:
+                return 0
+            blocks = [_block_ref(b) for b in raw_blocks]
+
+            changes_by_height = await self._changes(blocks[0].height, blocks[-1].height)
+        for block in blocks:
+            self.index.apply_block(block, changes_by_height.get(block.height, []))
+        return len(blocks)
+
+    async def run(self):
+        """Vòng lặp poll cho tới khi task bị cancel."""
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ Chain follower lỗi khi poll: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _is_on_chain(self, block: BlockRef) -> bool:
+        try:
+            current = await self.context._get(f"/blocks/{block.height}")
+        except BlockFrostAsyncError as e:
+            if e.status_code == 404:
+                return False
+            raise
+        return current["hash"] == block.hash
+
+    async def _rollback(self):
+        for block in reversed(self.index.blocks()):
+            if await self._is_on_chain(block):
+                self.index.rollback(block.height)
+                logger.warning(f"↩️ Rollback chỉ mục về block {block.height}")
+                return
+        logger.warning("↩️ Rollback sâu hơn số block giữ undo, bootstrap lại chỉ mục")
+        await self.bootstrap()
+
+    async def _changes(self, from_height: int, to_height: int) -> Dict[int, List[Tuple[List[UTxOKey], List[UTxO]]]]:
+        """(spent, created) theo block height cho mọi địa chỉ theo dõi, đúng thứ tự on-chain."""
+        txs = []
+        for address in self.index.addresses:
+            items = await self.context._get_pages(
+                f"/addresses/{address}/transactions", **{"from": str(from_height), "to": str(to_height)}
+            )
+            txs.extend((address, item) for item in items)
+        # Cùng một tx có thể chạm nhiều địa chỉ: chỉ tải /txs/{hash}/utxos một lần
+        hashes = list(dict.fromkeys(item["tx_hash"] for _, item in txs))
+        details = dict(zip(hashes, await asyncio.gather(
+            *(self.context._get(f"/txs/{tx_hash}/utxos") for tx_hash in hashes)
+        )))
+
+        txs.sort(key=lambda pair: (pair[1]["block_height"], pair[1]["tx_index"]))
+        result: Dict[int, List[Tuple[List[UTxOKey], List[UTxO]]]] = {}
+        for address, item in txs:
+            spent, created = tx_changes(address, item["tx_hash"], details[item["tx_hash"]])
+            created = [await self.context._to_utxo(address, output) for output in created]
+            result.setdefault(item["block_height"], []).append((spent, created))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.index.stats(), polls=self.polls, errors=self.errors)
+
+
+def _block_ref(block: Dict[str, Any]) -> BlockRef:
+    return BlockRef(block["height"], block["hash"])
+
+
+def _key(utxo: UTxO) -> UTxOKey:
+    return utxo.input.transaction_id.payload.hex(), utxo.input.index
@@ -0,0 +1,521 @@
+# chain/local_evaluator.py
+# Evaluate redeemer PlutusV3 ngay trong process (UPLC CEK machine của package `uplc`),
+# thay cho endpoint /utils/txs/evaluate của Blockfrost.
+
+import threading
+import time
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from pycardano import (
+    Address,
+    ChainContext,
+    ExecutionUnits,
+    PlutusV3Script,
+    PointerAddress,
+    RawCBOR,
+    RedeemerMap,
+    RedeemerTag,
+    ScriptHash,
+    Transaction,
+    TransactionFailedException,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    VerificationKeyHash,
+    datum_hash,
+    plutus_script_hash,
+    script_hash,
+)
+from pycardano.cbor import cbor2
+from pycardano.serialization import default_encoder
+
+from chain.base import ChainContextWrapper
+
+try:
+    from uplc.ast import (
+        BuiltinUnit,
+        PlutusByteString,
+        PlutusConstr,
+        PlutusData,
+        PlutusInteger,
+        PlutusList,
+        PlutusMap,
+        data_from_cbor,
+    )
+    from uplc.cost_model import (
+        Budget,
+        default_builtin_cost_model_base,
+        default_cek_machine_cost_model_base,
+        latest_network_config_plutus,
+        PlutusVersion,
+        updated_builtin_cost_model_from_network_config,
+        updated_cek_machine_cost_model_from_network_config,
+    )
+    from uplc.tools import eval as uplc_eval, unflatten
+except ImportError:  # pragma: no cover - uplc là dependency tuỳ chọn
+    uplc_eval = None
+
+# Slot bắt đầu Shelley và thời điểm tương ứng (giây) theo network magic;
+# network khác tính thẳng từ system_start + slot * slot_length
+_SHELLEY_START = {
+    764824073: (4492800, 1596059091),  # mainnet
+    1: (86400, 1655769600),  # preprod
+    2: (0, 1666656000),  # preview
+}
+
+
+class LocalEvaluationUnsupported(Exception):
+    """Transaction ngoài phạm vi evaluator local (input chưa biết, script V1/V2, certificate, ...)."""
+
+
+def _constr(index: int, *fields) -> "PlutusConstr":
+    return PlutusConstr(index, list(fields))
+
+
+def _maybe(value) -> "PlutusConstr":
+    return _constr(1) if value is None else _constr(0, value)
+
+
+def _bool(value: bool) -> "PlutusConstr":
+    return _constr(1 if value else 0)
+
+
+def _data(value: Any) -> "PlutusData":
+    """Datum/redeemer của pycardano (PlutusData, RawPlutusData, RawCBOR, CBORTag, ...) → uplc PlutusData."""
+    if isinstance(value, RawCBOR):
+        return data_from_cbor(value.cbor)
+    return data_from_cbor(cbor2.dumps(value, default=default_encoder))
+
+
+def _out_ref(tx_in: TransactionInput) -> "PlutusConstr":
+    # PlutusV3: TxId là bytes trực tiếp (không bọc Constr như V1/V2)
+    return _constr(0, PlutusByteString(tx_in.transaction_id.payload), PlutusInteger(tx_in.index))
+
+
+def _credential(part) -> "PlutusConstr":
+    if isinstance(part, VerificationKeyHash):
+        return _constr(0, PlutusByteString(part.payload))
+    if isinstance(part, ScriptHash):
+        return _constr(1, PlutusByteString(part.payload))
+    raise LocalEvaluationUnsupported(f"credential {part!r}")
+
+
+def _address(address: Address) -> "PlutusConstr":
+    if address.payment_part is None:
+        raise LocalEvaluationUnsupported("Byron address")
+    staking = address.staking_part
+    if staking is None:
+        staking_data = None
+    elif isinstance(staking, PointerAddress):
+        staking_data = _constr(
+            1, PlutusInteger(staking.slot), PlutusInteger(staking.tx_index), PlutusInteger(staking.cert_index)
+        )
+    else:
+        staking_data = _constr(0, _credential(staking))
+    return _constr(0, _credential(address.payment_part), _maybe(staking_data))
+
+
+def _value(coin: Optional[int], multi_asset) -> "PlutusMap":
+    """Value dạng Map policy → Map name → qty (ada là policy rỗng, đứng đầu); bỏ qty 0."""
+    entries = {}
+    if coin is not None:
+        entries[PlutusByteString(b"")] = PlutusMap({PlutusByteString(b""): PlutusInteger(coin)})
+    for policy_id, assets in sorted((multi_asset or {}).items(), key=lambda item: item[0].payload):
+        tokens = {
+            PlutusByteString(name.payload): PlutusInteger(qty)
+            for name, qty in sorted(assets.items(), key=lambda item: item[0].payload)
+            if qty != 0
+        }
+        if tokens:
+            entries[PlutusByteString(policy_id.payload)] = PlutusMap(tokens)
+    return PlutusMap(entries)
+
+
+def _tx_out(output: TransactionOutput) -> "PlutusConstr":
+    if output.datum is not None:
+        datum = _constr(2, _data(output.datum))
+    elif output.datum_hash is not None:
+        datum = _constr(1, PlutusByteString(output.datum_hash.payload))
+    else:
+        datum = _constr(0)
+    script_ref = PlutusByteString(script_hash(output.script).payload) if output.script is not None else None
+    amount = output.amount
+    value = _value(amount, None) if isinstance(amount, int) else _value(amount.coin, amount.multi_asset)
+    return _constr(0, _address(output.address), value, datum, _maybe(script_ref))
+
+
+def _redeemers(tx: Transaction) -> List[Tuple[RedeemerTag, int, Any]]:
+    redeemers = tx.transaction_witness_set.redeemer
+    if not redeemers:
+        return []
+    if isinstance(redeemers, RedeemerMap):
+        return [(key.tag, key.index, value.data) for key, value in redeemers.items()]
+    return [(r.tag, r.index, r.data) for r in redeemers]
+
+
+def _program_bytes(script: bytes) -> bytes:
+    """Flat program bọc đúng một lớp CBOR (blueprint đôi khi bọc hai lớp)."""
+    inner = cbor2.loads(script)
+    try:
+        if isinstance(cbor2.loads(inner), bytes):
+            return inner
+    except Exception:
+        pass
+    return script
+
+
+class LocalPlutusEvaluator:
+    """
+    Evaluate các redeemer PlutusV3 của một transaction bằng UPLC CEK machine.
+
+    Dựng ScriptContext V3 (TxInfo, redeemer, ScriptInfo) từ transaction và
+    các UTxO được tiêu / tham chiếu, rồi chạy script với cost model hiện tại
+    của network. Hỗ trợ redeemer mint và spend; transaction có certificate,
+    withdrawal, vote/proposal hoặc script V1/V2 raise LocalEvaluationUnsupported
+    (caller evaluate remote thay thế). Script fail raise TransactionFailedException.
+
+    Program đã giải mã (unflatten) và cost model được cache, dùng lại giữa các lần gọi.
+    """
+
+    def __init__(self):
+        if uplc_eval is None:
+            raise ImportError("Cần cài package `uplc` để evaluate script local: pip install uplc")
+        self._lock = threading.Lock()
+        self._programs: Dict[bytes, Any] = {}
+        self._cost_models: Dict[Tuple, Tuple[Any, Any]] = {}
+
+    def _program(self, script: PlutusV3Script):
+        key = bytes(script)
+        program = self._programs.get(key)
+        if program is None:
+            program = unflatten(_program_bytes(key))
+            with self._lock:
+                self._programs[key] = program
+        return program
+
+    def _machine_costs(self, cost_model: Optional[Dict]) -> Tuple[Any, Any]:
+        """(cek machine, builtin) cost model từ cost model PlutusV3 của protocol params."""
+        # Cost model của Blockfrost có tên tham số; dạng list / key là số thì dùng bản mặc định của uplc
+        if not cost_model or not all(isinstance(k, str) and not k.isdigit() for k in cost_model):
+            cost_model = latest_network_config_plutus(PlutusVersion.PlutusV3)
+        key = tuple(sorted(cost_model.items()))
+        costs = self._cost_models.get(key)
+        if costs is None:
+            costs = (
+                updated_cek_machine_cost_model_from_network_config(default_cek_machine_cost_model_base(), cost_model),
+                updated_builtin_cost_model_from_network_config(default_builtin_cost_model_base(), cost_model),
+            )
+            with self._lock:
+                self._cost_models[key] = costs
+        return costs
+
+    def evaluate(
+        self,
+        tx: Transaction,
+        utxos: Iterable[UTxO],
+        cost_model: Optional[Dict] = None,
+        max_ex_units: Optional[ExecutionUnits] = None,
+        slot_to_posix: Optional[Callable[[int], int]] = None,
+    ) -> Dict[str, ExecutionUnits]:
+        """
+        Ex-units của từng redeemer ("spend:0", "mint:0", ... như Blockfrost).
+
+        Args:
+            tx: Transaction (witness set có redeemer + script hoặc reference script).
+            utxos: UTxO của mọi input và reference input.
+            cost_model: Cost model PlutusV3 (`protocol_param.cost_models["PlutusV3"]`).
+            max_ex_units: Ngân sách tối đa cho một script (mặc định của uplc nếu None).
+            slot_to_posix: Đổi slot → POSIX ms cho validity range (bắt buộc nếu tx có ttl/validity_start).
+        """
+        body = tx.transaction_body
+        if body.certificates or body.withdraws or body.voting_procedures or body.proposal_procedures:
+            raise LocalEvaluationUnsupported("certificates / withdrawals / governance")
+        resolved = {utxo.input: utxo.output for utxo in utxos}
+        inputs = sorted(body.inputs, key=lambda i: (i.transaction_id.payload, i.index))
+        reference_inputs = sorted(body.reference_inputs or [], key=lambda i: (i.transaction_id.payload, i.index))
+        missing = [tx_in for tx_in in inputs + reference_inputs if tx_in not in resolved]
+        if missing:
+            raise LocalEvaluationUnsupported(f"unknown inputs: {missing}")
+
+        scripts = self._scripts(tx, [resolved[i] for i in inputs + reference_inputs])
+        witness_datums = {
+            datum_hash(d).payload: d for d in (tx.transaction_witness_set.plutus_data or [])
+        }
+        policies = sorted((body.mint or {}).keys(), key=lambda p: p.payload)
+
+        # Purpose (key sắp xếp, ScriptPurpose, ScriptInfo, script hash) của từng redeemer
+        purposes = {}
+        for tag, index, data in _redeemers(tx):
+            if tag == RedeemerTag.MINT:
+                policy = policies[index]
+                target = PlutusByteString(policy.payload)
+                purposes[(tag, index)] = ((0, policy.payload), _constr(0, target), _constr(0, target), policy, data)
+            elif tag == RedeemerTag.SPEND:
+                tx_in = inputs[index]
+                output = resolved[tx_in]
+                if not isinstance(output.address.payment_part, ScriptHash):
+                    raise LocalEvaluationUnsupported(f"spend redeemer on key input {tx_in}")
+                if output.datum is not None:
+                    datum = _data(output.datum)
+                elif output.datum_hash is not None and output.datum_hash.payload in witness_datums:
+                    datum = _data(witness_datums[output.datum_hash.payload])
+                else:
+                    datum = None
+                out_ref = _out_ref(tx_in)
+                purposes[(tag, index)] = (
+                    (1, tx_in.transaction_id.payload, tx_in.index),
+                    _constr(1, out_ref),
+                    _constr(1, out_ref, _maybe(datum)),
+                    output.address.payment_part,
+                    data,
+                )
+            else:
+                raise LocalEvaluationUnsupported(f"redeemer {tag.name}")
+
+        ordered = sorted(purposes.values(), key=lambda p: p[0])
+        tx_info = _constr(
+            0,
+            PlutusList([_constr(0, _out_ref(i), _tx_out(resolved[i])) for i in inputs]),
+            PlutusList([_constr(0, _out_ref(i), _tx_out(resolved[i])) for i in reference_inputs]),
+            PlutusList([_tx_out(output) for output in body.outputs]),
+            PlutusInteger(body.fee),
+            # PlutusV3: mint không có entry ada = 0
+            _value(None, body.mint),
+            PlutusList([]),
+            PlutusMap({}),
+            self._valid_range(body, slot_to_posix),
+            PlutusList([
+                PlutusByteString(signer.payload)
+                for signer in sorted(body.required_signers or [], key=lambda s: s.payload)
+            ]),
+            PlutusMap({purpose: _data(data) for _, purpose, _, _, data in ordered}),
+            PlutusMap({
+                PlutusByteString(h): _data(witness_datums[h]) for h in sorted(witness_datums)
+            }),
+            PlutusByteString(tx.id.payload),
+            PlutusMap({}),
+            PlutusList([]),
+            _maybe(PlutusInteger(body.current_treasury_value) if body.current_treasury_value is not None else None),
+            _maybe(PlutusInteger(body.donation) if body.donation else None),
+        )
+
+        cek_costs, builtin_costs = self._machine_costs(cost_model)
+        budget_kwargs = {}
+        if max_ex_units is not None:
+            budget_kwargs["budget"] = Budget(cpu=max_ex_units.steps, memory=max_ex_units.mem)
+        result = {}
+        for (tag, index), (_, _, script_info, hash_, data) in purposes.items():
+            script = scripts.get(hash_.payload)
+            if script is None:
+                raise LocalEvaluationUnsupported(f"script {hash_} not in witness set or reference inputs")
+            context = _constr(0, tx_info, _data(data), script_info)
+            computation = uplc_eval(
+                self._program(script),
+                context,
+                cek_machine_cost_model=cek_costs,
+                builtin_cost_model=builtin_costs,
+                **budget_kwargs,
+            )
+            name = f"{tag.name.lower()}:{index}"
+            if not isinstance(computation.result, BuiltinUnit):
+                raise TransactionFailedException(
+                    f"Local evaluation failed for {name}: {computation.result!r} logs={computation.logs}"
+                )
+            result[name] = ExecutionUnits(computation.cost.memory, computation.cost.cpu)
+        return result
+
+    @staticmethod
+    def _scripts(tx: Transaction, outputs: Sequence[TransactionOutput]) -> Dict[bytes, PlutusV3Script]:
+        """Script PlutusV3 theo hash: từ witness set và reference script của các output được dùng."""
+        witness = tx.transaction_witness_set
+        if witness.plutus_v1_script or witness.plutus_v2_script:
+            raise LocalEvaluationUnsupported("PlutusV1/V2 scripts")
+        scripts = {}
+        for script in witness.plutus_v3_script or []:
+            script = PlutusV3Script(script)
+            scripts[plutus_script_hash(script).payload] = script
+        for output in outputs:
+            if isinstance(output.script, PlutusV3Script):
+                scripts[plutus_script_hash(output.script).payload] = output.script
+        return scripts
+
+    @staticmethod
+    def _valid_range(body, slot_to_posix: Optional[Callable[[int], int]]) -> "PlutusConstr":
+        if (body.validity_start is not None or body.ttl is not None) and slot_to_posix is None:
+            raise LocalEvaluationUnsupported("validity range without slot → POSIX conversion")
+        if body.validity_start is None:
+            lower = _constr(0, _constr(0), _bool(True))
+        else:
+            lower = _constr(0, _constr(1, PlutusInteger(slot_to_posix(body.validity_start))), _bool(True))
+        if body.ttl is None:
+            upper = _constr(0, _constr(2), _bool(True))
+        else:
+            # Cận trên là slot ttl, không bao gồm
+            upper = _constr(0, _constr(1, PlutusInteger(slot_to_posix(body.ttl))), _bool(False))
+        return _constr(0, lower, upper)
+
+
+def _slot_to_posix(start_slot: int, start_time: int, slot_length: float, slot: int) -> int:
+    return int((start_time + (slot - start_slot) * slot_length) * 1000)
+
+
+def slot_to_posix_ms(context: ChainContext) -> Callable[[int], int]:
+    """Hàm đổi slot → POSIX time (ms) theo genesis của network (pickle được, dùng cho evaluate_many)."""
+    genesis = context.genesis_param
+    start_slot, start_time = _SHELLEY_START.get(genesis.network_magic, (0, genesis.system_start))
+    return partial(_slot_to_posix, start_slot, start_time, genesis.slot_length)
+
+
+# Evaluator dùng lại trong mỗi worker process của evaluate_many
+_worker_evaluator: Optional[LocalPlutusEvaluator] = None
+
+
+def _evaluate_cbor(args) -> Dict[str, Tuple[int, int]]:
+    global _worker_evaluator
+    tx_cbor, utxo_cbors, cost_model, max_ex_units, slot_to_posix = args
+    if _worker_evaluator is None:
+        _worker_evaluator = LocalPlutusEvaluator()
+    result = _worker_evaluator.evaluate(
+        Transaction.from_cbor(tx_cbor),
+        [UTxO.from_cbor(u) for u in utxo_cbors],
+        cost_model,
+        ExecutionUnits(*max_ex_units) if max_ex_units else None,
+        slot_to_posix,
+    )
+    return {name: (units.mem, units.steps) for name, units in result.items()}
+
+
+def evaluate_many(
+    items: Sequence[Tuple[Transaction, Sequence[UTxO]]],
+    cost_model: Optional[Dict] = None,
+    max_ex_units: Optional[ExecutionUnits] = None,
+    max_workers: Optional[int] = None,
+    slot_to_posix: Optional[Callable[[int], int]] = None,
+) -> List[Dict[str, ExecutionUnits]]:
+    """
+    Evaluate nhiều transaction song song trên nhiều CPU core (ProcessPoolExecutor).
+
+    Mỗi phần tử là (transaction, UTxO của input + reference input); kết quả
+    theo đúng thứ tự. `slot_to_posix` phải pickle được (vd: `slot_to_posix_ms(context)`).
+    """
+    limits = (max_ex_units.mem, max_ex_units.steps) if max_ex_units else None
+    jobs = [
+        (tx.to_cbor(), [utxo.to_cbor() for utxo in utxos], cost_model, limits, slot_to_posix)
+        for tx, utxos in items
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(_evaluate_cbor, jobs))
+    return [
+        {name: ExecutionUnits(mem, steps) for name, (mem, steps) in result.items()}
+        for result in results
+    ]
+
+
+class LocalEvaluationChainContext(ChainContextWrapper):
+    """
+    ChainContext evaluate script PlutusV3 local, chỉ gọi evaluate remote khi không thể.
+
+    UTxO của input được lấy từ các UTxO đã đi qua context (`utxos`,
+    `utxo_for_asset`) hoặc được báo trước qua `remember_utxos` (vd:
+    CIP68TxTemplates báo script input và reference script khi dựng builder).
+    Transaction ngoài phạm vi của LocalPlutusEvaluator (input chưa biết,
+    script V1/V2, certificate, ...) được evaluate remote như cũ; tương tự khi
+    chưa cài `uplc` hoặc không đổi được slot → POSIX time (context không có
+    genesis_param).
+    """
+
+    def __init__(
+        self,
+        inner: ChainContext,
+        evaluator: Optional[LocalPlutusEvaluator] = None,
+        max_utxos: int = 10000,
+    ):
+        super().__init__(inner)
+        if evaluator is None and uplc_eval is None:
+            print("⚠️ Chưa cài package `uplc`: evaluate script qua context gốc (remote)")
+        self.evaluator = evaluator or (LocalPlutusEvaluator() if uplc_eval is not None else None)
+        self.max_utxos = max_utxos
+        # TransactionInput → UTxO đã thấy (cũ nhất bị bỏ trước khi vượt max_utxos)
+        self._known: Dict[TransactionInput, UTxO] = {}
+        self._lock = threading.Lock()
+        self.local = 0
+        self.fallbacks = 0
+        self.local_seconds = 0.0
+        self._slot_to_posix: Optional[Callable[[int], int]] = None
+
+    def remember_utxos(self, utxos: Iterable[UTxO]):
+        with self._lock:
+            for utxo in utxos:
+                self._known.pop(utxo.input, None)
+                self._known[utxo.input] = utxo
+            while len(self._known) > self.max_utxos:
+                del self._known[next(iter(self._known))]
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        utxos = self._inner.utxos(address)
+        self.remember_utxos(utxos)
+        return utxos
+
+    def __getattr__(self, name):
+        attr = super().__getattr__(name)
+        if name != "utxo_for_asset":
+            return attr
+
+        def utxo_for_asset(*args, **kwargs):
+            utxo = attr(*args, **kwargs)
+            if utxo is not None:
+                self.remember_utxos([utxo])
+            return utxo
+
+        return utxo_for_asset
+
+    def _slot_converter(self) -> Callable[[int], int]:
+        """slot → POSIX ms của inner context (genesis không đổi nên chỉ tính một lần)."""
+        if self._slot_to_posix is None:
+            try:
+                self._slot_to_posix = slot_to_posix_ms(self._inner)
+            except Exception as e:
+                raise LocalEvaluationUnsupported(f"slot → POSIX time: {e!r}") from e
+        return self._slot_to_posix
+
+    def evaluate_tx(self, tx: Transaction) -> Dict[str, ExecutionUnits]:
+        body = tx.transaction_body
+        with self._lock:
+            utxos = [self._known.get(i) for i in list(body.inputs) + list(body.reference_inputs or [])]
+        if self.evaluator is not None and all(utxos):
+            params = self.protocol_param
+            start = time.perf_counter()
+            try:
+                result = self.evaluator.evaluate(
+                    tx,
+                    utxos,
+                    (params.cost_models or {}).get("PlutusV3"),
+                    ExecutionUnits(params.max_tx_ex_mem, params.max_tx_ex_steps),
+                    self._slot_converter() if body.ttl is not None or body.validity_start is not None else None,
+                )
+            except LocalEvaluationUnsupported:
+                pass
+            else:
+                with self._lock:
+                    self.local += 1
+                    self.local_seconds += time.perf_counter() - start
+                return result
+        with self._lock:
+            self.fallbacks += 1
+        return self._inner.evaluate_tx(tx)
+
+    def evaluate_tx_cbor(self, cbor: Union[bytes, str]) -> Dict[str, ExecutionUnits]:
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        return self.evaluate_tx(Transaction.from_cbor(cbor))
+
+    def local_eval_stats(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            return {
+                "local": self.local,
+                "remote_fallbacks": self.fallbacks,
+                "local_ms_avg": round(self.local_seconds / self.local * 1000, 2) if self.local else 0.0,
+                "known_utxos": len(self._known),
+            }
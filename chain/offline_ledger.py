@@ -0,0 +1,370 @@
+# chain/offline_ledger.py
+# ChainContext chạy hoàn toàn trong bộ nhớ: không cần Blockfrost, dùng cho benchmark/test.
+
+import hashlib
+import itertools
+import threading
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+from pycardano import (
+    Address,
+    AssetName,
+    ChainContext,
+    ExecutionUnits,
+    GenesisParameters,
+    MultiAsset,
+    ProtocolParameters,
+    RawCBOR,
+    ScriptHash,
+    Transaction,
+    TransactionFailedException,
+    TransactionId,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    Value,
+    VerificationKeyHash,
+)
+from pycardano.network import Network
+from pycardano.plutus import RedeemerMap
+from pycardano.utils import fee as min_fee, min_lovelace_post_alonzo
+
+from chain.utxo_cache import asset_unit
+
+# Ex-units mặc định trả về cho mỗi redeemer khi evaluate (không chạy Plutus thật)
+DEFAULT_EX_UNITS = ExecutionUnits(mem=1_000_000, steps=500_000_000)
+
+
+def default_protocol_param() -> ProtocolParameters:
+    """Protocol parameters cố định (giá trị giống preprod/mainnet hiện tại)."""
+    return ProtocolParameters(
+        min_fee_constant=155381,
+        min_fee_coefficient=44,
+        max_block_size=90112,
+        max_tx_size=16384,
+        max_block_header_size=1100,
+        key_deposit=2_000_000,
+        pool_deposit=500_000_000,
+        pool_influence=Fraction(3, 10),
+        monetary_expansion=Fraction(3, 1000),
+        treasury_expansion=Fraction(1, 5),
+        decentralization_param=Fraction(0),
+        extra_entropy="",
+        protocol_major_version=9,
+        protocol_minor_version=0,
+        min_utxo=0,
+        min_pool_cost=170_000_000,
+        price_mem=Fraction(577, 10000),
+        price_step=Fraction(721, 10000000),
+        max_tx_ex_mem=14_000_000,
+        max_tx_ex_steps=10_000_000_000,
+        max_block_ex_mem=62_000_000,
+        max_block_ex_steps=20_000_000_000,
+        max_val_size=5000,
+        collateral_percent=150,
+        max_collateral_inputs=3,
+        coins_per_utxo_word=0,
+        coins_per_utxo_byte=4310,
+        cost_models={},
+        maximum_reference_scripts_size={"bytes": 200000},
+        min_fee_reference_scripts={"base": 15, "range": 25600, "multiplier": 1.2},
+    )
+
+
+def default_genesis_param() -> GenesisParameters:
+    return GenesisParameters(
+        active_slots_coefficient=Fraction(1, 20),
+        update_quorum=5,
+        max_lovelace_supply=45_000_000_000_000_000,
+        network_magic=1,
+        epoch_length=432000,
+        system_start=1654041600,
+        slots_per_kes_period=129600,
+        slot_length=1,
+        max_kes_evolutions=62,
+        security_param=2160,
+    )
+
+
+class OfflineLedgerContext(ChainContext):
+    """
+    Ledger giả lập trong bộ nhớ, cài đặt đầy đủ ChainContext.
+
+    - `utxos(address)` đọc từ tập UTxO trong bộ nhớ; `utxo_for_asset` tìm UTxO giữ một asset.
+    - `submit_tx` kiểm tra rồi áp dụng transaction: input phải tồn tại (chống
+      double spend), nằm trong khoảng validity, đủ phí tối thiểu, output đủ
+      min-ADA, chữ ký vkey hợp lệ và đủ cho input/required signers, cân bằng
+      giá trị (input + mint = output + fee). Sau đó xoá input, tạo output.
+    - Plutus script KHÔNG được chạy: `evaluate_tx` trả về `ex_units` cố định
+      cho mỗi redeemer (hoặc kết quả của `evaluator` nếu truyền vào).
+    - Mỗi transaction hợp lệ làm slot tăng `slots_per_tx`; gọi
+      `advance_slot(n)` để tua slot thủ công.
+
+    Args:
+        genesis: Danh sách UTxO ban đầu.
+        network: Network của các địa chỉ.
+        protocol_param: Protocol parameters cố định (mặc định `default_protocol_param()`).
+        slot: Slot bắt đầu.
+        slots_per_tx: Số slot tăng sau mỗi transaction được áp dụng.
+        ex_units: Ex-units trả về cho mỗi redeemer khi evaluate.
+        evaluator: Hàm tuỳ chỉnh `(Transaction) -> Dict[str, ExecutionUnits]`.
+    """
+
+    def __init__(
+        self,
+        genesis: Optional[List[UTxO]] = None,
+        network: Network = Network.TESTNET,
+        protocol_param: Optional[ProtocolParameters] = None,
+        slot: int = 0,
+        slots_per_tx: int = 1,
+        ex_units: ExecutionUnits = DEFAULT_EX_UNITS,
+        evaluator: Optional[Callable[[Transaction], Dict[str, ExecutionUnits]]] = None,
+    ):
+        self._network = network
+        self._protocol_param = protocol_param or default_protocol_param()
+        self._genesis_param = default_genesis_param()
+        self._slot = slot
+        self.slots_per_tx = slots_per_tx
+        self.ex_units = ex_units
+        self.evaluator = evaluator
+        self._lock = threading.RLock()
+        self._utxos: Dict[TransactionInput, TransactionOutput] = {}
+        self._by_address: Dict[str, Dict[TransactionInput, None]] = {}
+        self._transactions: Dict[str, Dict[str, Any]] = {}
+        self._genesis_counter = itertools.count()
+        for utxo in genesis or []:
+            self._add(utxo.input, utxo.output)
+
+    # ---------------- CHAIN STATE ----------------
+    @property
+    def protocol_param(self) -> ProtocolParameters:
+        return self._protocol_param
+
+    @property
+    def genesis_param(self) -> GenesisParameters:
+        return self._genesis_param
+
+    @property
+    def network(self) -> Network:
+        return self._network
+
+    @property
+    def epoch(self) -> int:
+        return self._slot // self._genesis_param.epoch_length
+
+    @property
+    def last_block_slot(self) -> int:
+        return self._slot
+
+    def advance_slot(self, slots: int = 1) -> int:
+        """Tua slot lên `slots`, trả về slot hiện tại."""
+        with self._lock:
+            self._slot += slots
+            return self._slot
+
+    # ---------------- UTXO ----------------
+    def _add(self, tx_in: TransactionInput, tx_out: TransactionOutput):
+        self._utxos[tx_in] = tx_out
+        self._by_address.setdefault(str(tx_out.address), {})[tx_in] = None
+
+    def _remove(self, tx_in: TransactionInput):
+        tx_out = self._utxos.pop(tx_in)
+        self._by_address[str(tx_out.address)].pop(tx_in, None)
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        with self._lock:
+            inputs = self._by_address.get(str(address), {})
+            return [UTxO(tx_in, self._utxos[tx_in]) for tx_in in inputs]
+
+    def utxo_for_asset(
+        self,
+        policy_id: Union[ScriptHash, bytes, str],
+        asset_name: Union[AssetName, bytes, str],
+    ) -> Optional[UTxO]:
+        """UTxO đang giữ asset (giống AssetLookupChainContext.utxo_for_asset)."""
+        unit = asset_unit(policy_id, asset_name)
+        with self._lock:
+            for tx_in, tx_out in self._utxos.items():
+                for pid, assets in tx_out.amount.multi_asset.items():
+                    for name, qty in assets.items():
+                        if qty > 0 and asset_unit(pid, name) == unit:
+                            return UTxO(tx_in, tx_out)
+        return None
+
+    def fund(
+        self,
+        address: Union[str, Address],
+        amount: Union[int, Value],
+        datum: Any = None,
+        script: Any = None,
+    ) -> UTxO:
+        """Thêm một UTxO "genesis" cho địa chỉ (nạp tiền/asset để test)."""
+        if isinstance(address, str):
+            address = Address.from_primitive(address)
+        if isinstance(amount, int):
+            amount = Value(amount)
+        with self._lock:
+            seed = f"genesis-{next(self._genesis_counter)}".encode()
+            tx_in = TransactionInput(TransactionId(hashlib.blake2b(seed, digest_size=32).digest()), 0)
+            tx_out = TransactionOutput(address, amount, datum=datum, script=script)
+            self._add(tx_in, tx_out)
+            return UTxO(tx_in, tx_out)
+
+    def transaction(self, tx_hash: Union[str, TransactionId]) -> Optional[Dict[str, Any]]:
+        """Thông tin transaction đã áp dụng (giống Blockfrost /txs/{hash}), None nếu chưa có."""
+        return self._transactions.get(str(tx_hash))
+
+    # ---------------- SUBMIT ----------------
+    def submit_tx_cbor(self, cbor: Union[bytes, str]) -> str:
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        tx = Transaction.from_cbor(cbor)
+        body = tx.transaction_body
+        tx_id = tx.id
+        tx_hash = tx_id.payload.hex()
+
+        with self._lock:
+            if tx_hash in self._transactions:
+                raise TransactionFailedException(f"Transaction {tx_hash} đã được submit")
+            missing = [i for i in body.inputs if i not in self._utxos]
+            missing += [i for i in (body.reference_inputs or []) if i not in self._utxos]
+            if missing:
+                raise TransactionFailedException(
+                    f"BadInputsUTxO: {[f'{i.transaction_id}#{i.index}' for i in missing]}"
+                )
+            self._check_validity(body)
+            self._check_fee(tx, len(cbor))
+            self._check_outputs(body)
+            self._check_signatures(tx)
+            self._check_balance(body)
+
+            for tx_in in body.inputs:
+                self._remove(tx_in)
+            for index, tx_out in enumerate(body.outputs):
+                # Inline datum trả về dạng RawCBOR giống BlockFrostChainContext
+                if tx_out.datum is not None and not isinstance(tx_out.datum, RawCBOR):
+                    tx_out.datum = RawCBOR(tx_out.datum.to_cbor())
+                self._add(TransactionInput(tx_id, index), tx_out)
+            self._slot += self.slots_per_tx
+            self._transactions[tx_hash] = {
+                "hash": tx_hash,
+                "slot": self._slot,
+                "fees": str(body.fee),
+                "size": len(cbor),
+            }
+        return tx_hash
+
+    def _check_validity(self, body):
+        if body.ttl is not None and self._slot > body.ttl:
+            raise TransactionFailedException(f"OutsideValidityInterval: slot {self._slot} > ttl {body.ttl}")
+        if body.validity_start is not None and self._slot < body.validity_start:
+            raise TransactionFailedException(
+                f"OutsideValidityInterval: slot {self._slot} < validity_start {body.validity_start}"
+            )
+
+    def _check_fee(self, tx: Transaction, size: int):
+        steps = mem = 0
+        for redeemer in _redeemers(tx):
+            units = redeemer[1]
+            if units is not None:
+                steps += units.steps
+                mem += units.mem
+        required = min_fee(self, size, steps, mem)
+        if tx.transaction_body.fee < required:
+            raise TransactionFailedException(
+                f"FeeTooSmallUTxO: fee {tx.transaction_body.fee} < {required}"
+            )
+
+    def _check_outputs(self, body):
+        for index, tx_out in enumerate(body.outputs):
+            required = min_lovelace_post_alonzo(tx_out, self)
+            if tx_out.amount.coin < required:
+                raise TransactionFailedException(
+                    f"BabbageOutputTooSmallUTxO: output #{index} có {tx_out.amount.coin} < {required} lovelace"
+                )
+
+    def _check_signatures(self, tx: Transaction):
+        signed = set()
+        for witness in tx.transaction_witness_set.vkey_witnesses or []:
+            try:
+                VerifyKey(witness.vkey.payload[:32]).verify(tx.id.payload, witness.signature)
+            except BadSignatureError:
+                raise TransactionFailedException("InvalidWitnessesUTXOW: chữ ký không hợp lệ")
+            signed.add(witness.vkey.hash())
+
+        needed = set(tx.transaction_body.required_signers or [])
+        for tx_in in tx.transaction_body.inputs:
+            payment_part = self._utxos[tx_in].address.payment_part
+            # Chỉ input từ địa chỉ pubkey cần chữ ký; input script do Plutus/native script quyết định
+            if isinstance(payment_part, VerificationKeyHash):
+                needed.add(payment_part)
+        unsigned = needed - signed
+        if unsigned:
+            raise TransactionFailedException(
+                f"MissingVKeyWitnessesUTXOW: {[str(h) for h in unsigned]}"
+            )
+
+    def _check_balance(self, body):
+        consumed = Value(0)
+        for tx_in in body.inputs:
+            consumed += self._utxos[tx_in].amount
+        if body.mint:
+            consumed += Value(0, body.mint)
+        if body.withdraws:
+            consumed += sum(body.withdraws.values())
+        produced = Value(body.fee)
+        for tx_out in body.outputs:
+            produced += tx_out.amount
+        if consumed.coin != produced.coin or _assets(consumed) != _assets(produced):
+            raise TransactionFailedException(
+                f"ValueNotConservedUTxO: consumed {consumed} != produced {produced}"
+            )
+
+    # ---------------- EVALUATE ----------------
+    def evaluate_tx_cbor(self, cbor: Union[bytes, str]) -> Dict[str, ExecutionUnits]:
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        tx = Transaction.from_cbor(cbor)
+        if self.evaluator is not None:
+            return self.evaluator(tx)
+        # Trả bản sao: TransactionBuilder nhân buffer trực tiếp lên object ExecutionUnits
+        return {
+            key: ExecutionUnits(self.ex_units.mem, self.ex_units.steps)
+            for key, _ in _redeemers(tx)
+        }
+
+    # ---------------- DEBUG ----------------
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "slot": self._slot,
+                "utxos": len(self._utxos),
+                "addresses": sum(1 for v in self._by_address.values() if v),
+                "transactions": len(self._transactions),
+            }
+
+
+def _redeemers(tx: Transaction):
+    """Liệt kê (key "tag:index", ex_units) của các redeemer trong transaction."""
+    redeemers = tx.transaction_witness_set.redeemer
+    if not redeemers:
+        return []
+    if isinstance(redeemers, RedeemerMap):
+        return [
+            (f"{key.tag.name.lower()}:{key.index}", value.ex_units)
+            for key, value in redeemers.items()
+        ]
+    return [(f"{r.tag.name.lower()}:{r.index}", r.ex_units) for r in redeemers]
+
+
+def _assets(value: Value) -> Dict[bytes, Dict[bytes, int]]:
+    """MultiAsset -> dict, bỏ các asset có số lượng 0 (để so sánh cân bằng)."""
+    result = {}
+    for policy_id, assets in (value.multi_asset or MultiAsset()).items():
+        non_zero = {name.payload: qty for name, qty in assets.items() if qty != 0}
+        if non_zero:
+            result[policy_id.payload] = non_zero
+    return result
@@ -0,0 +1,284 @@
+# chain/scheduler.py
+# Điều phối request tới Blockfrost: token bucket theo giới hạn gói, ưu tiên
+# lời gọi tương tác (submit, đọc UTxO khi build) hơn lời gọi nền (số dư, listing),
+# tự retry 429/5xx với backoff có jitter.
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# Lớp ưu tiên: số nhỏ hơn được phục vụ trước
+INTERACTIVE = 0
+BACKGROUND = 1
+_PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Mã HTTP được retry
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Lớp ưu tiên của lời gọi hiện tại (theo thread / asyncio task)
+_current_priority: contextvars.ContextVar = contextvars.ContextVar(
+    "blockfrost_priority", default=INTERACTIVE
+)
+
+
+@contextlib.contextmanager
+def priority(level: int):
+    """
+    Đặt lớp ưu tiên cho mọi request Blockfrost trong khối lệnh.
+
+    Ví dụ:
+        with priority(BACKGROUND):
+            utxos = context.utxos(address)
+    """
+    token = _current_priority.set(level)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def background():
+    """Viết tắt của `priority(BACKGROUND)` cho truy vấn nền (số dư, listing)."""
+    return priority(BACKGROUND)
+
+
+class TokenBucket:
+    """
+    Token bucket: nạp `rate` token/giây, chứa tối đa `burst` token.
+
+    Không tự khoá; BlockfrostScheduler gọi các hàm này khi đang giữ lock.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> float:
+        """Lấy một token. Trả về 0 nếu lấy được, ngược lại số giây cần chờ."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def delay(self) -> float:
+        """Số giây tới khi có token tiếp theo (không lấy token)."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def drain(self):
+        """Bị 429: coi như hết token để mọi lời gọi cùng chậm lại."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class BlockfrostScheduler:
+    """
+    Hàng đợi ưu tiên + token bucket đặt trước mọi request HTTP tới Blockfrost.
+
+    Dùng được từ thread (`call`) lẫn asyncio (`call_async`); cả hai chia chung
+    một bucket và một hàng đợi nên giới hạn của project được tôn trọng trên
+    toàn process. Request chỉ xếp hàng khi bucket hết token; lúc đó request
+    INTERACTIVE luôn được lấy token trước BACKGROUND.
+
+    Args:
+        rate: Số request/giây được nạp lại (giới hạn của gói Blockfrost).
+        burst: Số request tối đa được dùng dồn một lúc.
+        max_retries: Số lần retry tối đa khi gặp 429/5xx.
+        base_delay: Độ trễ backoff ban đầu (giây).
+        max_delay: Độ trễ backoff tối đa (giây).
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 500,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._metrics = {
+            level: {"requests": 0, "queued": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for level in _PRIORITY_NAMES
+        }
+        self.throttled = 0
+        self.retries = 0
+        self.failures = 0
+
+    # ---------------- TOKEN ----------------
+    def _try_acquire(self, ticket: Tuple[int, int]) -> float:
+        """
+        Thử lấy token cho ticket (priority, seq) đang nằm trong hàng đợi.
+        Chỉ ticket đứng đầu được lấy; trả về 0 nếu thành công, ngược lại số giây nên chờ.
+        """
+        with self._lock:
+            if self._queue[0] != ticket:
+                # Chưa tới lượt: thăm dò lại sau khi có token mới
+                return max(0.001, self.bucket.delay())
+            delay = self.bucket.try_take()
+            if delay == 0:
+                heapq.heappop(self._queue)
+            return delay
+
+    def _enter(self, level: int):
+        """Lấy token ngay nếu không có ai đang chờ; ngược lại trả về ticket để xếp hàng."""
+        with self._lock:
+            self._metrics[level]["requests"] += 1
+            if not self._queue and self.bucket.try_take() == 0:
+                return None
+            ticket = (level, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            self._metrics[level]["queued"] += 1
+            return ticket
+
+    def _record_wait(self, level: int, waited: float):
+        with self._lock:
+            m = self._metrics[level]
+            m["wait_total"] += waited
+            m["wait_max"] = max(m["wait_max"], waited)
+
+    def acquire(self):
+        """Chờ (blocking) tới khi được cấp một token."""
+        level = _current_priority.get()
+        ticket = self._enter(level)
+        if ticket is None:
+            return
+        start = time.monotonic()
+        try:
+            while True:
+                delay = self._try_acquire(ticket)
+                if delay == 0:
+                    break
+                time.sleep(delay)
+        except BaseException:
+            self._leave(ticket)
+            raise
+        self._record_wait(level, time.monotonic() - start)
+
+    async def acquire_async(self):
+        """Phiên bản asyncio của `acquire` (không chặn event loop)."""
+        level = _current_priority.get()
+        ticket = self._enter(level)
+        if ticket is None:
+            return
+        start = time.monotonic()
+        try:
+            while True:
+                delay = self._try_acquire(ticket)
+                if delay == 0:
+                    break
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._leave(ticket)
+            raise
+        self._record_wait(level, time.monotonic() - start)
+
+    def _leave(self, ticket: Tuple[int, int]):
+        """Rút ticket khỏi hàng đợi (request bị huỷ khi đang chờ)."""
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+
+    # ---------------- RETRY ----------------
+    def _should_retry(self, status_code: Any, attempt: int) -> bool:
+        if status_code not in RETRY_STATUS:
+            return False
+        with self._lock:
+            if status_code == 429:
+                self.throttled += 1
+                self.bucket.drain()
+            if attempt >= self.max_retries:
+                self.failures += 1
+                return False
+            self.retries += 1
+        return True
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: ngẫu nhiên trong [0, min(max_delay, base * 2^attempt)]."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Chạy `fn()` (một request HTTP) qua scheduler.
+
+        Retry khi `fn` trả về response có status 429/5xx hoặc raise lỗi có
+        thuộc tính `status_code` tương ứng. Hết lượt retry thì trả về / raise
+        kết quả cuối cùng như bình thường.
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                if not self._should_retry(getattr(e, "status_code", None), attempt):
+                    raise
+            else:
+                if not self._should_retry(getattr(result, "status_code", None), attempt):
+                    return result
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    async def call_async(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Phiên bản asyncio của `call`."""
+        attempt = 0
+        while True:
+            await self.acquire_async()
+            try:
+                result = await fn()
+            except Exception as e:
+                if not self._should_retry(getattr(e, "status_code", None), attempt):
+                    raise
+            else:
+                if not self._should_retry(getattr(result, "status_code", None), attempt):
+                    return result
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    # ---------------- METRICS ----------------
+    def stats(self) -> Dict[str, Any]:
+        """Độ sâu hàng đợi, thời gian chờ theo lớp ưu tiên, số lần 429/retry."""
+        with self._lock:
+            depth = {name: 0 for name in _PRIORITY_NAMES.values()}
+            for level, _ in self._queue:
+                depth[_PRIORITY_NAMES[level]] += 1
+            classes = {}
+            for level, m in self._metrics.items():
+                queued = m["queued"]
+                classes[_PRIORITY_NAMES[level]] = {
+                    "requests": m["requests"],
+                    "queued": queued,
+                    "queue_depth": depth[_PRIORITY_NAMES[level]],
+                    "wait_avg_ms": round(m["wait_total"] / queued * 1000, 2) if queued else 0.0,
+                    "wait_max_ms": round(m["wait_max"] * 1000, 2),
+                }
+            return {
+                "rate": self.bucket.rate,
+                "burst": self.bucket.burst,
+                "tokens": round(self.bucket.tokens, 2),
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "failures": self.failures,
+                "classes": classes,
+            }
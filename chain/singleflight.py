@@ -0,0 +1,134 @@
+# chain/singleflight.py
+# Gộp các truy vấn giống hệt nhau đang chạy đồng thời thành một lời gọi upstream.
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Union
+
+from pycardano import Address, ChainContext, UTxO
+
+from chain.base import ChainContextWrapper
+
+
+class _Call:
+    """Một lời gọi đang chạy (thread) mà các waiter khác sẽ chờ kết quả."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Single-flight: các lời gọi cùng key đang chạy đồng thời chỉ gọi upstream một lần.
+
+    Key là (tên hàm, tham số). Waiter đến sau khi lời gọi đầu tiên đã xong sẽ
+    gọi upstream lại như bình thường (không cache kết quả).
+    Dùng được cho cả thread (`do`) và asyncio (`do_async`).
+
+    Thuộc tính:
+        calls: số lời gọi thực sự tới upstream.
+        shared: số lời gọi được tiết kiệm (dùng chung kết quả của lời gọi khác).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Chạy `fn()` cho key, hoặc chờ lời gọi cùng key đang chạy ở thread khác."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Phiên bản asyncio của `do`: các coroutine cùng key chờ chung một Task.
+
+        `fn()` chạy trong Task riêng, mọi caller (kể cả caller đầu tiên) chờ qua
+        `asyncio.shield`: một caller bị huỷ (vd: client ngắt kết nối) không làm
+        huỷ lời gọi upstream hay các caller còn lại.
+        """
+        task = self._async_calls.get(key)
+        if task is not None:
+            with self._lock:
+                self.shared += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._async_calls[key] = task
+            with self._lock:
+                self.calls += 1
+            task.add_done_callback(lambda done: self._finish_async(key, done))
+        return await asyncio.shield(task)
+
+    def _finish_async(self, key: Hashable, task: asyncio.Task):
+        if self._async_calls.get(key) is task:
+            del self._async_calls[key]
+        # Tránh cảnh báo "exception was never retrieved" khi mọi caller đã bị huỷ
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "upstream_calls": self.calls,
+                "saved_calls": self.shared,
+                "in_flight": len(self._calls) + len(self._async_calls),
+            }
+
+
+class SingleFlightChainContext(ChainContextWrapper):
+    """
+    ChainContext gộp các truy vấn đọc giống nhau đang chạy đồng thời (threaded services).
+
+    Chỉ áp dụng cho truy vấn đọc (`utxos`, `last_block_slot`, `script`); submit/evaluate
+    luôn đi thẳng xuống context bên trong.
+    """
+
+    def __init__(self, inner: ChainContext, flight: SingleFlight = None):
+        super().__init__(inner)
+        self.flight = flight or SingleFlight()
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        utxos = self.flight.do(("utxos", str(address)), lambda: self._inner.utxos(address))
+        # Mỗi waiter nhận list riêng để không sửa lẫn nhau
+        return list(utxos)
+
+    @property
+    def last_block_slot(self) -> int:
+        return self.flight.do(("last_block_slot",), lambda: self._inner.last_block_slot)
+
+    def script(self, script_hash: str):
+        fetch = super().script
+        return self.flight.do(("script", script_hash), lambda: fetch(script_hash))
+
+    def stats(self) -> Dict[str, int]:
+        return self.flight.stats()
+
@@ -0,0 +1,285 @@
+# chain/utxo_cache.py
+# Cache UTxO theo địa chỉ (TTL + LRU) đặt trước ChainContext,
+# và cache vị trí hiện tại của từng asset (UTxO đang giữ asset đó).
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from pycardano import Address, AssetName, ChainContext, ScriptHash, Transaction, TransactionInput, UTxO
+
+from chain.base import ChainContextWrapper
+
+
+class UTxOCache:
+    """
+    Bộ nhớ cache UTxO theo địa chỉ, dùng chung cho context sync và async.
+
+    Mỗi entry sống `ttl` giây, tối đa `max_addresses` địa chỉ (LRU).
+    Khi có transaction được submit, entry của mọi địa chỉ bị tiêu UTxO
+    (input) hoặc nhận output từ transaction đó sẽ bị xoá ngay.
+
+    Args:
+        ttl: Thời gian sống của một entry (giây). 0 = tắt cache.
+        max_addresses: Số địa chỉ tối đa được giữ trong cache.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_addresses: int = 256):
+        self.ttl = ttl
+        self.max_addresses = max_addresses
+        self._entries: "OrderedDict[str, Tuple[float, List[UTxO]]]" = OrderedDict()
+        # (tx_id, index) -> địa chỉ đang cache UTxO đó, để invalidate theo input
+        self._owners: Dict[Tuple[bytes, int], str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, address: Union[str, Address]) -> Optional[List[UTxO]]:
+        """Trả về bản sao list UTxO còn hạn, hoặc None nếu miss."""
+        key = str(address)
+        with self._lock:
+            entry = self._entries.get(key) if self.enabled else None
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+            return None
+
+    def put(self, address: Union[str, Address], utxos: List[UTxO]):
+        if not self.enabled:
+            return
+        key = str(address)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, list(utxos))
+            for utxo in utxos:
+                self._owners[_utxo_key(utxo)] = key
+            while len(self._entries) > self.max_addresses:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        """Xoá entry của một địa chỉ (gọi khi đang giữ lock)."""
+        entry = self._entries.pop(key, None)
+        if entry:
+            for utxo in entry[1]:
+                self._owners.pop(_utxo_key(utxo), None)
+
+    def invalidate(self, address: Optional[Union[str, Address]] = None):
+        """Xoá cache của một địa chỉ, hoặc toàn bộ nếu address=None."""
+        with self._lock:
+            if address is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._owners.clear()
+            elif str(address) in self._entries:
+                self.invalidations += 1
+                self._drop(str(address))
+
+    def invalidate_tx(self, cbor: Union[bytes, str]):
+        """Xoá cache của các địa chỉ bị ảnh hưởng bởi transaction (input hoặc output)."""
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        body = Transaction.from_cbor(cbor).transaction_body
+
+        touched: Set[str] = {str(output.address) for output in body.outputs}
+        with self._lock:
+            for tx_in in body.inputs:
+                owner = self._owners.get((tx_in.transaction_id.payload, tx_in.index))
+                if owner:
+                    touched.add(owner)
+            for key in touched:
+                if key in self._entries:
+                    self.invalidations += 1
+                    self._drop(key)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Số liệu hit/miss của cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "invalidations": self.invalidations,
+                "addresses": len(self._entries),
+                "ttl": self.ttl,
+                "max_addresses": self.max_addresses,
+            }
+
+
+class CachedChainContext(ChainContextWrapper):
+    """
+    ChainContext cache kết quả `utxos(address)` qua một UTxOCache.
+
+    Transaction đi qua `submit_tx`/`submit_tx_cbor` sẽ invalidate các địa chỉ liên quan.
+
+    Args:
+        inner: ChainContext thật (vd: BlockFrostChainContext).
+        ttl: Thời gian sống của một entry (giây). 0 = tắt cache.
+        max_addresses: Số địa chỉ tối đa được giữ trong cache.
+        cache: UTxOCache có sẵn (để dùng chung), bỏ qua ttl/max_addresses nếu truyền vào.
+    """
+
+    def __init__(
+        self,
+        inner: ChainContext,
+        ttl: float = 5.0,
+        max_addresses: int = 256,
+        cache: Optional[UTxOCache] = None,
+    ):
+        super().__init__(inner)
+        self.cache = cache or UTxOCache(ttl=ttl, max_addresses=max_addresses)
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        cached = self.cache.get(address)
+        if cached is not None:
+            return cached
+        utxos = self._inner.utxos(address)
+        self.cache.put(address, utxos)
+        return utxos
+
+    def stream_utxos(self, address: Union[str, Address], page_size: int = 100, concurrency: int = 4) -> Iterator[UTxO]:
+        """Stream từ cache nếu còn entry; ngược lại stream từ context bên trong và ghi vào cache khi xong."""
+        cached = self.cache.get(address)
+        if cached is not None:
+            yield from cached
+            return
+        utxos = []
+        for utxo in super().stream_utxos(address, page_size, concurrency):
+            utxos.append(utxo)
+            yield utxo
+        # Chỉ ghi khi đã duyệt hết (caller dừng giữa chừng thì list chưa đủ)
+        self.cache.put(address, utxos)
+
+    def invalidate(self, address: Optional[Union[str, Address]] = None):
+        self.cache.invalidate(address)
+
+    def submit_tx_cbor(self, cbor: Union[bytes, str]) -> str:
+        tx_hash = self._inner.submit_tx_cbor(cbor)
+        self.cache.invalidate_tx(cbor)
+        return tx_hash
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        return self.cache.stats()
+
+
+class AssetLocationCache:
+    """
+    Cache asset → UTxO đang giữ asset đó (None = không có holder, vd: đã burn).
+
+    Dùng cho NFT: mỗi asset chỉ nằm ở một UTxO. Entry sống `ttl` giây, tối đa
+    `max_assets` asset (LRU). Khi có transaction được submit, vị trí mới của
+    các asset đã cache (hoặc vừa mint) được ghi ngay từ output của transaction,
+    nên không phụ thuộc độ trễ index của Blockfrost.
+
+    Args:
+        ttl: Thời gian sống của một entry (giây). 0 = tắt cache.
+        max_assets: Số asset tối đa được giữ trong cache.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_assets: int = 1024):
+        self.ttl = ttl
+        self.max_assets = max_assets
+        self._entries: "OrderedDict[str, Tuple[float, Optional[UTxO]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def lookup(self, unit: str) -> Tuple[bool, Optional[UTxO]]:
+        """(True, utxo) nếu còn entry hợp lệ (utxo có thể là None), ngược lại (False, None)."""
+        with self._lock:
+            entry = self._entries.get(unit) if self.ttl > 0 else None
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(unit)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, unit: str, utxo: Optional[UTxO]):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._put(unit, utxo)
+
+    def _put(self, unit: str, utxo: Optional[UTxO]):
+        self._entries[unit] = (time.monotonic() + self.ttl, utxo)
+        self._entries.move_to_end(unit)
+        while len(self._entries) > self.max_assets:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, unit: Optional[str] = None):
+        """Xoá entry của một asset, hoặc toàn bộ nếu unit=None."""
+        with self._lock:
+            if unit is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(unit, None)
+
+    def apply_tx(self, cbor: Union[bytes, str]):
+        """
+        Cập nhật vị trí asset theo transaction vừa submit: asset trong output
+        (đã cache hoặc vừa mint) chuyển sang UTxO mới, UTxO đã cache bị tiêu
+        mà asset không xuất hiện ở output nào thì coi như đã burn.
+        """
+        if self.ttl <= 0:
+            return
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        tx = Transaction.from_cbor(cbor)
+        body = tx.transaction_body
+        minted = set()
+        if body.mint:
+            for policy_id, assets in body.mint.items():
+                minted.update(asset_unit(policy_id, name) for name, qty in assets.items() if qty > 0)
+
+        spent = {(i.transaction_id.payload, i.index) for i in body.inputs}
+        with self._lock:
+            moved = {}
+            for index, output in enumerate(body.outputs):
+                for policy_id, assets in output.amount.multi_asset.items():
+                    for name, qty in assets.items():
+                        unit = asset_unit(policy_id, name)
+                        if qty > 0 and (unit in self._entries or unit in minted):
+                            moved[unit] = UTxO(TransactionInput(tx.id, index), output)
+            for unit, (_, utxo) in list(self._entries.items()):
+                if unit not in moved and utxo is not None and _utxo_key(utxo) in spent:
+                    moved[unit] = None
+            for unit, utxo in moved.items():
+                self._put(unit, utxo)
+            self.updates += len(moved)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "updates": self.updates,
+                "assets": len(self._entries),
+                "ttl": self.ttl,
+            }
+
+
+def asset_unit(policy_id: Union[ScriptHash, bytes, str], asset_name: Union[AssetName, bytes, str]) -> str:
+    """Asset ID dạng Blockfrost: policy_id hex + asset_name hex (asset_name dạng str là hex)."""
+    if isinstance(policy_id, ScriptHash):
+        policy_id = policy_id.payload
+    if isinstance(asset_name, AssetName):
+        asset_name = asset_name.payload
+    policy_hex = policy_id.hex() if isinstance(policy_id, bytes) else policy_id
+    name_hex = asset_name.hex() if isinstance(asset_name, bytes) else asset_name
+    return (policy_hex + name_hex).lower()
+
+
+def _utxo_key(utxo: UTxO) -> Tuple[bytes, int]:
+    return utxo.input.transaction_id.payload, utxo.input.index
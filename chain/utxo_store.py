@@ -0,0 +1,425 @@
+# chain/utxo_store.py
+# Snapshot UTxO theo địa chỉ lưu trong SQLite, đồng bộ tăng dần theo block height:
+# lần đầu tải toàn bộ UTxO, các lần sau chỉ lấy các transaction mới từ block đã xử lý.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from blockfrost import ApiError
+from pycardano import (
+    Address,
+    Asset,
+    AssetName,
+    ChainContext,
+    DatumHash,
+    MultiAsset,
+    ScriptHash,
+    Transaction,
+    TransactionId,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    Value,
+)
+from pycardano.serialization import RawCBOR
+
+from chain.base import ChainContextWrapper
+from chain.singleflight import SingleFlight
+
+# (tx_hash hex, output index)
+UTxOKey = Tuple[str, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS utxos (
+    tx_hash    TEXT    NOT NULL,
+    idx        INTEGER NOT NULL,
+    address    TEXT    NOT NULL,
+    lovelace   INTEGER NOT NULL,
+    assets     TEXT,
+    datum_hash TEXT,
+    datum      BLOB,
+    script_out BLOB,
+    PRIMARY KEY (tx_hash, idx)
+);
+CREATE INDEX IF NOT EXISTS utxos_address ON utxos (address);
+CREATE TABLE IF NOT EXISTS sync_state (
+    address   TEXT PRIMARY KEY,
+    height    INTEGER NOT NULL,
+    synced_at REAL    NOT NULL
+);
+"""
+
+
+class SQLiteUTxOStore:
+    """
+    Kho UTxO cục bộ trong SQLite, khoá chính `(tx_hash, idx)`.
+
+    Mỗi dòng giữ địa chỉ, lovelace, assets (JSON policy -> name -> qty) và
+    datum hash / inline datum (CBOR gốc); UTxO được dựng lại trực tiếp từ các
+    cột này. Chỉ output có reference script mới lưu thêm CBOR đầy đủ
+    (`script_out`), vì decode CBOR của pycardano chậm hơn nhiều.
+    `sync_state` lưu block height đã đồng bộ tới của từng địa chỉ.
+
+    UTxO vừa bị tiêu bởi transaction submit từ process này được ẩn tạm
+    (`mark_spent`) cho tới khi lần sync sau thấy transaction đó on-chain,
+    hoặc hết `pending_ttl` giây (transaction không vào được block).
+
+    Args:
+        path: Đường dẫn file SQLite (":memory:" = chỉ trong bộ nhớ).
+        pending_ttl: Thời gian ẩn tối đa các UTxO đang chờ bị tiêu (giây).
+    """
+
+    def __init__(self, path: str = ":memory:", pending_ttl: float = 600.0):
+        self.path = path
+        self.pending_ttl = pending_ttl
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._pending: Dict[UTxOKey, float] = {}
+        self.reads = 0
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.applied_txs = 0
+
+    # ---------------- ĐỌC ----------------
+    def height(self, address: Union[str, Address]) -> Optional[int]:
+        """Block height đã đồng bộ tới của địa chỉ, None nếu chưa từng sync."""
+        row = self._query_one("SELECT height FROM sync_state WHERE address = ?", (str(address),))
+        return row[0] if row else None
+
+    def synced_at(self, address: Union[str, Address]) -> Optional[float]:
+        row = self._query_one("SELECT synced_at FROM sync_state WHERE address = ?", (str(address),))
+        return row[0] if row else None
+
+    def is_fresh(self, address: Union[str, Address], min_interval: float) -> bool:
+        """True nếu địa chỉ đã sync trong vòng `min_interval` giây."""
+        synced_at = self.synced_at(address)
+        return synced_at is not None and time.time() - synced_at < min_interval
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        """Đọc UTxO của địa chỉ từ SQLite (bỏ các UTxO đang chờ bị tiêu)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tx_hash, idx, lovelace, assets, datum_hash, datum, script_out "
+                "FROM utxos WHERE address = ? ORDER BY rowid",
+                (str(address),),
+            ).fetchall()
+            pending = self._live_pending()
+            self.reads += 1
+
+        if not isinstance(address, Address):
+            address = Address.from_primitive(address)
+        result = []
+        for tx_hash, idx, lovelace, assets, datum_hash, datum, script_out in rows:
+            if (tx_hash, idx) in pending:
+                continue
+            if script_out is not None:
+                tx_out = TransactionOutput.from_cbor(script_out)
+            else:
+                tx_out = TransactionOutput(
+                    address,
+                    Value(lovelace, _multi_asset(assets)),
+                    datum_hash=DatumHash(bytes.fromhex(datum_hash)) if datum_hash else None,
+                )
+            if datum is not None:
+                # Giữ inline datum ở dạng CBOR gốc giống BlockFrostChainContext
+                tx_out.datum = RawCBOR(datum)
+            result.append(UTxO(TransactionInput(TransactionId(bytes.fromhex(tx_hash)), idx), tx_out))
+        return result
+
+    # ---------------- GHI ----------------
+    def replace(self, address: Union[str, Address], utxos: Iterable[UTxO], height: int):
+        """Thay toàn bộ UTxO của địa chỉ (full sync) và ghi height."""
+        address = str(address)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM utxos WHERE address = ?", (address,))
+                self._conn.executemany(_INSERT, (_row(address, utxo) for utxo in utxos))
+                self._set_state(address, height)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.full_syncs += 1
+
+    def apply(
+        self,
+        address: Union[str, Address],
+        changes: Sequence[Tuple[Sequence[UTxOKey], Sequence[UTxO]]],
+        height: int,
+    ):
+        """
+        Áp dụng lần lượt (spent, created) của từng transaction mới rồi ghi height,
+        trong cùng một SQLite transaction.
+        """
+        address = str(address)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for spent, created in changes:
+                    self._conn.executemany(
+                        "DELETE FROM utxos WHERE tx_hash = ? AND idx = ?", spent
+                    )
+                    self._conn.executemany(_INSERT, (_row(address, utxo) for utxo in created))
+                    for key in spent:
+                        self._pending.pop(tuple(key), None)
+                self._set_state(address, height)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.delta_syncs += 1
+            self.applied_txs += len(changes)
+
+    def touch(self, address: Union[str, Address]):
+        """Đánh dấu vừa sync (không có block mới)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE sync_state SET synced_at = ? WHERE address = ?", (time.time(), str(address))
+            )
+
+    def mark_spent(self, cbor: Union[bytes, str]) -> Set[str]:
+        """
+        Ẩn các input của transaction vừa submit và buộc các địa chỉ liên quan
+        sync lại ở lần đọc sau. Trả về các địa chỉ bị ảnh hưởng.
+        """
+        if isinstance(cbor, str):
+            cbor = bytes.fromhex(cbor)
+        body = Transaction.from_cbor(cbor).transaction_body
+        keys = [(tx_in.transaction_id.payload.hex(), tx_in.index) for tx_in in body.inputs]
+        touched = {str(output.address) for output in body.outputs}
+        expires = time.monotonic() + self.pending_ttl
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT address FROM utxos WHERE tx_hash = ? AND idx = ?", key
+                ).fetchone()
+                if row:
+                    touched.add(row[0])
+                    self._pending[key] = expires
+            self._conn.executemany(
+                "UPDATE sync_state SET synced_at = 0 WHERE address = ?", ((a,) for a in touched)
+            )
+        return touched
+
+    def forget(self, address: Optional[Union[str, Address]] = None):
+        """Xoá snapshot của một địa chỉ (hoặc toàn bộ) để lần sau full sync lại."""
+        with self._lock:
+            if address is None:
+                self._conn.execute("DELETE FROM utxos")
+                self._conn.execute("DELETE FROM sync_state")
+                self._pending.clear()
+            else:
+                self._conn.execute("DELETE FROM utxos WHERE address = ?", (str(address),))
+                self._conn.execute("DELETE FROM sync_state WHERE address = ?", (str(address),))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            utxo_count = self._conn.execute("SELECT COUNT(*) FROM utxos").fetchone()[0]
+            addresses = self._conn.execute("SELECT COUNT(*) FROM sync_state").fetchone()[0]
+            return {
+                "path": self.path,
+                "addresses": addresses,
+                "utxos": utxo_count,
+                "pending_spent": len(self._live_pending()),
+                "reads": self.reads,
+                "full_syncs": self.full_syncs,
+                "delta_syncs": self.delta_syncs,
+                "applied_txs": self.applied_txs,
+            }
+
+    # ---------------- NỘI BỘ ----------------
+    def _query_one(self, sql: str, params: tuple):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _set_state(self, address: str, height: int):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sync_state (address, height, synced_at) VALUES (?, ?, ?)",
+            (address, height, time.time()),
+        )
+
+    def _live_pending(self) -> Set[UTxOKey]:
+        """Các UTxO đang chờ bị tiêu còn hạn (gọi khi đang giữ lock)."""
+        now = time.monotonic()
+        for key in [k for k, expires in self._pending.items() if expires <= now]:
+            del self._pending[key]
+        return set(self._pending)
+
+
+_INSERT = (
+    "INSERT OR REPLACE INTO utxos "
+    "(tx_hash, idx, address, lovelace, assets, datum_hash, datum, script_out) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _row(address: str, utxo: UTxO) -> tuple:
+    output = utxo.output
+    assets = None
+    if output.amount.multi_asset:
+        assets = json.dumps({
+            policy.payload.hex(): {name.payload.hex(): qty for name, qty in names.items()}
+            for policy, names in output.amount.multi_asset.items()
+        })
+    datum = output.datum
+    if isinstance(datum, RawCBOR):
+        datum = datum.cbor
+    elif datum is not None:
+        datum = datum.to_cbor()
+    return (
+        utxo.input.transaction_id.payload.hex(),
+        utxo.input.index,
+        address,
+        output.amount.coin,
+        assets,
+        output.datum_hash.payload.hex() if output.datum_hash else None,
+        datum,
+        output.to_cbor() if output.script is not None else None,
+    )
+
+
+def _multi_asset(assets: Optional[str]) -> MultiAsset:
+    multi_asset = MultiAsset()
+    if assets:
+        for policy, names in json.loads(assets).items():
+            asset = Asset()
+            for name, quantity in names.items():
+                asset[AssetName(bytes.fromhex(name))] = quantity
+            multi_asset[ScriptHash(bytes.fromhex(policy))] = asset
+    return multi_asset
+
+
+def tx_changes(
+    address: str, tx_hash: str, tx_utxos: Dict[str, Any]
+) -> Tuple[List[UTxOKey], List[Dict[str, Any]]]:
+    """
+    Từ JSON /txs/{hash}/utxos: các UTxO của `address` bị tiêu và các output
+    mới (JSON, đã thêm tx_hash) thuộc `address`.
+
+    Bỏ qua reference input (không bị tiêu) và collateral (chỉ bị tiêu khi
+    phase-2 validation lỗi).
+    """
+    spent = [
+        (item["tx_hash"], item["output_index"])
+        for item in tx_utxos["inputs"]
+        if item["address"] == address and not item.get("reference") and not item.get("collateral")
+    ]
+    created = [
+        dict(item, tx_hash=tx_hash)
+        for item in tx_utxos["outputs"]
+        if item["address"] == address and not item.get("collateral")
+    ]
+    return spent, created
+
+
+class SnapshotChainContext(ChainContextWrapper):
+    """
+    ChainContext đọc `utxos(address)` từ SQLiteUTxOStore.
+
+    - Địa chỉ chưa có snapshot: tải toàn bộ UTxO một lần (full sync).
+    - Snapshot cũ hơn `min_interval` giây: chỉ lấy các transaction của địa chỉ
+      từ block height đã xử lý tới tip (`/addresses/{addr}/transactions?from=`)
+      và áp dụng input/output của chúng (delta sync).
+    - Ngược lại: đọc thẳng từ SQLite, không gọi mạng.
+
+    Context bên trong phải là Blockfrost (có `api`). Các lần sync cùng địa chỉ
+    chạy đồng thời được gộp qua SingleFlight.
+
+    Args:
+        inner: Context Blockfrost (có thể đã bọc single-flight).
+        store: SQLiteUTxOStore dùng chung.
+        min_interval: Khoảng thời gian tối thiểu giữa hai lần delta sync (giây).
+        page_concurrency: Số trang tải song song khi full sync.
+    """
+
+    def __init__(
+        self,
+        inner: ChainContext,
+        store: SQLiteUTxOStore,
+        min_interval: float = 2.0,
+        page_concurrency: int = 4,
+    ):
+        super().__init__(inner)
+        self.store = store
+        self.min_interval = min_interval
+        self.page_concurrency = page_concurrency
+        self._flight = SingleFlight()
+
+    def utxos(self, address: Union[str, Address]) -> List[UTxO]:
+        address = str(address)
+        if not self.store.is_fresh(address, self.min_interval):
+            self._flight.do(("sync", address), lambda: self.sync(address))
+        return self.store.utxos(address)
+
+    def stream_utxos(self, address: Union[str, Address], page_size: int = 100, concurrency: int = 4) -> Iterator[UTxO]:
+        # Đã có trong SQLite (sync nếu cần): không tải lại theo trang
+        return iter(self.utxos(address))
+
+    def sync(self, address: Union[str, Address]) -> int:
+        """Đồng bộ snapshot của địa chỉ tới tip. Trả về số transaction đã áp dụng."""
+        # Import muộn: chain.async_context (và chain.utxo_stream) import module này
+        from chain.utxo_stream import iter_utxos
+
+        address = str(address)
+        api = self._inner.api
+        height = self.store.height(address)
+        tip = api.block_latest(return_type="json")["height"]
+
+        if height is None:
+            # Tải xong rồi mới ghi, để không giữ lock của store trong lúc gọi mạng
+            utxos = list(iter_utxos(self._inner, address, concurrency=self.page_concurrency))
+            self.store.replace(address, utxos, tip)
+            return 0
+        if tip <= height:
+            self.store.touch(address)
+            return 0
+
+        try:
+            txs = api.address_transactions(
+                address, from_block=str(height + 1), to_block=str(tip),
+                gather_pages=True, return_type="json",
+            )
+        except ApiError as e:
+            if e.status_code != 404:
+                raise
+            txs = []
+
+        changes = []
+        for tx in txs:
+            spent, created = tx_changes(
+                address, tx["tx_hash"], api.transaction_utxos(tx["tx_hash"], return_type="json")
+            )
+            changes.append((spent, [self._to_utxo(address, item) for item in created]))
+        self.store.apply(address, changes, tip)
+        return len(changes)
+
+    def _to_utxo(self, address: str, item: Dict[str, Any]) -> UTxO:
+        from chain.async_context import utxo_from_json
+
+        script = None
+        if item.get("reference_script_hash"):
+            script = self.script(item["reference_script_hash"])
+        return utxo_from_json(address, item, script)
+
+    def submit_tx_cbor(self, cbor: Union[bytes, str]) -> str:
+        tx_hash = self._inner.submit_tx_cbor(cbor)
+        self.store.mark_spent(cbor)
+        return tx_hash
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
@@ -0,0 +1,126 @@
+# chain/utxo_stream.py
+# Duyệt UTxO của một địa chỉ theo từng trang Blockfrost (stream), tải trước
+# vài trang song song thay vì gom toàn bộ vào một list.
+
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional, Union
+
+from blockfrost import ApiError
+from pycardano import Address, ChainContext, NativeScript, PlutusScript, UTxO
+
+from chain.async_context import fix_plutus_script, utxo_from_json
+
+# Blockfrost trả tối đa 100 phần tử mỗi trang
+MAX_PAGE_SIZE = 100
+
+
+def iter_address_utxos(
+    api,
+    address: Union[str, Address],
+    page_size: int = MAX_PAGE_SIZE,
+    concurrency: int = 4,
+    return_type: str = "object",
+) -> Iterator[Any]:
+    """
+    Duyệt toàn bộ `api.address_utxos(address)` qua mọi trang.
+
+    Tối đa `concurrency` trang được tải song song (cửa sổ prefetch); các trang
+    được trả về đúng thứ tự, phần tử của trang 1 có ngay khi trang 1 về.
+    Dừng ở trang đầu tiên có ít hơn `page_size` phần tử (các trang tải thừa
+    phía sau bị bỏ). Địa chỉ chưa có UTxO (404) cho iterator rỗng.
+
+    Args:
+        api: BlockFrostApi.
+        address: Địa chỉ cần duyệt.
+        page_size: Số phần tử mỗi trang (1..100).
+        concurrency: Số trang tải song song tối đa (1 = tuần tự).
+        return_type: "object" (Namespace như blockfrost-python) hoặc "json" (dict).
+    """
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"❌ page_size phải trong khoảng 1..{MAX_PAGE_SIZE}")
+    concurrency = max(1, concurrency)
+    address = str(address)
+
+    def fetch(page: int):
+        try:
+            return api.address_utxos(address, count=page_size, page=page, return_type=return_type)
+        except ApiError as e:
+            if e.status_code == 404:
+                return []
+            raise
+
+    # Chạy request trong context hiện tại để giữ priority của scheduler (chain.scheduler)
+    context = contextvars.copy_context()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="utxo-page") as pool:
+        window = deque()
+        next_page = 1
+        try:
+            while True:
+                while len(window) < concurrency:
+                    window.append(pool.submit(context.copy().run, fetch, next_page))
+                    next_page += 1
+                items = window.popleft().result()
+                yield from items
+                if len(items) < page_size:
+                    return
+        finally:
+            # Bỏ các trang tải trước không còn cần (hoặc khi caller dừng giữa chừng)
+            for future in window:
+                future.cancel()
+
+
+def fetch_script(api, script_hash: str):
+    """Reference script theo hash qua API Blockfrost (Plutus: bỏ lớp CBOR thừa nếu có)."""
+    script_type = api.script(script_hash, return_type="json")["type"]
+    if script_type.lower().startswith("plutusv"):
+        cbor = api.script_cbor(script_hash, return_type="json")["cbor"]
+        return fix_plutus_script(script_hash, PlutusScript.from_version(int(script_type[-1]), bytes.fromhex(cbor)))
+    return NativeScript.from_dict(api.script_json(script_hash, return_type="json")["json"])
+
+
+def stream_api_utxos(
+    api,
+    address: Union[str, Address],
+    page_size: int = MAX_PAGE_SIZE,
+    concurrency: int = 4,
+    get_script: Optional[Callable[[str], Any]] = None,
+) -> Iterator[UTxO]:
+    """`iter_address_utxos` chuyển thành pycardano.UTxO; reference script lấy qua `get_script`."""
+    if isinstance(address, str):
+        address = Address.from_primitive(address)
+    get_script = get_script or (lambda script_hash: fetch_script(api, script_hash))
+    for item in iter_address_utxos(api, address, page_size, concurrency, return_type="json"):
+        script = None
+        if item.get("reference_script_hash"):
+            script = get_script(item["reference_script_hash"])
+        yield utxo_from_json(address, item, script)
+
+
+def iter_utxos(
+    context: ChainContext,
+    address: Union[str, Address],
+    page_size: int = MAX_PAGE_SIZE,
+    concurrency: int = 4,
+) -> Iterator[UTxO]:
+    """
+    Stream `pycardano.UTxO` của `address` từ một ChainContext.
+
+    Context bọc bởi các wrapper của chain/ đi qua `stream_utxos` của từng lớp:
+    cache UTxO còn entry thì dùng luôn (stream xong thì ghi vào cache),
+    snapshot SQLite đọc từ đĩa, tới Blockfrost thì các trang được tải song
+    song qua `iter_address_utxos` và chuyển thành UTxO ngay khi về.
+    BlockFrostChainContext trần cũng được stream theo trang; context khác
+    (vd: OfflineLedgerContext) thì duyệt `context.utxos(address)`.
+    """
+    stream = getattr(context, "stream_utxos", None)
+    if stream is not None:
+        yield from stream(address, page_size, concurrency)
+        return
+    api = getattr(context, "api", None)
+    if api is None:
+        yield from context.utxos(address)
+        return
+    yield from stream_api_utxos(api, address, page_size, concurrency)
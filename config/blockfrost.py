@@ -1,45 +1,378 @@
 # config/blockfrost.py
 
-from pycardano import BlockFrostChainContext, Network
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from pycardano import BlockFrostChainContext, ChainContext, Network
 from blockfrost import ApiUrls
-from config.settings import BLOCKFROST_PROJECT_ID, NETWORK
+from chain.asset_lookup import AssetLookupChainContext
+from chain.async_context import AsyncBlockFrostChainContext
+from chain.cassette import Cassette
+from chain.exunits_cache import ExUnitsCache, ExUnitsCacheChainContext
+from chain.local_evaluator import LocalEvaluationChainContext
+from chain.scheduler import BlockfrostScheduler
+from chain.singleflight import SingleFlight, SingleFlightChainContext
+from chain.utxo_cache import AssetLocationCache, CachedChainContext, UTxOCache
+from chain.utxo_store import SnapshotChainContext, SQLiteUTxOStore
+from config.settings import (
+    ASSET_CACHE_SIZE,
+    ASSET_CACHE_TTL,
+    BLOCKFROST_BURST,
+    BLOCKFROST_MAX_RETRIES,
+    BLOCKFROST_PROJECT_ID,
+    BLOCKFROST_POOL_SIZE,
+    EXUNITS_CACHE_MARGIN,
+    EXUNITS_CACHE_SIZE,
+    BLOCKFROST_RATE_LIMIT,
+    NETWORK,
+    PLUTUS_LOCAL_EVAL,
+    UTXO_CACHE_SIZE,
+    UTXO_CACHE_TTL,
+    UTXO_PAGE_CONCURRENCY,
+    UTXO_SNAPSHOT_DIR,
+    UTXO_SNAPSHOT_INTERVAL,
+)
+
+# Base URL theo từng network. TESTNET được map sang PREVIEW giống .env hiện tại.
+_BLOCKFROST_URLS = {
+    "PREVIEW": ApiUrls.preview.value,
+    "PREPROD": ApiUrls.preprod.value,
+    "MAINNET": ApiUrls.mainnet.value,
+}
+_NETWORK_ALIASES = {
+    "TESTNET": "PREVIEW",
+    "TEST": "PREVIEW",
+}
+
+# Mỗi (network, project ID) giữ đúng một context; mỗi base URL một requests.Session (keep-alive)
+_contexts: Dict[Tuple[str, str], ChainContext] = {}
+_sessions: Dict[str, requests.Session] = {}
+# Cache UTxO theo network, dùng chung giữa context sync và async
+_caches: Dict[str, UTxOCache] = {}
+# Cache vị trí asset (utxo_for_asset) theo network, dùng chung sync/async
+_asset_caches: Dict[str, AssetLocationCache] = {}
+# Cache ex-units theo network, dùng chung giữa context sync và backend async
+_exunits_caches: Dict[str, ExUnitsCache] = {}
+# Single-flight theo network: gộp các truy vấn trùng nhau đang chạy đồng thời
+_flights: Dict[str, SingleFlight] = {}
+# Scheduler (rate limit + ưu tiên + retry 429/5xx) theo base URL, dùng chung sync/async
+_schedulers: Dict[str, BlockfrostScheduler] = {}
+# Snapshot UTxO SQLite theo network (UTXO_SNAPSHOT_DIR), dùng chung sync/async
+_stores: Dict[str, SQLiteUTxOStore] = {}
+# Context thay thế cho mọi network (vd: OfflineLedgerContext khi benchmark/test)
+_override: Optional[ChainContext] = None
+# Cassette record/replay (BLOCKFROST_CASSETTE), nạp khi tạo context đầu tiên
+_cassette: Optional[Cassette] = None
+_lock = threading.Lock()
+
+
+class _PooledRequests:
+    """
+    Thay thế module `requests` bên trong blockfrost-python.
+
+    blockfrost-python gọi `requests.get/post` trực tiếp nên mỗi call mở một
+    kết nối TCP+TLS mới. Lớp này chuyển các call đó sang Session đã đăng ký
+    cho base URL tương ứng để tái sử dụng kết nối, và cho mỗi request đi
+    qua BlockfrostScheduler của base URL đó.
+    """
+
+    def _request(self, method: str, url: str, **kwargs):
+        for base_url, session in _sessions.items():
+            if url.startswith(base_url):
+                if _cassette is not None:
+                    send = lambda: _cassette.request(session, method, url, **kwargs)
+                else:
+                    send = lambda: getattr(session, method)(url, **kwargs)
+                return _schedulers[base_url].call(send)
+        return getattr(requests, method)(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self._request("get", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._request("post", url, **kwargs)
+
+
+_pooled_requests = _PooledRequests()
+
+
+def _install_pooled_requests() -> bool:
+    """
+    Gắn _PooledRequests vào mọi module blockfrost đang dùng `requests`.
+
+    blockfrost-python (đã pin 0.7.0 trong requirements) không nhận Session từ
+    ngoài nên chỉ có cách thay module `requests` của nó. Nếu bản khác không còn
+    gọi `requests` ở cấp module thì không gắn được: in cảnh báo và trả về
+    False, request vẫn chạy nhưng không qua pool / scheduler.
+    """
+    import sys
+    import blockfrost.api  # noqa: F401  (đảm bảo các submodule đã được load)
+
+    for name, module in list(sys.modules.items()):
+        if name.startswith("blockfrost") and getattr(module, "requests", None) is requests:
+            module.requests = _pooled_requests
+    if getattr(blockfrost.api, "requests", None) is not _pooled_requests:
+        print("⚠️ Không gắn được connection pool vào blockfrost-python "
+              "(cần blockfrost-python==0.7.0), request sẽ không qua pool / scheduler.")
+        return False
+    return True
+
+
+def normalize_network(network: Optional[str] = None) -> str:
+    """Chuẩn hoá tên network (preview | preprod | mainnet | testnet) về key nội bộ."""
+    name = (network or NETWORK or "").upper()
+    name = _NETWORK_ALIASES.get(name, name)
+    if name not in _BLOCKFROST_URLS:
+        raise ValueError(f"❌ Network không hợp lệ: {network!r} (preview | preprod | mainnet | testnet)")
+    return name
+
+
+def _get_cache(key: str) -> UTxOCache:
+    cache = _caches.get(key)
+    if cache is None:
+        cache = _caches.setdefault(key, UTxOCache(ttl=UTXO_CACHE_TTL, max_addresses=UTXO_CACHE_SIZE))
+    return cache
+
+
+def _get_asset_cache(key: str) -> AssetLocationCache:
+    cache = _asset_caches.get(key)
+    if cache is None:
+        cache = _asset_caches.setdefault(key, AssetLocationCache(ttl=ASSET_CACHE_TTL, max_assets=ASSET_CACHE_SIZE))
+    return cache
+
+
+def _get_exunits_cache(key: str) -> ExUnitsCache:
+    cache = _exunits_caches.get(key)
+    if cache is None:
+        cache = _exunits_caches.setdefault(
+            key, ExUnitsCache(margin=EXUNITS_CACHE_MARGIN, max_entries=EXUNITS_CACHE_SIZE)
+        )
+    return cache
+
+
+def _get_store(key: str) -> Optional[SQLiteUTxOStore]:
+    if not UTXO_SNAPSHOT_DIR:
+        return None
+    store = _stores.get(key)
+    if store is None:
+        path = os.path.join(UTXO_SNAPSHOT_DIR, f"utxos_{key.lower()}.sqlite")
+        store = _stores.setdefault(key, SQLiteUTxOStore(path))
+    return store
+
+
+def _get_flight(key: str) -> SingleFlight:
+    flight = _flights.get(key)
+    if flight is None:
+        flight = _flights.setdefault(key, SingleFlight())
+    return flight
+
+
+def _get_scheduler(base_url: str) -> BlockfrostScheduler:
+    scheduler = _schedulers.get(base_url)
+    if scheduler is None:
+        scheduler = _schedulers.setdefault(base_url, BlockfrostScheduler(
+            rate=BLOCKFROST_RATE_LIMIT,
+            burst=BLOCKFROST_BURST,
+            max_retries=BLOCKFROST_MAX_RETRIES,
+        ))
+    return scheduler
+
 
-_context_cache = None
+def _make_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
-def get_blockfrost_context() -> BlockFrostChainContext:
+def get_blockfrost_context(
+    network: Optional[str] = None,
+    project_id: Optional[str] = None,
+    pool_size: Optional[int] = None,
+) -> ChainContext:
     """
-    Trả về BlockFrostChainContext tương ứng với network hiện tại.
-    Dùng cache để tránh khởi tạo lại nhiều lần.
+    Trả về chain context Blockfrost dùng chung cho cả process, theo từng network.
+
+    Lần gọi đầu cho mỗi network sẽ tạo context và một connection pool
+    (keep-alive, tối đa `pool_size` kết nối). Các lần sau trả về đúng
+    context đó nên protocol parameters đã fetch cũng được tái sử dụng.
+    Context được bọc bởi CachedChainContext (cache UTxO theo địa chỉ,
+    cấu hình qua UTXO_CACHE_TTL / UTXO_CACHE_SIZE), bên dưới là
+    SingleFlightChainContext (cache miss trùng nhau chỉ gọi Blockfrost một lần).
+    Nếu đặt UTXO_SNAPSHOT_DIR, giữa hai lớp này là SnapshotChainContext:
+    UTxO được đọc từ SQLite và chỉ đồng bộ phần thay đổi từ block đã xử lý.
+    Trên đó là AssetLookupChainContext: `utxo_for_asset(policy_id, asset_name)`
+    tìm UTxO đang giữ một asset mà không tải toàn bộ địa chỉ. Nếu bật
+    PLUTUS_LOCAL_EVAL, LocalEvaluationChainContext chạy script PlutusV3 ngay
+    trong process thay cho Blockfrost evaluate. Ngoài cùng là
+    ExUnitsCacheChainContext: trả ex-units cho tx cùng cấu trúc đã evaluate
+    (EXUNITS_CACHE_MARGIN / EXUNITS_CACHE_SIZE), chỉ evaluate khi miss.
+
+    Context được cache theo (network, project ID): truyền project ID khác
+    sẽ tạo context riêng (connection pool, scheduler và cache vẫn dùng chung
+    theo network).
+
+    Args:
+        network: preview | preprod | mainnet | testnet. Mặc định lấy từ settings.
+        project_id: Blockfrost project ID. Mặc định lấy từ settings.
+        pool_size: Số kết nối tối đa trong pool. Mặc định BLOCKFROST_POOL_SIZE.
     """
-    global _context_cache
-    if _context_cache:
-        return _context_cache
+    if _override is not None:
+        return _override
+
+    key = normalize_network(network)
+    project_id = project_id or BLOCKFROST_PROJECT_ID
+    context = _contexts.get((key, project_id))
+    if context is not None:
+        return context
+
+    with _lock:
+        context = _contexts.get((key, project_id))
+        if context is not None:
+            return context
 
-    if NETWORK == "PREVIEW":
-        base_url = ApiUrls.preview.value
-        network_enum = Network.TESTNET
-    elif NETWORK == "PREPROD":
-        base_url = ApiUrls.preprod.value
-        network_enum = Network.TESTNET
-    elif NETWORK == "MAINNET":
-        base_url = ApiUrls.mainnet.value
-        network_enum = Network.MAINNET
-    else:
-        raise ValueError("❌ Network không hợp lệ trong config/settings.py")
+        global _cassette
+        if _cassette is None:
+            _cassette = Cassette.from_env()
+        replaying = _cassette is not None and _cassette.replaying
+        if not (project_id or replaying):
+            raise ValueError("❌ Thiếu BLOCKFROST_PROJECT_ID trong file .env")
 
-    project_id = BLOCKFROST_PROJECT_ID
-    context = BlockFrostChainContext(project_id=project_id, base_url=base_url)
-    _context_cache = context
+        base_url = _BLOCKFROST_URLS[key]
+        _install_pooled_requests()
+        _get_scheduler(base_url)
+        if base_url not in _sessions:
+            _sessions[base_url] = _make_session(pool_size or BLOCKFROST_POOL_SIZE)
 
-    print(f"🔗 Đã khởi tạo Blockfrost context cho {NETWORK} thành công.")
+        inner = SingleFlightChainContext(
+            BlockFrostChainContext(
+                # Replay không gửi request thật nên không cần project ID
+                project_id=project_id or "replay",
+                base_url=base_url,
+            ),
+            flight=_get_flight(key),
+        )
+        store = _get_store(key)
+        if store is not None:
+            inner = SnapshotChainContext(
+                inner,
+                store=store,
+                min_interval=UTXO_SNAPSHOT_INTERVAL,
+                page_concurrency=UTXO_PAGE_CONCURRENCY,
+            )
+        context = AssetLookupChainContext(
+            CachedChainContext(inner, cache=_get_cache(key)),
+            cache=_get_asset_cache(key),
+        )
+        if PLUTUS_LOCAL_EVAL:
+            context = LocalEvaluationChainContext(context)
+        context = ExUnitsCacheChainContext(context, cache=_get_exunits_cache(key))
+        _contexts[(key, project_id)] = context
+
+    print(f"🔗 Đã khởi tạo Blockfrost context cho {key} thành công.")
     return context
 
 
-def get_network_enum() -> Network:
+def set_chain_context(context: Optional[ChainContext]):
+    """
+    Thay context Blockfrost bằng `context` cho toàn process (services, wallet, ...).
+
+    Dùng để chạy offline với OfflineLedgerContext:
+        set_chain_context(OfflineLedgerContext(...))
+    Truyền None để quay lại Blockfrost.
+    """
+    global _override
+    _override = context
+
+
+def set_cassette(cassette: Optional[Cassette]):
+    """Bật record/replay cho các request Blockfrost sync (None = tắt)."""
+    global _cassette
+    _cassette = cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    return _cassette
+
+
+def create_async_blockfrost_context(
+    network: Optional[str] = None,
+    project_id: Optional[str] = None,
+    pool_size: Optional[int] = None,
+) -> AsyncBlockFrostChainContext:
+    """
+    Tạo chain context asyncio (httpx) cho network, dùng chung UTxO cache với context sync.
+
+    AsyncClient gắn với event loop đang chạy nên mỗi ứng dụng tự tạo và
+    đóng context của mình (vd: trong lifespan của FastAPI, gọi `aclose()`).
+    """
+    key = normalize_network(network)
+    base_url = _BLOCKFROST_URLS[key]
+    return AsyncBlockFrostChainContext(
+        project_id=project_id or BLOCKFROST_PROJECT_ID,
+        base_url=base_url,
+        pool_size=pool_size or BLOCKFROST_POOL_SIZE,
+        cache=_get_cache(key),
+        flight=_get_flight(key),
+        scheduler=_get_scheduler(base_url),
+        snapshot=_get_store(key),
+        snapshot_interval=UTXO_SNAPSHOT_INTERVAL,
+        asset_cache=_get_asset_cache(key),
+    )
+
+
+def get_flight_stats(network: Optional[str] = None) -> Dict[str, int]:
+    """Số lời gọi upstream thực tế / số lời gọi được gộp (saved_calls) của network."""
+    return _get_flight(normalize_network(network)).stats()
+
+
+def get_scheduler_stats(network: Optional[str] = None) -> Dict:
+    """Độ sâu hàng đợi, thời gian chờ và số lần 429/retry của scheduler theo network."""
+    return _get_scheduler(_BLOCKFROST_URLS[normalize_network(network)]).stats()
+
+
+def get_snapshot_stats(network: Optional[str] = None) -> Optional[Dict]:
+    """Số UTxO / địa chỉ trong snapshot SQLite và số lần full/delta sync (None nếu tắt)."""
+    store = _get_store(normalize_network(network))
+    return store.stats() if store is not None else None
+
+
+def get_asset_stats(network: Optional[str] = None) -> Dict:
+    """Hit/miss của cache vị trí asset (utxo_for_asset) theo network."""
+    return _get_asset_cache(normalize_network(network)).stats()
+
+
+def get_exunits_cache(network: Optional[str] = None) -> ExUnitsCache:
+    """Cache ex-units của network (bọc context async của backend bằng ExUnitsCacheChainContext)."""
+    return _get_exunits_cache(normalize_network(network))
+
+
+def get_exunits_stats(network: Optional[str] = None) -> Dict:
+    """Số lần evaluate được bỏ qua / phải gọi thật (skip_rate) của cache ex-units theo network."""
+    return _get_exunits_cache(normalize_network(network)).stats()
+
+
+def close_blockfrost_contexts():
+    """Đóng toàn bộ connection pool (gọi khi tắt ứng dụng)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _contexts.clear()
+        for cache in _caches.values():
+            cache.invalidate()
+        for cache in _asset_caches.values():
+            cache.invalidate()
+
+
+def get_network_enum(network: Optional[str] = None) -> Network:
     """
     Trả về enum Network của PyCardano tương ứng với network hiện tại.
     """
-    if NETWORK == "MAINNET":
+    if normalize_network(network) == "MAINNET":
         return Network.MAINNET
     return Network.TESTNET
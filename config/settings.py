@@ -14,12 +14,36 @@ BLOCKFROST_NETWORK = os.getenv("BLOCKFROST_NETWORK", "TESTNET").upper()
 MNEMONIC = os.getenv("MNEMONIC1")
 IPFS_API = os.getenv("IPFS_API", "https://ipfs.infura.io:5001")
 AI_MODEL_PATH = os.getenv("AI_MODEL_PATH", "models/face_model.pt")
+# Số kết nối keep-alive tối đa tới Blockfrost cho mỗi network
+BLOCKFROST_POOL_SIZE = int(os.getenv("BLOCKFROST_POOL_SIZE", "10"))
+# Cache UTxO theo địa chỉ: thời gian sống (giây, 0 = tắt) và số địa chỉ tối đa
+UTXO_CACHE_TTL = float(os.getenv("UTXO_CACHE_TTL", "5"))
+UTXO_CACHE_SIZE = int(os.getenv("UTXO_CACHE_SIZE", "256"))
+# Giới hạn của gói Blockfrost: số request/giây, burst, và số lần retry khi gặp 429/5xx
+BLOCKFROST_RATE_LIMIT = float(os.getenv("BLOCKFROST_RATE_LIMIT", "10"))
+BLOCKFROST_BURST = int(os.getenv("BLOCKFROST_BURST", "500"))
+BLOCKFROST_MAX_RETRIES = int(os.getenv("BLOCKFROST_MAX_RETRIES", "5"))
+# Số trang /addresses/{addr}/utxos (100 UTxO/trang) được tải song song khi stream UTxO
+UTXO_PAGE_CONCURRENCY = int(os.getenv("UTXO_PAGE_CONCURRENCY", "4"))
+# Snapshot UTxO trong SQLite (mỗi network một file trong thư mục này, rỗng = tắt)
+# và khoảng thời gian tối thiểu (giây) giữa hai lần đồng bộ phần thay đổi với Blockfrost
+UTXO_SNAPSHOT_DIR = os.getenv("UTXO_SNAPSHOT_DIR", "")
+UTXO_SNAPSHOT_INTERVAL = float(os.getenv("UTXO_SNAPSHOT_INTERVAL", "2"))
+# Cache vị trí asset (UTxO đang giữ NFT): thời gian sống (giây, 0 = tắt) và số asset tối đa
+ASSET_CACHE_TTL = float(os.getenv("ASSET_CACHE_TTL", "30"))
+ASSET_CACHE_SIZE = int(os.getenv("ASSET_CACHE_SIZE", "1024"))
+# Cache ex-units của redeemer Plutus theo cấu trúc tx: biên an toàn (0.1 = +10%) và số key tối đa (0 = tắt)
+EXUNITS_CACHE_MARGIN = float(os.getenv("EXUNITS_CACHE_MARGIN", "0.1"))
+EXUNITS_CACHE_SIZE = int(os.getenv("EXUNITS_CACHE_SIZE", "256"))
+# Evaluate script PlutusV3 ngay trong process (cần package `uplc`) thay vì gọi Blockfrost evaluate
+PLUTUS_LOCAL_EVAL = os.getenv("PLUTUS_LOCAL_EVAL", "0").lower() in ("1", "true", "yes")
 
 # Xác định mạng lưới (mainnet hoặc testnet)
 NETWORK = BLOCKFROST_NETWORK
 
-# Kiểm tra cấu hình
+# Kiểm tra cấu hình: thiếu project ID vẫn import được (vd: chạy với OfflineLedgerContext),
+# lỗi chỉ xảy ra khi thực sự tạo Blockfrost context
 if not BLOCKFROST_PROJECT_ID:
-    raise ValueError("❌ Thiếu BLOCKFROST_PROJECT_ID trong file .env")
-
-print(f"✅ Đã load cấu hình: {BLOCKFROST_NETWORK} / Blockfrost Project ID: {BLOCKFROST_PROJECT_ID[:5]}****")
+    print("⚠️ Thiếu BLOCKFROST_PROJECT_ID trong file .env (chỉ dùng được chain context offline)")
+else:
+    print(f"✅ Đã load cấu hình: {BLOCKFROST_NETWORK} / Blockfrost Project ID: {BLOCKFROST_PROJECT_ID[:5]}****")
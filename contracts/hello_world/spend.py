@@ -7,6 +7,9 @@ from dotenv import load_dotenv
 from pycardano import *
 from pycardano.hash import VerificationKeyHash, ScriptHash, TransactionId
 
+# Repo root trong sys.path để dùng chain/ (evaluator local)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
 load_dotenv()
 network = os.getenv("BLOCKFROST_NETWORK")
 wallet_mnemonic = os.getenv("MNEMONIC")
@@ -41,6 +44,11 @@ api = BlockFrostApi(project_id=blockfrost_api_key, base_url=base_url)
 
 # Khởi tạo ngữ cảnh chuỗi BlockFrost
 cardano = BlockFrostChainContext(project_id=blockfrost_api_key, base_url=base_url)
+# PLUTUS_LOCAL_EVAL=1: ex-units của validator được tính local (package `uplc`), không gọi Blockfrost evaluate
+if os.getenv("PLUTUS_LOCAL_EVAL", "0").lower() in ("1", "true", "yes"):
+    from chain.local_evaluator import LocalEvaluationChainContext
+
+    cardano = LocalEvaluationChainContext(cardano)
 
 # Đọc validator từ plutus.json (dựa trên sample)
 def read_validator() -> dict:
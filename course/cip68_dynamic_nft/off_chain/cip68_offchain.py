@@ -146,18 +146,27 @@ def _debug_tx_builder(builder: TransactionBuilder):
         print("(unable to pretty print builder)")
     print("=========================================")
 
-def _simulate_or_submit(context, tx, submit: bool):
+def _simulate_or_submit(context, tx, submit: bool, skip_cached_eval: bool = False):
     """
     Try evaluate_tx (simulate). If simulation passes, optionally submit.
+
+    skip_cached_eval (opt-in, --skip-cached-eval): when submitting a tx whose
+    shape already has cached ex-units (mk_context wraps ExUnitsCacheChainContext),
+    skip the pre-submit evaluation and leave script validation to the node.
     """
-    try:
-        print("Simulating transaction (evaluate)...")
-        eval_res = context.evaluate_tx_cbor(tx.to_cbor())
-        print("Simulation result:", eval_res)
-    except TransactionFailedException as e:
-        print("Simulation FAILED. Blockfrost/ogmios returned evaluation failure:")
-        print(e)
-        raise
+    cache = getattr(context, "exunits_cache", None)
+    if skip_cached_eval and submit and cache is not None and cache.covers(tx):
+        print("⚠️ Simulation skipped (--skip-cached-eval): scripts are validated only by the node on submit",
+              cache.stats())
+    else:
+        try:
+            print("Simulating transaction (evaluate)...")
+            eval_res = context.evaluate_tx_cbor(tx.to_cbor())
+            print("Simulation result:", eval_res)
+        except TransactionFailedException as e:
+            print("Simulation FAILED. Blockfrost/ogmios returned evaluation failure:")
+            print(e)
+            raise
 
     if submit:
         print("Submitting tx...")
@@ -168,7 +177,7 @@ def _simulate_or_submit(context, tx, submit: bool):
 
 # ---------- Actions ----------
 
-def action_mint(debug=False, submit=True):
+def action_mint(debug=False, submit=True, skip_cached_eval=False):
     """Mint pair: ref(label=100) -> store (with inline datum), user(label=222) -> user address"""
     if not MNEMONIC:
         raise RuntimeError("MNEMONIC missing in config")
@@ -301,9 +310,9 @@ def action_mint(debug=False, submit=True):
         raise
 
     # Submit directly to network
-    return _simulate_or_submit(context, signed_tx, submit)
+    return _simulate_or_submit(context, signed_tx, submit, skip_cached_eval)
 
-def action_burn(debug=False, submit=True):
+def action_burn(debug=False, submit=True, skip_cached_eval=False):
     """Burn pair: burn both ref and user (amount -1 each)."""
     if not MNEMONIC:
         raise RuntimeError("MNEMONIC missing in config")
@@ -371,9 +380,9 @@ def action_burn(debug=False, submit=True):
         print("Builder build failed:", e)
         raise
 
-    return _simulate_or_submit(context, signed_tx, submit)
+    return _simulate_or_submit(context, signed_tx, submit, skip_cached_eval)
 
-def action_update_store(debug=False, submit=True):
+def action_update_store(debug=False, submit=True, skip_cached_eval=False):
     """Spend the store UTxO and re-create it (Update) with new datum (same address)."""
     if not MNEMONIC:
         raise RuntimeError("MNEMONIC missing in config")
@@ -449,9 +458,9 @@ def action_update_store(debug=False, submit=True):
         print("Builder build failed:", e)
         raise
 
-    return _simulate_or_submit(context, signed_tx, submit)
+    return _simulate_or_submit(context, signed_tx, submit, skip_cached_eval)
 
-def action_remove_store(debug=False, submit=True):
+def action_remove_store(debug=False, submit=True, skip_cached_eval=False):
     """Spend the store UTxO and remove it from script (send to user)"""
     if not MNEMONIC:
         raise RuntimeError("MNEMONIC missing in config")
@@ -494,27 +503,28 @@ def action_remove_store(debug=False, submit=True):
         print("Builder build failed:", e)
         raise
 
-    return _simulate_or_submit(context, signed_tx, submit)
+    return _simulate_or_submit(context, signed_tx, submit, skip_cached_eval)
 
 
 # ---------- CLI ----------
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python -m off_chain.cip68_offchain <mint|burn|update|remove> [--debug] [--no-submit]")
+        print("Usage: python -m off_chain.cip68_offchain <mint|burn|update|remove> [--debug] [--no-submit] [--skip-cached-eval]")
         sys.exit(1)
 
     cmd = sys.argv[1].lower()
     debug = "--debug" in sys.argv
     no_submit = "--no-submit" in sys.argv
+    skip_cached_eval = "--skip-cached-eval" in sys.argv
 
     if cmd == "mint":
-        action_mint(debug=debug, submit=not no_submit)
+        action_mint(debug=debug, submit=not no_submit, skip_cached_eval=skip_cached_eval)
     elif cmd == "burn":
-        action_burn(debug=debug, submit=not no_submit)
+        action_burn(debug=debug, submit=not no_submit, skip_cached_eval=skip_cached_eval)
     elif cmd == "update":
-        action_update_store(debug=debug, submit=not no_submit)
+        action_update_store(debug=debug, submit=not no_submit, skip_cached_eval=skip_cached_eval)
     elif cmd == "remove":
-        action_remove_store(debug=debug, submit=not no_submit)
+        action_remove_store(debug=debug, submit=not no_submit, skip_cached_eval=skip_cached_eval)
     else:
         print("Unknown command:", cmd)
         sys.exit(2)
@@ -168,17 +168,23 @@ def make_store_redeemer(is_update: bool):
     return Redeemer(some)
 
 # Simulate / submit with clear printing
-def _simulate_or_submit(context, tx, submit: bool):
-    try:
-        print("Simulating transaction (evaluate)...")
-        eval_res = context.evaluate_tx_cbor(tx.to_cbor())
-        print("Simulation result:", eval_res)
-    except TransactionFailedException as e:
-        print("\n❌ Simulation/Evaluation failed. Blockfrost/Ogmios response:")
-        print(e)
-        # Show a helpful hint
-        print("Hint: check that the applied validators are compiled with the correct parameters (issuer, store).")
-        raise
+def _simulate_or_submit(context, tx, submit: bool, skip_cached_eval: bool = False):
+    # Same opt-in shortcut as cip68_offchain._simulate_or_submit (--skip-cached-eval)
+    cache = getattr(context, "exunits_cache", None)
+    if skip_cached_eval and submit and cache is not None and cache.covers(tx):
+        print("⚠️ Simulation skipped (--skip-cached-eval): scripts are validated only by the node on submit",
+              cache.stats())
+    else:
+        try:
+            print("Simulating transaction (evaluate)...")
+            eval_res = context.evaluate_tx_cbor(tx.to_cbor())
+            print("Simulation result:", eval_res)
+        except TransactionFailedException as e:
+            print("\n❌ Simulation/Evaluation failed. Blockfrost/Ogmios response:")
+            print(e)
+            # Show a helpful hint
+            print("Hint: check that the applied validators are compiled with the correct parameters (issuer, store).")
+            raise
 
     if submit:
         print("Submitting tx...")
@@ -191,7 +197,7 @@ def _simulate_or_submit(context, tx, submit: bool):
 # Actions
 # -----------------------
 
-def action_mint(debug: bool = False, submit: bool = True):
+def action_mint(debug: bool = False, submit: bool = True, skip_cached_eval: bool = False):
     """Mint pair: ref(label=100) -> store (inline datum), user(label=222) -> user address"""
     if not MNEMONIC:
         raise RuntimeError("MNEMONIC missing in config")
@@ -273,9 +279,9 @@ def action_mint(debug: bool = False, submit: bool = True):
         _debug_tx_builder(builder)
         raise
 
-    return _simulate_or_submit(context, signed, submit)
+    return _simulate_or_submit(context, signed, submit, skip_cached_eval)
 
-def action_burn(debug: bool = False, submit: bool = True):
+def action_burn(debug: bool = False, submit: bool = True, skip_cached_eval: bool = False):
     """Burn both tokens and spend store UTxO (remove)."""
     if not MNEMONIC:
         raise RuntimeError("MNEMONIC missing in config")
@@ -356,9 +362,9 @@ def action_burn(debug: bool = False, submit: bool = True):
         _debug_tx_builder(builder)
         raise
 
-    return _simulate_or_submit(context, signed, submit)
+    return _simulate_or_submit(context, signed, submit, skip_cached_eval)
 
-def action_update_store(debug: bool = False, submit: bool = True):
+def action_update_store(debug: bool = False, submit: bool = True, skip_cached_eval: bool = False):
     """Spend the store UTxO and recreate it with updated datum (Update)."""
     if not MNEMONIC:
         raise RuntimeError("MNEMONIC missing in config")
@@ -422,9 +428,9 @@ def action_update_store(debug: bool = False, submit: bool = True):
         _debug_tx_builder(builder)
         raise
 
-    return _simulate_or_submit(context, signed, submit)
+    return _simulate_or_submit(context, signed, submit, skip_cached_eval)
 
-def action_remove_store(debug: bool = False, submit: bool = True):
+def action_remove_store(debug: bool = False, submit: bool = True, skip_cached_eval: bool = False):
     """Spend the store UTxO and move the ref asset out of script (Remove)."""
     if not MNEMONIC:
         raise RuntimeError("MNEMONIC missing in config")
@@ -471,28 +477,29 @@ def action_remove_store(debug: bool = False, submit: bool = True):
         _debug_tx_builder(builder)
         raise
 
-    return _simulate_or_submit(context, signed, submit)
+    return _simulate_or_submit(context, signed, submit, skip_cached_eval)
 
 # -----------------------
 # CLI
 # -----------------------
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python -m off_chain.cip68_offchain <mint|burn|update|remove> [--debug] [--no-submit]")
+        print("Usage: python -m off_chain.cip68_offchain <mint|burn|update|remove> [--debug] [--no-submit] [--skip-cached-eval]")
         sys.exit(1)
 
     cmd = sys.argv[1].lower()
     debug = "--debug" in sys.argv
     no_submit = "--no-submit" in sys.argv
+    skip_cached_eval = "--skip-cached-eval" in sys.argv
 
     if cmd == "mint":
-        safe_run(action_mint, debug=debug, submit=not no_submit)
+        safe_run(action_mint, debug=debug, submit=not no_submit, skip_cached_eval=skip_cached_eval)
     elif cmd == "burn":
-        safe_run(action_burn, debug=debug, submit=not no_submit)
+        safe_run(action_burn, debug=debug, submit=not no_submit, skip_cached_eval=skip_cached_eval)
     elif cmd == "update":
-        safe_run(action_update_store, debug=debug, submit=not no_submit)
+        safe_run(action_update_store, debug=debug, submit=not no_submit, skip_cached_eval=skip_cached_eval)
     elif cmd == "remove":
-        safe_run(action_remove_store, debug=debug, submit=not no_submit)
+        safe_run(action_remove_store, debug=debug, submit=not no_submit, skip_cached_eval=skip_cached_eval)
     else:
         print("Unknown command:", cmd)
         sys.exit(2)
@@ -1,13 +1,14 @@
-from pycardano.backend.blockfrost import BlockFrostChainContext, ApiUrls
+from pycardano.backend.base import ChainContext
 from pycardano.network import Network
 from ..common.config import BLOCKFROST_PROJECT_ID
 
-def mk_context() -> BlockFrostChainContext:
-    # Preprod
-    return BlockFrostChainContext(
-        project_id=BLOCKFROST_PROJECT_ID,
-        base_url=ApiUrls.preview.value,
-    )
+# Package `course` import từ repo root nên config/ (provider chung) cũng đã nằm trong sys.path
+from config.blockfrost import get_blockfrost_context
+
+
+def mk_context() -> ChainContext:
+    # Preview - context dùng chung cho cả process (pooled, giữ protocol params, cache UTxO)
+    return get_blockfrost_context("PREVIEW", project_id=BLOCKFROST_PROJECT_ID)
 
 def network() -> Network:
-    return Network.TESTNET
\ No newline at end of file
+    return Network.TESTNET
@@ -15,6 +15,7 @@ from pycardano import (
     Asset,
     AssetName,
     MultiAsset,
+    RawCBOR,
     Redeemer,
     ScriptHash,
     Transaction,
@@ -143,7 +144,7 @@ def mint_dynamic_nft(
     signed_tx = builder.build_and_sign(
         [user_xsk, issuer_xsk], change_address=user_addr, auto_required_signers=True
     )
-    tx_id = mk_context().submit_tx(signed_tx.to_cbor())
+    tx_id = context.submit_tx(signed_tx.to_cbor())
 
     return tx_id, {
         "reference_token": an_ref.hex(),
@@ -285,46 +286,36 @@ def list_cip68_nfts(user_bech32: str) -> Dict[str, Any]:
 
     # Map suffix -> presence of user token and reference datum
     result: List[Dict[str, Any]] = []
+    user_label = NON_FUNGIBLE_TOKEN_LABEL.to_bytes(4, "big")
 
-    # Scan user UTxOs for user tokens (label 222)
-    user_utxos = context.utxos(user_addr)
-    suffixes = set()
-    for u in user_utxos:
+    # One pass over user UTxOs: suffix -> UTxO holding the user token (label 222)
+    user_utxo_by_suffix: Dict[bytes, Any] = {}
+    for u in context.utxos(user_addr):
         ma = u.output.amount.multi_asset
         if mint.policy_id in ma:
             for n in ma[mint.policy_id].keys():
                 raw = bytes(n)
-                if len(raw) == 32 and raw[:4] == NON_FUNGIBLE_TOKEN_LABEL.to_bytes(4, "big"):
-                    suffixes.add(raw[4:])
+                if len(raw) == 32 and raw[:4] == user_label:
+                    user_utxo_by_suffix.setdefault(raw[4:], u)
 
-    # For each suffix, check store for corresponding reference token (label 100) and read datum
-    store_utxos = context.utxos(store.lock_address)
-    for suffix in suffixes:
+    # For each suffix, ask where its reference token (label 100) is instead of scanning
+    # the store address: cost grows with the tokens this wallet holds, not with the store
+    for suffix, u in user_utxo_by_suffix.items():
         ref_name = AssetName(build_token_name(REFERENCE_TOKEN_LABEL, suffix))
         datum_json = None
         ref_utxo_ref = None
-        user_utxo_ref = None
-        # find a user utxo holding the user token for this suffix
-        for u in user_utxos:
-            ma = u.output.amount.multi_asset
-            if mint.policy_id in ma and AssetName(build_token_name(NON_FUNGIBLE_TOKEN_LABEL, suffix)) in ma[mint.policy_id]:
-                user_utxo_ref = {"tx_hash": str(u.input.transaction_id), "index": u.input.index}
-                break
-        for s in store_utxos:
-            ma = s.output.amount.multi_asset
-            if mint.policy_id in ma and ref_name in ma[mint.policy_id]:
-                ref_utxo_ref = {
-                    "tx_hash": str(s.input.transaction_id),
-                    "index": s.input.index,
-                }
-                if s.output.datum is not None:
-                    # Try to export datum as JSON-like via to_cbor_hex as fallback
-                    try:
-                        # If datum builder exposes original fields, convert here (course datum is metadata-like)
-                        datum_json = {"cbor": s.output.datum.to_cbor_hex()}
-                    except Exception:
-                        datum_json = {"cbor": s.output.datum.to_cbor_hex()}
-                break
+        user_utxo_ref = {"tx_hash": str(u.input.transaction_id), "index": u.input.index}
+        s = context.utxo_for_asset(mint.policy_id, ref_name)
+        if s is not None and s.output.address == store.lock_address:
+            ref_utxo_ref = {
+                "tx_hash": str(s.input.transaction_id),
+                "index": s.input.index,
+            }
+            datum = s.output.datum
+            if datum is not None:
+                # Export datum as CBOR hex (course datum is metadata-like);
+                # inline datums from Blockfrost arrive as RawCBOR
+                datum_json = {"cbor": datum.cbor.hex() if isinstance(datum, RawCBOR) else datum.to_cbor_hex()}
         result.append(
             {
                 "policy_id": mint.policy_id.payload.hex(),
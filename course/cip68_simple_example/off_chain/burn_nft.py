@@ -34,27 +34,15 @@ import utils
 
 def find_token_utxos(context, policy_id_hex, ref_token_hex, user_token_hex, store_addr, user_addr):
     """Find UTxOs containing both reference and user tokens."""
-    # Find reference token at store
-    ref_utxo = None
-    for utxo in context.utxos(store_addr):
-        if utxo.output.amount.multi_asset:
-            for pid, assets in utxo.output.amount.multi_asset.items():
-                if pid.payload.hex() == policy_id_hex:
-                    for asset_name, qty in assets.items():
-                        if asset_name.payload.hex() == ref_token_hex and qty == 1:
-                            ref_utxo = utxo
-                            break
-    
-    # Find user token at user wallet
-    user_utxo = None
-    for utxo in context.utxos(user_addr):
-        if utxo.output.amount.multi_asset:
-            for pid, assets in utxo.output.amount.multi_asset.items():
-                if pid.payload.hex() == policy_id_hex:
-                    for asset_name, qty in assets.items():
-                        if asset_name.payload.hex() == user_token_hex and qty == 1:
-                            user_utxo = utxo
-                            break
+    # Ask Blockfrost where each token is instead of downloading whole addresses
+    ref_utxo = context.utxo_for_asset(policy_id_hex, ref_token_hex)
+    if ref_utxo and str(ref_utxo.output.address) != str(store_addr):
+        ref_utxo = None
+    
+    # User token must be in the user wallet
+    user_utxo = context.utxo_for_asset(policy_id_hex, user_token_hex)
+    if user_utxo and str(user_utxo.output.address) != str(user_addr):
+        user_utxo = None
     
     return ref_utxo, user_utxo
 
@@ -73,10 +61,10 @@ def main():
     
     # 1. Setup
     print("\n[1] Setting up...")
-    context = BlockFrostChainContext(
+    context = utils.asset_lookup_context(BlockFrostChainContext(
         project_id=config.BLOCKFROST_PROJECT_ID,
         network=config.NETWORK,
-    )
+    ))
     
     # Load keys
     from off_chain.mint_nft import generate_or_load_keys
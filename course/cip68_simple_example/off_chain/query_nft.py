@@ -48,27 +48,28 @@ def decode_metadata_datum(datum):
 
 def find_tokens(context, policy_id_hex, ref_token_hex, user_token_hex, store_addr):
     """Find both reference and user tokens."""
-    # Find reference token at store
+    # Ask Blockfrost where each token is instead of downloading the store address
     ref_info = None
-    for utxo in context.utxos(store_addr):
-        if utxo.output.amount.multi_asset:
-            for pid, assets in utxo.output.amount.multi_asset.items():
-                if pid.payload.hex() == policy_id_hex:
-                    for asset_name, qty in assets.items():
-                        if asset_name.payload.hex() == ref_token_hex and qty == 1:
-                            ref_info = {
-                                "utxo": utxo,
-                                "address": str(store_addr),
-                                "datum": utxo.output.datum,
-                                "amount": utxo.output.amount.coin
-                            }
-                            break
+    ref_utxo = context.utxo_for_asset(policy_id_hex, ref_token_hex)
+    if ref_utxo and str(ref_utxo.output.address) == str(store_addr):
+        ref_info = {
+            "utxo": ref_utxo,
+            "address": str(store_addr),
+            "datum": ref_utxo.output.datum,
+            "amount": ref_utxo.output.amount.coin
+        }
     
-    # Try to find user token by querying blockchain
-    # (In production, you'd need to track where user sent it)
-    user_info = {
-        "note": "User token location unknown (could be in any wallet after transfer)"
-    }
+    # The same lookup also locates the user token, wherever it was transferred
+    user_utxo = context.utxo_for_asset(policy_id_hex, user_token_hex)
+    if user_utxo:
+        user_info = {
+            "utxo": user_utxo,
+            "address": str(user_utxo.output.address),
+        }
+    else:
+        user_info = {
+            "note": "User token not found (it may have been burned)"
+        }
     
     return ref_info, user_info
 
@@ -85,10 +86,10 @@ def main():
     
     # Setup
     print("\n[1] Connecting to blockchain...")
-    context = BlockFrostChainContext(
+    context = utils.asset_lookup_context(BlockFrostChainContext(
         project_id=config.BLOCKFROST_PROJECT_ID,
         network=config.NETWORK,
-    )
+    ))
     
     # Load issuer key to rebuild validators
     from off_chain.mint_nft import generate_or_load_keys
@@ -157,6 +158,7 @@ def main():
         print(f"   Check on explorer or use wallet to locate")
     else:
         print(f"   ✓ Found at: {user_info.get('address', 'unknown')}")
+        print(f"   UTxO: {user_info['utxo'].input.transaction_id}#{user_info['utxo'].input.index}")
     
     print("\n" + "=" * 70)
     print(f"\n💡 Tip: View full details on Cardano explorer:")
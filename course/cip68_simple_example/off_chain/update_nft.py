@@ -35,17 +35,10 @@ import utils
 
 def find_reference_token_utxo(context, store_addr, policy_id, ref_token_name):
     """Find the UTxO containing the reference token at store address."""
-    utxos = context.utxos(store_addr)
-    
-    for utxo in utxos:
-        # Check if this UTxO contains our reference token
-        if utxo.output.amount.multi_asset:
-            for pid, assets in utxo.output.amount.multi_asset.items():
-                if pid.payload.hex() == policy_id:
-                    for asset_name, qty in assets.items():
-                        if asset_name.payload.hex() == ref_token_name and qty == 1:
-                            return utxo
-    
+    # Ask Blockfrost where the token is instead of downloading the whole store address
+    utxo = context.utxo_for_asset(policy_id, ref_token_name)
+    if utxo and str(utxo.output.address) == str(store_addr):
+        return utxo
     return None
 
 
@@ -63,10 +56,10 @@ def main():
     
     # 1. Setup
     print("\n[1] Setting up...")
-    context = BlockFrostChainContext(
+    context = utils.asset_lookup_context(BlockFrostChainContext(
         project_id=config.BLOCKFROST_PROJECT_ID,
         network=config.NETWORK,
-    )
+    ))
     
     # Load keys
     from off_chain.mint_nft import generate_or_load_keys
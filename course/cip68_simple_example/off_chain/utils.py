@@ -3,12 +3,14 @@ Utility functions for CIP-68 simple example
 """
 import json
 import subprocess
+import sys
 import tempfile
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Tuple
 
 from pycardano import (
+    ChainContext,
     PlutusV3Script,
     PlutusData,
     plutus_script_hash,
@@ -16,6 +18,14 @@ from pycardano import (
 
 import config
 
+# The repo root (with the shared chain/ package) goes at the END of sys.path,
+# so this example's config.py still wins over the repo's config/ package
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+from chain.asset_lookup import AssetLookupChainContext
+
 
 def load_plutus_script(validator_title: str) -> PlutusV3Script:
     """Load a Plutus script from the blueprint."""
@@ -158,6 +168,24 @@ def build_token_name(label: int, asset_name_suffix: bytes) -> bytes:
     return label_bytes + asset_name_suffix
 
 
+def asset_lookup_context(context: ChainContext) -> AssetLookupChainContext:
+    """
+    Wrap a chain context with the repo's chain.AssetLookupChainContext.
+
+    context.utxo_for_asset(policy_id, asset_name) then finds the UTxO holding
+    an asset (NFT) with two narrow Blockfrost queries instead of scanning a
+    whole address, and remembers the answer in an AssetLocationCache that is
+    updated when a transaction is submitted through the wrapper.
+
+    Args:
+        context: BlockFrostChainContext
+
+    Returns:
+        AssetLookupChainContext wrapping `context`
+    """
+    return AssetLookupChainContext(context)
+
+
 def create_cip68_datum(metadata: Dict[str, str], author_pkh: bytes = None) -> PlutusData:
     """
     Create CIP-68 metadata datum.
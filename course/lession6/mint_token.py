@@ -24,6 +24,7 @@ Kèm theo giải thích về lý thuyết liên quan.
 import os
 import sys
 from os.path import exists
+from pathlib import Path
 
 # Blockfrost: dùng để query blockchain (UTxO, submit tx, v.v.)
 from blockfrost import ApiError, ApiUrls, BlockFrostApi
@@ -34,6 +35,13 @@ from dotenv import load_dotenv
 # Pycardano: thư viện chính để build transaction Cardano
 from pycardano import *
 
+# iter_address_utxos: duyệt UTxO theo từng trang Blockfrost (chain/utxo_stream.py ở repo root)
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from chain.utxo_stream import iter_address_utxos
+
 
 # ======================================================
 # 2. NẠP BIẾN MÔI TRƯỜNG (.env)
@@ -106,22 +114,25 @@ api = BlockFrostApi(
     base_url=base_url
 )
 
-# Lấy toàn bộ UTxO của địa chỉ
+# Duyệt toàn bộ UTxO của địa chỉ qua mọi trang (Blockfrost trả tối đa 100 UTxO/trang)
+# và tính tổng ADA ngay khi từng trang về
+utxo_count = 0
+total_ada = 0
 try:
-    utxos = api.address_utxos(main_address)
-except Exception as e:
-    if e.status_code == 404:
-        print("Ví chưa có UTxO nào.")
-        if network == "testnet":
-            print("Lấy tADA tại faucet:")
-            print("https://docs.cardano.org/cardano-testnets/tools/faucet/")
-        sys.exit(1)
-    else:
-        print(f"Lỗi Blockfrost: {e}")
-        sys.exit(1)
-
-# Tính tổng ADA
-total_ada = sum(int(utxo.amount[0].quantity) for utxo in utxos)
+    for utxo in iter_address_utxos(api, main_address):
+        utxo_count += 1
+        total_ada += int(utxo.amount[0].quantity)
+except ApiError as e:
+    print(f"Lỗi Blockfrost: {e}")
+    sys.exit(1)
+
+if utxo_count == 0:
+    print("Ví chưa có UTxO nào.")
+    if network == "testnet":
+        print("Lấy tADA tại faucet:")
+        print("https://docs.cardano.org/cardano-testnets/tools/faucet/")
+    sys.exit(1)
+
 print(f"Tổng ADA khả dụng: {total_ada / 1_000_000} ADA")
 
 
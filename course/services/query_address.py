@@ -1,11 +1,19 @@
 import os
 import sys
+from pathlib import Path
 
 from blockfrost import ApiError, ApiUrls, BlockFrostApi, BlockFrostIPFS
 from dotenv import load_dotenv
 
 from pycardano import *
 
+# Wire repo root để dùng iter_address_utxos trong chain/utxo_stream.py
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from chain.utxo_stream import iter_address_utxos
+
 load_dotenv()
 network = os.getenv("BLOCKFROST_NETWORK")
 wallet_mnemonic = os.getenv("MNEMONIC")
@@ -39,29 +47,31 @@ print(" ")
 
 api = BlockFrostApi(project_id=blockfrost_api_key, base_url=base_url)
 
-try:
-    utxos = api.address_utxos(main_address)
-except Exception as e:
-    if e.status_code == 404:
-        print("Address does not have any UTXOs. ")
-        if network == "testnet":
-            print(
-                "Request tADA from the faucet: https://docs.cardano.org/cardano-testnets/tools/faucet/"
-            )
-    else:
-        print(e.message)
-    sys.exit(1)
-
 print(f"hash \t\t\t\t\t\t\t\t\t amount")
 print(
     "--------------------------------------------------------------------------------------"
 )
 
-for utxo in utxos:
-    tokens = ""
-    for token in utxo.amount:
-        if token.unit != "lovelace":
-            tokens += f"{token.quantity} {token.unit} + "
-    print(
-        f"{utxo.tx_hash}#{utxo.tx_index} \t {int(utxo.amount[0].quantity)/1000000} ADA [{tokens}]"
-    )
\ No newline at end of file
+# Blockfrost trả tối đa 100 UTxO mỗi trang: duyệt hết các trang, in ngay khi trang về
+count = 0
+try:
+    for utxo in iter_address_utxos(api, main_address):
+        count += 1
+        tokens = ""
+        for token in utxo.amount:
+            if token.unit != "lovelace":
+                tokens += f"{token.quantity} {token.unit} + "
+        print(
+            f"{utxo.tx_hash}#{utxo.tx_index} \t {int(utxo.amount[0].quantity)/1000000} ADA [{tokens}]"
+        )
+except ApiError as e:
+    print(e.message)
+    sys.exit(1)
+
+if count == 0:
+    print("Address does not have any UTXOs. ")
+    if network == "testnet":
+        print(
+            "Request tADA from the faucet: https://docs.cardano.org/cardano-testnets/tools/faucet/"
+        )
+    sys.exit(1)
\ No newline at end of file
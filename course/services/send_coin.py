@@ -1,9 +1,17 @@
 import os
 import sys
+from pathlib import Path
 from blockfrost import ApiError, ApiUrls, BlockFrostApi
 from dotenv import load_dotenv
 from pycardano import *
 
+# Wire repo root để dùng iter_address_utxos trong chain/utxo_stream.py
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from chain.utxo_stream import iter_address_utxos
+
 # Tải biến môi trường
 load_dotenv()
 network = os.getenv("BLOCKFROST_NETWORK")
@@ -43,21 +51,23 @@ amount_to_send = 100_000_000  # 100 ADA
 # Khởi tạo API BlockFrost
 api = BlockFrostApi(project_id=blockfrost_api_key, base_url=base_url)
 
-# Lấy UTxO
+# Duyệt UTxO theo từng trang (Blockfrost trả tối đa 100 UTxO/trang) và cộng số dư ADA
+utxo_count = 0
+total_ada = 0
 try:
-    utxos = api.address_utxos(main_address)
-except Exception as e:
-    if e.status_code == 404:
-        print("Địa chỉ không có UTxO nào.")
-        if network == "testnet":
-            print("Yêu cầu tADA từ faucet: https://docs.cardano.org/cardano-testnets/tools/faucet/")
-        sys.exit(1)
-    else:
-        print(e.message)
-        sys.exit(1)
+    for utxo in iter_address_utxos(api, main_address):
+        utxo_count += 1
+        total_ada += int(utxo.amount[0].quantity)
+except ApiError as e:
+    print(e.message)
+    sys.exit(1)
+
+if utxo_count == 0:
+    print("Địa chỉ không có UTxO nào.")
+    if network == "testnet":
+        print("Yêu cầu tADA từ faucet: https://docs.cardano.org/cardano-testnets/tools/faucet/")
+    sys.exit(1)
 
-# Kiểm tra số dư ADA
-total_ada = sum(int(utxo.amount[0].quantity) for utxo in utxos)
 print(f"Tổng ADA khả dụng: {total_ada / 1_000_000} ADA")
 
 if total_ada < amount_to_send + 1_000_000:  # Dự phòng 1 ADA cho phí và UTxO tối thiểu
@@ -27,14 +27,20 @@ Tạo unsigned transactions để frontend ký bằng browser wallet.
 import os
 import sys
 import json
-from typing import Optional, Dict, Any, List
+import base64
+import hashlib
+import asyncio
+import traceback
+from typing import Optional, Dict, Any, Iterator, List
 from datetime import datetime
 
 from contextlib import asynccontextmanager
 
 # FastAPI và các mô hình dữ liệu
 # dùng để xây dựng API và xử lý các yêu cầu HTTP
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 # Cors middleware để cho phép truy cập từ frontend
 from fastapi.middleware.cors import CORSMiddleware
@@ -66,13 +72,32 @@ from offchain.cip68_utils import (
     load_store_script,
     extract_owner_from_datum,
 )
+from offchain.cip68_datum_cache import datum_cache
+from offchain.cip68_events import ReferenceEventHub
+from offchain.cip68_index import HolderIndex, ReferenceEntry, ReferenceEvent, ReferenceTokenIndex
+from offchain.cip68_operations import get_async_chain_context, get_network
+from offchain.cip68_reference_scripts import load_reference_scripts
+from config.blockfrost import get_exunits_cache
+from config.settings import PLUTUS_LOCAL_EVAL
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_batch import BatchTx, CIP68BatchUpdater
+from chain.async_context import AsyncBlockFrostChainContext, AsyncChainContextBridge
+from chain.exunits_cache import ExUnitsCacheChainContext
+from chain.local_evaluator import LocalEvaluationChainContext
+from chain.follower import AddressIndex, ChainFollower
+from chain.scheduler import background
 
 # Load environment variables
 load_dotenv()
 
 # Khai báo biến toàn cục
 
-chain_context: Optional [BlockFrostChainContext] = None
+# async_context: I/O với Blockfrost không chặn event loop (await trong endpoint)
+# chain_context: bridge đồng bộ cho TransactionBuilder, chỉ dùng trong worker thread;
+#   evaluate ex-units đi qua cache theo cấu trúc tx, khi miss thì chạy script local
+#   (PLUTUS_LOCAL_EVAL=1) hoặc gọi Blockfrost
+async_context: Optional[AsyncBlockFrostChainContext] = None
+chain_context: Optional [ExUnitsCacheChainContext] = None
 
 blueprint_path: Optional[str] = None
 network: Network = Network.TESTNET
@@ -81,6 +106,20 @@ store_script: Optional[PlutusV3Script] = None
 policy_id: Optional[ScriptHash] = None
 store_address: Optional[Address] = None
 
+# Chỉ mục UTxO của store address, cập nhật từng block bởi chain follower (task nền).
+# Các endpoint đọc từ chỉ mục thay vì quét lại toàn bộ store address qua Blockfrost.
+store_index: Optional[AddressIndex] = None
+follower: Optional[ChainFollower] = None
+follower_task: Optional[asyncio.Task] = None
+# Chỉ mục tên token → UTxO giữ reference token (+ datum đã giải mã), cập nhật theo store_index
+ref_index: Optional[ReferenceTokenIndex] = None
+# Địa chỉ ví → user token (222) đang giữ, nạp khi ví được xem lần đầu
+holder_index: Optional[HolderIndex] = None
+# Policy ID, store address, redeemer hằng và reference script của tx mint/update/burn, tính lúc khởi động
+tx_templates: Optional[CIP68TxTemplates] = None
+# Phát event mint/update/burn từ ref_index tới các client /api/events (SSE)
+event_hub: Optional[ReferenceEventHub] = None
+
 # PYDANTIC MODELS
 # Pydantic models dùng để xác định cấu trúc dữ liệu cho các yêu cầu và phản hồi API
 # khai bao kiểu dữ liệu cho các yêu cầu mint asset
@@ -102,6 +141,21 @@ class UpdateRequest(BaseModel):
     token_name: str = Field(..., description="Tên token")
     new_description: str = Field(..., min_length=1, max_length=256, description="Mô tả mới")
 
+# Model yêu cầu cập nhật metadata của nhiều token
+# Dùng cho endpoint /api/update/batch (nhiều reference token mỗi transaction)
+MAX_UPDATE_BATCH = 1000
+
+class BatchUpdateItem(BaseModel):
+    """Một token trong batch update."""
+    token_name: str = Field(..., min_length=1, max_length=32, description="Tên token")
+    new_description: str = Field(..., min_length=1, max_length=256, description="Mô tả mới")
+
+class BatchUpdateRequest(BaseModel):
+    """Request model for batch updating metadata."""
+    wallet_address: str = Field(..., description="Địa chỉ ví của owner")
+    items: List[BatchUpdateItem] = Field(..., min_length=1, max_length=MAX_UPDATE_BATCH, description="Danh sách token")
+    max_items_per_tx: Optional[int] = Field(None, ge=1, description="Giới hạn số token mỗi transaction")
+
 # Model của yêu cầu burn asset
 # Dùng cho endpoint /api/burn
 # Mô hình này xác định các trường cần thiết để đốt một CIP-68 token.
@@ -158,6 +212,28 @@ class MetadataResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
     version: Optional[int] = None
 
+# Model yêu cầu / phản hồi truy vấn metadata nhiều token một lần
+# Dùng cho endpoint /api/metadata/batch (trang gallery)
+MAX_METADATA_BATCH = 500
+
+class MetadataBatchRequest(BaseModel):
+    """Request model for batch metadata query."""
+    token_names: List[str] = Field(..., min_length=1, max_length=MAX_METADATA_BATCH, description="Danh sách tên token")
+
+class MetadataBatchItem(BaseModel):
+    """Metadata của một token trong batch (found=False nếu không tìm thấy)."""
+    token_name: str
+    found: bool
+    metadata: Optional[Dict[str, Any]] = None
+    version: Optional[int] = None
+
+class MetadataBatchResponse(BaseModel):
+    """Response model for batch metadata query."""
+    success: bool
+    message: str
+    results: List[MetadataBatchItem] = []
+    found: int = 0
+
 # Model phản hồi thông tin ví
 # Dùng cho endpoint /api/wallet/{address}
 # Mô hình này định nghĩa cấu trúc phản hồi khi truy vấn thông tin ví.# Bao gồm số dư lovelace, số lượng UTxO và danh sách tài sản
@@ -181,22 +257,20 @@ class WalletInfoResponse(BaseModel):
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Khai báo biến toàn cục
-    global chain_context, mint_script, store_script, network, policy_id, store_address
+    global async_context, chain_context, mint_script, store_script, network, policy_id, store_address
+    global store_index, follower, follower_task, ref_index, holder_index, event_hub, tx_templates
     # Startup
     print("Starting CIP-68 Backend API (Simplified)...")
     # Khởi tạo Chain Context
     network_str = os.getenv("NETWORK", "Preprod")
-    blockfrost_key = os.getenv("BLOCKFROST_PROJECT_ID")
-    network = Network.TESTNET if network_str.lower() == "preprod" else Network.MAINNET
-    if network_str == "Preprod":
-        blockfrost_url = ApiUrls.preprod.value
-    else:
-        blockfrost_url = ApiUrls.mainnet.value
-
-    chain_context = BlockFrostChainContext(
-        project_id=blockfrost_key,
-        base_url=blockfrost_url
-    )
+    # Cùng network với context Blockfrost (Preview / Preprod -> TESTNET, Mainnet -> MAINNET)
+    network = get_network()
+    # Context asyncio (httpx, connection pool) + bridge cho TransactionBuilder
+    async_context = get_async_chain_context()
+    bridge = AsyncChainContextBridge(async_context, asyncio.get_running_loop())
+    if PLUTUS_LOCAL_EVAL:
+        bridge = LocalEvaluationChainContext(bridge)
+    chain_context = ExUnitsCacheChainContext(bridge, cache=get_exunits_cache(network_str))
 
     # thiêt lập đường dẫn đến blueprint
     global blueprint_path
@@ -214,17 +288,62 @@ async def lifespan(app: FastAPI):
         store_script = load_store_script(blueprint_path)
         policy_id =get_policy_id(mint_script)
         store_address = get_script_address(store_script,network)
+        tx_templates = CIP68TxTemplates(mint_script, store_script, network)
         print(f"Policy ID: {policy_id}")
         print(f"Store Address: {store_address}")
+        # Reference scripts (deploy_reference_scripts.py): tx chỉ tham chiếu script, không đính kèm
+        reference_scripts = load_reference_scripts()
+        if reference_scripts is not None:
+            if not reference_scripts.matches(mint_script, store_script):
+                print("Warning: reference scripts không khớp blueprint, đính kèm script vào tx")
+            else:
+                try:
+                    unspent = reference_scripts.unspent_in(await async_context.utxos(reference_scripts.address))
+                except Exception as e:
+                    print(f"Warning: không kiểm tra được reference scripts: {e}")
+                    unspent = False
+                if unspent:
+                    tx_templates.reference_scripts = reference_scripts
+                    print(f"Reference scripts: {reference_scripts.mint.input}, {reference_scripts.store.input}")
+                else:
+                    print("Warning: UTxO reference script không còn, đính kèm script vào tx")
     else:
         print(f"Warning: Blueprint not found at {blueprint_path}")
         blueprint_path = None
     print(f"Connected to {network_str} network")
 
+    # Chain follower: nạp chỉ mục store address một lần rồi theo dõi từng block
+    if store_address:
+        store_index = AddressIndex(
+            [store_address], depth=int(os.getenv("CHAIN_FOLLOW_DEPTH", "10"))
+        )
+        # Đăng ký trước bootstrap để ref_index nhận toàn bộ UTxO khi chỉ mục được nạp
+        ref_index = ReferenceTokenIndex(policy_id, store_address)
+        store_index.subscribe(ref_index.on_change)
+        event_hub = ReferenceEventHub(max_subscribers=int(os.getenv("EVENT_MAX_SUBSCRIBERS", "1000")))
+        ref_index.subscribe(event_hub.publish)
+        holder_index = HolderIndex(policy_id, ttl=float(os.getenv("HOLDER_INDEX_TTL", "60")))
+        follower = ChainFollower(
+            async_context, store_index, interval=float(os.getenv("CHAIN_FOLLOW_INTERVAL", "10"))
+        )
+        try:
+            await follower.bootstrap()
+        except Exception as e:
+            # Chưa nạp được thì endpoint vẫn đọc trực tiếp qua Blockfrost, follower thử lại khi poll
+            print(f"Warning: chain follower bootstrap failed: {e}")
+        follower_task = asyncio.create_task(follower.run())
+
     yield
     
     # Shutdown
     print("Shutting down CIP-68 Backend API...")
+    if follower_task:
+        follower_task.cancel()
+        try:
+            await follower_task
+        except asyncio.CancelledError:
+            pass
+    await async_context.aclose()
 
 
 # ============================================================================
@@ -259,7 +378,75 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cho JS của frontend đọc ETag để gửi lại qua If-None-Match
+    expose_headers=["ETag"],
 )
+# Build transaction body + witness set (chưa có vkey) và trả về CBOR hex.
+# builder.build() gọi utxos/protocol params/evaluate qua chain_context (bridge)
+# nên phải chạy trong worker thread: await run_in_threadpool(_build_unsigned_tx, ...)
+def _build_unsigned_tx(builder: TransactionBuilder, change_address: Address) -> str:
+    tx_body = builder.build(change_address=change_address)
+    witness_set = builder.build_witness_set()
+    tx = Transaction(tx_body, witness_set)
+    return tx.to_cbor().hex()
+# UTxO của store address: lấy từ chỉ mục của chain follower (nhất quán tại tip đã biết),
+# chỉ gọi Blockfrost khi chỉ mục chưa sẵn sàng
+# Ưu tiên mặc định (interactive) vì nằm trên đường build mint/update/burn;
+# các endpoint đọc / listing tự bọc background()
+async def _store_utxos() -> List[UTxO]:
+    if store_index is not None and store_index.ready:
+        return store_index.utxos()
+    return await async_context.utxos(store_address)
+# Tìm reference token của một NFT: tra O(1) trong ref_index,
+# chỉ quét store address khi chỉ mục chưa sẵn sàng
+async def _find_reference(token_name: bytes) -> Optional[ReferenceEntry]:
+    return (await _reference_index()).get(token_name)
+# ref_index nếu đã sẵn sàng, nếu chưa thì chỉ mục tạm dựng từ một lần đọc store address
+async def _reference_index() -> ReferenceTokenIndex:
+    if ref_index is not None and ref_index.ready:
+        return ref_index
+    scan = ReferenceTokenIndex(policy_id, store_address)
+    scan.load(await _store_utxos())
+    return scan
+# Conditional GET: client gửi lại ETag qua If-None-Match, nếu khớp thì trả 304 (không body)
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+# Header của response server-sent events: không cache, proxy (nginx) không gom buffer
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Server-sent events cho các tx của một batch (generator `plan` của CIP68BatchUpdater.plan):
+# `transaction` cho mỗi tx, `done` khi xong, `error` nếu lỗi giữa chừng
+async def _batch_events(plan: Iterator[BatchTx], total: int):
+    index = done = 0
+    try:
+        while True:
+            # Mỗi tx build trong worker thread (gọi chain_context qua bridge)
+            batch_tx = await run_in_threadpool(next, plan, None)
+            if batch_tx is None:
+                break
+            index += 1
+            done += len(batch_tx.token_names)
+            payload = {
+                "index": index,
+                "tx_cbor": batch_tx.tx.to_cbor_hex(),
+                "token_names": [name.decode('utf-8') for name in batch_tx.token_names],
+                "chained": batch_tx.chained,
+                "fee": batch_tx.fee,
+                "size": batch_tx.size,
+                "done": done,
+                "total": total,
+            }
+            yield f"event: transaction\ndata: {json.dumps(payload)}\n\n"
+        summary = {"transactions": index, "total": total, "policy_id": str(policy_id)}
+        yield f"event: done\ndata: {json.dumps(summary)}\n\n"
+    except Exception as e:
+        traceback.print_exc()
+        yield f"event: error\ndata: {json.dumps({'message': str(e), 'done': done, 'total': total})}\n\n"
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -274,6 +461,27 @@ async def root():
         "network": os.getenv("NETWORK", "Preprod"),
         "timestamp": datetime.now().isoformat()
     }
+# Endpoint xem số liệu cache của chain context
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Số liệu hiệu năng của chain context (cache UTxO, snapshot SQLite, single-flight, scheduler).
+    """
+    return {
+        "utxo_cache": async_context.stats() if async_context else None,
+        "utxo_snapshot": async_context.snapshot_stats() if async_context else None,
+        "single_flight": async_context.flight_stats() if async_context else None,
+        "asset_lookup": async_context.asset_stats() if async_context else None,
+        "scheduler": async_context.scheduler_stats() if async_context else None,
+        "exunits_cache": chain_context.exunits_stats() if chain_context else None,
+        "local_eval": chain_context.local_eval_stats() if PLUTUS_LOCAL_EVAL and chain_context else None,
+        "store_index": follower.stats() if follower else None,
+        "reference_index": ref_index.stats() if ref_index else None,
+        "holder_index": holder_index.stats() if holder_index else None,
+        "events": event_hub.stats() if event_hub else None,
+        "tx_templates": tx_templates.stats() if tx_templates else None,
+        "datum_cache": datum_cache.stats(),
+    }
 # Endpoint chuyển đổi địa chỉ từ hex sang bech32
 @app.get("/api/convert-address")
 async def convert_address(hex_address: str = Query(..., description="Hex-encoded address from CIP-30")):
@@ -320,6 +528,10 @@ async def get_script_info():
         "store_hash": str(store_script),
         "store_address": str(store_address) if store_address else None,
         "network": os.getenv("NETWORK", "Preprod"),
+        "reference_scripts": {
+            "mint": str(tx_templates.reference_scripts.mint.input),
+            "store": str(tx_templates.reference_scripts.store.input),
+        } if tx_templates and tx_templates.reference_scripts else None,
         "message": "Using non-parameterized contracts (fixed policy ID)"
     }
 # Endpoint lấy thông tin ví
@@ -328,7 +540,9 @@ async def get_wallet_info(address: str):
     """Lấy thông tin ví."""
     try:
         addr = Address.from_primitive(address)
-        utxos = chain_context.utxos(addr)
+        # Số dư / listing là lời gọi nền, nhường rate limit cho mint/update/burn/submit
+        with background():
+            utxos = await async_context.utxos(addr)
         total_lovelace = sum(utxo.output.amount.coin for utxo in utxos)
         # Collect assets
         assets = []
@@ -350,6 +564,50 @@ async def get_wallet_info(address: str):
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+# Endpoint liệt kê CIP-68 NFT của một ví (màn hình "token của tôi")
+@app.get("/api/wallet/{address}/tokens")
+async def get_wallet_tokens(address: str):
+    """
+    CIP-68 NFT liên quan tới ví: đang giữ user token tại địa chỉ này,
+    hoặc là owner trong datum (payment key hash của địa chỉ).
+
+    Tra theo chỉ mục holder/owner nên thời gian tỉ lệ với số token của ví.
+    """
+    try:
+        if ref_index is None or holder_index is None:
+            raise HTTPException(status_code=500, detail="Store address not initialized")
+        addr = Address.from_primitive(address)
+        held = holder_index.names(addr)
+        if held is None:
+            with background():
+                holder_index.load(addr, await async_context.utxos(addr))
+            held = holder_index.names(addr) or set()
+        owner_pkh = addr.payment_part.payload if addr.payment_part else None
+
+        with background():
+            index = await _reference_index()
+        entries = {entry.token_name: entry for entry in index.get_many(held)}
+        if owner_pkh is not None:
+            entries.update((entry.token_name, entry) for entry in index.by_owner(owner_pkh))
+
+        tokens = []
+        for name in sorted(entries):
+            entry = entries[name]
+            datum = entry.datum
+            tokens.append({
+                "token_name": name.decode('utf-8', errors='replace'),
+                "policy_id": str(policy_id),
+                "owner": datum.owner.hex() if datum else None,
+                "version": datum.version if datum else None,
+                "metadata": entry.metadata,
+                "holds_user_token": name in held,
+                "is_owner": datum is not None and datum.owner == owner_pkh,
+            })
+        return {"success": True, "address": address, "tokens": tokens, "count": len(tokens)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 # Endpoint tạo giao dịch mint token
 # frontend gửi yêu cầu mint token với địa chỉ ví, tên token và mô tả
 # backend tạo unsigned transaction và trả về CBOR hex của transaction
@@ -369,7 +627,7 @@ async def create_mint_transaction(request: MintRequest):
         owner_address = Address.from_primitive(request.wallet_address)
         owner_pkh = owner_address.payment_part.to_primitive()
         # Get UTxOs
-        utxos = chain_context.utxos(owner_address)
+        utxos = await async_context.utxos(owner_address)
         if not utxos:
             raise HTTPException(status_code=400, detail="Ví không có UTxO nào!")
 
@@ -388,61 +646,14 @@ async def create_mint_transaction(request: MintRequest):
             metadata=request.description,
             version=1
         )
-        # Create MultiAsset for minting
-        mint_asset = Asset()
-        mint_asset[ref_asset_name] = 1
-        mint_asset[user_asset_name] = 1
-
-        mint_assets = MultiAsset()
-        mint_assets[policy_id] = mint_asset
-
-         # Create redeemer
-        redeemer = Redeemer(MintToken(token_name=token_name_bytes))
-
-        # Calculate values
-        ref_asset_only = Asset()
-        ref_asset_only[ref_asset_name] = 1
-        ref_multi = MultiAsset()
-        ref_multi[policy_id] = ref_asset_only
-        ref_value = Value(2_000_000, ref_multi)
-        
-        user_asset_only = Asset()
-        user_asset_only[user_asset_name] = 1
-        user_multi = MultiAsset()
-        user_multi[policy_id] = user_asset_only
-        user_value = Value(2_000_000, user_multi)
-
-        # Build transaction
-        builder = TransactionBuilder(chain_context)
-
-        builder.add_input_address(owner_address)
-        # Mint tokens
-        builder.mint = mint_assets
-
-        builder.add_minting_script(mint_script, redeemer=redeemer)
-
-        # Output: Reference token to store script
-        builder.add_output(
-            TransactionOutput(store_address, ref_value, datum=datum)
-        )
-
-        # Output: User token to owner
-        builder.add_output(
-            TransactionOutput(owner_address, user_value)
-        )
+        # Build transaction từ template: chỉ điền ví, tên token và datum
+        builder = tx_templates.mint(chain_context, owner_address, token_name_bytes, datum)
 
-        # Required signers
-        builder.required_signers = [owner_address.payment_part]
-        
         # Transaction object bao gồm body và witness set
         # tx_body: TransactionBody chứa các inputs, outputs, mint, fee, ttl, ...
         # witness_set: TransactionWitnessSet chứa scripts, redeemers, datums (chưa có vkey)
-        # Build transaction body
-        tx_body = builder.build(change_address=owner_address)
-        witness_set = builder.build_witness_set()
-
-        tx = Transaction(tx_body, witness_set)
-        tx_cbor = tx.to_cbor().hex()
+        # Build transaction trong worker thread để không chặn event loop
+        tx_cbor = await run_in_threadpool(_build_unsigned_tx, builder, owner_address)
 
         return TransactionResponse(
             success=True,
@@ -454,7 +665,6 @@ async def create_mint_transaction(request: MintRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return TransactionResponse(
             success=False,
@@ -485,26 +695,19 @@ async def create_update_transaction (request: UpdateRequest):
 
         ref_asset_name = AssetName(CIP68_REFERENCE_PREFIX + token_name_bytes)
         # Find reference token UTxO
-        utxos = chain_context.utxos(store_address)
-        ref_utxo = None
-        for utxo in utxos:
-            if utxo.output.amount.multi_asset:
-                for pid, assets in utxo.output.amount.multi_asset.items():
-                    if pid == policy_id and ref_asset_name in assets:
-                        ref_utxo = utxo
-                        break
-        
-        if not ref_utxo:
+        ref_entry = await _find_reference(token_name_bytes)
+        if not ref_entry:
             raise HTTPException(status_code=404, detail="Reference token not found")
+        ref_utxo = ref_entry.utxo
     
-        # Get current datum and verify owner
-        current_datum = ref_utxo.output.datum
-        new_version = 2
-        if isinstance(current_datum, CIP68Datum):
-            current_owner = extract_owner_from_datum(current_datum)
-            if current_owner != owner_pkh:
-                raise HTTPException(status_code=403, detail="You are not the owner of this NFT")
-            new_version = current_datum.version + 1
+        # Get current datum (đã giải mã từ inline datum) and verify owner
+        current_datum = ref_entry.datum
+        if current_datum is None:
+            raise HTTPException(status_code=422, detail="Cannot decode the reference token datum")
+        current_owner = extract_owner_from_datum(current_datum)
+        if current_owner != owner_pkh:
+            raise HTTPException(status_code=403, detail="You are not the owner of this NFT")
+        new_version = current_datum.version + 1
         # Create new datum - giữ nguyên policy_id, asset_name, owner
         new_datum = create_cip68_datum(
             policy_id=policy_id_bytes,
@@ -513,37 +716,11 @@ async def create_update_transaction (request: UpdateRequest):
             metadata=request.new_description,
             version=new_version
         )   
-        # Create redeemer
-        redeemer = Redeemer(UpdateMetadata())
-
-        # Build transaction
-        builder = TransactionBuilder(chain_context)
-        builder.add_input_address(owner_address)
-        # Spend reference token UTxO
-        builder.add_script_input(
-            ref_utxo,
-            store_script,
-            redeemer=redeemer
-        )
-        # Output: Reference token back to store script
-        ref_asset = Asset()
-        ref_asset[ref_asset_name] = 1
-        ref_multi = MultiAsset()
-        ref_multi[policy_id] = ref_asset
-        ref_value = Value(ref_utxo.output.amount.coin, ref_multi)
-
-        builder.add_output(
-            TransactionOutput(store_address, ref_value, datum=new_datum)
-        )
-         # Required signers
-        builder.required_signers = [owner_address.payment_part]
-
-        # Build transaction body
-        tx_body = builder.build(change_address=owner_address)
-        # Build witness set (without vkey - wallet provides signature)
-        witness_set = builder.build_witness_set()
-        tx = Transaction(tx_body, witness_set)
-        tx_cbor = tx.to_cbor().hex()
+        # Build transaction từ template: tiêu reference UTxO, trả về store address với datum mới
+        builder = tx_templates.update(chain_context, owner_address, ref_utxo, token_name_bytes, new_datum)
+
+        # Build transaction body + witness set (without vkey - wallet provides signature)
+        tx_cbor = await run_in_threadpool(_build_unsigned_tx, builder, owner_address)
         return TransactionResponse(
             success=True,
             message="Update transaction created successfully",
@@ -559,6 +736,59 @@ async def create_update_transaction (request: UpdateRequest):
             success=False,
             message=f"Error creating update transaction: {str(e)}"
         )
+# Endpoint tạo nhiều giao dịch update metadata, mỗi giao dịch tiêu nhiều reference token
+# Trả về server-sent events để frontend thấy tiến độ khi batch lớn
+@app.post("/api/update/batch")
+async def create_batch_update_transactions(request: BatchUpdateRequest):
+    """
+    Tạo các unsigned transaction để update metadata của nhiều CIP-68 NFT.
+
+    Owner của mọi token được kiểm tra từ datum trước khi build (404 nếu thiếu
+    reference token, 403 nếu ví không phải owner). Số token mỗi tx được chọn
+    theo max tx size và tổng ex-units (mỗi token một redeemer UpdateMetadata).
+    Stream server-sent events: `transaction` cho mỗi tx (tx_cbor, token_names,
+    done/total), `done` khi xong, `error` nếu lỗi giữa chừng. Frontend ký và
+    gửi /api/submit theo đúng thứ tự (tx `chained` tiêu output change của tx trước).
+    """
+    if not tx_templates:
+        raise HTTPException(status_code=500, detail="Scripts not loaded")
+    try:
+        owner_address = Address.from_primitive(request.wallet_address)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid wallet address")
+    names = [item.token_name for item in request.items]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Tên token bị trùng trong batch")
+
+    owner_pkh = owner_address.payment_part.to_primitive()
+    references = await _reference_index()
+    items = []
+    missing, not_owned = [], []
+    for item in request.items:
+        token_name_bytes = item.token_name.encode('utf-8')
+        ref_entry = references.get(token_name_bytes)
+        if not ref_entry:
+            missing.append(item.token_name)
+            continue
+        current_datum = ref_entry.datum
+        if current_datum is None or extract_owner_from_datum(current_datum) != owner_pkh:
+            not_owned.append(item.token_name)
+            continue
+        items.append((ref_entry.utxo, token_name_bytes, create_cip68_datum(
+            policy_id=bytes(policy_id),
+            asset_name=token_name_bytes,
+            owner_pkh=owner_pkh,
+            metadata=item.new_description,
+            version=current_datum.version + 1
+        )))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Reference token not found: {', '.join(missing)}")
+    if not_owned:
+        raise HTTPException(status_code=403, detail=f"You are not the owner of: {', '.join(not_owned)}")
+
+    updater = CIP68BatchUpdater(tx_templates, max_items_per_tx=request.max_items_per_tx)
+    plan = updater.plan(chain_context, owner_address, items)
+    return StreamingResponse(_batch_events(plan, len(items)), media_type="text/event-stream", headers=SSE_HEADERS)
 @app.post("/api/burn", response_model=TransactionResponse)
 async def create_burn_transaction(request: BurnRequest):
     """
@@ -577,74 +807,30 @@ async def create_burn_transaction(request: BurnRequest):
         ref_asset_name, user_asset_name = create_cip68_asset_names(token_name_bytes)
 
          # Find reference token UTxO
-        store_utxos = chain_context.utxos(store_address)
-        ref_utxo = None
-        for utxo in store_utxos:
-            if utxo.output.amount.multi_asset:
-                for pid, assets in utxo.output.amount.multi_asset.items():
-                    if pid == policy_id and ref_asset_name in assets:
-                        ref_utxo = utxo
-                        break
-        
-        if not ref_utxo:
+        ref_entry = await _find_reference(token_name_bytes)
+        if not ref_entry:
             raise HTTPException(status_code=404, detail="Reference token not found")
+        ref_utxo = ref_entry.utxo
         # Verify owner from datum
-        current_datum = ref_utxo.output.datum
-
-        if isinstance(current_datum, CIP68Datum):
-            current_owner = extract_owner_from_datum(current_datum)
-            if current_owner != owner_pkh:
-                raise HTTPException(status_code=403, detail="You are not the owner of this NFT")
-        # Find user token UTxO
-        owner_utxos = chain_context.utxos(owner_address)
-        user_utxo = None
-        for utxo in owner_utxos:
-            if utxo.output.amount.multi_asset:
-                for pid, assets in utxo.output.amount.multi_asset.items():
-                    if pid == policy_id and user_asset_name in assets:
-                        user_utxo = utxo
-                        break
+        current_datum = ref_entry.datum
+        if current_datum is None:
+            raise HTTPException(status_code=422, detail="Cannot decode the reference token datum")
+        current_owner = extract_owner_from_datum(current_datum)
+        if current_owner != owner_pkh:
+            raise HTTPException(status_code=403, detail="You are not the owner of this NFT")
+        # Find user token UTxO: hỏi thẳng vị trí asset, phải thuộc ví owner (cùng payment key)
+        user_utxo = await async_context.utxo_for_asset(policy_id, user_asset_name)
+        if user_utxo and user_utxo.output.address.payment_part != owner_address.payment_part:
+            user_utxo = None
         
         if not user_utxo:
             raise HTTPException(status_code=404, detail="User token not found in wallet")
         
-        # Create burn assets (negative quantities)
-        burn_asset = Asset()
-        burn_asset[ref_asset_name] = -1
-        burn_asset[user_asset_name] = -1
-        
-        burn_assets = MultiAsset()
-        burn_assets[policy_id] = burn_asset
-
-         # Create redeemers
-        mint_redeemer = Redeemer(BurnToken(token_name=token_name_bytes))
-        spend_redeemer = Redeemer(BurnReference())
-
-        # Build transaction
-        builder = TransactionBuilder(chain_context)
-        builder.add_input_address(owner_address)
-          # Spend reference token
-        builder.add_script_input(
-            ref_utxo,
-            store_script,
-            redeemer=spend_redeemer
-        )
-        # Add user token input
-        builder.add_input(user_utxo)
-         # Burn tokens
-        builder.mint = burn_assets
-
-        builder.add_minting_script(mint_script, redeemer=mint_redeemer)
-
-        # Required signers
-        builder.required_signers = [owner_address.payment_part]
-
-        # Build transaction body
-        tx_body = builder.build(change_address=owner_address)
-         # Build witness set (without vkey - wallet provides signature)
-        witness_set = builder.build_witness_set()
-        tx = Transaction(tx_body, witness_set)
-        tx_cbor = tx.to_cbor().hex()
+        # Build transaction từ template: tiêu reference + user token và burn cả hai
+        builder = tx_templates.burn(chain_context, owner_address, ref_utxo, user_utxo, token_name_bytes)
+
+        # Build transaction body + witness set (without vkey - wallet provides signature)
+        tx_cbor = await run_in_threadpool(_build_unsigned_tx, builder, owner_address)
         return TransactionResponse(
             success=True,
             message="Burn transaction created successfully",
@@ -656,7 +842,6 @@ async def create_burn_transaction(request: BurnRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return TransactionResponse(
             success=False,
@@ -697,7 +882,12 @@ async def submit_transaction(request: SubmitRequest):
         backend_tx.transaction_witness_set = final_witness_set
         # 5. Submit
         # Quan trọng: Dùng backend_tx.to_cbor() để đảm bảo cấu trúc Body giữ nguyên
-        tx_hash = chain_context.submit_tx_cbor(backend_tx.to_cbor())
+        tx_hash = await async_context.submit_tx_cbor(backend_tx.to_cbor())
+        # Áp dụng ngay vào ref_index để request sau không dùng lại reference UTxO đã tiêu
+        if ref_index is not None:
+            ref_index.apply_submitted(backend_tx)
+        if holder_index is not None:
+            holder_index.apply_submitted(backend_tx)
         
         return SubmitResponse(
                     success=True,
@@ -705,7 +895,6 @@ async def submit_transaction(request: SubmitRequest):
                     tx_hash=str(tx_hash)
                 )
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return SubmitResponse(
             success=False,
@@ -713,81 +902,41 @@ async def submit_transaction(request: SubmitRequest):
         )
 # Endpoint lấy metadata hiện tại của token
 @app.get("/api/metadata/{token_name}", response_model=MetadataResponse)
-async def get_metadata(token_name: str):
+async def get_metadata(
+    token_name: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Lấy metadata hiện tại của CIP-68 NFT.
     
     SIMPLIFIED: Uses fixed policy ID and store address.
+
+    ETag = reference UTxO (tx_hash#index) + version của datum: metadata chỉ
+    đổi khi reference token chuyển sang UTxO mới, nên client polling gửi
+    If-None-Match và nhận 304 khi chưa có gì thay đổi.
     """
     try:
         
         if not store_address:
             raise HTTPException(status_code=500, detail="Store address not initialized")
         
-        # Create asset name
-        token_name_bytes = token_name.encode('utf-8')
-        ref_asset_name = AssetName(CIP68_REFERENCE_PREFIX + token_name_bytes)
-        
-        print(f"\n=== METADATA FETCH DEBUG ===")
-        print(f"Token name: {token_name}")
-        print(f"Looking for ref asset: {ref_asset_name.payload.hex()}")
-        
-        # Find reference token UTxO
-        utxos = chain_context.utxos(store_address)
-        print(f"Found {len(utxos)} UTxOs at store address")
-        
-        for utxo in utxos:
-            if utxo.output.amount.multi_asset:
-                for p, assets in utxo.output.amount.multi_asset.items():
-                    print(f"Policy: {p.payload.hex()}")
-                    for asset_name, qty in assets.items():
-                        print(f"  Asset: {asset_name.payload.hex()} = {qty}")
-                    
-                    if p == policy_id and ref_asset_name in assets:
-                        print(f"✅ Found matching NFT!")
-                        datum = utxo.output.datum
-                        print(f"Datum type: {type(datum)}")
-                        
-                        # If datum is RawCBOR, deserialize it
-                        if isinstance(datum, RawCBOR):
-                            try:
-                                datum = CIP68Datum.from_cbor(datum.cbor)
-                                print(f"Deserialized to CIP68Datum")
-                            except Exception as e:
-                                print(f"Failed to deserialize datum: {e}")
-                                continue
-                        
-                        if isinstance(datum, CIP68Datum):
-                            # Convert bytes keys and values to strings
-                            metadata = {}
-                            for k, v in datum.metadata.items():
-                                # Decode key
-                                key = k.decode('utf-8') if isinstance(k, bytes) else str(k)
-                                
-                                # Decode value - handle various types
-                                if isinstance(v, bytes):
-                                    value = v.decode('utf-8')
-                                elif hasattr(v, 'to_primitive'):
-                                    # PlutusData object
-                                    prim = v.to_primitive()
-                                    if isinstance(prim, bytes):
-                                        value = prim.decode('utf-8')
-                                    else:
-                                        value = str(prim)
-                                else:
-                                    value = str(v)
-                                    
-                                metadata[key] = value
-                            
-                            print(f"Metadata extracted: {metadata}")
-                            return MetadataResponse(
-                                success=True,
-                                message="Metadata found",
-                                metadata=metadata,
-                                version=datum.version
-                            )
+        # Find reference token UTxO (datum + metadata dict lấy từ datum cache khi đưa vào chỉ mục)
+        with background():
+            ref_entry = await _find_reference(token_name.encode('utf-8'))
+        if ref_entry and ref_entry.decoded is not None:
+            ref_input = ref_entry.utxo.input
+            etag = f'"{ref_input.transaction_id}#{ref_input.index}-v{ref_entry.datum.version}"'
+            if _etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+            response.headers["ETag"] = etag
+            return MetadataResponse(
+                success=True,
+                message="Metadata found",
+                metadata=ref_entry.metadata,
+                version=ref_entry.datum.version
+            )
         
-        print(f"❌ NFT not found")
         return MetadataResponse(
             success=False,
             message="NFT not found"
@@ -799,51 +948,200 @@ async def get_metadata(token_name: str):
             message=f"Error fetching metadata: {str(e)}"
         )
 
+# Endpoint lấy metadata của nhiều token trong một request
+@app.post("/api/metadata/batch", response_model=MetadataBatchResponse)
+async def get_metadata_batch(request: MetadataBatchRequest):
+    """
+    Lấy metadata hiện tại của nhiều CIP-68 NFT cùng lúc.
+
+    Mọi tên được tra trong cùng một chỉ mục (ref_index, hoặc một lần đọc
+    store address nếu chỉ mục chưa sẵn sàng) thay vì N request đơn lẻ.
+    Kết quả giữ thứ tự của `token_names`; token không có thì found=False.
+    """
+    try:
+        if not store_address:
+            raise HTTPException(status_code=500, detail="Store address not initialized")
+
+        with background():
+            index = await _reference_index()
+        names = [name.encode('utf-8') for name in request.token_names]
+        entries = {entry.token_name: entry for entry in index.get_many(set(names))}
+
+        results = []
+        for token_name, name in zip(request.token_names, names):
+            entry = entries.get(name)
+            if entry is None or entry.decoded is None:
+                results.append(MetadataBatchItem(token_name=token_name, found=False))
+            else:
+                results.append(MetadataBatchItem(
+                    token_name=token_name,
+                    found=True,
+                    metadata=entry.metadata,
+                    version=entry.datum.version,
+                ))
+        found = sum(1 for item in results if item.found)
+        return MetadataBatchResponse(
+            success=True,
+            message=f"Found {found}/{len(results)} tokens",
+            results=results,
+            found=found,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        return MetadataBatchResponse(
+            success=False,
+            message=f"Error fetching metadata: {str(e)}"
+        )
+
+# Endpoint stream thay đổi metadata (server-sent events)
+# Khoảng thời gian gửi comment keep-alive khi không có event (giây)
+EVENT_KEEPALIVE = 15.0
+
+@app.get("/api/events")
+async def stream_events(
+    tokens: Optional[str] = Query(None, description="Tên token, phân cách bởi dấu phẩy"),
+    owners: Optional[str] = Query(None, description="Owner payment key hash (hex), phân cách bởi dấu phẩy"),
+):
+    """
+    Server-sent events khi reference token được mint, cập nhật metadata hoặc burn.
+
+    Thay cho việc polling /api/metadata: mọi client dùng chung event từ
+    chain follower, nên số request lên Blockfrost không đổi theo số client.
+    Không truyền `tokens`/`owners` thì nhận mọi event. Event `resync` nghĩa
+    là client đọc không kịp và cần tải lại trạng thái rồi kết nối lại.
+    """
+    if event_hub is None:
+        raise HTTPException(status_code=503, detail="Event stream not available")
+    try:
+        names = [name.encode('utf-8') for name in tokens.split(',') if name] if tokens else []
+        owner_pkhs = [bytes.fromhex(pkh) for pkh in owners.split(',') if pkh] if owners else []
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid owner")
+    try:
+        subscription = event_hub.subscribe(names, owner_pkhs)
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                event = await subscription.next(timeout=EVENT_KEEPALIVE)
+                if subscription.overflowed:
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event.kind}\ndata: {json.dumps(_event_payload(event))}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+def _event_payload(event: ReferenceEvent) -> Dict[str, Any]:
+    entry = event.entry or event.previous
+    datum = entry.datum
+    payload = {
+        "type": event.kind,
+        "token_name": event.token_name.decode('utf-8', errors='replace'),
+        "policy_id": str(policy_id),
+        "owner": datum.owner.hex() if datum else None,
+        "previous_version": event.previous.datum.version if event.previous and event.previous.datum else None,
+        "version": None,
+        "metadata": None,
+        "utxo": None,
+    }
+    if event.entry is not None:
+        ref_input = event.entry.utxo.input
+        payload["utxo"] = f"{ref_input.transaction_id}#{ref_input.index}"
+        if event.entry.datum is not None:
+            payload["version"] = event.entry.datum.version
+            payload["metadata"] = event.entry.metadata
+    return payload
+
 # Endpoint liệt kê tất cả CIP-68 tokens
 @app.get("/api/tokens")
-async def list_all_tokens():
+async def list_all_tokens(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="next_cursor của trang trước"),
+    limit: int = Query(50, ge=1, le=500),
+    owner: Optional[str] = Query(None, description="Owner payment key hash (hex)"),
+    prefix: str = Query("", description="Tiền tố tên token"),
+    min_version: int = Query(0, ge=0),
+    if_none_match: Optional[str] = Header(None),
+):
     """
-    List all CIP-68 tokens.
+    Liệt kê CIP-68 token theo trang, sắp xếp theo tên token.
+
+    Lọc owner / prefix / min_version phía server và đọc từ ref_index, nên
+    thời gian một trang tỉ lệ với `limit` thay vì tổng số token.
+    Trang tiếp theo: gọi lại với `cursor=next_cursor` (None = hết).
+
+    ETag = revision của ref_index + tham số truy vấn: khi chỉ mục chưa đổi,
+    If-None-Match được trả 304 mà không dựng trang.
     """
     try:
         if not store_address:
             raise HTTPException(status_code=500, detail="Store address not initialized")
+        try:
+            after = _decode_cursor(cursor) if cursor else None
+            owner_pkh = bytes.fromhex(owner) if owner else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor or owner")
+
+        etag = None
+        if ref_index is not None and ref_index.ready:
+            query = f"{cursor}|{limit}|{owner}|{prefix}|{min_version}".encode('utf-8')
+            etag = f'"{ref_index.revision()}-{hashlib.blake2b(query, digest_size=8).hexdigest()}"'
+            if _etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+
+        with background():
+            index = await _reference_index()
+        entries, next_name = index.page(
+            after=after,
+            limit=limit,
+            owner=owner_pkh,
+            prefix=prefix.encode('utf-8'),
+            min_version=min_version,
+        )
+
         tokens = []
-        utxos = chain_context.utxos(store_address)
-        # Scan UTxOs for CIP-68 reference tokens
-        for utxo in utxos:
-            if utxo.output.amount.multi_asset:
-                for pid, assets in utxo.output.amount.multi_asset.items():
-                    if pid == policy_id:
-                        for asset_name in assets.keys():
-                            # Check if it's a reference token
-                            if asset_name.payload.startswith(CIP68_REFERENCE_PREFIX):
-                                token_name = asset_name.payload[4:].decode('utf-8')
-                                datum = utxo.output.datum
-                                
-                                token_info = {
-                                    'token_name': token_name,
-                                    'policy_id': policy_id,
-                                }
-                                
-                                if isinstance(datum, CIP68Datum):
-                                    token_info['owner'] = datum.owner.hex()
-                                    token_info['version'] = datum.version
-                                
-                                tokens.append(token_info)
-        
+        for entry in entries:
+            datum = entry.datum
+            tokens.append({
+                'token_name': entry.token_name.decode('utf-8', errors='replace'),
+                'policy_id': str(policy_id),
+                'owner': datum.owner.hex() if datum else None,
+                'version': datum.version if datum else None,
+                'metadata': entry.metadata,
+            })
+
+        if etag is not None:
+            response.headers["ETag"] = etag
         return {
             "success": True,
             "tokens": tokens,
-            "count": len(tokens)
+            "count": len(tokens),
+            "next_cursor": _encode_cursor(next_name) if next_name is not None else None,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "success": False,
             "message": f"Error listing tokens: {str(e)}",
             "tokens": []
         }
+# Cursor phân trang: base64url (không padding) của tên token cuối trang trước
+def _encode_cursor(token_name: bytes) -> str:
+    return base64.urlsafe_b64encode(token_name).decode('ascii').rstrip('=')
+def _decode_cursor(cursor: str) -> bytes:
+    # binascii.Error là ValueError: cursor hỏng được báo 400 ở endpoint
+    return base64.b64decode(cursor + '=' * (-len(cursor) % 4), altchars=b'-_', validate=True)
 # RUN SERVER
 # ============================================================================
 
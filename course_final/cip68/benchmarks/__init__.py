@@ -0,0 +1,8 @@
+"""
+CIP-68 Benchmarks
+=================
+Các script đo hiệu năng backend/offchain, chạy offline (không cần Blockfrost).
+
+Chạy từ thư mục course_final/cip68:
+    python -m benchmarks.bench_async_context
+"""
@@ -0,0 +1,96 @@
+"""
+Benchmark: blocking chain context vs. async chain context
+=========================================================
+Bắn N request đồng thời vào /api/tokens và /api/metadata/{token_name}
+của backend thật (qua ASGI, không cần server) với Blockfrost giả có độ trễ cố định.
+
+- before: handler `async def` gọi context sync (time.sleep) -> chặn event loop
+- after:  handler `await` AsyncBlockFrostChainContext (httpx) -> chạy song song
+
+Chạy:
+    python -m benchmarks.bench_async_context [--requests 50] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+
+import httpx
+
+from benchmarks.common import Timer, load_backend, make_store_items, token_name_at
+from chain.async_context import AsyncBlockFrostChainContext, utxo_from_json
+
+
+class BlockingContext:
+    """Mô phỏng code cũ: gọi Blockfrost sync (blocking) ngay trong handler async."""
+
+    def __init__(self, address: str, items: list, latency: float):
+        self._utxos = [utxo_from_json(address, item) for item in items]
+        self._latency = latency
+
+    async def utxos(self, address):
+        time.sleep(self._latency)
+        return list(self._utxos)
+
+
+def make_async_context(items: list, latency: float) -> AsyncBlockFrostChainContext:
+    """AsyncBlockFrostChainContext với transport giả trả về store UTxOs sau `latency` giây."""
+    payload = json.dumps(items).encode()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        if request.url.params.get("page", "1") != "1":
+            return httpx.Response(200, content=b"[]")
+        return httpx.Response(200, content=payload)
+
+    return AsyncBlockFrostChainContext(
+        project_id="bench",
+        base_url="https://bench.local/api",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+async def fire(main, n_requests: int) -> float:
+    """Gửi n_requests đồng thời (xen kẽ tokens/metadata), trả về số request/giây."""
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        paths = [
+            "/api/tokens" if i % 2 == 0 else f"/api/metadata/{token_name_at(i % 10)}"
+            for i in range(n_requests)
+        ]
+        # Bỏ log debug của endpoint để chỉ đo phần xử lý request
+        with Timer() as t, contextlib.redirect_stdout(io.StringIO()):
+            responses = await asyncio.gather(*(client.get(p) for p in paths))
+    assert all(r.status_code == 200 for r in responses)
+    return n_requests / t.elapsed
+
+
+async def run(n_requests: int, latency: float, store_size: int):
+    main = load_backend()
+    items = make_store_items(main.policy_id, store_size)
+
+    main.async_context = BlockingContext(str(main.store_address), items, latency)
+    before = await fire(main, n_requests)
+
+    main.async_context = make_async_context(items, latency)
+    after = await fire(main, n_requests)
+    await main.async_context.aclose()
+
+    print(f"Requests đồng thời: {n_requests} | độ trễ Blockfrost: {latency * 1000:.0f} ms | store: {store_size} UTxO")
+    print(f"before (blocking): {before:8.1f} req/s")
+    print(f"after  (async):    {after:8.1f} req/s  (x{after / before:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--store-size", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.latency_ms / 1000, args.store_size))
+
+
+if __name__ == "__main__":
+    main()
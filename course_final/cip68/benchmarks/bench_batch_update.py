@@ -0,0 +1,161 @@
+"""
+Benchmark: batch update (nhiều reference token mỗi tx) vs update từng token
+===========================================================================
+Tạo `--items` reference token tại store address trên OfflineLedgerContext
+(ex-units evaluate local nếu có `uplc`), rồi update metadata của tất cả, mỗi
+transaction được ký và submit vào ledger.
+
+- single: CIP68TxTemplates.update, một reference token mỗi tx (như /api/update),
+          đo trên `--single` token rồi ngoại suy
+- batch:  CIP68BatchUpdater (update_metadata_batch / /api/update/batch)
+
+Store validator tìm input / output của chính nó trong toàn bộ tx nên chi phí
+mỗi redeemer tăng theo số token trong tx: giới hạn thường là tổng ex-units
+chứ không phải max_tx_size. Cuối cùng kiểm tra batch có token của ví khác
+bị từ chối trước khi build.
+
+Headline: số transaction (số lần ký + chờ block), fee mỗi token và số token
+build + ký mỗi phút. Với evaluate local, thời gian build batch chủ yếu là
+evaluate các redeemer (tăng bậc hai theo số token mỗi tx); với Blockfrost
+mỗi tx chỉ tốn một lần gọi evaluate.
+
+Chạy:
+    python -m benchmarks.bench_batch_update [--items 200] [--single 20] [--reference-scripts]
+"""
+import argparse
+import contextlib
+import io
+
+from pycardano import (
+    Address,
+    Asset,
+    MultiAsset,
+    Network,
+    PaymentSigningKey,
+    Transaction,
+    Value,
+    VerificationKeyWitness,
+)
+
+from benchmarks.common import Timer, load_backend, token_name_at
+from chain.local_evaluator import LocalEvaluationChainContext
+from chain.offline_ledger import OfflineLedgerContext
+from offchain.cip68_batch import CIP68BatchUpdater
+from offchain.cip68_reference_scripts import deploy_reference_scripts
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import create_cip68_asset_names, create_cip68_datum, decode_cip68_datum
+
+
+def _sign(tx: Transaction, skey: PaymentSigningKey) -> Transaction:
+    tx.transaction_witness_set.vkey_witnesses = [
+        VerificationKeyWitness(skey.to_verification_key(), skey.sign(tx.transaction_body.hash()))
+    ]
+    return tx
+
+
+def run(n_items: int, n_single: int, use_reference_scripts: bool):
+    main = load_backend()
+    ledger = OfflineLedgerContext()
+    context = LocalEvaluationChainContext(ledger)
+    skey = PaymentSigningKey.generate()
+    owner_address = Address(skey.to_verification_key().hash(), network=Network.TESTNET)
+    owner_pkh = owner_address.payment_part.to_primitive()
+    for _ in range(4):
+        ledger.fund(owner_address, 1_000_000_000)
+
+    def datum_for(name: bytes, version: int, owner: bytes = owner_pkh):
+        return create_cip68_datum(bytes(main.policy_id), name, owner, f"{name.decode()} v{version}", version=version)
+
+    # Reference token đã mint sẵn tại store address (version 1)
+    names = [token_name_at(i).encode('utf-8') for i in range(n_single + n_items)]
+    for name in names:
+        ref_asset_name, _ = create_cip68_asset_names(name)
+        ledger.fund(
+            main.store_address,
+            Value(2_000_000, MultiAsset({main.policy_id: Asset({ref_asset_name: 1})})),
+            datum=datum_for(name, 1),
+        )
+
+    def ref_utxo(name: bytes):
+        return ledger.utxo_for_asset(main.policy_id, create_cip68_asset_names(name)[0])
+
+    reference_scripts = None
+    if use_reference_scripts:
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference_scripts = deploy_reference_scripts(
+                ledger, skey, owner_address, main.mint_script, main.store_script
+            )
+    templates = CIP68TxTemplates(main.mint_script, main.store_script, Network.TESTNET, reference_scripts)
+
+    # Single: một tx mỗi token
+    with Timer() as single, contextlib.redirect_stdout(io.StringIO()):
+        single_fee = 0
+        for name in names[:n_single]:
+            builder = templates.update(context, owner_address, ref_utxo(name), name, datum_for(name, 2))
+            tx = _sign(Transaction(builder.build(change_address=owner_address), builder.build_witness_set()), skey)
+            ledger.submit_tx_cbor(tx.to_cbor())
+            single_fee += tx.transaction_body.fee
+    single_rate = n_single / single.elapsed * 60
+
+    # Batch
+    updater = CIP68BatchUpdater(templates)
+    txs = []
+
+    def progress(done, total, batch_tx):
+        print(f"  {done:>6}/{total} token | tx #{len(txs) + 1}: {len(batch_tx.token_names)} token, "
+              f"{batch_tx.size} B, ex-units {batch_tx.ex_units.mem} mem / {batch_tx.ex_units.steps} steps"
+              f"{' (nối tiếp)' if batch_tx.chained else ''}")
+
+    print(f"Batch update {n_items} token (reference scripts: {'có' if reference_scripts else 'không'})")
+    with Timer() as batch:
+        items = [(ref_utxo(name), name, datum_for(name, 2)) for name in names[n_single:]]
+        for batch_tx in updater.plan(context, owner_address, items, progress=progress):
+            ledger.submit_tx_cbor(_sign(batch_tx.tx, skey).to_cbor())
+            txs.append(batch_tx)
+    batch_rate = n_items / batch.elapsed * 60
+    batch_fee = sum(tx.fee for tx in txs)
+
+    updated = sum(1 for name in names if decode_cip68_datum(ref_utxo(name).output.datum).version == 2)
+    assert updated == len(names), updated
+    params = ledger.protocol_param
+    print()
+    print(f"{'mode':>7} {'tx':>6} {'token/tx':>9} {'token/min':>10} {'fee/token ADA':>14}")
+    print(f"{'single':>7} {n_items:>6} {1:>9} {single_rate:10.0f} {single_fee / n_single / 1_000_000:14.4f}")
+    print(f"{'batch':>7} {len(txs):>6} {n_items / len(txs):9.1f} {batch_rate:10.0f} "
+          f"{batch_fee / n_items / 1_000_000:14.4f}")
+    print(f"speedup {batch_rate / single_rate:.1f}x | builds {updater.stats()} | local evaluate {context.local_eval_stats()}")
+    print(f"tx lớn nhất: {max(tx.size for tx in txs)} / {params.max_tx_size} B, "
+          f"{max(tx.ex_units.mem for tx in txs)} / {params.max_tx_ex_mem} mem, "
+          f"{max(tx.ex_units.steps for tx in txs)} / {params.max_tx_ex_steps} steps")
+
+    # Token của ví khác trong batch: bị từ chối trước khi build
+    stranger = PaymentSigningKey.generate().to_verification_key().hash().to_primitive()
+    foreign = b"ForeignNFT"
+    ledger.fund(
+        main.store_address,
+        Value(2_000_000, MultiAsset({main.policy_id: Asset({create_cip68_asset_names(foreign)[0]: 1})})),
+        datum=datum_for(foreign, 1, owner=stranger),
+    )
+    builds = updater.builds
+    try:
+        list(updater.plan(context, owner_address, [
+            (ref_utxo(names[0]), names[0], datum_for(names[0], 3)),
+            (ref_utxo(foreign), foreign, datum_for(foreign, 2, owner=stranger)),
+        ]))
+        raise AssertionError("batch có token của ví khác không bị từ chối")
+    except ValueError as e:
+        assert updater.builds == builds
+        print(f"Ownership: {' '.join(str(e).split())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--single", type=int, default=20)
+    parser.add_argument("--reference-scripts", action="store_true")
+    args = parser.parse_args()
+    run(args.items, args.single, args.reference_scripts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: polling có và không có If-None-Match
+===============================================
+Client polling /api/metadata/{token_name} và /api/tokens khi không có gì thay đổi:
+
+- full: request thường -> backend dựng và serialize lại toàn bộ response (200)
+- 304:  gửi lại ETag qua If-None-Match -> backend trả 304 không body
+
+Chạy:
+    python -m benchmarks.bench_conditional_get [--polls 2000] [--store-size 1000] [--limit 200]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+
+import httpx
+
+from benchmarks.common import Timer, load_backend, make_store_items, token_name_at
+from chain.async_context import utxo_from_json
+from offchain.cip68_index import ReferenceTokenIndex
+
+
+async def poll(client: httpx.AsyncClient, path: str, n_polls: int, conditional: bool):
+    etag = (await client.get(path)).headers["ETag"]
+    headers = {"If-None-Match": etag} if conditional else {}
+    expected = 304 if conditional else 200
+    received = 0
+    with Timer() as t:
+        for _ in range(n_polls):
+            response = await client.get(path, headers=headers)
+            assert response.status_code == expected
+            received += len(response.content)
+    return t.elapsed / n_polls, received / n_polls
+
+
+async def run(n_polls: int, store_size: int, limit: int):
+    main = load_backend()
+    index = ReferenceTokenIndex(main.policy_id, main.store_address)
+    items = make_store_items(main.policy_id, store_size)
+    index.load(utxo_from_json(main.store_address, item) for item in items)
+    main.ref_index = index
+
+    paths = [f"/api/metadata/{token_name_at(0)}", f"/api/tokens?limit={limit}"]
+    transport = httpx.ASGITransport(app=main.app)
+    print(f"Polls: {n_polls} | store: {store_size} UTxO | /api/tokens limit={limit}")
+    print(f"{'endpoint':>28} {'full µs':>9} {'304 µs':>9} {'speedup':>8} {'full B':>8} {'304 B':>6}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in paths:
+            # Bỏ log debug của endpoint để chỉ đo phần xử lý request
+            with contextlib.redirect_stdout(io.StringIO()):
+                full, full_bytes = await poll(client, path, n_polls, conditional=False)
+                cond, cond_bytes = await poll(client, path, n_polls, conditional=True)
+            print(f"{path:>28} {full * 1e6:9.0f} {cond * 1e6:9.0f} {full / cond:7.1f}x {full_bytes:8.0f} {cond_bytes:6.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--polls", type=int, default=2000)
+    parser.add_argument("--store-size", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.polls, args.store_size, args.limit))
+
+
+if __name__ == "__main__":
+    main()
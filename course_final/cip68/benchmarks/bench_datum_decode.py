@@ -0,0 +1,65 @@
+"""
+Benchmark: giải mã CIP68Datum
+=============================
+So sánh trên cùng một inline datum (CBOR):
+
+- dataclass: CIP68Datum.from_cbor + metadata_to_dict (đường tổng quát cũ)
+- view:      CIP68DatumView.parse + to_datum + metadata_dict (giải mã đủ như datum cache)
+- version:   CIP68DatumView.parse + chỉ đọc version (field lười)
+
+Chạy:
+    python -m benchmarks.bench_datum_decode [--iterations 20000] [--fields 2 10 50]
+"""
+import argparse
+
+from benchmarks.common import OWNER_PKH, Timer
+from offchain.cip68_datum_cache import metadata_to_dict
+from offchain.cip68_datum_view import CIP68DatumView
+from offchain.cip68_utils import CIP68Datum
+
+
+def make_cbor(n_fields: int) -> bytes:
+    metadata = {b"name": b"BenchNFT_000001", b"description": b"Benchmark token #1"}
+    for i in range(n_fields - len(metadata)):
+        metadata[f"attr_{i}".encode()] = f"value {i}".encode()
+    return CIP68Datum(bytes(28), b"BenchNFT_000001", OWNER_PKH, metadata, 3).to_cbor()
+
+
+def run(iterations: int, field_counts):
+    print(f"Iterations: {iterations}")
+    print(f"{'fields':>7} {'bytes':>6} {'dataclass µs':>13} {'view µs':>8} {'version µs':>11} {'speedup':>8}")
+    for n_fields in field_counts:
+        cbor = make_cbor(max(n_fields, 2))
+        expected = CIP68Datum.from_cbor(cbor)
+        view = CIP68DatumView.parse(cbor)
+        assert view.to_datum() == expected and view.metadata_dict() == metadata_to_dict(expected)
+
+        with Timer() as dataclass_path:
+            for _ in range(iterations):
+                datum = CIP68Datum.from_cbor(cbor)
+                metadata_to_dict(datum)
+        with Timer() as view_path:
+            for _ in range(iterations):
+                view = CIP68DatumView.parse(cbor)
+                view.to_datum()
+                view.metadata_dict()
+        with Timer() as version_path:
+            for _ in range(iterations):
+                CIP68DatumView.parse(cbor).version
+
+        slow = dataclass_path.elapsed / iterations * 1e6
+        fast = view_path.elapsed / iterations * 1e6
+        lazy = version_path.elapsed / iterations * 1e6
+        print(f"{n_fields:7d} {len(cbor):6d} {slow:13.1f} {fast:8.1f} {lazy:11.1f} {slow / fast:7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--fields", type=int, nargs="+", default=[2, 10, 50])
+    args = parser.parse_args()
+    run(args.iterations, args.fields)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: build transaction mint / update có và không có cache ex-units
+=======================================================================
+Build như /api/mint và /api/update (CIP68TxTemplates) trên OfflineLedgerContext;
+evaluate_tx được làm chậm thêm `--latency` ms để mô phỏng round trip
+/utils/txs/evaluate của Blockfrost.
+
+- remote: mỗi build gọi evaluate (như trước khi có cache)
+- cached: ExUnitsCacheChainContext, chỉ evaluate khi gặp cấu trúc tx mới
+
+Chạy:
+    python -m benchmarks.bench_exunits_cache [--builds 20] [--latency 150] [--margin 0.1]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from pycardano import Address, Asset, MultiAsset, Network, PaymentSigningKey, Value
+
+from benchmarks.common import Timer, load_backend, token_name_at
+from chain.base import ChainContextWrapper
+from chain.exunits_cache import ExUnitsCache, ExUnitsCacheChainContext
+from chain.offline_ledger import OfflineLedgerContext
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import create_cip68_asset_names, create_cip68_datum
+
+
+class _SlowEvaluate(ChainContextWrapper):
+    """Thêm độ trễ cố định cho evaluate (giả lập Blockfrost) và đếm số lần gọi."""
+
+    def __init__(self, inner, latency: float):
+        super().__init__(inner)
+        self.latency = latency
+        self.calls = 0
+
+    def evaluate_tx_cbor(self, cbor):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._inner.evaluate_tx_cbor(cbor)
+
+
+def run(n_builds: int, latency_ms: float, margin: float):
+    main = load_backend()
+    templates = CIP68TxTemplates(main.mint_script, main.store_script, Network.TESTNET)
+    ledger = OfflineLedgerContext()
+    skey = PaymentSigningKey.generate()
+    owner_address = Address(skey.to_verification_key().hash(), network=Network.TESTNET)
+    owner_pkh = owner_address.payment_part.to_primitive()
+    for _ in range(10):
+        ledger.fund(owner_address, 50_000_000)
+
+    name = token_name_at(0).encode('utf-8')
+    ref_asset_name, _ = create_cip68_asset_names(name)
+    ledger.fund(
+        main.store_address,
+        Value(2_000_000, MultiAsset({main.policy_id: Asset({ref_asset_name: 1})})),
+        datum=create_cip68_datum(bytes(main.policy_id), name, owner_pkh, "v1", version=1),
+    )
+    ref_utxo = ledger.utxo_for_asset(main.policy_id, ref_asset_name)
+
+    def datum_for(i, version=1):
+        return create_cip68_datum(
+            bytes(main.policy_id), token_name_at(i).encode('utf-8'), owner_pkh, f"token {i}", version=version
+        )
+
+    cases = [
+        ("mint", lambda ctx, i: templates.mint(ctx, owner_address, token_name_at(i).encode(), datum_for(i))),
+        ("update", lambda ctx, i: templates.update(ctx, owner_address, ref_utxo, name, datum_for(0, i + 2))),
+    ]
+
+    print(f"Builds: {n_builds} | evaluate latency: {latency_ms:.0f} ms | margin: {margin}")
+    print(f"{'tx':>8} {'remote ms':>10} {'cached ms':>10} {'evaluates':>10} {'speedup':>8}  ex-units")
+    for label, make in cases:
+        results = {}
+        for mode in ("remote", "cached"):
+            slow = _SlowEvaluate(ledger, latency_ms / 1000)
+            context = slow
+            if mode == "cached":
+                context = ExUnitsCacheChainContext(slow, cache=ExUnitsCache(margin=margin))
+            # Bỏ log của pycardano để chỉ đo phần build
+            with Timer() as t, contextlib.redirect_stdout(io.StringIO()):
+                for i in range(n_builds):
+                    builder = make(context, i)
+                    builder.build(change_address=owner_address)
+                    [redeemer] = builder.build_witness_set().redeemer.values()
+            results[mode] = (t.elapsed / n_builds * 1000, slow.calls, redeemer.ex_units)
+        (remote_ms, remote_calls, remote_units), (cached_ms, cached_calls, cached_units) = (
+            results["remote"], results["cached"]
+        )
+        print(f"{label:>8} {remote_ms:10.1f} {cached_ms:10.1f} {f'{remote_calls}->{cached_calls}':>10} "
+              f"{remote_ms / cached_ms:7.2f}x  {remote_units.mem}->{cached_units.mem} mem")
+        assert cached_units.mem >= remote_units.mem and cached_units.steps >= remote_units.steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--builds", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=150)
+    parser.add_argument("--margin", type=float, default=0.1)
+    args = parser.parse_args()
+    run(args.builds, args.latency, args.margin)
+
+
+if __name__ == "__main__":
+    main()
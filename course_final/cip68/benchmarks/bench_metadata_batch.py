@@ -0,0 +1,81 @@
+"""
+Benchmark: N lần GET /api/metadata/{token_name} vs một POST /api/metadata/batch
+=============================================================================
+Trang gallery cần metadata của N token. So sánh:
+
+- single: N request GET riêng lẻ (mỗi request một lần tra reference token)
+- batch:  một request POST /api/metadata/batch với N tên
+
+Đo trong hai trạng thái của backend (qua ASGI, Blockfrost giả có độ trễ):
+- "no index": ref_index chưa sẵn sàng -> mỗi request đọc lại store address
+- "index":    ref_index đã nạp -> chỉ còn chi phí HTTP + tra dict
+
+Chạy:
+    python -m benchmarks.bench_metadata_batch [--tokens 100] [--store-size 1000] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+
+import httpx
+
+from benchmarks.bench_async_context import make_async_context
+from benchmarks.common import Timer, load_backend, make_store_items, token_name_at
+from chain.async_context import utxo_from_json
+from offchain.cip68_index import ReferenceTokenIndex
+
+
+async def single_calls(client: httpx.AsyncClient, names) -> float:
+    with Timer() as t:
+        responses = await asyncio.gather(*(client.get(f"/api/metadata/{name}") for name in names))
+    assert all(r.json()["success"] for r in responses)
+    return t.elapsed
+
+
+async def batch_call(client: httpx.AsyncClient, names) -> float:
+    with Timer() as t:
+        response = await client.post("/api/metadata/batch", json={"token_names": list(names)})
+    body = response.json()
+    assert body["success"] and body["found"] == len(names), body["message"]
+    return t.elapsed
+
+
+async def run(n_tokens: int, store_size: int, latency: float):
+    main = load_backend()
+    items = make_store_items(main.policy_id, store_size)
+    names = [token_name_at(i * store_size // n_tokens) for i in range(n_tokens)]
+
+    index = ReferenceTokenIndex(main.policy_id, main.store_address)
+    index.load(utxo_from_json(main.store_address, item) for item in items)
+
+    main.async_context = make_async_context(items, latency)
+    transport = httpx.ASGITransport(app=main.app)
+    print(f"Token/trang: {n_tokens} | store: {store_size} UTxO | độ trễ Blockfrost: {latency * 1000:.0f} ms")
+    print(f"{'backend':>10} {'single ms':>10} {'batch ms':>10} {'speedup':>9}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Bỏ log debug của endpoint để chỉ đo phần xử lý request
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = []
+            for label, ref_index in (("no index", None), ("index", index)):
+                main.ref_index = ref_index
+                single = await single_calls(client, names)
+                batch = await batch_call(client, names)
+                rows.append((label, single, batch))
+    await main.async_context.aclose()
+
+    for label, single, batch in rows:
+        print(f"{label:>10} {single * 1000:10.1f} {batch * 1000:10.1f} {single / batch:8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--store-size", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.tokens, args.store_size, args.latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
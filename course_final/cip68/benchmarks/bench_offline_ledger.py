@@ -0,0 +1,71 @@
+"""
+Benchmark: CIP-68 mint / update / burn trên OfflineLedgerContext
+================================================================
+Chạy các hàm trong offchain/cip68_operations.py end-to-end (build, ký, submit)
+vào ledger trong bộ nhớ, không cần Blockfrost. Plutus script không được chạy:
+ledger trả ex-units cố định cho mỗi redeemer.
+
+Chạy:
+    python -m benchmarks.bench_offline_ledger [--tokens 20]
+"""
+import argparse
+import contextlib
+import io
+
+from pycardano import Address, Network, PaymentSigningKey
+
+from benchmarks.common import Timer, token_name_at
+from chain.offline_ledger import OfflineLedgerContext
+from offchain.cip68_operations import (
+    burn_cip68_token,
+    get_scripts,
+    list_all_tokens,
+    mint_cip68_token,
+    update_metadata,
+)
+
+
+def run(n_tokens: int):
+    ledger = OfflineLedgerContext()
+    payment_skey = PaymentSigningKey.generate()
+    payment_vkey = payment_skey.to_verification_key()
+    owner_address = Address(payment_vkey.hash(), network=Network.TESTNET)
+    for _ in range(n_tokens * 2):
+        ledger.fund(owner_address, 50_000_000)
+    _, _, policy_id, store_address = get_scripts()
+
+    names = [token_name_at(i) for i in range(n_tokens)]
+    steps = [
+        ("mint_cip68_token", lambda name: mint_cip68_token(
+            ledger, payment_skey, payment_vkey, owner_address, name, "benchmark")),
+        ("update_metadata", lambda name: update_metadata(
+            ledger, payment_skey, payment_vkey, owner_address, name, "updated")),
+        ("burn_cip68_token", lambda name: burn_cip68_token(
+            ledger, payment_skey, payment_vkey, owner_address, name)),
+    ]
+
+    print(f"{'thao tác':20} {'tx/s':>8} {'ms/tx':>8}")
+    for label, op in steps:
+        # Bỏ log debug của các hàm offchain để chỉ đo phần build/submit
+        with Timer() as t, contextlib.redirect_stdout(io.StringIO()):
+            for name in names:
+                op(name)
+        print(f"{label:20} {n_tokens / t.elapsed:8.1f} {t.elapsed / n_tokens * 1000:8.2f}")
+
+        if label == "update_metadata":
+            with contextlib.redirect_stdout(io.StringIO()):
+                tokens = list_all_tokens(ledger, str(owner_address), store_address, policy_id=policy_id)
+            assert len(tokens) == n_tokens and all(t["version"] == 2 for t in tokens)
+
+    print(f"ledger: {ledger.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=20)
+    args = parser.parse_args()
+    run(args.tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: tra cứu reference token theo tên
+===========================================
+So sánh cách cũ (quét toàn bộ UTxO của store address rồi giải mã datum)
+với ReferenceTokenIndex (một lần tra dict, datum đã giải mã sẵn) khi số
+UTxO tại store address tăng dần. Dữ liệu giả, không cần Blockfrost.
+
+Chạy:
+    python -m benchmarks.bench_reference_index [--sizes 100 1000 10000] [--lookups 200]
+"""
+import argparse
+import random
+
+from pycardano import AssetName, RawCBOR
+
+from benchmarks.common import Timer, load_backend, make_store_items, token_name_at
+from chain.async_context import utxo_from_json
+from offchain.cip68_index import ReferenceTokenIndex
+from offchain.cip68_utils import CIP68_REFERENCE_PREFIX, CIP68Datum
+
+
+def linear_lookup(utxos, policy_id, token_name: str):
+    """Vòng lặp cũ của /api/metadata, /api/update, /api/burn."""
+    ref_asset_name = AssetName(CIP68_REFERENCE_PREFIX + token_name.encode('utf-8'))
+    for utxo in utxos:
+        if utxo.output.amount.multi_asset:
+            for pid, assets in utxo.output.amount.multi_asset.items():
+                if pid == policy_id and ref_asset_name in assets:
+                    datum = utxo.output.datum
+                    if isinstance(datum, RawCBOR):
+                        datum = CIP68Datum.from_cbor(datum.cbor)
+                    return utxo, datum
+    return None
+
+
+def run(sizes, n_lookups: int):
+    main = load_backend()
+    rng = random.Random(0)
+    print(f"{'utxos':>8} {'build ms':>10} {'scan µs/op':>12} {'index µs/op':>12} {'speedup':>9}")
+    for size in sizes:
+        items = make_store_items(main.policy_id, size)
+        utxos = [utxo_from_json(main.store_address, item) for item in items]
+        names = [token_name_at(rng.randrange(size)) for _ in range(n_lookups)]
+
+        with Timer() as build:
+            index = ReferenceTokenIndex(main.policy_id, main.store_address)
+            index.load(utxos)
+
+        # Cách cũ tốn O(n) mỗi lần: giới hạn số lần tra để benchmark không quá lâu
+        scan_names = names[:max(1, min(n_lookups, 200_000 // size))]
+        with Timer() as scan:
+            for name in scan_names:
+                assert linear_lookup(utxos, main.policy_id, name) is not None
+        with Timer() as lookup:
+            for name in names:
+                assert index.get(name).datum is not None
+
+        scan_us = scan.elapsed / len(scan_names) * 1e6
+        index_us = lookup.elapsed / len(names) * 1e6
+        print(f"{size:8d} {build.elapsed * 1000:10.1f} {scan_us:12.1f} {index_us:12.2f} {scan_us / index_us:8.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+    run(args.sizes, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
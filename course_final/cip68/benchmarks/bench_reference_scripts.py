@@ -0,0 +1,114 @@
+"""
+Benchmark: đính kèm script vs tham chiếu reference script
+=========================================================
+Build mint / update / burn như /api/mint, /api/update, /api/burn
+(CIP68TxTemplates) trên OfflineLedgerContext, ở hai chế độ:
+
+- inline:    mint/store script đính kèm trong witness set (như trước)
+- reference: script nằm trong UTxO reference script (deploy_reference_scripts),
+             tx chỉ có reference input
+
+So sánh kích thước tx (đã ký), fee và thời gian build. Ex-units được
+evaluate local nếu có `uplc` (PLUTUS_LOCAL_EVAL), nếu không thì dùng giá trị
+cố định của OfflineLedgerContext (như nhau cho cả hai chế độ).
+
+Chạy:
+    python -m benchmarks.bench_reference_scripts [--builds 10]
+"""
+import argparse
+import contextlib
+import io
+
+from pycardano import (
+    Address,
+    Asset,
+    MultiAsset,
+    Network,
+    PaymentSigningKey,
+    Transaction,
+    Value,
+    VerificationKeyWitness,
+)
+
+from benchmarks.common import Timer, load_backend
+from chain.local_evaluator import LocalEvaluationChainContext
+from chain.offline_ledger import OfflineLedgerContext
+from offchain.cip68_reference_scripts import deploy_reference_scripts
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import create_cip68_asset_names, create_cip68_datum
+
+
+def _signed(builder, skey, change_address) -> Transaction:
+    body = builder.build(change_address=change_address)
+    witness = builder.build_witness_set()
+    witness.vkey_witnesses = [VerificationKeyWitness(skey.to_verification_key(), skey.sign(body.hash()))]
+    return Transaction(body, witness)
+
+
+def run(n_builds: int):
+    main = load_backend()
+    ledger = OfflineLedgerContext()
+    context = LocalEvaluationChainContext(ledger)
+    skey = PaymentSigningKey.generate()
+    owner_address = Address(skey.to_verification_key().hash(), network=Network.TESTNET)
+    owner_pkh = owner_address.payment_part.to_primitive()
+    for _ in range(10):
+        ledger.fund(owner_address, 100_000_000)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        reference_scripts = deploy_reference_scripts(
+            ledger, skey, owner_address, main.mint_script, main.store_script
+        )
+    deposit = reference_scripts.mint.output.amount.coin + reference_scripts.store.output.amount.coin
+
+    # Reference token tại store address + user token trong ví, cho update / burn
+    name = b"BenchRefNFT"
+    ref_asset_name, user_asset_name = create_cip68_asset_names(name)
+    ledger.fund(
+        main.store_address,
+        Value(2_000_000, MultiAsset({main.policy_id: Asset({ref_asset_name: 1})})),
+        datum=create_cip68_datum(bytes(main.policy_id), name, owner_pkh, "v1", version=1),
+    )
+    ledger.fund(owner_address, Value(2_000_000, MultiAsset({main.policy_id: Asset({user_asset_name: 1})})))
+    ref_utxo = ledger.utxo_for_asset(main.policy_id, ref_asset_name)
+    user_utxo = ledger.utxo_for_asset(main.policy_id, user_asset_name)
+
+    def datum_for(token: bytes, version: int):
+        return create_cip68_datum(bytes(main.policy_id), token, owner_pkh, f"{token.decode()} v{version}", version=version)
+
+    cases = [
+        ("mint", lambda t, i: t.mint(context, owner_address, f"Bench{i:05d}".encode(), datum_for(f"Bench{i:05d}".encode(), 1))),
+        ("update", lambda t, i: t.update(context, owner_address, ref_utxo, name, datum_for(name, i + 2))),
+        ("burn", lambda t, i: t.burn(context, owner_address, ref_utxo, user_utxo, name)),
+    ]
+    modes = {
+        "inline": CIP68TxTemplates(main.mint_script, main.store_script, Network.TESTNET),
+        "reference": CIP68TxTemplates(main.mint_script, main.store_script, Network.TESTNET, reference_scripts),
+    }
+
+    print(f"Mint script: {len(main.mint_script)} bytes | store script: {len(main.store_script)} bytes "
+          f"| deposit reference script: {deposit / 1_000_000:.2f} ADA (một lần, lấy lại được)")
+    print(f"{'tx':>8} {'mode':>10} {'size B':>8} {'fee ADA':>9} {'build ms':>9}")
+    for label, make in cases:
+        results = {}
+        for mode, templates in modes.items():
+            with Timer() as t, contextlib.redirect_stdout(io.StringIO()):
+                for i in range(n_builds):
+                    tx = _signed(make(templates, i), skey, owner_address)
+            results[mode] = (len(tx.to_cbor()), tx.transaction_body.fee, t.elapsed / n_builds * 1000)
+            size, fee, ms = results[mode]
+            print(f"{label:>8} {mode:>10} {size:8d} {fee / 1_000_000:9.6f} {ms:9.1f}")
+        (inline_size, inline_fee, _), (ref_size, ref_fee, _) = results["inline"], results["reference"]
+        print(f"{'':>8} {'Δ':>10} {ref_size - inline_size:+8d} {(ref_fee - inline_fee) / 1_000_000:+9.6f}")
+    print(f"Local evaluate: {context.local_eval_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--builds", type=int, default=10)
+    args = parser.parse_args()
+    run(args.builds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: build transaction mint / update từ đầu vs qua CIP68TxTemplates
+========================================================================
+Đo thời gian CPU để dựng + build một unsigned transaction như /api/mint và
+/api/update, trên OfflineLedgerContext (không Blockfrost, ex-units cố định).
+
+- legacy:   dựng Asset/MultiAsset/Redeemer/datum dataclass ở mỗi request
+            (code cũ của backend)
+- template: CIP68TxTemplates dựng một lần; datum/redeemer dạng RawPlutusData
+
+Chạy:
+    python -m benchmarks.bench_tx_templates [--builds 30] [--wallet-utxos 20] [--rounds 3]
+"""
+import argparse
+import contextlib
+import io
+
+from pycardano import (
+    Address,
+    Asset,
+    MultiAsset,
+    Network,
+    PaymentSigningKey,
+    Redeemer,
+    TransactionBuilder,
+    TransactionOutput,
+    Value,
+)
+
+from benchmarks.common import Timer, load_backend, token_name_at
+from chain.offline_ledger import OfflineLedgerContext
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import MintToken, UpdateMetadata, create_cip68_asset_names, create_cip68_datum
+
+
+def legacy_mint(main, context, owner_address, token_name: bytes, datum) -> TransactionBuilder:
+    """Phần dựng builder của create_mint_transaction trước khi có template."""
+    ref_asset_name, user_asset_name = create_cip68_asset_names(token_name)
+    mint_asset = Asset()
+    mint_asset[ref_asset_name] = 1
+    mint_asset[user_asset_name] = 1
+    mint_assets = MultiAsset()
+    mint_assets[main.policy_id] = mint_asset
+    redeemer = Redeemer(MintToken(token_name=token_name))
+    ref_multi = MultiAsset()
+    ref_multi[main.policy_id] = Asset({ref_asset_name: 1})
+    user_multi = MultiAsset()
+    user_multi[main.policy_id] = Asset({user_asset_name: 1})
+
+    builder = TransactionBuilder(context)
+    builder.add_input_address(owner_address)
+    builder.mint = mint_assets
+    builder.add_minting_script(main.mint_script, redeemer=redeemer)
+    builder.add_output(TransactionOutput(main.store_address, Value(2_000_000, ref_multi), datum=datum))
+    builder.add_output(TransactionOutput(owner_address, Value(2_000_000, user_multi)))
+    builder.required_signers = [owner_address.payment_part]
+    return builder
+
+
+def legacy_update(main, context, owner_address, ref_utxo, token_name: bytes, datum) -> TransactionBuilder:
+    """Phần dựng builder của create_update_transaction trước khi có template."""
+    ref_asset_name, _ = create_cip68_asset_names(token_name)
+    builder = TransactionBuilder(context)
+    builder.add_input_address(owner_address)
+    builder.add_script_input(ref_utxo, main.store_script, redeemer=Redeemer(UpdateMetadata()))
+    ref_multi = MultiAsset()
+    ref_multi[main.policy_id] = Asset({ref_asset_name: 1})
+    builder.add_output(
+        TransactionOutput(main.store_address, Value(ref_utxo.output.amount.coin, ref_multi), datum=datum)
+    )
+    builder.required_signers = [owner_address.payment_part]
+    return builder
+
+
+def run(n_builds: int, wallet_utxos: int, rounds: int):
+    main = load_backend()
+    templates = CIP68TxTemplates(main.mint_script, main.store_script, Network.TESTNET)
+    ledger = OfflineLedgerContext()
+    skey = PaymentSigningKey.generate()
+    owner_address = Address(skey.to_verification_key().hash(), network=Network.TESTNET)
+    owner_pkh = owner_address.payment_part.to_primitive()
+    for _ in range(wallet_utxos):
+        ledger.fund(owner_address, 50_000_000)
+
+    # Một reference token có sẵn tại store address cho phần update
+    name = token_name_at(0).encode('utf-8')
+    ref_asset_name, _ = create_cip68_asset_names(name)
+    ledger.fund(
+        main.store_address,
+        Value(2_000_000, MultiAsset({main.policy_id: Asset({ref_asset_name: 1})})),
+        datum=create_cip68_datum(bytes(main.policy_id), name, owner_pkh, "v1", version=1),
+    )
+    ref_utxo = ledger.utxo_for_asset(main.policy_id, ref_asset_name)
+
+    def datum_for(i, version=1):
+        return create_cip68_datum(
+            bytes(main.policy_id), token_name_at(i).encode('utf-8'), owner_pkh, f"token {i}", version=version
+        )
+
+    cases = [
+        ("mint", lambda i: legacy_mint(main, ledger, owner_address, token_name_at(i).encode(), datum_for(i)),
+         lambda i: templates.mint(ledger, owner_address, token_name_at(i).encode(), datum_for(i))),
+        ("update", lambda i: legacy_update(main, ledger, owner_address, ref_utxo, name, datum_for(0, 2)),
+         lambda i: templates.update(ledger, owner_address, ref_utxo, name, datum_for(0, 2))),
+    ]
+
+    print(f"Builds: {n_builds} x {rounds} vòng | UTxO ví: {wallet_utxos}")
+    print(f"{'tx':>8} {'legacy ms':>10} {'template ms':>12} {'speedup':>8}")
+    for label, legacy, template in cases:
+        results = {"legacy": float("inf"), "template": float("inf")}
+        # Xen kẽ hai cách qua nhiều vòng, lấy vòng nhanh nhất để giảm nhiễu
+        for _ in range(rounds):
+            for mode, make in (("legacy", legacy), ("template", template)):
+                make(0).build(change_address=owner_address)  # warm-up
+                # Bỏ log của pycardano để chỉ đo phần build
+                with Timer() as t, contextlib.redirect_stdout(io.StringIO()):
+                    for i in range(n_builds):
+                        builder = make(i)
+                        builder.build(change_address=owner_address)
+                        builder.build_witness_set()
+                results[mode] = min(results[mode], t.elapsed / n_builds * 1000)
+        print(f"{label:>8} {results['legacy']:10.1f} {results['template']:12.1f} "
+              f"{results['legacy'] / results['template']:7.2f}x")
+    print(f"template: {templates.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--builds", type=int, default=30)
+    parser.add_argument("--wallet-utxos", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    run(args.builds, args.wallet_utxos, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Kiểm tra evaluator Plutus local (chain/local_evaluator.py) với Blockfrost
+=======================================================================
+So sánh ex-units của LocalPlutusEvaluator với Blockfrost /utils/txs/evaluate
+trên network thật (NETWORK, BLOCKFROST_PROJECT_ID, MNEMONIC trong .env). Tx mint
+(và update/burn nếu truyền --token của ví) được build nhưng KHÔNG ký, KHÔNG submit.
+
+Phần offline (mint → update → burn trên OfflineLedgerContext, evaluate_many,
+các đường evaluate remote) nằm trong tests/test_local_evaluator.py.
+
+Chạy:
+    python -m benchmarks.check_local_evaluator [--token MyNFT]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+from pycardano import Transaction
+
+from benchmarks.common import BLUEPRINT_PATH
+from chain.exunits_cache import ExUnitsCacheChainContext
+from chain.local_evaluator import (
+    LocalEvaluationChainContext,
+    LocalPlutusEvaluator,
+    slot_to_posix_ms,
+)
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import (
+    create_cip68_asset_names,
+    create_cip68_datum,
+    load_mint_script,
+    load_store_script,
+)
+
+
+def _build(builder, change_address) -> Transaction:
+    # Bỏ log của pycardano
+    with contextlib.redirect_stdout(io.StringIO()):
+        body = builder.build(change_address=change_address)
+        return Transaction(body, builder.build_witness_set())
+
+
+def _utxos(builder) -> list:
+    return list(builder.inputs) + [u for u in builder.reference_inputs if not isinstance(u, bytes)]
+
+
+def _remote_context(context):
+    """Bỏ các lớp cache / evaluator local để gọi thẳng Blockfrost evaluate."""
+    while isinstance(context, (ExUnitsCacheChainContext, LocalEvaluationChainContext)):
+        context = context.inner
+    return context
+
+
+def check_remote(token: str) -> bool:
+    from offchain.cip68_operations import get_chain_context, get_network, get_wallet_from_seed
+
+    network = get_network()
+    templates = CIP68TxTemplates(load_mint_script(BLUEPRINT_PATH), load_store_script(BLUEPRINT_PATH), network)
+    remote = _remote_context(get_chain_context())
+    context = LocalEvaluationChainContext(remote)
+    *_, address = get_wallet_from_seed(os.getenv("MNEMONIC"))
+    # Owner trong datum phải là payment key hash của ví (validator kiểm tra chữ ký)
+    owner_pkh = address.payment_part.to_primitive()
+    policy = bytes(templates.policy_id)
+
+    builders = []
+    probe = f"LocalEvalCheck{os.getpid()}".encode()
+    builders.append(("mint", templates.mint(
+        context, address, probe, create_cip68_datum(policy, probe, owner_pkh, "check", version=1)
+    )))
+    if token:
+        name = token.encode('utf-8')
+        ref_name, user_name = create_cip68_asset_names(name)
+        ref = context.utxo_for_asset(templates.policy_id, ref_name)
+        user = context.utxo_for_asset(templates.policy_id, user_name)
+        if ref is None or user is None:
+            print(f"❌ Không tìm thấy reference/user token của {token}")
+            return False
+        builders.append(("update", templates.update(
+            context, address, ref, name, create_cip68_datum(policy, name, owner_pkh, "check", version=2)
+        )))
+        builders.append(("burn", templates.burn(context, address, ref, user, name)))
+
+    evaluator = LocalPlutusEvaluator()
+    params = remote.protocol_param
+    ok = True
+    print(f"Remote cross-check ({network}):")
+    for label, builder in builders:
+        tx = _build(builder, address)
+        local = evaluator.evaluate(
+            tx, _utxos(builder), (params.cost_models or {}).get("PlutusV3"), slot_to_posix=slot_to_posix_ms(remote)
+        )
+        expected = remote.evaluate_tx(tx)
+        for key, units in expected.items():
+            mine = local.get(key)
+            match = mine is not None and (mine.mem, mine.steps) == (units.mem, units.steps)
+            ok &= match
+            print(f"  {'✅' if match else '❌'} {label:<7} {key:<7} remote={units} local={mine}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token", default="", help="Tên token của ví để kiểm tra thêm update/burn")
+    args = parser.parse_args()
+    ok = check_remote(args.token)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark helpers
+=================
+Dữ liệu giả (store UTxOs, datum CIP-68) và hàm nạp backend để đo offline.
+"""
+import os
+import sys
+import time
+
+# Thêm project root + backend vào sys.path giống run_backend.py
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'backend'))
+# Repo root (config/, chain/) đặt sau để `benchmarks` vẫn là package của cip68
+sys.path.append(os.path.dirname(os.path.dirname(PROJECT_ROOT)))
+
+from pycardano import Address, Network, VerificationKeyHash
+
+from offchain.cip68_utils import (
+    CIP68_REFERENCE_PREFIX,
+    create_cip68_datum,
+    get_policy_id,
+    get_script_address,
+    load_mint_script,
+    load_store_script,
+)
+
+BLUEPRINT_PATH = os.path.join(PROJECT_ROOT, 'cip68_dynamic_asset', 'plutus.json')
+
+# Owner giả cho dữ liệu benchmark
+OWNER_PKH = bytes(range(28))
+OWNER_ADDRESS = Address(VerificationKeyHash(OWNER_PKH), network=Network.TESTNET)
+
+
+def load_backend():
+    """
+    Import backend.main và gán scripts/policy/store address như lifespan
+    (không tạo chain context). Trả về module backend.main.
+    """
+    import backend.main as main
+
+    main.network = Network.TESTNET
+    main.mint_script = load_mint_script(BLUEPRINT_PATH)
+    main.store_script = load_store_script(BLUEPRINT_PATH)
+    main.policy_id = get_policy_id(main.mint_script)
+    main.store_address = get_script_address(main.store_script, Network.TESTNET)
+    return main
+
+
+def token_name_at(i: int) -> str:
+    return f"BenchNFT_{i:06d}"
+
+
+def make_store_items(policy_id, count: int, version: int = 1) -> list:
+    """
+    Sinh `count` phần tử JSON giống /addresses/{store}/utxos của Blockfrost,
+    mỗi phần tử giữ một reference token kèm inline datum CIP68Datum.
+    """
+    policy_hex = bytes(policy_id).hex()
+    items = []
+    for i in range(count):
+        name = token_name_at(i).encode('utf-8')
+        datum = create_cip68_datum(
+            policy_id=bytes(policy_id),
+            asset_name=name,
+            owner_pkh=OWNER_PKH,
+            metadata=f"Benchmark token #{i}",
+            version=version,
+        )
+        items.append({
+            "tx_hash": i.to_bytes(32, 'big').hex(),
+            "output_index": 0,
+            "amount": [
+                {"unit": "lovelace", "quantity": "2000000"},
+                {"unit": policy_hex + (CIP68_REFERENCE_PREFIX + name).hex(), "quantity": "1"},
+            ],
+            "data_hash": None,
+            "inline_datum": datum.to_cbor_hex(),
+            "reference_script_hash": None,
+        })
+    return items
+
+
+class Timer:
+    """Đo thời gian một khối lệnh: `with Timer() as t: ...; t.elapsed`."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,127 @@
+"""
+Record / replay demo_mint.py, demo_update.py, demo_burn.py
+==========================================================
+Ghi lại mọi request Blockfrost của ba demo một lần (cassette .json.gz trong
+benchmarks/cassettes/), sau đó phát lại offline để:
+
+- đo thời gian CPU của luồng build/ký (không lẫn độ trễ mạng),
+- bắt regression về số lời gọi upstream của mỗi luồng so với lúc ghi.
+
+SEED_PHRASE phải là ví đã dùng lúc ghi (địa chỉ nằm trong URL được ghi lại).
+Lúc replay không cần BLOCKFROST_PROJECT_ID.
+
+Chạy:
+    # Ghi lại (giao dịch thật trên testnet, cần BLOCKFROST_PROJECT_ID + SEED_PHRASE)
+    python -m benchmarks.replay_demos --record
+    # Phát lại offline (CI)
+    python -m benchmarks.replay_demos [--realtime] [--max-extra-calls 0]
+"""
+import argparse
+import contextlib
+import io
+import os
+import runpy
+import sys
+import tempfile
+import time
+
+from benchmarks.common import PROJECT_ROOT
+from chain.cassette import RECORD, REPLAY, Cassette
+from config.blockfrost import close_blockfrost_contexts, set_cassette
+
+CASSETTE_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', 'cassettes')
+
+# (demo, câu trả lời cho input()): chọn token đầu tiên trong danh sách
+DEMOS = [
+    ("demo_mint", ""),
+    ("demo_update", "1\n"),
+    ("demo_burn", "1\n"),
+]
+
+
+def cassette_path(demo: str) -> str:
+    return os.path.join(CASSETTE_DIR, f"{demo}.json.gz")
+
+
+def run_demo(demo: str, answers: str) -> dict:
+    """Chạy demo trong process hiện tại (cwd tạm, stdin giả), trả về thời gian + log."""
+    out, err = io.StringIO(), io.StringIO()
+    stdin = sys.stdin
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        sys.stdin = io.StringIO(answers)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                runpy.run_path(os.path.join(PROJECT_ROOT, f"{demo}.py"), run_name="__main__")
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            sys.stdin = stdin
+            os.chdir(cwd)
+    # Các demo tự bắt exception và in traceback ra stderr
+    return {"wall": wall, "cpu": cpu, "ok": "Traceback" not in err.getvalue(),
+            "log": out.getvalue() + err.getvalue()}
+
+
+def record():
+    os.makedirs(CASSETTE_DIR, exist_ok=True)
+    for demo, answers in DEMOS:
+        cassette = Cassette(cassette_path(demo), mode=RECORD)
+        cassette.meta = {"demo": demo, "stdin": answers, "recorded_at": int(time.time())}
+        set_cassette(cassette)
+        result = run_demo(demo, answers)
+        cassette.save()
+        close_blockfrost_contexts()
+        print(f"{demo:12} {'ok' if result['ok'] else 'LỖI':4} {cassette.stats()['total']:4d} lời gọi"
+              f" -> {os.path.relpath(cassette.path, PROJECT_ROOT)}")
+        if not result["ok"]:
+            print(result["log"])
+            return 1
+    return 0
+
+
+def replay(realtime: bool, max_extra_calls: int) -> int:
+    status = 0
+    print(f"{'demo':12} {'wall ms':>9} {'cpu ms':>9} {'calls':>6} {'recorded':>9}  kết quả")
+    for demo, _ in DEMOS:
+        path = cassette_path(demo)
+        if not os.path.exists(path):
+            print(f"{demo:12} chưa có cassette ({os.path.relpath(path, PROJECT_ROOT)}), chạy --record trước")
+            status = 1
+            continue
+        cassette = Cassette(path, mode=REPLAY, realtime=realtime)
+        set_cassette(cassette)
+        result = run_demo(demo, cassette.meta.get("stdin", ""))
+        close_blockfrost_contexts()
+
+        stats = cassette.stats()
+        regressed = stats["total"] > stats["recorded_total"] + max_extra_calls
+        verdict = "LỖI" if not result["ok"] else "REGRESSION" if regressed else "ok"
+        print(f"{demo:12} {result['wall'] * 1000:9.1f} {result['cpu'] * 1000:9.1f}"
+              f" {stats['total']:6d} {stats['recorded_total']:9d}  {verdict}")
+        if regressed:
+            for endpoint, count in sorted(stats["calls"].items()):
+                recorded = stats["recorded"].get(endpoint, 0)
+                if count != recorded:
+                    print(f"    {endpoint}: {recorded} -> {count}")
+        if verdict != "ok":
+            status = 1
+            if not result["ok"]:
+                print(result["log"])
+    set_cassette(None)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", action="store_true", help="Ghi cassette mới từ Blockfrost thật")
+    parser.add_argument("--realtime", action="store_true", help="Replay với latency gốc")
+    parser.add_argument("--max-extra-calls", type=int, default=0,
+                        help="Số lời gọi upstream được phép vượt so với lúc ghi")
+    args = parser.parse_args()
+    sys.exit(record() if args.record else replay(args.realtime, args.max_extra_calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,15 +10,18 @@ import json
 
 from dotenv import load_dotenv
 
+# Add project root to path (offchain/) và repo root (config/, chain/ dùng chung)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
 from offchain.cip68_operations import (
     get_chain_context,
     get_wallet_from_seed,
     mint_cip68_token,
 )
+from offchain.cip68_reference_scripts import load_reference_scripts
 
 load_dotenv()
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 def main():
     print("=" * 60)
@@ -62,6 +65,8 @@ def main():
             owner_address=address,
             token_name=token_name,
             description=description,
+            # Dùng reference script nếu đã chạy deploy_reference_scripts.py
+            reference_scripts=load_reference_scripts(context=context),
         )
         print("\n" + "=" * 60)
         print("MINT THÀNH CÔNG!")
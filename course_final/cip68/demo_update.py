@@ -10,8 +10,9 @@ import sys
 import time
 from dotenv import load_dotenv
 
-# Add project root to path
+# Add project root to path (offchain/) và repo root (config/, chain/ dùng chung)
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from offchain.cip68_operations import (
     get_chain_context,
@@ -20,6 +21,7 @@ from offchain.cip68_operations import (
     update_metadata,
     list_all_tokens,
 )
+from offchain.cip68_reference_scripts import load_reference_scripts
 
 load_dotenv()
 
@@ -46,7 +48,7 @@ def main():
 
     # List tokens owned by this address
     print("\nTìm tokens bạn sở hữu...")
-    tokens = list_all_tokens(context, address, store_address)
+    tokens = list_all_tokens(context, address, store_address, policy_id=policy_id)
 
     if not tokens:
         print("Không tìm thấy token nào! Hãy chạy demo_mint.py trước.")
@@ -84,6 +86,8 @@ def main():
             owner_address=address,
             token_name=token_name,
             new_description=new_description,
+            # Dùng reference script nếu đã chạy deploy_reference_scripts.py
+            reference_scripts=load_reference_scripts(context=context),
         )
         print("\n" + "=" * 60)
         print("UPDATE THÀNH CÔNG!")
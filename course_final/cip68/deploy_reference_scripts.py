@@ -0,0 +1,94 @@
+"""
+Deploy Reference Scripts
+========================
+Script chạy một lần: khoá mint script và store script vào 2 UTxO reference
+script, lưu thông tin vào reference_scripts.json (hoặc CIP68_REFERENCE_SCRIPTS).
+
+Sau đó demo_mint / demo_update / demo_burn và backend tự tham chiếu các UTxO
+này thay vì đính kèm script vào mỗi transaction.
+
+Chạy:
+    python deploy_reference_scripts.py [--lock-address addr_test1...] [--force]
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+from pycardano import Address
+
+# Add project root to path (offchain/) và repo root (config/, chain/ dùng chung)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from offchain.cip68_operations import (
+    get_chain_context,
+    get_scripts,
+    get_wallet_from_seed,
+)
+from offchain.cip68_reference_scripts import (
+    REFERENCE_SCRIPTS_FILE,
+    deploy_reference_scripts,
+    load_reference_scripts,
+)
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lock-address", help="Địa chỉ giữ reference script (mặc định: ví deploy)")
+    parser.add_argument("--force", action="store_true", help="Deploy lại dù đã có file deploy còn hợp lệ")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("DEPLOY: CIP-68 Reference Scripts")
+    print("=" * 60)
+    seed_phrase = os.getenv("SEED_PHRASE")
+    if not seed_phrase:
+        print("ERROR: SEED_PHRASE không tìm thấy trong .env")
+        return
+    payment_skey, payment_vkey, stake_skey, stake_vkey, address = get_wallet_from_seed(seed_phrase)
+    context = get_chain_context()
+    mint_script, store_script, policy_id, store_address = get_scripts()
+
+    if not args.force:
+        try:
+            existing = load_reference_scripts(context=context)
+        except ValueError as e:
+            print(f"{e}, deploy lại...")
+            existing = None
+        if existing is not None and existing.matches(mint_script, store_script):
+            print(f"Reference scripts đã được deploy ({REFERENCE_SCRIPTS_FILE}):")
+            print(f"  Mint:  {existing.mint.input}")
+            print(f"  Store: {existing.store.input}")
+            return
+
+    lock_address = Address.from_primitive(args.lock_address) if args.lock_address else address
+    print(f"\nWallet address: {address}")
+    print(f"Lock address:   {lock_address}")
+    print(f"Mint script:  {len(mint_script)} bytes")
+    print(f"Store script: {len(store_script)} bytes")
+    print("-" * 60)
+
+    try:
+        scripts = deploy_reference_scripts(
+            context, payment_skey, address, mint_script, store_script, lock_address=lock_address
+        )
+        scripts.save(REFERENCE_SCRIPTS_FILE)
+        print("\n" + "=" * 60)
+        print("DEPLOY THÀNH CÔNG!")
+        print(f"Mint reference:  {scripts.mint.input} ({scripts.mint.output.amount.coin / 1_000_000:.2f} ADA)")
+        print(f"Store reference: {scripts.store.input} ({scripts.store.output.amount.coin / 1_000_000:.2f} ADA)")
+        print(f"Saved to: {REFERENCE_SCRIPTS_FILE}")
+        print("=" * 60)
+        print(f"\nXem tại: https://preprod.cardanoscan.io/transaction/{scripts.mint.input.transaction_id}")
+        print("Đợi transaction được xác nhận trước khi mint / update / burn.")
+    except Exception as e:
+        print(f"\nLỗi: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
@@ -21,14 +21,30 @@ from .cip68_utils import (
     load_mint_script,
     load_store_script,
     extract_owner_from_datum,
+    decode_cip68_datum,
 )
+from .cip68_datum_view import CIP68DatumView
+from .cip68_datum_cache import DatumCache, DecodedDatum, datum_cache, decode_datum_cached, metadata_to_dict
+from .cip68_index import HolderIndex, ReferenceEvent, ReferenceTokenIndex
+from .cip68_events import ReferenceEventHub, Subscription
+from .cip68_reference_scripts import (
+    ReferenceScripts,
+    build_deploy_tx,
+    deploy_reference_scripts,
+    load_reference_scripts,
+)
+from .cip68_templates import CIP68TxTemplates
+from .cip68_batch import BatchTx, CIP68BatchUpdater
 from .cip68_operations import (
     get_chain_context,
+    get_async_chain_context,
+    find_asset_utxo,
     get_wallet_from_seed,
     get_network,
     get_scripts,
     mint_cip68_token,
     update_metadata,
+    update_metadata_batch,
     burn_cip68_token,
     list_all_tokens,
 )
@@ -52,13 +68,35 @@ __all__ = [
     'load_mint_script',
     'load_store_script',
     'extract_owner_from_datum',
+    'decode_cip68_datum',
+    'CIP68DatumView',
+    'DatumCache',
+    'DecodedDatum',
+    'datum_cache',
+    'decode_datum_cached',
+    'metadata_to_dict',
+    'ReferenceTokenIndex',
+    'HolderIndex',
+    'ReferenceEvent',
+    'ReferenceEventHub',
+    'Subscription',
+    'ReferenceScripts',
+    'build_deploy_tx',
+    'deploy_reference_scripts',
+    'load_reference_scripts',
+    'CIP68TxTemplates',
+    'BatchTx',
+    'CIP68BatchUpdater',
     # Operations
     'get_chain_context',
+    'get_async_chain_context',
+    'find_asset_utxo',
     'get_wallet_from_seed',
     'get_network',
     'get_scripts',
     'mint_cip68_token',
     'update_metadata',
+    'update_metadata_batch',
     'burn_cip68_token',
     'list_all_tokens',
 ]
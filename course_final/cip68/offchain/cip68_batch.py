@@ -0,0 +1,487 @@
+"""
+CIP-68 Batch Transactions
+=========================
+Update metadata của nhiều NFT bằng ít transaction nhất: mỗi transaction
+chứa nhiều reference token (CIP68TxTemplates.update_batch), số item được
+chọn để không vượt max_tx_size, max ex-units và min-ADA của từng output.
+
+Không có batch mint: minting policy cip68_mint chỉ kiểm tra cặp token có
+tên trong redeemer MintToken và chỉ chạy một lần cho mỗi policy trong tx,
+nên các cặp còn lại của một tx mint nhiều NFT không được kiểm tra on-chain.
+Store validator thì chạy cho từng UTxO reference token bị tiêu, nên batch update vẫn
+được kiểm tra đầy đủ.
+
+- Kích thước: ước lượng theo từng item (datum + tên token), build thật để
+  kiểm tra; vượt max_tx_size thì bớt item.
+- Ex-units: evaluate thật hai tx thử (1 và 2 item) để có mô hình tuyến tính
+  cho redeemer lớn nhất. Mỗi item một redeemer và chi phí mỗi redeemer tăng
+  theo số input/output (tổng tăng bậc hai), nên mỗi tx được evaluate thật và
+  kiểm tra tổng ex-units; chỉ tx nối tiếp mới dùng giá trị đặt sẵn.
+- Nối tiếp: tx sau không dùng lại input của tx trước và có thể tiêu output
+  change của tx trước (chưa lên chain), nên cả batch build được ngay và
+  submit theo thứ tự. Tx nối tiếp dùng ex-units đặt sẵn (Blockfrost không
+  evaluate được tx có input chưa lên chain); nếu có `uplc`, giá trị đặt sẵn
+  được kiểm tra bằng evaluator local trước khi trả tx (thiếu thì bớt item),
+  nếu không thì ghi log cảnh báo.
+"""
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from pycardano import (
+    Address,
+    ChainContext,
+    ExecutionUnits,
+    InsufficientUTxOBalanceException,
+    InvalidTransactionException,
+    PlutusData,
+    RedeemerMap,
+    Transaction,
+    TransactionBuilder,
+    TransactionInput,
+    UTxO,
+    UTxOSelectionException,
+)
+
+from chain.local_evaluator import LocalEvaluationUnsupported, LocalPlutusEvaluator, slot_to_posix_ms, uplc_eval
+from config.logging_config import logger
+
+from .cip68_templates import CIP68TxTemplates
+from .cip68_utils import create_cip68_asset_names, decode_cip68_datum
+
+# Callback tiến độ: (số item đã build, tổng số item, tx vừa build)
+ProgressCallback = Callable[[int, int, "BatchTx"], None]
+
+
+@dataclass
+class BatchTx:
+    """Một transaction (chưa ký) của batch."""
+
+    tx: Transaction
+    token_names: List[bytes]
+    ex_units: ExecutionUnits
+    # True nếu tiêu output của tx trước trong batch (phải submit sau tx đó)
+    chained: bool = False
+
+    @property
+    def size(self) -> int:
+        return len(self.tx.to_cbor())
+
+    @property
+    def fee(self) -> int:
+        return self.tx.transaction_body.fee
+
+
+@dataclass
+class _ExUnitsModel:
+    """Ex-units của redeemer lớn nhất theo số item: base + per_item * (k - 1)."""
+
+    base: ExecutionUnits
+    per_item: Tuple[float, float]
+    # Tổng ex-units thật / (số redeemer * redeemer lớn nhất) ở lần evaluate gần nhất
+    fill: float = 1.0
+
+    def at(self, k: int, margin: float) -> ExecutionUnits:
+        scale = 1 + margin
+        return ExecutionUnits(
+            math.ceil((self.base.mem + self.per_item[0] * (k - 1)) * scale),
+            math.ceil((self.base.steps + self.per_item[1] * (k - 1)) * scale),
+        )
+
+    def total(self, k: int, redeemers: int, margin: float, fill: Optional[float] = None) -> ExecutionUnits:
+        """Tổng ex-units ước lượng của tx k item (fill=1: mọi redeemer đặt sẵn bằng giá trị lớn nhất)."""
+        units = self.at(k, margin)
+        scale = redeemers * (self.fill if fill is None else fill)
+        return ExecutionUnits(math.ceil(units.mem * scale), math.ceil(units.steps * scale))
+
+    def refit(self, k: int, units: ExecutionUnits):
+        """Cập nhật độ dốc theo một tx thật k item (giữ độ dốc lớn hơn)."""
+        if k > 1:
+            self.per_item = (
+                max(self.per_item[0], (units.mem - self.base.mem) / (k - 1)),
+                max(self.per_item[1], (units.steps - self.base.steps) / (k - 1)),
+            )
+
+
+@dataclass
+class _Chain:
+    """Input đã dùng và output change còn tiêu được giữa các tx của batch."""
+
+    spent: Set[TransactionInput] = field(default_factory=set)
+    pending: List[UTxO] = field(default_factory=list)
+
+
+@dataclass
+class _Built:
+    """Kết quả một lần build: tx, input đã chọn, số output không phải change, redeemer lớn nhất."""
+
+    batch_tx: BatchTx
+    inputs: Set[TransactionInput]
+    explicit_outputs: int
+    max_units: ExecutionUnits
+    # UTxO của mọi input + reference input (cho evaluator local)
+    utxos: List[UTxO] = field(default_factory=list)
+
+
+def _item_size(token_name: bytes, datum: Any) -> int:
+    """Byte một item thêm vào tx (không kể phần cố định): datum + 3 lần tên asset."""
+    datum_size = len(datum.to_cbor()) if hasattr(datum, "to_cbor") else 0
+    return datum_size + 3 * (len(token_name) + 4)
+
+
+class _BatchPlanner(ABC):
+    """
+    Chia danh sách item thành các transaction, mỗi tx build bằng `_template`.
+
+    Lớp con định nghĩa `_template`, `_token_name`, `_item_size` cho loại item
+    của mình (vd: CIP68BatchUpdater).
+
+    Args:
+        templates: CIP68TxTemplates (script, policy, reference scripts).
+        max_items_per_tx: Giới hạn số item mỗi tx (None = chỉ theo giới hạn protocol).
+        margin: Biên an toàn cho ex-units ước lượng (0.1 = +10%).
+        size_reserve: Số byte chừa lại dưới max_tx_size (vkey witness, sai số ước lượng).
+    """
+
+    # True: tx không nối tiếp luôn được evaluate thật (ex-units không tuyến tính theo số item)
+    evaluate_each = False
+
+    def __init__(
+        self,
+        templates: CIP68TxTemplates,
+        max_items_per_tx: Optional[int] = None,
+        margin: float = 0.1,
+        size_reserve: int = 512,
+    ):
+        self.templates = templates
+        self.max_items_per_tx = max_items_per_tx
+        self.margin = margin
+        self.size_reserve = size_reserve
+        self.builds = 0
+        self.evaluations = 0
+        # Tx nối tiếp: ex-units đặt sẵn đã / chưa được kiểm tra bằng evaluator local
+        self.verified = 0
+        self.unverified = 0
+        self._evaluator = LocalPlutusEvaluator() if uplc_eval is not None else None
+
+    # --- phần riêng của từng loại batch ---
+
+    @abstractmethod
+    def _template(self, context: ChainContext, owner_address: Address, batch: Sequence,
+                  ex_units: Optional[ExecutionUnits]) -> TransactionBuilder:
+        """Builder của một tx chứa `batch`; `ex_units` đặt sẵn cho redeemer (None = evaluate)."""
+
+    @abstractmethod
+    def _token_name(self, item) -> bytes:
+        """Tên token (không prefix) của item."""
+
+    @abstractmethod
+    def _item_size(self, item) -> int:
+        """Byte ước lượng item thêm vào tx (xem `_item_size` của module)."""
+
+    def _redeemers(self, k: int) -> int:
+        """Số redeemer của tx k item."""
+        return 1
+
+    def _validate(self, owner_address: Address, items: Sequence):
+        names = [self._token_name(item) for item in items]
+        if len(set(names)) != len(names):
+            raise ValueError("Tên token bị trùng trong batch")
+
+    # --- lập kế hoạch ---
+
+    def plan(
+        self,
+        context: ChainContext,
+        owner_address: Address,
+        items: Sequence,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Iterator[BatchTx]:
+        """
+        Build lần lượt các transaction của batch (generator, theo thứ tự submit).
+
+        Raises:
+            ValueError: Item không hợp lệ (vd: tên token trùng nhau trong batch)
+                hoặc một item vượt giới hạn của một transaction.
+        """
+        self._validate(owner_address, items)
+        if not items:
+            return
+        params = context.protocol_param
+        sizes = [self._item_size(item) for item in items]
+        model, fixed_size, per_item_overhead = self._calibrate(context, owner_address, items, sizes)
+        chain = _Chain()
+        done = 0
+        first = True
+        while done < len(items):
+            k = self._fit(sizes[done:], model, fixed_size, per_item_overhead, params)
+            while True:
+                batch = items[done:done + k]
+                # Tx đầu tiên (và mọi tx nếu evaluate_each) evaluate thật, các tx sau dùng mô hình
+                batch_tx = self._attempt(
+                    context, owner_address, batch, model, chain, params, evaluate=first or self.evaluate_each
+                )
+                if batch_tx is not None:
+                    break
+                if k == 1:
+                    raise ValueError(
+                        f"Item {self._token_name(batch[0])!r} vượt giới hạn một transaction "
+                        "(max_tx_size / max ex-units)"
+                    )
+                k = max(1, min(k - 1, int(k * 0.95), self._fit(sizes[done:], model, fixed_size,
+                                                             per_item_overhead, params)))
+            first = False
+            done += k
+            if progress is not None:
+                progress(done, len(items), batch_tx)
+            yield batch_tx
+
+    def _attempt(self, context, owner_address, batch, model, chain, params, evaluate: bool) -> Optional[BatchTx]:
+        """Build một tx của batch; None nếu vượt max_tx_size hoặc max ex-units (cần bớt item)."""
+        k = len(batch)
+        # Ví còn UTxO chưa dùng trong batch (UTxO có script bị coin selection bỏ qua)
+        evaluate = evaluate and (not chain.pending or any(
+            utxo.input not in chain.spent and utxo.output.script is None
+            for utxo in context.utxos(owner_address)
+        ))
+        try:
+            if evaluate:
+                try:
+                    built = self._build(context, owner_address, batch, None, chain, use_pending=False)
+                except (InsufficientUTxOBalanceException, UTxOSelectionException):
+                    # UTxO chưa dùng của ví không đủ: nối tiếp vào change của tx trước
+                    if not chain.pending:
+                        raise
+                else:
+                    model.refit(k, built.max_units)
+                    total = built.batch_tx.ex_units
+                    model.fill = min(1.0, total.mem / (self._redeemers(k) * built.max_units.mem))
+                    if not _within(total, params):
+                        return None
+                    _advance(chain, built, owner_address)
+                    return built.batch_tx
+            if not _within(model.total(k, self._redeemers(k), self.margin, fill=1.0), params):
+                return None
+            preset = model.at(k, self.margin)
+            built = self._build(context, owner_address, batch, preset, chain, use_pending=True)
+            actual = self._verify(context, built, preset, params)
+            if actual is not None and (actual.mem > preset.mem or actual.steps > preset.steps):
+                # Mô hình ước lượng thấp (chi phí không tuyến tính): đặt lại theo giá trị thật + margin
+                logger.warning(f"⚠️ Batch {k} item: ex-units đặt sẵn {preset} < evaluate local {actual}")
+                model.refit(k, actual)
+                scale = 1 + self.margin
+                preset = ExecutionUnits(
+                    math.ceil(max(preset.mem, actual.mem) * scale), math.ceil(max(preset.steps, actual.steps) * scale)
+                )
+                redeemers = self._redeemers(k)
+                if not _within(ExecutionUnits(preset.mem * redeemers, preset.steps * redeemers), params):
+                    return None
+                built = self._build(context, owner_address, batch, preset, chain, use_pending=True)
+        except InvalidTransactionException:
+            return None
+        _advance(chain, built, owner_address)
+        return built.batch_tx
+
+    def _verify(self, context, built: _Built, preset: ExecutionUnits, params) -> Optional[ExecutionUnits]:
+        """
+        Evaluate local tx dùng ex-units đặt sẵn: redeemer lớn nhất thực tế,
+        hoặc None nếu không kiểm tra được (chưa cài `uplc`, tx ngoài phạm vi evaluator).
+        """
+        tx = built.batch_tx.tx
+        reason = "chưa cài package `uplc`"
+        if self._evaluator is not None:
+            body = tx.transaction_body
+            try:
+                to_posix = (
+                    slot_to_posix_ms(context) if body.ttl is not None or body.validity_start is not None else None
+                )
+                result = self._evaluator.evaluate(
+                    tx,
+                    built.utxos,
+                    (params.cost_models or {}).get("PlutusV3"),
+                    ExecutionUnits(params.max_tx_ex_mem, params.max_tx_ex_steps),
+                    to_posix,
+                )
+            except LocalEvaluationUnsupported as e:
+                reason = str(e)
+            except (NotImplementedError, AttributeError) as e:
+                # Context không có genesis_param: không đổi được slot → POSIX time
+                reason = f"slot → POSIX time: {e!r}"
+            else:
+                self.verified += 1
+                return ExecutionUnits(
+                    max(units.mem for units in result.values()),
+                    max(units.steps for units in result.values()),
+                )
+        self.unverified += 1
+        logger.warning(
+            f"⚠️ Tx nối tiếp ({len(built.batch_tx.token_names)} item) dùng ex-units đặt sẵn {preset} "
+            f"chưa được kiểm tra: {reason}"
+        )
+        return None
+
+    def _calibrate(self, context, owner_address, items, sizes) -> Tuple[_ExUnitsModel, int, int]:
+        """Build thử 1 và 2 item (evaluate thật): kích thước cố định, overhead mỗi item, mô hình ex-units."""
+        try:
+            one = self._build(context, owner_address, items[:1], None)
+        except InvalidTransactionException as e:
+            raise ValueError(
+                f"Item {self._token_name(items[0])!r} vượt giới hạn một transaction (max_tx_size / max ex-units)"
+            ) from e
+        if len(items) == 1:
+            return _ExUnitsModel(one.max_units, (0.0, 0.0)), one.batch_tx.size - sizes[0], 0
+        try:
+            two = self._build(context, owner_address, items[:2], None)
+        except InvalidTransactionException:
+            # Hai item đầu không vừa một tx: ước lượng dè dặt, mỗi item thêm tốn như cả tx một item
+            base = one.max_units
+            return _ExUnitsModel(base, (float(base.mem), float(base.steps))), one.batch_tx.size - sizes[0], 0
+        per_item_overhead = max(0, two.batch_tx.size - one.batch_tx.size - sizes[1])
+        model = _ExUnitsModel(
+            one.max_units,
+            (max(0, two.max_units.mem - one.max_units.mem), max(0, two.max_units.steps - one.max_units.steps)),
+        )
+        model.fill = two.batch_tx.ex_units.mem / (self._redeemers(2) * two.max_units.mem)
+        return model, one.batch_tx.size - sizes[0] - per_item_overhead, per_item_overhead
+
+    def _fit(self, sizes: Sequence[int], model: _ExUnitsModel, fixed_size: int, overhead: int, params) -> int:
+        """Số item tối đa (từ đầu `sizes`) theo kích thước ước lượng và tổng ex-units."""
+        budget = params.max_tx_size - self.size_reserve - fixed_size
+        limit = len(sizes) if self.max_items_per_tx is None else min(len(sizes), self.max_items_per_tx)
+        k = 0
+        while k < limit:
+            budget -= sizes[k] + overhead
+            units = model.total(k + 1, self._redeemers(k + 1), self.margin)
+            if k > 0 and (budget < 0 or not _within(units, params)):
+                break
+            k += 1
+        return max(1, k)
+
+    def _build(
+        self,
+        context: ChainContext,
+        owner_address: Address,
+        batch: Sequence,
+        ex_units: Optional[ExecutionUnits],
+        chain: Optional[_Chain] = None,
+        use_pending: bool = False,
+    ) -> _Built:
+        builder = self._template(context, owner_address, batch, ex_units)
+        if chain is not None and chain.spent:
+            builder.excluded_inputs = [u for u in context.utxos(owner_address) if u.input in chain.spent]
+        if chain is not None and use_pending and chain.pending:
+            builder.potential_inputs.extend(chain.pending)
+        explicit_outputs = len(builder.outputs)
+        self.builds += 1
+        if ex_units is None:
+            self.evaluations += 1
+        tx_body = builder.build(change_address=owner_address)
+        tx = Transaction(tx_body, builder.build_witness_set())
+        units = _redeemer_ex_units(tx)
+        max_units = ExecutionUnits(max(u.mem for u in units), max(u.steps for u in units))
+        return _Built(
+            BatchTx(tx, [self._token_name(item) for item in batch], _total_ex_units(units)),
+            {utxo.input for utxo in builder.inputs},
+            explicit_outputs,
+            max_units,
+            list(builder.inputs) + [u for u in builder.reference_inputs if isinstance(u, UTxO)],
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "builds": self.builds,
+            "evaluations": self.evaluations,
+            "preset_verified": self.verified,
+            "preset_unverified": self.unverified,
+        }
+
+
+class CIP68BatchUpdater(_BatchPlanner):
+    """
+    Chia danh sách (reference UTxO, token_name, datum mới) thành các transaction update_batch.
+
+    Trước khi build, mọi item được kiểm tra từ datum hiện tại: reference UTxO
+    nằm ở store address và chứa reference token, owner trong datum là ví
+    `owner_address`, datum mới giữ nguyên policy_id / asset_name / owner (như
+    validator UpdateMetadata). Item sai làm cả batch bị từ chối (ValueError).
+    """
+
+    evaluate_each = True
+
+    def _template(self, context, owner_address, batch, ex_units):
+        return self.templates.update_batch(context, owner_address, batch, ex_units=ex_units)
+
+    def _token_name(self, item) -> bytes:
+        return item[1]
+
+    def _item_size(self, item) -> int:
+        _, token_name, datum = item
+        return _item_size(token_name, datum)
+
+    def _redeemers(self, k: int) -> int:
+        return k
+
+    def _validate(self, owner_address: Address, items: Sequence[Tuple[UTxO, bytes, PlutusData]]):
+        super()._validate(owner_address, items)
+        refs = [ref_utxo.input for ref_utxo, _, _ in items]
+        if len(set(refs)) != len(refs):
+            raise ValueError("Reference UTxO bị trùng trong batch")
+        owner = owner_address.payment_part.to_primitive()
+        errors = []
+        for ref_utxo, token_name, new_datum in items:
+            reason = self._check(ref_utxo, token_name, new_datum, owner)
+            if reason:
+                errors.append(f"{token_name.decode('utf-8', errors='replace')}: {reason}")
+        if errors:
+            raise ValueError("Không thể update batch:\n  " + "\n  ".join(errors))
+
+    def _check(self, ref_utxo: UTxO, token_name: bytes, new_datum: PlutusData, owner: bytes) -> Optional[str]:
+        """Lý do item không hợp lệ, None nếu hợp lệ."""
+        ref_asset_name, _ = create_cip68_asset_names(token_name)
+        if ref_utxo.output.address != self.templates.store_address:
+            return "reference UTxO không nằm ở store address"
+        if ref_utxo.output.amount.multi_asset.get(self.templates.policy_id, {}).get(ref_asset_name, 0) != 1:
+            return "UTxO không chứa reference token"
+        current = decode_cip68_datum(ref_utxo.output.datum)
+        if current is None:
+            return "không giải mã được datum hiện tại"
+        if current.owner != owner:
+            return "ví không phải owner của token"
+        new = decode_cip68_datum(new_datum)
+        if new is None:
+            return "datum mới không đúng cấu trúc CIP68Datum"
+        if (new.policy_id, new.asset_name, new.owner) != (current.policy_id, current.asset_name, current.owner):
+            return "datum mới đổi policy_id / asset_name / owner"
+        return None
+
+
+def _within(units: ExecutionUnits, params) -> bool:
+    return units.mem <= params.max_tx_ex_mem and units.steps <= params.max_tx_ex_steps
+
+
+def _redeemer_ex_units(tx: Transaction) -> List[ExecutionUnits]:
+    """Ex-units của các redeemer trong witness set của tx (RedeemerMap hoặc list Redeemer)."""
+    redeemers = tx.transaction_witness_set.redeemer or []
+    if isinstance(redeemers, RedeemerMap):
+        return [value.ex_units for value in redeemers.values()]
+    return [redeemer.ex_units for redeemer in redeemers]
+
+
+def _total_ex_units(units: Sequence[ExecutionUnits]) -> ExecutionUnits:
+    total = ExecutionUnits(0, 0)
+    for u in units:
+        total += u
+    return total
+
+
+def _advance(chain: _Chain, built: _Built, owner_address: Address):
+    """Ghi input vừa dùng và output change của tx vào chain; đánh dấu tx nếu tiêu output của tx trước."""
+    built.batch_tx.chained = any(utxo.input in built.inputs for utxo in chain.pending)
+    chain.spent |= built.inputs
+    chain.pending = [utxo for utxo in chain.pending if utxo.input not in built.inputs]
+    tx = built.batch_tx.tx
+    tx_id = tx.id
+    for index, output in enumerate(tx.transaction_body.outputs):
+        if index >= built.explicit_outputs and output.address == owner_address:
+            chain.pending.append(UTxO(TransactionInput(tx_id, index), output))
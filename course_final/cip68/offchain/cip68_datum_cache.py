@@ -0,0 +1,158 @@
+"""
+CIP-68 Decoded Datum Cache
+==========================
+Cache LRU các datum CIP-68 đã giải mã, khoá theo hash của bytes CBOR.
+
+Datum của một reference UTxO không đổi cho tới khi UTxO bị tiêu, nên
+cùng một bytes CBOR luôn cho cùng một CIP68Datum và cùng một metadata
+dict. Cache trả lại kết quả đã giải mã thay vì gọi `CIP68Datum.from_cbor`
+và dựng lại metadata dict ở mỗi request đọc metadata.
+
+Khi miss, datum được giải mã qua CIP68DatumView (đọc thẳng CBOR), chỉ
+quay về `CIP68Datum.from_cbor` nếu datum không đúng cấu trúc quen thuộc.
+"""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from pycardano import RawCBOR
+
+from .cip68_datum_view import CIP68DatumView, _to_text
+from .cip68_utils import CIP68Datum
+
+
+class DecodedDatum(NamedTuple):
+    """Datum đã giải mã và metadata dạng JSON (dùng chung giữa các request, không được sửa)."""
+    datum: CIP68Datum
+    metadata: Dict[str, str]
+
+
+def metadata_to_dict(datum: CIP68Datum) -> Dict[str, str]:
+    """Chuyển metadata của CIP68Datum (bytes/PlutusData) thành dict chuỗi cho API."""
+    metadata = {}
+    for k, v in datum.metadata.items():
+        key = _to_text(k)
+        # PlutusData object
+        if not isinstance(v, (bytes, str, int)) and hasattr(v, 'to_primitive'):
+            v = v.to_primitive()
+        metadata[key] = _to_text(v)
+    return metadata
+
+
+class DatumCache:
+    """
+    Cache LRU: blake2b(CBOR của datum) → DecodedDatum.
+
+    Datum không giải mã được (không phải CIP68Datum) cũng được cache (None)
+    để không thử lại ở mỗi request.
+
+    Args:
+        max_entries: Số datum tối đa được giữ.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        # key → (DecodedDatum hoặc None, số bytes ước tính)
+        self._entries: "OrderedDict[bytes, Tuple[Optional[DecodedDatum], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def decode(self, datum: Any) -> Optional[DecodedDatum]:
+        """
+        Giải mã datum (RawCBOR / bytes CBOR / PlutusData / CIP68Datum) qua cache.
+
+        Returns:
+            DecodedDatum, hoặc None nếu không có datum hoặc datum không đúng cấu trúc
+        """
+        cbor = _cbor_of(datum)
+        if cbor is None:
+            return None
+        key = hashlib.blake2b(cbor, digest_size=16).digest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Giải mã ngoài lock: hai thread cùng miss một key chỉ tốn thêm một lần decode
+        decoded = None
+        view = None if isinstance(datum, CIP68Datum) else CIP68DatumView.parse(cbor)
+        if view is not None:
+            decoded = DecodedDatum(view.to_datum(), view.metadata_dict())
+        else:
+            try:
+                parsed = datum if isinstance(datum, CIP68Datum) else CIP68Datum.from_cbor(cbor)
+                decoded = DecodedDatum(parsed, metadata_to_dict(parsed))
+            except Exception:
+                pass
+        size = _estimate_size(cbor, decoded)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (decoded, size)
+                self._memory += size
+                while len(self._entries) > self.max_entries:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._memory -= evicted
+                    self.evictions += 1
+        return decoded
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._memory = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "memory_bytes": self._memory,
+            }
+
+
+def _cbor_of(datum: Any) -> Optional[bytes]:
+    if datum is None:
+        return None
+    if isinstance(datum, RawCBOR):
+        return datum.cbor
+    if isinstance(datum, bytes):
+        return datum
+    if hasattr(datum, "to_cbor"):
+        return datum.to_cbor()
+    return None
+
+
+def _estimate_size(cbor: bytes, decoded: Optional[DecodedDatum]) -> int:
+    """Ước lượng bộ nhớ của một entry: CBOR + các chuỗi/bytes của datum và metadata dict."""
+    size = len(cbor)
+    if decoded is not None:
+        datum = decoded.datum
+        size += sys.getsizeof(datum) + sys.getsizeof(decoded.metadata)
+        size += sum(sys.getsizeof(v) for v in (datum.policy_id, datum.asset_name, datum.owner))
+        for k, v in datum.metadata.items():
+            size += sys.getsizeof(k) + sys.getsizeof(v)
+        for k, v in decoded.metadata.items():
+            size += sys.getsizeof(k) + sys.getsizeof(v)
+    return size
+
+
+# Cache dùng chung cho cả process (offchain + backend)
+datum_cache = DatumCache()
+
+
+def decode_datum_cached(datum: Any) -> Optional[DecodedDatum]:
+    """Giải mã datum CIP-68 qua `datum_cache` dùng chung."""
+    return datum_cache.decode(datum)
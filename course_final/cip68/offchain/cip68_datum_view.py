@@ -0,0 +1,223 @@
+"""
+CIP-68 Datum View
+=================
+Đọc trực tiếp CBOR của CIP68Datum trên một memoryview, không qua
+`CIP68Datum.from_cbor` (cbor2 → PlutusData dataclass → dict metadata).
+
+Datum của contract có cấu trúc cố định:
+
+    Constr 0 [policy_id: bytes, asset_name: bytes, owner: bytes,
+              metadata: Map<bytes, bytes | int>, version: int]
+
+`CIP68DatumView.parse` chỉ kiểm tra cấu trúc và ghi lại vị trí của 5 field;
+mỗi field chỉ được giải mã khi được đọc. Datum không đúng cấu trúc trên
+(vd: metadata lồng PlutusData, số nguyên lớn) thì `parse` trả về None và
+caller dùng lại đường giải mã tổng quát.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .cip68_utils import CIP68Datum
+
+# Tag CBOR của Constr 0 trong PlutusData
+_CONSTR_0_TAG = 121
+_BREAK = 0xff
+_FIELD_NAMES = ("policy_id", "asset_name", "owner", "metadata", "version")
+
+
+class _ShapeError(ValueError):
+    """CBOR không đúng cấu trúc CIP68Datum mà fast path hỗ trợ."""
+
+
+def _head(buf: memoryview, pos: int) -> Tuple[int, Optional[int], int]:
+    """(major type, argument hoặc None nếu độ dài không xác định, vị trí tiếp theo)."""
+    initial = buf[pos]
+    major, info = initial >> 5, initial & 0x1f
+    pos += 1
+    if info < 24:
+        return major, info, pos
+    if info == 24:
+        return major, buf[pos], pos + 1
+    if info == 25:
+        return major, int.from_bytes(buf[pos:pos + 2], 'big'), pos + 2
+    if info == 26:
+        return major, int.from_bytes(buf[pos:pos + 4], 'big'), pos + 4
+    if info == 27:
+        return major, int.from_bytes(buf[pos:pos + 8], 'big'), pos + 8
+    if info == 31 and major in (2, 4, 5):
+        return major, None, pos
+    raise _ShapeError(f"unsupported CBOR head 0x{initial:02x}")
+
+
+def _read_bytes(buf: memoryview, pos: int) -> Tuple[bytes, int]:
+    major, length, pos = _head(buf, pos)
+    if major != 2:
+        raise _ShapeError("expected bytes")
+    if length is not None:
+        end = pos + length
+        if end > len(buf):
+            raise _ShapeError("truncated bytes")
+        return bytes(buf[pos:end]), end
+    # Bytes dài được chia chunk (độ dài không xác định)
+    chunks = []
+    while buf[pos] != _BREAK:
+        chunk, pos = _read_bytes(buf, pos)
+        chunks.append(chunk)
+    return b"".join(chunks), pos + 1
+
+
+def _read_int(buf: memoryview, pos: int) -> Tuple[int, int]:
+    major, value, pos = _head(buf, pos)
+    if major == 0:
+        return value, pos
+    if major == 1:
+        return -1 - value, pos
+    raise _ShapeError("expected int")
+
+
+def _read_scalar(buf: memoryview, pos: int) -> Tuple[Union[bytes, int], int]:
+    if buf[pos] >> 5 == 2:
+        return _read_bytes(buf, pos)
+    return _read_int(buf, pos)
+
+
+def _skip_bytes(buf: memoryview, pos: int) -> int:
+    major, length, pos = _head(buf, pos)
+    if major != 2:
+        raise _ShapeError("expected bytes")
+    if length is not None:
+        if pos + length > len(buf):
+            raise _ShapeError("truncated bytes")
+        return pos + length
+    while buf[pos] != _BREAK:
+        pos = _skip_bytes(buf, pos)
+    return pos + 1
+
+
+def _skip_scalar(buf: memoryview, pos: int) -> int:
+    if buf[pos] >> 5 == 2:
+        return _skip_bytes(buf, pos)
+    return _read_int(buf, pos)[1]
+
+
+def _skip_metadata(buf: memoryview, pos: int) -> int:
+    major, count, pos = _head(buf, pos)
+    if major != 5:
+        raise _ShapeError("expected map")
+    if count is None:
+        while buf[pos] != _BREAK:
+            pos = _skip_scalar(buf, _skip_bytes(buf, pos))
+        return pos + 1
+    for _ in range(count):
+        pos = _skip_scalar(buf, _skip_bytes(buf, pos))
+    return pos
+
+
+def _to_text(value: Any) -> str:
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            # Giá trị nhị phân (vd: key hash) trả về dạng hex
+            return value.hex()
+    return str(value)
+
+
+class CIP68DatumView:
+    """
+    CIP68Datum đọc lười từ bytes CBOR.
+
+    Thuộc tính giống CIP68Datum (`policy_id`, `asset_name`, `owner`,
+    `metadata`, `version`), cộng thêm `metadata_dict()` (metadata dạng chuỗi
+    cho API) và `to_datum()` (CIP68Datum đầy đủ). Tạo qua `parse`.
+    """
+
+    __slots__ = ("_buf", "_offsets", "_cache")
+
+    def __init__(self, buf: memoryview, offsets: List[int]):
+        self._buf = buf
+        self._offsets = offsets
+        self._cache: Dict[str, Any] = {}
+
+    @classmethod
+    def parse(cls, cbor: Union[bytes, bytearray, memoryview]) -> Optional["CIP68DatumView"]:
+        """View của datum, hoặc None nếu CBOR không đúng cấu trúc CIP68Datum."""
+        buf = memoryview(cbor)
+        try:
+            major, tag, pos = _head(buf, 0)
+            if major != 6 or tag != _CONSTR_0_TAG:
+                return None
+            major, count, pos = _head(buf, pos)
+            if major != 4 or count not in (None, len(_FIELD_NAMES)):
+                return None
+            offsets = [pos]
+            pos = _skip_bytes(buf, pos)
+            offsets.append(pos)
+            pos = _skip_bytes(buf, pos)
+            offsets.append(pos)
+            pos = _skip_bytes(buf, pos)
+            offsets.append(pos)
+            pos = _skip_metadata(buf, pos)
+            offsets.append(pos)
+            pos = _read_int(buf, pos)[1]
+            if count is None:
+                if buf[pos] != _BREAK:
+                    return None
+                pos += 1
+            if pos != len(buf):
+                return None
+        except (_ShapeError, IndexError):
+            return None
+        return cls(buf, offsets)
+
+    def _field(self, index: int, reader) -> Any:
+        name = _FIELD_NAMES[index]
+        if name not in self._cache:
+            self._cache[name] = reader(self._buf, self._offsets[index])[0]
+        return self._cache[name]
+
+    @property
+    def policy_id(self) -> bytes:
+        return self._field(0, _read_bytes)
+
+    @property
+    def asset_name(self) -> bytes:
+        return self._field(1, _read_bytes)
+
+    @property
+    def owner(self) -> bytes:
+        return self._field(2, _read_bytes)
+
+    @property
+    def version(self) -> int:
+        return self._field(4, _read_int)
+
+    @property
+    def metadata(self) -> Dict[bytes, Union[bytes, int]]:
+        return self._field(3, self._read_metadata)
+
+    def metadata_dict(self) -> Dict[str, str]:
+        """Metadata dạng chuỗi (giống cip68_datum_cache.metadata_to_dict)."""
+        return {_to_text(k): _to_text(v) for k, v in self.metadata.items()}
+
+    def to_datum(self) -> CIP68Datum:
+        return CIP68Datum(
+            policy_id=self.policy_id,
+            asset_name=self.asset_name,
+            owner=self.owner,
+            metadata=self.metadata,
+            version=self.version,
+        )
+
+    @staticmethod
+    def _read_metadata(buf: memoryview, pos: int) -> Tuple[Dict[bytes, Union[bytes, int]], int]:
+        _, count, pos = _head(buf, pos)
+        metadata = {}
+        if count is None:
+            while buf[pos] != _BREAK:
+                key, pos = _read_bytes(buf, pos)
+                metadata[key], pos = _read_scalar(buf, pos)
+            return metadata, pos + 1
+        for _ in range(count):
+            key, pos = _read_bytes(buf, pos)
+            metadata[key], pos = _read_scalar(buf, pos)
+        return metadata, pos
@@ -0,0 +1,131 @@
+"""
+CIP-68 Reference Event Hub
+==========================
+Phát ReferenceEvent (mint / update / burn) tới nhiều client đang kết nối
+(vd: server-sent events của backend).
+
+Một nguồn duy nhất (ReferenceTokenIndex, được chain follower cập nhật)
+đẩy event vào hub; mỗi client chỉ là một hàng đợi trong bộ nhớ, nên số
+request lên Blockfrost không tăng theo số client.
+
+    hub = ReferenceEventHub()
+    ref_index.subscribe(hub.publish)
+
+    subscription = hub.subscribe(token_names={b"MyNFT"})
+    event = await subscription.next(timeout=15)
+"""
+import asyncio
+import threading
+from typing import Any, Dict, Iterable, Optional, Set
+
+from .cip68_index import ReferenceEvent
+
+
+class Subscription:
+    """
+    Hàng đợi event của một client, lọc theo tên token và/hoặc owner pkh
+    (không lọc gì = nhận mọi event).
+
+    Client đọc chậm làm đầy hàng đợi thì bị đánh dấu `overflowed`: event
+    sau đó bị bỏ và client cần tải lại trạng thái (vd: /api/tokens).
+    """
+
+    def __init__(self, hub: "ReferenceEventHub", token_names: Set[bytes], owners: Set[bytes], queue_size: int):
+        self._hub = hub
+        self.token_names = token_names
+        self.owners = owners
+        self.overflowed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[ReferenceEvent]" = asyncio.Queue(queue_size)
+
+    def matches(self, event: ReferenceEvent) -> bool:
+        if not self.token_names and not self.owners:
+            return True
+        if event.token_name in self.token_names:
+            return True
+        return any(
+            entry is not None and entry.datum is not None and entry.datum.owner in self.owners
+            for entry in (event.entry, event.previous)
+        )
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[ReferenceEvent]:
+        """Event tiếp theo, hoặc None nếu hết `timeout` giây mà chưa có."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._hub._unsubscribe(self)
+
+    def _deliver(self, event: ReferenceEvent):
+        # Chạy trong event loop của client
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+            self._hub.delivered += 1
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self._hub.dropped += 1
+
+
+class ReferenceEventHub:
+    """
+    Phân phối ReferenceEvent tới các Subscription.
+
+    `publish` có thể được gọi từ bất kỳ thread nào; event được chuyển vào
+    event loop của từng client bằng `call_soon_threadsafe`.
+
+    Args:
+        queue_size: Số event tối đa chờ trong hàng đợi của một client.
+        max_subscribers: Số client tối đa cùng lúc.
+    """
+
+    def __init__(self, queue_size: int = 100, max_subscribers: int = 1000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, token_names: Iterable[bytes] = (), owners: Iterable[bytes] = ()) -> Subscription:
+        """
+        Đăng ký client mới (gọi trong event loop).
+
+        Raises:
+            OverflowError: Đã đủ `max_subscribers` client.
+        """
+        subscription = Subscription(self, set(token_names), set(owners), self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise OverflowError("Too many event subscribers")
+            self._subscribers.add(subscription)
+        return subscription
+
+    def publish(self, event: ReferenceEvent):
+        """Listener cho ReferenceTokenIndex.subscribe."""
+        with self._lock:
+            self.published += 1
+            targets = [s for s in self._subscribers if s.matches(event)]
+        for subscription in targets:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # Event loop của client đã đóng
+                self._unsubscribe(subscription)
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+            }
@@ -0,0 +1,477 @@
+"""
+CIP-68 Reference Token Index
+============================
+Chỉ mục trong bộ nhớ: tên token → UTxO hiện tại giữ reference token (100)
+tại store address, kèm datum CIP68Datum đã giải mã sẵn.
+
+Thay cho việc duyệt toàn bộ UTxO của store address ở mỗi request
+(metadata / update / burn), tra cứu chỉ còn một lần tra dict.
+
+- Trạng thái đã xác nhận: nạp một lần (`load`) rồi cập nhật theo
+  thay đổi UTxO mà chain follower quan sát được (`on_change`).
+- Trạng thái chờ (pending): transaction vừa submit được áp dụng ngay
+  (`apply_submitted`) để request tiếp theo không dùng lại UTxO đã tiêu.
+  Pending hết hạn sau `pending_ttl` giây, hoặc bị thay khi follower thấy
+  thay đổi on-chain của token đó.
+
+Hai chỉ mục phụ cho màn hình ví ("token của tôi"), tốn thời gian theo số
+token của ví thay vì số UTxO tại store address:
+- theo owner (pkh lưu trong CIP68Datum.owner): `ReferenceTokenIndex.by_owner`
+- theo địa chỉ đang giữ user token (222): `HolderIndex`
+
+Danh sách tên đã sắp xếp cho phân trang theo cursor (`page`): một trang tốn
+thời gian theo kích thước trang thay vì tổng số token.
+
+`revision()` đổi mỗi khi nội dung chỉ mục đổi - dùng làm ETag cho danh sách.
+
+Listener đăng ký qua `subscribe` nhận ReferenceEvent (mint / update / burn)
+cho mỗi thay đổi on-chain đã quan sát (không tính trạng thái pending).
+"""
+import heapq
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from pycardano import Address, ScriptHash, Transaction, TransactionInput, UTxO
+
+from .cip68_datum_cache import DecodedDatum, decode_datum_cached
+from .cip68_utils import CIP68_REFERENCE_PREFIX, CIP68_USER_PREFIX, CIP68Datum
+
+# (tx_hash hex, index) - giống chain.utxo_store.UTxOKey
+_UTxOKey = Tuple[str, int]
+
+
+class ReferenceEntry(NamedTuple):
+    """Reference token của một NFT: UTxO đang giữ nó và datum đã giải mã (qua datum cache)."""
+    token_name: bytes
+    utxo: UTxO
+    decoded: Optional[DecodedDatum]
+
+    @property
+    def datum(self) -> Optional[CIP68Datum]:
+        return self.decoded.datum if self.decoded is not None else None
+
+    @property
+    def metadata(self) -> Optional[Dict[str, str]]:
+        return self.decoded.metadata if self.decoded is not None else None
+
+
+class ReferenceEvent(NamedTuple):
+    """
+    Thay đổi on-chain của một reference token.
+
+    kind: "minted" (token mới), "updated" (chuyển sang UTxO mới, vd: cập nhật
+    metadata) hoặc "burned" (entry = None).
+    """
+    kind: str
+    token_name: bytes
+    entry: Optional[ReferenceEntry]
+    previous: Optional[ReferenceEntry]
+
+
+ReferenceListener = Callable[[ReferenceEvent], None]
+
+
+class ReferenceTokenIndex:
+    """
+    Chỉ mục O(1) từ tên token (không gồm prefix CIP-68) → ReferenceEntry.
+
+    Dùng làm listener của chain.follower.AddressIndex:
+        index = ReferenceTokenIndex(policy_id, store_address)
+        address_index.subscribe(index.on_change)
+
+    Args:
+        policy_id: Policy ID của mint script.
+        store_address: Địa chỉ store script giữ reference token.
+        pending_ttl: Thời gian giữ trạng thái của transaction vừa submit (giây).
+    """
+
+    def __init__(self, policy_id: ScriptHash, store_address: Union[str, Address], pending_ttl: float = 600.0):
+        self.policy_id = policy_id
+        self.store_address = str(store_address)
+        self.pending_ttl = pending_ttl
+        self.ready = False
+        self._entries: Dict[bytes, ReferenceEntry] = {}
+        # tên trong _entries, sắp xếp tăng dần (thứ tự ổn định cho phân trang)
+        self._sorted_names: List[bytes] = []
+        self._names_by_key: Dict[_UTxOKey, List[bytes]] = {}
+        # owner pkh → tên token (chỉ trạng thái đã xác nhận)
+        self._by_owner: Dict[bytes, Set[bytes]] = {}
+        # tên → (hết hạn lúc, entry mới hoặc None nếu đã burn)
+        self._pending: Dict[bytes, Tuple[float, Optional[ReferenceEntry]]] = {}
+        self._lock = threading.Lock()
+        # Tăng mỗi lần nội dung đổi; _instance phân biệt các lần khởi động lại
+        self._revision = 0
+        self._instance = uuid.uuid4().hex[:8]
+        self._listeners: List[ReferenceListener] = []
+        self.hits = 0
+        self.misses = 0
+
+    def subscribe(self, listener: ReferenceListener):
+        """Đăng ký listener(event), gọi sau mỗi thay đổi on-chain của một reference token."""
+        self._listeners.append(listener)
+
+    # ---------------- ĐỌC ----------------
+    def get(self, token_name: Union[str, bytes]) -> Optional[ReferenceEntry]:
+        """Reference token hiện tại của `token_name`, hoặc None nếu không có."""
+        if isinstance(token_name, str):
+            token_name = token_name.encode('utf-8')
+        with self._lock:
+            entry = self._lookup(token_name)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def entries(self) -> List[ReferenceEntry]:
+        """Mọi reference token hiện tại (đã tính pending)."""
+        with self._lock:
+            names = set(self._entries) | set(self._pending)
+            entries = [self._lookup(name) for name in names]
+        return [entry for entry in entries if entry is not None]
+
+    def by_owner(self, owner_pkh: bytes) -> List[ReferenceEntry]:
+        """Các token có CIP68Datum.owner == `owner_pkh` (đã tính pending)."""
+        with self._lock:
+            names = set(self._by_owner.get(owner_pkh, ()))
+            names.update(
+                name for name, (_, entry) in self._pending.items()
+                if entry is not None and entry.datum is not None and entry.datum.owner == owner_pkh
+            )
+            entries = [self._lookup(name) for name in names]
+        return [
+            entry for entry in entries
+            if entry is not None and entry.datum is not None and entry.datum.owner == owner_pkh
+        ]
+
+    def get_many(self, token_names: Iterable[bytes]) -> List[ReferenceEntry]:
+        """Reference token của nhiều tên cùng lúc (bỏ qua tên không có)."""
+        with self._lock:
+            entries = [self._lookup(name) for name in token_names]
+        return [entry for entry in entries if entry is not None]
+
+    def page(
+        self,
+        after: Optional[bytes] = None,
+        limit: int = 50,
+        owner: Optional[bytes] = None,
+        prefix: bytes = b"",
+        min_version: int = 0,
+    ) -> Tuple[List[ReferenceEntry], Optional[bytes]]:
+        """
+        Một trang token sắp xếp theo tên, bắt đầu sau cursor `after`.
+
+        Args:
+            after: Tên token cuối của trang trước (None = trang đầu).
+            limit: Số token tối đa của trang.
+            owner: Chỉ lấy token có CIP68Datum.owner == owner.
+            prefix: Chỉ lấy token có tên bắt đầu bằng prefix.
+            min_version: Chỉ lấy token có CIP68Datum.version >= min_version.
+
+        Returns:
+            (entries, next_cursor) - next_cursor là None nếu không còn trang sau
+        """
+        with self._lock:
+            # Lọc theo owner: chỉ duyệt token của owner đó thay vì toàn bộ
+            names = sorted(self._by_owner.get(owner, ())) if owner is not None else self._sorted_names
+            start = bisect_left(names, prefix)
+            if after is not None:
+                start = max(start, bisect_right(names, after))
+            pending = sorted(
+                name for name in self._pending
+                if name.startswith(prefix) and (after is None or name > after)
+            )
+
+            entries: List[ReferenceEntry] = []
+            previous = None
+            # Lấy dư một token để biết còn trang sau hay không
+            for name in heapq.merge((names[i] for i in range(start, len(names))), pending):
+                if name == previous:
+                    continue
+                previous = name
+                if not name.startswith(prefix):
+                    break
+                entry = self._lookup(name)
+                if entry is None:
+                    continue
+                datum = entry.datum
+                if owner is not None and (datum is None or datum.owner != owner):
+                    continue
+                if min_version and (datum is None or datum.version < min_version):
+                    continue
+                entries.append(entry)
+                if len(entries) > limit:
+                    break
+
+        if len(entries) > limit:
+            entries = entries[:limit]
+            return entries, entries[-1].token_name
+        return entries, None
+
+    def revision(self) -> str:
+        """Phiên bản hiện tại của chỉ mục: giống nhau nghĩa là mọi kết quả đọc giống nhau."""
+        with self._lock:
+            now = time.monotonic()
+            for name in [name for name, (expires, _) in self._pending.items() if expires <= now]:
+                del self._pending[name]
+                self._revision += 1
+            return f"{self._instance}.{self._revision}"
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    def _lookup(self, name: bytes) -> Optional[ReferenceEntry]:
+        pending = self._pending.get(name)
+        if pending is not None:
+            expires, entry = pending
+            if expires > time.monotonic():
+                return entry
+            del self._pending[name]
+            self._revision += 1
+        return self._entries.get(name)
+
+    # ---------------- GHI ----------------
+    def load(self, utxos: Iterable[UTxO]):
+        """Nạp lại toàn bộ chỉ mục từ danh sách UTxO của store address."""
+        with self._lock:
+            self._entries.clear()
+            self._sorted_names.clear()
+            self._names_by_key.clear()
+            self._by_owner.clear()
+            self._pending.clear()
+            self._add(utxos)
+            self._revision += 1
+            self.ready = True
+
+    def on_change(self, added: List[UTxO], removed: List[UTxO]):
+        """Listener cho AddressIndex: áp dụng thay đổi UTxO đã quan sát trên chain."""
+        with self._lock:
+            # Trạng thái trước thay đổi của các token bị ảnh hưởng, để sinh ReferenceEvent
+            before: Dict[bytes, Optional[ReferenceEntry]] = {}
+            if self._listeners:
+                for utxo in removed:
+                    for name in self._names_by_key.get(_key(utxo.input), []):
+                        before.setdefault(name, self._entries.get(name))
+                for utxo in added:
+                    for name in self._ref_names(utxo):
+                        before.setdefault(name, self._entries.get(name))
+            for utxo in removed:
+                key = _key(utxo.input)
+                for name in self._names_by_key.pop(key, []):
+                    entry = self._entries.get(name)
+                    if entry is not None and _key(entry.utxo.input) == key:
+                        del self._entries[name]
+                        del self._sorted_names[bisect_left(self._sorted_names, name)]
+                        self._unlink_owner(entry)
+                    self._pending.pop(name, None)
+            self._add(added)
+            self._revision += 1
+            self.ready = True
+            events = [
+                event for event in (
+                    _event(name, previous, self._entries.get(name)) for name, previous in before.items()
+                )
+                if event is not None
+            ]
+        for event in events:
+            for listener in self._listeners:
+                listener(event)
+
+    def apply_submitted(self, tx: Transaction):
+        """
+        Áp dụng transaction vừa submit thành công như trạng thái pending:
+        reference token bị tiêu thì đánh dấu đã burn, output mới tại store
+        address thì thành UTxO hiện tại của token đó.
+        """
+        tx_id = tx.id
+        expires = time.monotonic() + self.pending_ttl
+        with self._lock:
+            for tx_input in tx.transaction_body.inputs:
+                for name in self._names_by_key.get(_key(tx_input), []):
+                    self._pending[name] = (expires, None)
+            for index, output in enumerate(tx.transaction_body.outputs):
+                if str(output.address) != self.store_address:
+                    continue
+                utxo = UTxO(TransactionInput(tx_id, index), output)
+                for name in self._ref_names(utxo):
+                    self._pending[name] = (expires, self._entry(name, utxo))
+            self._revision += 1
+
+    def _add(self, utxos: Iterable[UTxO]):
+        for utxo in utxos:
+            names = self._ref_names(utxo)
+            if not names:
+                continue
+            self._names_by_key[_key(utxo.input)] = names
+            for name in names:
+                previous = self._entries.get(name)
+                if previous is not None:
+                    self._unlink_owner(previous)
+                else:
+                    insort(self._sorted_names, name)
+                entry = self._entries[name] = self._entry(name, utxo)
+                if entry.datum is not None:
+                    self._by_owner.setdefault(entry.datum.owner, set()).add(name)
+                self._pending.pop(name, None)
+
+    def _unlink_owner(self, entry: ReferenceEntry):
+        if entry.datum is None:
+            return
+        names = self._by_owner.get(entry.datum.owner)
+        if names is not None:
+            names.discard(entry.token_name)
+            if not names:
+                del self._by_owner[entry.datum.owner]
+
+    def _ref_names(self, utxo: UTxO) -> List[bytes]:
+        if str(utxo.output.address) != self.store_address:
+            return []
+        assets = utxo.output.amount.multi_asset.get(self.policy_id)
+        if not assets:
+            return []
+        prefix_len = len(CIP68_REFERENCE_PREFIX)
+        return [
+            asset_name.payload[prefix_len:]
+            for asset_name, quantity in assets.items()
+            if quantity > 0 and asset_name.payload.startswith(CIP68_REFERENCE_PREFIX)
+        ]
+
+    @staticmethod
+    def _entry(name: bytes, utxo: UTxO) -> ReferenceEntry:
+        return ReferenceEntry(name, utxo, decode_datum_cached(utxo.output.datum))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "revision": self._revision,
+                "tokens": len(self._entries),
+                "owners": len(self._by_owner),
+                "pending": len(self._pending),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class HolderIndex:
+    """
+    Địa chỉ → tên các user token (222) của policy đang nằm tại địa chỉ đó.
+
+    Địa chỉ ví không được chain follower theo dõi, nên mỗi địa chỉ được nạp
+    khi cần (`load` từ UTxO của địa chỉ) và sống `ttl` giây; trong thời gian
+    đó, transaction submit qua backend (`apply_submitted`) cập nhật ngay chỗ
+    ở mới của user token (mint, chuyển, burn).
+
+    Args:
+        policy_id: Policy ID của mint script.
+        ttl: Thời gian sống của dữ liệu một địa chỉ (giây).
+        max_addresses: Số địa chỉ tối đa được giữ (bỏ địa chỉ nạp lâu nhất).
+    """
+
+    def __init__(self, policy_id: ScriptHash, ttl: float = 60.0, max_addresses: int = 1024):
+        self.policy_id = policy_id
+        self.ttl = ttl
+        self.max_addresses = max_addresses
+        # địa chỉ → (hết hạn lúc, tên token)
+        self._holdings: Dict[str, Tuple[float, Set[bytes]]] = {}
+        self._holder_of: Dict[bytes, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def names(self, address: Union[str, Address]) -> Optional[Set[bytes]]:
+        """Tên user token tại địa chỉ, hoặc None nếu chưa nạp / đã hết hạn."""
+        address = str(address)
+        with self._lock:
+            holding = self._holdings.get(address)
+            if holding is None or holding[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return set(holding[1])
+
+    def load(self, address: Union[str, Address], utxos: Iterable[UTxO]):
+        """Nạp user token của địa chỉ từ toàn bộ UTxO của nó."""
+        address = str(address)
+        names = {name for utxo in utxos for name in _user_names(utxo, self.policy_id)}
+        with self._lock:
+            self._drop(address)
+            self._holdings[address] = (time.monotonic() + self.ttl, names)
+            for name in names:
+                self._holder_of[name] = address
+            while len(self._holdings) > self.max_addresses:
+                self._drop(min(self._holdings, key=lambda a: self._holdings[a][0]))
+
+    def apply_submitted(self, tx: Transaction):
+        """User token trong output chuyển sang địa chỉ của output; user token bị burn thì bỏ."""
+        body = tx.transaction_body
+        moved: Dict[bytes, str] = {}
+        for index, output in enumerate(body.outputs):
+            for name in _user_names(UTxO(TransactionInput(tx.id, index), output), self.policy_id):
+                moved[name] = str(output.address)
+        burned = set()
+        if body.mint and self.policy_id in body.mint:
+            burned = {
+                asset_name.payload[len(CIP68_USER_PREFIX):]
+                for asset_name, quantity in body.mint[self.policy_id].items()
+                if quantity < 0 and asset_name.payload.startswith(CIP68_USER_PREFIX)
+            }
+        with self._lock:
+            for name in burned | set(moved):
+                previous = self._holder_of.pop(name, None)
+                if previous in self._holdings:
+                    self._holdings[previous][1].discard(name)
+            for name, address in moved.items():
+                if name in burned:
+                    continue
+                if address in self._holdings:
+                    self._holdings[address][1].add(name)
+                    self._holder_of[name] = address
+
+    def _drop(self, address: str):
+        holding = self._holdings.pop(address, None)
+        if holding is not None:
+            for name in holding[1]:
+                if self._holder_of.get(name) == address:
+                    del self._holder_of[name]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "addresses": len(self._holdings),
+                "tokens": len(self._holder_of),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _event(name: bytes, previous: Optional[ReferenceEntry], entry: Optional[ReferenceEntry]) -> Optional[ReferenceEvent]:
+    if previous is None and entry is None:
+        return None
+    if previous is None:
+        return ReferenceEvent("minted", name, entry, None)
+    if entry is None:
+        return ReferenceEvent("burned", name, None, previous)
+    if _key(previous.utxo.input) == _key(entry.utxo.input):
+        # Cùng UTxO (vd: reset chỉ mục, rollback rồi áp dụng lại) - không đổi gì
+        return None
+    return ReferenceEvent("updated", name, entry, previous)
+
+
+def _user_names(utxo: UTxO, policy_id: ScriptHash) -> List[bytes]:
+    assets = utxo.output.amount.multi_asset.get(policy_id)
+    if not assets:
+        return []
+    prefix_len = len(CIP68_USER_PREFIX)
+    return [
+        asset_name.payload[prefix_len:]
+        for asset_name, quantity in assets.items()
+        if quantity > 0 and asset_name.payload.startswith(CIP68_USER_PREFIX)
+    ]
+
+
+def _key(tx_input: TransactionInput) -> _UTxOKey:
+    return tx_input.transaction_id.payload.hex(), tx_input.index
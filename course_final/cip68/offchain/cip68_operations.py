@@ -10,6 +10,7 @@ SIMPLIFIED VERSION: Non-parameterized contracts
 """
 import os
 import json
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 from blockfrost import ApiError, ApiUrls, BlockFrostApi, BlockFrostIPFS
@@ -30,32 +31,66 @@ from .cip68_utils import (
     load_mint_script,
     load_store_script,
     extract_owner_from_datum,
+    decode_cip68_datum,
 )
+from .cip68_datum_cache import decode_datum_cached
+from .cip68_reference_scripts import ReferenceScripts, script_source
+from .cip68_batch import CIP68BatchUpdater, ProgressCallback
+from .cip68_templates import CIP68TxTemplates
+from .cip68_index import ReferenceTokenIndex
+from config.blockfrost import create_async_blockfrost_context, get_blockfrost_context, get_network_enum
+from chain.asset_lookup import AssetLookupChainContext
+from chain.async_context import AsyncBlockFrostChainContext
+
 # Load environment variables
 load_dotenv()
 
-# Hàm tạo BlockFrost chain context
-def get_chain_context() -> BlockFrostChainContext:
+# Hàm lấy BlockFrost chain context
+def get_chain_context() -> ChainContext:
     """
-    Tạo BlockFrost chain context từ environment variables.
+    Lấy BlockFrost chain context dùng chung từ environment variables.
+
+    Context được tạo một lần cho mỗi network (xem config/blockfrost.py)
+    và dùng chung connection pool + protocol parameters cho cả process.
+    UTxO theo địa chỉ được cache ngắn hạn và tự invalidate khi submit.
     
     Returns:
-        BlockFrostChainContext
+        ChainContext (BlockFrostChainContext bọc bởi CachedChainContext)
     """
     network = os.getenv("NETWORK", "Preprod")
     blockfrost_key = os.getenv("BLOCKFROST_PROJECT_ID")
 
-    # Map network (testnet → preview)
-    if network == "Preprod":
-        blockfrost_url = ApiUrls.preprod.value
-    else:
-        blockfrost_url = ApiUrls.mainnet.value
+    return get_blockfrost_context(network, project_id=blockfrost_key)
 
-    return BlockFrostChainContext(
-        project_id=blockfrost_key,
-        base_url=blockfrost_url
-    )
+# Hàm tạo chain context asyncio (dùng trong backend FastAPI)
+def get_async_chain_context() -> AsyncBlockFrostChainContext:
+    """
+    Tạo chain context asyncio từ environment variables.
+
+    Dùng httpx.AsyncClient nên các endpoint `async def` có thể `await`
+    mà không chặn event loop. Dùng chung UTxO cache với get_chain_context().
+    Người gọi chịu trách nhiệm `await context.aclose()` khi tắt.
+
+    Returns:
+        AsyncBlockFrostChainContext
+    """
+    network = os.getenv("NETWORK", "Preprod")
+    blockfrost_key = os.getenv("BLOCKFROST_PROJECT_ID")
+
+    return create_async_blockfrost_context(network, project_id=blockfrost_key)
 # Hàm tạo wallet từ seed phrase
+# Tìm UTxO đang giữ một asset mà không tải toàn bộ địa chỉ
+def find_asset_utxo(context: ChainContext, policy_id: ScriptHash, asset_name: AssetName) -> Optional[UTxO]:
+    """
+    UTxO hiện tại đang giữ asset (reference/user token của NFT), hoặc None.
+
+    Context từ get_chain_context() (và OfflineLedgerContext) có sẵn `utxo_for_asset`;
+    BlockFrostChainContext thường được bọc tạm bởi AssetLookupChainContext.
+    """
+    if not hasattr(context, "utxo_for_asset"):
+        context = AssetLookupChainContext(context)
+    return context.utxo_for_asset(policy_id, asset_name)
+
 def get_wallet_from_seed(seed_phrase: str) -> tuple:
     """
     Tạo wallet từ seed phrase.
@@ -84,9 +119,8 @@ def get_wallet_from_seed(seed_phrase: str) -> tuple:
 
 # Hàm lấy network từ environment
 def get_network() -> Network:
-    """Get network from environment."""
-    network_str = os.getenv("NETWORK", "Preprod")
-    return Network.TESTNET if network_str.lower() == "preprod" else Network.MAINNET
+    """Get network from environment (cùng cách chuẩn hoá với get_chain_context)."""
+    return get_network_enum(os.getenv("NETWORK", "Preprod"))
 
 # Hàm load scripts và lấy policy ID, store address
 def get_scripts(blueprint_path: str = None) -> tuple:
@@ -105,11 +139,15 @@ def get_scripts(blueprint_path: str = None) -> tuple:
             "cip68_dynamic_asset",
             "plutus.json"
         )
-    
+    # Blueprint chỉ đọc + parse lại khi file thay đổi (aiken build) hoặc đổi network
+    blueprint_path = os.path.abspath(blueprint_path)
+    return _load_scripts(blueprint_path, os.path.getmtime(blueprint_path), get_network())
+
+@lru_cache(maxsize=8)
+def _load_scripts(blueprint_path: str, mtime: float, network: Network) -> tuple:
     mint_script = load_mint_script(blueprint_path)
     store_script = load_store_script(blueprint_path)
     policy_id = get_policy_id(mint_script)
-    network = get_network()
     store_address = get_script_address(store_script, network)
 
     return mint_script, store_script, policy_id, store_address
@@ -122,6 +160,7 @@ def mint_cip68_token(
     token_name: str,
     description: str,
     blueprint_path: str = None,
+    reference_scripts: Optional[ReferenceScripts] = None,
 )-> dict:
     """
     Mint một CIP-68 Dynamic NFT.
@@ -137,6 +176,8 @@ def mint_cip68_token(
         token_name: Tên token (sẽ được thêm prefix)
         description: Mô tả ban đầu của NFT
         blueprint_path: Path to plutus.json (optional)
+        reference_scripts: UTxO reference script (load_reference_scripts); có thì
+            tham chiếu script qua reference input thay vì đính kèm script
         
     Returns:
         Dict with tx_hash, policy_id, and asset info
@@ -185,7 +226,9 @@ def mint_cip68_token(
     builder.add_input_address(owner_address)
      # Mint tokens
     builder.mint = mint_assets
-    builder.add_minting_script(mint_script, redeemer=redeemer)
+    builder.add_minting_script(
+        script_source(mint_script, reference_scripts and reference_scripts.mint), redeemer=redeemer
+    )
      # Output: Reference token đến store script với datum
     builder.add_output(
         TransactionOutput(
@@ -232,6 +275,7 @@ def update_metadata(
     token_name: str,
     new_description: str,
     blueprint_path: str = None,
+    reference_scripts: Optional[ReferenceScripts] = None,
 ) -> dict:
     """
     Update metadata của một CIP-68 NFT.
@@ -247,6 +291,8 @@ def update_metadata(
         token_name: Tên token
         new_description: Mô tả mới
         blueprint_path: Path to plutus.json (optional)
+        reference_scripts: UTxO reference script (load_reference_scripts); có thì
+            tham chiếu script qua reference input thay vì đính kèm script
         
     Returns:
         Dict with tx_hash and updated info
@@ -263,28 +309,20 @@ def update_metadata(
     token_name_bytes = token_name.encode('utf-8')
     ref_asset_name = AssetName(CIP68_REFERENCE_PREFIX + token_name_bytes)
 
-    # Tìm UTxO chứa reference token
-    utxos = context.utxos(store_address)
-    ref_utxo = None
-    for utxo in utxos:
-        if utxo.output.amount.multi_asset:
-            for pid, assets in utxo.output.amount.multi_asset.items():
-                if pid == policy_id and ref_asset_name in assets:
-                    ref_utxo = utxo
-                    break
-    if not ref_utxo:
+    # Tìm UTxO chứa reference token (hỏi thẳng vị trí asset, không quét store address)
+    ref_utxo = find_asset_utxo(context, policy_id, ref_asset_name)
+    if not ref_utxo or str(ref_utxo.output.address) != str(store_address):
         raise ValueError("Không tìm thấy reference token UTxO!")
     
-    # Xử lý datum để lấy ra pkh owner
-    current_datum = ref_utxo.output.datum
-    if isinstance(current_datum, CIP68Datum):
-        current_owner = extract_owner_from_datum(current_datum)
-        if current_owner != owner_pkh:
-            raise ValueError("Bạn không phải owner của NFT này!")
-        new_version = current_datum.version + 1
-    else:
-        # Try to parse from raw data
-        new_version = 2
+    # Xử lý datum để lấy ra pkh owner (Blockfrost trả inline datum dạng RawCBOR)
+    # Không giải mã được datum thì không kiểm tra được owner: từ chối thay vì bỏ qua
+    current_datum = decode_cip68_datum(ref_utxo.output.datum)
+    if current_datum is None:
+        raise ValueError("Không giải mã được datum của reference token!")
+    current_owner = extract_owner_from_datum(current_datum)
+    if current_owner != owner_pkh:
+        raise ValueError("Bạn không phải owner của NFT này!")
+    new_version = current_datum.version + 1
     # Tạo datum mới - giữ nguyên policy_id, asset_name, owner
     new_datum = create_cip68_datum(
         policy_id=policy_id_bytes,
@@ -302,7 +340,7 @@ def update_metadata(
     # Spend reference token UTxO
     builder.add_script_input(
         ref_utxo,
-        store_script,
+        script_source(store_script, reference_scripts and reference_scripts.store),
         redeemer=redeemer
     )
     # Output: Reference token trở lại store script với datum mới
@@ -341,13 +379,97 @@ def update_metadata(
         "new_version": new_version,
     }
 
+# Hàm update metadata của nhiều CIP-68 token, gộp nhiều reference token vào mỗi transaction
+def update_metadata_batch(
+    context: BlockFrostChainContext,
+    payment_skey: PaymentSigningKey,
+    payment_vkey: PaymentVerificationKey,
+    owner_address: Address,
+    updates: List[tuple],
+    blueprint_path: str = None,
+    reference_scripts: Optional[ReferenceScripts] = None,
+    max_items_per_tx: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    index: Optional[ReferenceTokenIndex] = None,
+) -> List[dict]:
+    """
+    Update metadata của nhiều CIP-68 NFT với ít transaction nhất (xem cip68_batch.py).
+
+    Mỗi transaction tiêu nhiều reference UTxO (mỗi UTxO một redeemer
+    UpdateMetadata), chia theo max tx size và tổng ex-units. Owner của mọi
+    token được kiểm tra từ datum trước khi build; một token sai là cả batch
+    bị từ chối. Reference UTxO của mọi token được tra trong `index`, hoặc
+    trong một lần đọc store address (không tra từng asset).
+
+    Args:
+        context: BlockFrost chain context
+        payment_skey: Payment signing key
+        payment_vkey: Payment verification key
+        owner_address: Địa chỉ của owner
+        updates: Danh sách (token_name, new_description)
+        blueprint_path: Path to plutus.json (optional)
+        reference_scripts: UTxO reference script (load_reference_scripts)
+        max_items_per_tx: Giới hạn số token mỗi transaction (optional)
+        progress: Callback (đã update, tổng, BatchTx) sau mỗi transaction
+        index: ReferenceTokenIndex của store address đã sẵn sàng (tuỳ chọn)
+
+    Returns:
+        List dict (tx_hash, token_names, fee, size) theo thứ tự submit
+    """
+    mint_script, store_script, policy_id, store_address = get_scripts(blueprint_path)
+    templates = CIP68TxTemplates(mint_script, store_script, get_network(), reference_scripts)
+    owner_pkh = bytes(payment_vkey.hash())
+    policy_id_bytes = bytes(policy_id)
+    if index is None or not index.ready:
+        index = ReferenceTokenIndex(policy_id, store_address)
+        index.load(context.utxos(store_address))
+    items = []
+    missing = []
+    for token_name, new_description in updates:
+        token_name_bytes = token_name.encode('utf-8') if isinstance(token_name, str) else token_name
+        entry = index.get(token_name_bytes)
+        if entry is None:
+            missing.append(token_name_bytes.decode('utf-8', errors='replace'))
+            continue
+        ref_utxo = entry.utxo
+        # Datum không giải mã được sẽ bị CIP68BatchUpdater từ chối
+        current_datum = entry.datum
+        new_version = current_datum.version + 1 if current_datum is not None else 2
+        items.append((ref_utxo, token_name_bytes, create_cip68_datum(
+            policy_id=policy_id_bytes,
+            asset_name=token_name_bytes,
+            owner_pkh=owner_pkh,
+            metadata=new_description,
+            version=new_version
+        )))
+    if missing:
+        raise ValueError(f"Không tìm thấy reference token UTxO: {', '.join(missing)}")
+
+    results = []
+    updater = CIP68BatchUpdater(templates, max_items_per_tx=max_items_per_tx)
+    for batch_tx in updater.plan(context, owner_address, items, progress=progress):
+        tx = batch_tx.tx
+        tx.transaction_witness_set.vkey_witnesses = [
+            VerificationKeyWitness(payment_vkey, payment_skey.sign(tx.transaction_body.hash()))
+        ]
+        tx_hash = context.submit_tx(tx)
+        print(f"Batch update submitted: {tx_hash} ({len(batch_tx.token_names)} NFT)")
+        results.append({
+            "tx_hash": str(tx_hash),
+            "token_names": [name.decode('utf-8') for name in batch_tx.token_names],
+            "fee": batch_tx.fee,
+            "size": batch_tx.size,
+        })
+    return results
+
 def burn_cip68_token(
     context: BlockFrostChainContext,
     payment_skey: PaymentSigningKey,
     payment_vkey: PaymentVerificationKey,
     owner_address: Address,
     token_name: str,
-    blueprint_path: str = None,    
+    blueprint_path: str = None,
+    reference_scripts: Optional[ReferenceScripts] = None,
 )-> dict:
     """
     Burn một CIP-68 NFT (cả reference token và user token).
@@ -362,6 +484,8 @@ def burn_cip68_token(
         owner_address: Địa chỉ của owner
         token_name: Tên token
         blueprint_path: Path to plutus.json (optional)
+        reference_scripts: UTxO reference script (load_reference_scripts); có thì
+            tham chiếu script qua reference input thay vì đính kèm script
         
     Returns:
         Dict with tx_hash and burn info
@@ -375,34 +499,24 @@ def burn_cip68_token(
     token_name_bytes = token_name.encode('utf-8')
     ref_asset_name, user_asset_name = create_cip68_asset_names(token_name_bytes)
 
-    # Tìm UTxO chứa reference token
-    store_utxos = context.utxos(store_address)
-    ref_utxo = None
-    for utxo in store_utxos:
-        if utxo.output.amount.multi_asset:
-            for pid, assets in utxo.output.amount.multi_asset.items():
-                if pid == policy_id and ref_asset_name in assets:
-                    ref_utxo = utxo
-                    break
-    if not ref_utxo:
+    # Tìm UTxO chứa reference token (hỏi thẳng vị trí asset, không quét store address)
+    ref_utxo = find_asset_utxo(context, policy_id, ref_asset_name)
+    if not ref_utxo or str(ref_utxo.output.address) != str(store_address):
         raise ValueError("Không tìm thấy reference token UTxO!")
     # Verify owner from datum
 
-    current_datum = ref_utxo.output.datum
-    if isinstance(current_datum, CIP68Datum):
-        current_owner = extract_owner_from_datum(current_datum)
-        if current_owner != owner_pkh:
-            raise ValueError("Bạn không phải owner của NFT này!")
-        
-    # Tìm UTxO chứa user token trong ví owner
-    owner_utxos = context.utxos(owner_address)
-    user_utxo = None
-    for utxo in owner_utxos:
-        if utxo.output.amount.multi_asset:
-            for pid, assets in utxo.output.amount.multi_asset.items():
-                if pid == policy_id and user_asset_name in assets:
-                    user_utxo = utxo
-                    break
+    # Không giải mã được datum thì không kiểm tra được owner: từ chối thay vì bỏ qua
+    current_datum = decode_cip68_datum(ref_utxo.output.datum)
+    if current_datum is None:
+        raise ValueError("Không giải mã được datum của reference token!")
+    current_owner = extract_owner_from_datum(current_datum)
+    if current_owner != owner_pkh:
+        raise ValueError("Bạn không phải owner của NFT này!")
+
+    # Tìm UTxO chứa user token, phải thuộc ví owner (cùng payment key)
+    user_utxo = find_asset_utxo(context, policy_id, user_asset_name)
+    if user_utxo and user_utxo.output.address.payment_part != owner_address.payment_part:
+        user_utxo = None
     if not user_utxo:
         raise ValueError("Không tìm thấy user token UTxO!")
     
@@ -423,7 +537,7 @@ def burn_cip68_token(
     # Spend reference token UTxO
     builder.add_script_input(
         ref_utxo,
-        store_script,
+        script_source(store_script, reference_scripts and reference_scripts.store),
         redeemer=spend_redeemer
     )
      # Add user token input
@@ -431,7 +545,9 @@ def burn_cip68_token(
 
     # Burn tokens
     builder.mint = burn_assets
-    builder.add_minting_script(mint_script, redeemer=mint_redeemer)
+    builder.add_minting_script(
+        script_source(mint_script, reference_scripts and reference_scripts.mint), redeemer=mint_redeemer
+    )
     # Required signers
     builder.required_signers = [payment_vkey.hash()]
 
@@ -453,56 +569,60 @@ def burn_cip68_token(
     }
 # list token khi cần thiết
 
-def list_all_tokens (context, user_address_str, store_address):
-    # Định nghĩa prefix chuẩn theo CIP-68 (dạng bytes)
-    REF_PREFIX = bytes.fromhex("000643b0")  # (100)
-    USER_PREFIX = bytes.fromhex("000de140") # (222)
+def list_all_tokens(
+    context,
+    user_address_str,
+    store_address,
+    index: Optional[ReferenceTokenIndex] = None,
+    policy_id: Optional[ScriptHash] = None,
+):
+    """
+    Liệt kê các CIP-68 NFT mà ví đang giữ user token, kèm metadata hiện tại.
+
+    Chỉ duyệt UTxO của ví; reference token của từng NFT được tra theo tên
+    (qua `index` nếu có, nếu không thì hỏi thẳng vị trí asset), nên thời gian
+    tỉ lệ với số token của ví chứ không với số UTxO tại store address.
+
+    Args:
+        context: Chain context
+        user_address_str: Địa chỉ ví
+        store_address: Địa chỉ store script
+        index: ReferenceTokenIndex của store address (tuỳ chọn)
+        policy_id: Policy ID của bộ sưu tập (mặc định lấy từ blueprint qua get_scripts)
+    """
+    if policy_id is None:
+        policy_id = index.policy_id if index is not None else get_scripts()[2]
     user_tokens_list = []
-    holding_token_names = set()
 
-    # BƯỚC 1: Lấy danh sách tên token trong ví User
-    user_utxos = context.utxos(user_address_str)
-    for utxo in user_utxos:
-        for pid, assets in utxo.output.amount.multi_asset.items():
-            for asset_name, qty in assets.items():
-                if qty > 0 and asset_name.payload.startswith(USER_PREFIX):
-                    # Lấy phần tên sau prefix (222)
-                    base_name = asset_name.payload[len(USER_PREFIX):]
-                    holding_token_names.add(base_name)
+    # BƯỚC 1: Lấy danh sách tên token (222) trong ví User
+    holding_token_names = set()
+    for utxo in context.utxos(user_address_str):
+        assets = utxo.output.amount.multi_asset.get(policy_id, {})
+        for asset_name, qty in assets.items():
+            if qty > 0 and asset_name.payload.startswith(CIP68_USER_PREFIX):
+                # Lấy phần tên sau prefix (222)
+                holding_token_names.add(asset_name.payload[len(CIP68_USER_PREFIX):])
     print(f"User đang giữ các base names: {holding_token_names}")
-    # BƯỚC 2: Tìm Reference Token tương ứng trong Store
-    store_utxos = context.utxos(store_address)
-    for utxo in store_utxos:
-        for pid, assets in utxo.output.amount.multi_asset.items():
-            for asset_name, qty in assets.items():
-                if asset_name.payload.startswith(REF_PREFIX):
-                     # Lấy phần tên sau prefix (100)
-                    base_name = asset_name.payload[len(REF_PREFIX):]
-                    if base_name in holding_token_names:
-                        # Giải mã Datum
-                        try:
-                            # Sử dụng PlutusData.from_cbor trực tiếp từ RawCBOR
-                            raw_datum = utxo.output.datum
-                            if hasattr(raw_datum, 'cbor'):
-                                datum = CIP68Datum.from_cbor(raw_datum.cbor)
-
-                            else:
-                                datum = CIP68Datum.from_cbor(raw_datum)
-
-                            # Build thông tin trả về
-                            meta_dict = {}
-                            for k, v in datum.metadata.items():
-                                key = k.decode() if isinstance(k, bytes) else str(k)
-                                val = v.decode() if isinstance(v, bytes) else str(v)
-                                meta_dict[key] = val
-                            user_tokens_list.append({
-                                "token_name": base_name.decode(),
-                                "policy_id": pid.payload.hex(),
-                                "metadata": meta_dict,
-                                "version": datum.version})
-                        except Exception as e:
-                            print(f"Lỗi parse datum cho {base_name}: {e}")
 
+    # BƯỚC 2: Tìm Reference Token (100) tương ứng theo tên
+    for base_name in sorted(holding_token_names):
+        if index is not None:
+            entry = index.get(base_name)
+            ref_utxo = entry.utxo if entry else None
+        else:
+            ref_utxo = find_asset_utxo(context, policy_id, AssetName(CIP68_REFERENCE_PREFIX + base_name))
+        if not ref_utxo or str(ref_utxo.output.address) != str(store_address):
+            continue
+        # Giải mã Datum qua cache (datum của UTxO chưa tiêu không đổi)
+        decoded = decode_datum_cached(ref_utxo.output.datum)
+        if decoded is None:
+            print(f"Lỗi parse datum cho {base_name}")
+            continue
+        user_tokens_list.append({
+            "token_name": base_name.decode(),
+            "policy_id": policy_id.payload.hex(),
+            "metadata": dict(decoded.metadata),
+            "version": decoded.datum.version})
 
     return user_tokens_list
 
@@ -0,0 +1,146 @@
+"""
+CIP-68 Reference Scripts
+========================
+Deploy mint script và store script một lần vào UTxO mang reference script,
+sau đó transaction mint / update / burn chỉ tham chiếu các UTxO đó
+(reference input) thay vì đính kèm toàn bộ bytes của script.
+
+Thông tin deploy (UTxO đầy đủ ở dạng CBOR) được lưu ra file JSON nên lúc
+build không cần hỏi lại Blockfrost; `load_reference_scripts` có thể kiểm tra
+các UTxO vẫn còn (chưa bị tiêu) nếu truyền context.
+
+Mặc định script được khoá tại chính địa chỉ ví deploy: coin selection của
+PyCardano bỏ qua UTxO có script nên chúng không bị tiêu nhầm khi build.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+
+from pycardano import (
+    Address,
+    ChainContext,
+    PaymentSigningKey,
+    PlutusV3Script,
+    TransactionBuilder,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    plutus_script_hash,
+)
+
+from .cip68_utils import with_min_lovelace
+
+# File lưu thông tin deploy (ghi đè bằng CIP68_REFERENCE_SCRIPTS)
+REFERENCE_SCRIPTS_FILE = os.getenv(
+    "CIP68_REFERENCE_SCRIPTS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reference_scripts.json"),
+)
+
+
+@dataclass
+class ReferenceScripts:
+    """UTxO đang giữ reference script của mint policy và store validator."""
+
+    mint: UTxO
+    store: UTxO
+
+    def to_dict(self) -> dict:
+        return {
+            "mint": {"utxo": str(self.mint.input), "script_hash": str(plutus_script_hash(self.mint.output.script)),
+                     "cbor": self.mint.to_cbor_hex()},
+            "store": {"utxo": str(self.store.input), "script_hash": str(plutus_script_hash(self.store.output.script)),
+                      "cbor": self.store.to_cbor_hex()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ReferenceScripts":
+        return cls(UTxO.from_cbor(data["mint"]["cbor"]), UTxO.from_cbor(data["store"]["cbor"]))
+
+    def save(self, path: str = REFERENCE_SCRIPTS_FILE):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def matches(self, mint_script: PlutusV3Script, store_script: PlutusV3Script) -> bool:
+        """Reference script có đúng là hai script đang dùng (vd: blueprint chưa bị build lại)."""
+        return (
+            plutus_script_hash(self.mint.output.script) == plutus_script_hash(mint_script)
+            and plutus_script_hash(self.store.output.script) == plutus_script_hash(store_script)
+        )
+
+    def unspent_in(self, utxos: Iterable[UTxO]) -> bool:
+        """Cả hai UTxO còn trong danh sách UTxO hiện tại của địa chỉ khoá."""
+        inputs = {utxo.input for utxo in utxos}
+        return self.mint.input in inputs and self.store.input in inputs
+
+    @property
+    def address(self) -> Address:
+        return self.mint.output.address
+
+
+def reference_script_output(address: Address, script: PlutusV3Script, context: ChainContext) -> TransactionOutput:
+    """Output khoá `script` tại `address`, lovelace = min-ADA của chính output đó."""
+    return with_min_lovelace(TransactionOutput(address, 0, script=script), context)
+
+
+def build_deploy_tx(
+    context: ChainContext,
+    address: Address,
+    mint_script: PlutusV3Script,
+    store_script: PlutusV3Script,
+    lock_address: Optional[Address] = None,
+) -> TransactionBuilder:
+    """Transaction tạo 2 UTxO reference script (mint ở output #0, store ở output #1)."""
+    lock_address = lock_address or address
+    builder = TransactionBuilder(context)
+    builder.add_input_address(address)
+    builder.add_output(reference_script_output(lock_address, mint_script, context))
+    builder.add_output(reference_script_output(lock_address, store_script, context))
+    return builder
+
+
+def deploy_reference_scripts(
+    context: ChainContext,
+    payment_skey: PaymentSigningKey,
+    address: Address,
+    mint_script: PlutusV3Script,
+    store_script: PlutusV3Script,
+    lock_address: Optional[Address] = None,
+) -> ReferenceScripts:
+    """
+    Ký + submit transaction deploy, trả về ReferenceScripts (UTxO của tx vừa submit).
+
+    UTxO chỉ dùng được sau khi transaction được xác nhận.
+    """
+    builder = build_deploy_tx(context, address, mint_script, store_script, lock_address)
+    signed_tx = builder.build_and_sign(signing_keys=[payment_skey], change_address=address)
+    context.submit_tx(signed_tx)
+    tx_id = signed_tx.id
+    outputs = signed_tx.transaction_body.outputs
+    return ReferenceScripts(
+        UTxO(TransactionInput(tx_id, 0), outputs[0]),
+        UTxO(TransactionInput(tx_id, 1), outputs[1]),
+    )
+
+
+def load_reference_scripts(
+    path: str = REFERENCE_SCRIPTS_FILE,
+    context: Optional[ChainContext] = None,
+) -> Optional[ReferenceScripts]:
+    """
+    Đọc thông tin deploy; None nếu chưa deploy.
+
+    Nếu truyền `context`, raise ValueError khi UTxO reference script đã bị tiêu.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        scripts = ReferenceScripts.from_dict(json.load(f))
+    if context is not None and not scripts.unspent_in(context.utxos(scripts.address)):
+        raise ValueError(f"UTxO reference script trong {path} đã bị tiêu, cần deploy lại")
+    return scripts
+
+
+def script_source(script: PlutusV3Script, reference: Optional[UTxO]) -> Union[PlutusV3Script, UTxO]:
+    """Tham số `script` cho add_minting_script / add_script_input: reference UTxO nếu có."""
+    return reference if reference is not None else script
@@ -0,0 +1,216 @@
+"""
+CIP-68 Transaction Templates
+============================
+Dựng TransactionBuilder cho transaction mint / update / burn của một cặp
+script. Mỗi request vẫn dựng một TransactionBuilder mới; template chỉ giữ
+những giá trị không phụ thuộc request, tính một lần khi tạo template
+(lúc backend khởi động):
+- policy ID và store address
+- hai redeemer hằng (UpdateMetadata, BurnReference) ở dạng RawPlutusData
+- (tuỳ chọn) reference script UTxO thay cho bytes của script (cip68_reference_scripts)
+
+Datum và redeemer theo token được chuyển sang RawPlutusData một lần, nên
+các vòng ước lượng fee / ex-units của TransactionBuilder không phải
+serialize lại PlutusData dataclass ở mỗi vòng.
+"""
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from pycardano import (
+    Address,
+    Asset,
+    ChainContext,
+    ExecutionUnits,
+    MultiAsset,
+    Network,
+    PlutusData,
+    PlutusV3Script,
+    RawPlutusData,
+    Redeemer,
+    TransactionBuilder,
+    TransactionOutput,
+    UTxO,
+    Value,
+)
+from .cip68_reference_scripts import ReferenceScripts, script_source
+from .cip68_utils import (
+    BurnReference,
+    BurnToken,
+    MintToken,
+    UpdateMetadata,
+    create_cip68_asset_names,
+    get_policy_id,
+    get_script_address,
+    with_min_lovelace,
+)
+
+# Lovelace khoá cùng reference / user token khi mint
+MIN_TOKEN_OUTPUT_LOVELACE = 2_000_000
+
+
+def raw_plutus_data(data: PlutusData) -> RawPlutusData:
+    """PlutusData → RawPlutusData (cùng bytes CBOR, không cần serialize lại dataclass)."""
+    return RawPlutusData.from_cbor(data.to_cbor())
+
+
+def _remember_utxos(context: ChainContext, utxos: Iterable[UTxO]):
+    """
+    Báo trước UTxO không đi qua `context.utxos` (script input, reference script)
+    cho context evaluate local (LocalEvaluationChainContext.remember_utxos).
+    """
+    remember_utxos = getattr(context, "remember_utxos", None)
+    if remember_utxos is not None:
+        remember_utxos(utxos)
+
+
+class CIP68TxTemplates:
+    """
+    Template cho transaction mint / update / burn của một cặp script.
+
+    Chỉ policy ID, store address, hai redeemer hằng và reference script
+    (nếu có) được tính sẵn; mỗi hàm dựng một TransactionBuilder mới đã điền
+    đủ input/output/mint/redeemer, caller chỉ còn gọi `build`
+    (vd: backend `_build_unsigned_tx`).
+
+    Args:
+        mint_script: Minting policy.
+        store_script: Store validator giữ reference token.
+        network: Network của store address.
+        reference_scripts: UTxO reference script đã deploy; có thì tx tham chiếu
+            script qua reference input thay vì đính kèm script.
+    """
+
+    def __init__(
+        self,
+        mint_script: PlutusV3Script,
+        store_script: PlutusV3Script,
+        network: Network,
+        reference_scripts: Optional[ReferenceScripts] = None,
+    ):
+        self.mint_script = mint_script
+        self.store_script = store_script
+        self.reference_scripts = reference_scripts
+        self.policy_id = get_policy_id(mint_script)
+        self.store_address = get_script_address(store_script, network)
+        self.update_redeemer = raw_plutus_data(UpdateMetadata())
+        self.burn_reference_redeemer = raw_plutus_data(BurnReference())
+
+    def builder(self, context: ChainContext) -> TransactionBuilder:
+        if self.reference_scripts is not None:
+            _remember_utxos(context, [self.reference_scripts.mint, self.reference_scripts.store])
+        return TransactionBuilder(context)
+
+    def _multi_asset(self, assets: Dict) -> MultiAsset:
+        return MultiAsset({self.policy_id: Asset(assets)})
+
+    @property
+    def mint_source(self):
+        return script_source(self.mint_script, self.reference_scripts and self.reference_scripts.mint)
+
+    @property
+    def store_source(self):
+        return script_source(self.store_script, self.reference_scripts and self.reference_scripts.store)
+
+    def mint(
+        self,
+        context: ChainContext,
+        owner_address: Address,
+        token_name: bytes,
+        datum: PlutusData,
+    ) -> TransactionBuilder:
+        """Mint reference token (về store address, kèm datum) + user token (về owner)."""
+        ref_asset_name, user_asset_name = create_cip68_asset_names(token_name)
+        builder = self.builder(context)
+        builder.add_input_address(owner_address)
+        builder.mint = self._multi_asset({ref_asset_name: 1, user_asset_name: 1})
+        builder.add_minting_script(
+            self.mint_source, redeemer=Redeemer(raw_plutus_data(MintToken(token_name=token_name)))
+        )
+        builder.add_output(TransactionOutput(
+            self.store_address,
+            Value(MIN_TOKEN_OUTPUT_LOVELACE, self._multi_asset({ref_asset_name: 1})),
+            datum=raw_plutus_data(datum),
+        ))
+        builder.add_output(TransactionOutput(
+            owner_address,
+            Value(MIN_TOKEN_OUTPUT_LOVELACE, self._multi_asset({user_asset_name: 1})),
+        ))
+        builder.required_signers = [owner_address.payment_part]
+        return builder
+
+    def update(
+        self,
+        context: ChainContext,
+        owner_address: Address,
+        ref_utxo: UTxO,
+        token_name: bytes,
+        datum: PlutusData,
+    ) -> TransactionBuilder:
+        """Tiêu reference UTxO và trả reference token về store address với datum mới."""
+        ref_asset_name, _ = create_cip68_asset_names(token_name)
+        _remember_utxos(context, [ref_utxo])
+        builder = self.builder(context)
+        builder.add_input_address(owner_address)
+        builder.add_script_input(ref_utxo, self.store_source, redeemer=Redeemer(self.update_redeemer))
+        builder.add_output(TransactionOutput(
+            self.store_address,
+            Value(ref_utxo.output.amount.coin, self._multi_asset({ref_asset_name: 1})),
+            datum=raw_plutus_data(datum),
+        ))
+        builder.required_signers = [owner_address.payment_part]
+        return builder
+
+    def update_batch(
+        self,
+        context: ChainContext,
+        owner_address: Address,
+        items: Sequence[Tuple[UTxO, bytes, PlutusData]],
+        ex_units: Optional[ExecutionUnits] = None,
+    ) -> TransactionBuilder:
+        """
+        Cập nhật datum của nhiều reference token trong một transaction.
+
+        Mỗi item (reference UTxO, tên token, datum mới) là một script input
+        với redeemer UpdateMetadata và một output trả reference token về store
+        address (lovelace giữ nguyên, nâng lên min-ADA nếu datum mới lớn hơn).
+        `ex_units` (mỗi redeemer) đặt sẵn thì builder không evaluate.
+        """
+        _remember_utxos(context, [ref_utxo for ref_utxo, _, _ in items])
+        builder = self.builder(context)
+        builder.add_input_address(owner_address)
+        for ref_utxo, token_name, datum in items:
+            ref_asset_name, _ = create_cip68_asset_names(token_name)
+            builder.add_script_input(
+                ref_utxo, self.store_source, redeemer=Redeemer(self.update_redeemer, ex_units=ex_units)
+            )
+            builder.add_output(with_min_lovelace(TransactionOutput(
+                self.store_address,
+                Value(ref_utxo.output.amount.coin, self._multi_asset({ref_asset_name: 1})),
+                datum=raw_plutus_data(datum),
+            ), context))
+        builder.required_signers = [owner_address.payment_part]
+        return builder
+
+    def burn(
+        self,
+        context: ChainContext,
+        owner_address: Address,
+        ref_utxo: UTxO,
+        user_utxo: UTxO,
+        token_name: bytes,
+    ) -> TransactionBuilder:
+        """Tiêu reference UTxO + user token và burn cả hai."""
+        ref_asset_name, user_asset_name = create_cip68_asset_names(token_name)
+        _remember_utxos(context, [ref_utxo, user_utxo])
+        builder = self.builder(context)
+        builder.add_input_address(owner_address)
+        builder.add_script_input(ref_utxo, self.store_source, redeemer=Redeemer(self.burn_reference_redeemer))
+        builder.add_input(user_utxo)
+        builder.mint = self._multi_asset({ref_asset_name: -1, user_asset_name: -1})
+        builder.add_minting_script(
+            self.mint_source, redeemer=Redeemer(raw_plutus_data(BurnToken(token_name=token_name)))
+        )
+        builder.required_signers = [owner_address.payment_part]
+        return builder
+
+    def stats(self) -> Dict[str, bool]:
+        return {"reference_scripts": self.reference_scripts is not None}
@@ -240,6 +240,32 @@ def extract_owner_from_datum(datum: CIP68Datum) -> bytes:
         bytes: Owner's public key hash (28 bytes)
     """
     return datum.owner
+# Giải mã datum của reference token (RawCBOR từ Blockfrost hoặc CIP68Datum có sẵn)
+def decode_cip68_datum(datum: Any) -> Optional[CIP68Datum]:
+    """
+    Giải mã inline datum thành CIP68Datum.
+
+    Args:
+        datum: RawCBOR / bytes CBOR / PlutusData / CIP68Datum / None
+
+    Returns:
+        CIP68Datum, hoặc None nếu không có datum hoặc datum không đúng cấu trúc
+    """
+    if datum is None or isinstance(datum, CIP68Datum):
+        return datum
+    if isinstance(datum, RawCBOR):
+        cbor = datum.cbor
+    elif isinstance(datum, bytes):
+        cbor = datum
+    elif hasattr(datum, "to_cbor"):
+        # RawPlutusData / PlutusData khác (vd: output của Transaction.from_cbor)
+        cbor = datum.to_cbor()
+    else:
+        return None
+    try:
+        return CIP68Datum.from_cbor(cbor)
+    except Exception:
+        return None
 # Lấy address của script từ PlutusV3Script
 def get_script_address(script: PlutusV3Script, network: Network) -> Address:
     """
@@ -253,4 +279,16 @@ def get_script_address(script: PlutusV3Script, network: Network) -> Address:
         Address của script
     """
     script_hash = plutus_script_hash(script)
-    return Address(script_hash, network=network)
\ No newline at end of file
+    return Address(script_hash, network=network)
+
+
+def with_min_lovelace(output: TransactionOutput, context: ChainContext) -> TransactionOutput:
+    """
+    Nâng lovelace của output lên min-ADA nếu cần.
+
+    min-ADA phụ thuộc kích thước output (kể cả trường coin), nên tính lại
+    cho tới khi ổn định.
+    """
+    while output.amount.coin < (required := min_lovelace_post_alonzo(output, context)):
+        output.amount.coin = required
+    return output
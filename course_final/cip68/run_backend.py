@@ -11,6 +11,8 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 
 sys.path.insert(0, project_root)
 sys.path.insert(0, os.path.join(project_root, 'backend'))
+# Repo root: config/ và chain/ dùng chung với các khoá học khác
+sys.path.append(os.path.dirname(os.path.dirname(project_root)))
 import uvicorn
 
 
@@ -43,11 +43,19 @@ Bước 4 : Tạo file .env và điền biến môi trường
 """
 import os
 import sys
+from pathlib import Path
 from blockfrost import BlockFrostApi, ApiError, ApiUrls
 from dotenv import load_dotenv
 from pycardano import *
 import time
 
+# Wire repo root để dùng iter_address_utxos trong chain/utxo_stream.py
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from chain.utxo_stream import iter_address_utxos
+
 # === Bước 1: Cấu hình môi trường ===
 # Tải biến môi trường
 load_dotenv()
@@ -90,17 +98,10 @@ print(f"Main Address: {main_address}")
 api= BlockFrostApi(project_id=blockfrost_api_key, base_url=api_url)
 
 # Lấy tất cả UTxO của địa chỉ main_address
-try: 
-    utxos= api.address_utxos(main_address)
-except Exception as e:
-    if e.status_code == 404:
-        print("Địa chỉ chưa có UTxO nào.")
-        if network == "testnet":
-            print("Vui lòng sử dụng faucet testnet để gửi một ít ADA vào địa chỉ này.")
-        sys.exit(1)
-    else:
-        print(f"Lỗi khi lấy UTxO: {e}")
-        sys.exit(1)
+# Lưu ý: api.address_utxos(main_address) chỉ trả về trang đầu (tối đa 100 UTxO),
+# ví có hàng nghìn UTxO sẽ bị cắt bớt. iter_address_utxos duyệt hết mọi trang,
+# tải trước vài trang song song và trả từng UTxO ngay khi trang về.
+utxos= iter_address_utxos(api, main_address)
 
 # === Bước 4: Xây dựng giao dịch ===
 
@@ -130,48 +131,64 @@ builder= TransactionBuilder(context)
 # Trong TransactionOutput sẽ bao gồm address và value của UTxO
 
 # Duyệt qua tất cả UTxO và thêm vào giao dịch
-print(f"Danh sách UTxO sẽ được gộp: {len(utxos)} UTxOs")
-
-for i, utxo in enumerate(utxos):
-    # in thông tin chi tiết của từng UTxO
-    print(f"\n[{i+1}]/{len(utxos)} UTxO Details: {utxo.tx_hash}# Index{utxo.tx_index}")
-    # Tạo TransactionInput từ tx_hash và tx_index
-    tx_input= TransactionInput.from_primitive([utxo.tx_hash, utxo.tx_index])
-
-    # Xử lý value của UTxO và in chi tiết thông tin tài sản:
-    lovelace_amount= 0
-    multi_asset={}
-    for asset in utxo.amount:
-        if asset.unit == "lovelace":
-            lovelace_amount= int(asset.quantity)
-            print(f" - ADA: {lovelace_amount / 1_000_000} ADA")
-        else:
-            policy_id= asset.unit[:56]
-            asset_name= asset.unit[56:]
-            quantity= int(asset.quantity)
+# (số dư được cộng dồn ngay trong vòng lặp, không cần giữ lại danh sách UTxO)
+print("Danh sách UTxO sẽ được gộp:")
+utxo_count= 0
+balance= 0
+
+try:
+    for i, utxo in enumerate(utxos):
+        utxo_count += 1
+        # in thông tin chi tiết của từng UTxO
+        print(f"\n[{i+1}] UTxO Details: {utxo.tx_hash}# Index{utxo.tx_index}")
+        # Tạo TransactionInput từ tx_hash và tx_index
+        tx_input= TransactionInput.from_primitive([utxo.tx_hash, utxo.tx_index])
+
+        # Xử lý value của UTxO và in chi tiết thông tin tài sản:
+        lovelace_amount= 0
+        multi_asset={}
+        for asset in utxo.amount:
+            if asset.unit == "lovelace":
+                lovelace_amount= int(asset.quantity)
+                print(f" - ADA: {lovelace_amount / 1_000_000} ADA")
+            else:
+                policy_id= asset.unit[:56]
+                asset_name= asset.unit[56:]
+                quantity= int(asset.quantity)
             
-            # In thông tin tài sản đa dạng (multi-asset)
-            try:
-                asset_name_str= bytes.fromhex(asset_name).decode("utf-8") # Convert hex to string
-            except:
-                asset_name_str= asset_name  # Nếu không thể decode, giữ nguyên dạng hex
-            print(f" - Asset: {policy_id}.{asset_name_str} - Quantity: {quantity}")
-            # Xây dựng multi_asset dictionary để xử lý value
-            if policy_id not in multi_asset:
-                multi_asset[policy_id]= {}
-            multi_asset[policy_id][asset_name]= quantity
-    # Tạo TransactionOutput từ address và value
-    # Xây dựng value
-    if multi_asset:
-        value = Value.from_primitive([lovelace_amount, multi_asset])
-    else:
-        value = Value.from_primitive([lovelace_amount])
-    # Tạo TransactionOutput
-    tx_output= TransactionOutput(address=main_address, amount=value)
-    # Tạo UTxO từ TransactionInput và TransactionOutput
-    utxo_to_add= UTxO(tx_input, tx_output)
-    # Thêm UTxO vào giao dịch
-    builder.add_input(utxo_to_add)
+                # In thông tin tài sản đa dạng (multi-asset)
+                try:
+                    asset_name_str= bytes.fromhex(asset_name).decode("utf-8") # Convert hex to string
+                except:
+                    asset_name_str= asset_name  # Nếu không thể decode, giữ nguyên dạng hex
+                print(f" - Asset: {policy_id}.{asset_name_str} - Quantity: {quantity}")
+                # Xây dựng multi_asset dictionary để xử lý value
+                if policy_id not in multi_asset:
+                    multi_asset[policy_id]= {}
+                multi_asset[policy_id][asset_name]= quantity
+        # Tạo TransactionOutput từ address và value
+        # Xây dựng value
+        if multi_asset:
+            value = Value.from_primitive([lovelace_amount, multi_asset])
+        else:
+            value = Value.from_primitive([lovelace_amount])
+        # Tạo TransactionOutput
+        tx_output= TransactionOutput(address=main_address, amount=value)
+        # Tạo UTxO từ TransactionInput và TransactionOutput
+        utxo_to_add= UTxO(tx_input, tx_output)
+        # Thêm UTxO vào giao dịch
+        builder.add_input(utxo_to_add)
+        # Cộng dồn số dư ADA
+        balance += lovelace_amount
+except ApiError as e:
+    print(f"Lỗi khi lấy UTxO: {e}")
+    sys.exit(1)
+
+if utxo_count == 0:
+    print("Địa chỉ chưa có UTxO nào.")
+    if network == Network.TESTNET:
+        print("Vui lòng sử dụng faucet testnet để gửi một ít ADA vào địa chỉ này.")
+    sys.exit(1)
 
 # === Bước 5: Thực hiện ký giao dịch và  gửi giao dịch ===
 
@@ -179,11 +196,6 @@ signed_tx= builder.build_and_sign([payment_skey],
                                   change_address=main_address)
 # Hiển thị thông tin giao dịch đã ký
 
-# số dư:
-balance= sum(
-    int(a.quantity) for utxo in utxos for a in utxo.amount if a.unit == "lovelace"
-)
-
 print(f"\nTổng số ADA trong tất cả UTxO: {balance / 1_000_000} ADA")
 print(f"Số lượng UTxO trước khi gộp: {len(signed_tx.transaction_body.inputs)} UTxOs")
 print(f"Số lượng UTxO sau khi gộp: {len(signed_tx.transaction_body.outputs)} UTxOs")
@@ -221,9 +233,9 @@ if wait_for_tx(tx_id):
     time.sleep(20)
     # Lấy lại UTxO của địa chỉ sau khi giao dịch hoàn tất
     try:
-        new_utxos= api.address_utxos(main_address)
-        print(f"Số lượng UTxO hiện tại sau khi gộp: {len(new_utxos)} UTxOs")
-        for utxo in new_utxos:
+        new_utxo_count= 0
+        for utxo in iter_address_utxos(api, main_address):
+            new_utxo_count += 1
             print(f" - UTxO: {utxo.tx_hash}# Index{utxo.tx_index}")
             total_ada= 0
             print("   Tài sản bên trong:")
@@ -241,6 +253,7 @@ if wait_for_tx(tx_id):
                     except:
                         asset_name_str= asset_name  # Nếu không thể decode, giữ nguyên dạng hex
                     print(f"     - Asset: {policy_id}.{asset_name_str} - Quantity: {quantity}")
+        print(f"Số lượng UTxO hiện tại sau khi gộp: {new_utxo_count} UTxOs")
     except Exception as e:
         print(f"Lỗi khi lấy UTxO sau giao dịch: {e}")
 else:
@@ -7,7 +7,9 @@ import time
 from typing import Optional
 from pycardano import TransactionBuilder, TransactionOutput, Value
 from pycardano.utils import min_lovelace
+from chain.utxo_stream import iter_utxos
 from config.blockfrost import get_blockfrost_context
+from config.settings import UTXO_PAGE_CONCURRENCY
 from wallet.wallet_manager import WalletManager
 from config.logging_config import logger
 
@@ -15,7 +17,7 @@ from config.logging_config import logger
 class ConsolidationService:
     def __init__(self, wallet: Optional[WalletManager] = None):
         self.wallet = wallet or WalletManager()
-        self.context = get_blockfrost_context()
+        self.context = get_blockfrost_context(self.wallet.network_name)
         logger.info("✅ ConsolidationService (Auto min ADA, safe mode)")
 
     def consolidate(self, min_utxo_threshold: int = 5, wait_confirm: bool = True) -> Optional[str]:
@@ -27,14 +29,18 @@ class ConsolidationService:
             wait_confirm: có chờ transaction confirm on-chain không
         """
         address = self.wallet.get_address()
-        utxos = self.context.utxos(address)
-        logger.info(f"🔍 Có {len(utxos)} UTXO tại {str(address)[:20]}...")
-
-        if len(utxos) < min_utxo_threshold:
+        # Đếm + cộng số dư theo từng trang UTxO thay vì giữ cả danh sách
+        utxo_count = 0
+        total_lovelace = 0
+        for utxo in iter_utxos(self.context, address, concurrency=UTXO_PAGE_CONCURRENCY):
+            utxo_count += 1
+            total_lovelace += utxo.output.amount.coin
+        logger.info(f"🔍 Có {utxo_count} UTXO tại {str(address)[:20]}...")
+
+        if utxo_count < min_utxo_threshold:
             logger.warning(f"⚠️ Ít hơn {min_utxo_threshold} UTXO, bỏ qua.")
             return None
 
-        total_lovelace = sum(u.output.amount.coin for u in utxos)
         logger.info(f"💰 Tổng số dư: {total_lovelace / 1_000_000:.6f} ADA")
 
         # Khởi tạo transaction
@@ -7,8 +7,9 @@ from pycardano import (
     Address, TransactionBuilder, TransactionOutput, PaymentSigningKey,
     PaymentVerificationKey, Value, MultiAsset, AssetName, ScriptPubkey,
     ScriptAll, NativeScript, AuxiliaryData, AlonzoMetadata, Metadata, UTxO,
-    PaymentKeyPair, BlockFrostChainContext
+    PaymentKeyPair, BlockFrostChainContext, Asset, ScriptHash
 )
+from pycardano.utils import min_lovelace_post_alonzo
 from config.blockfrost import get_blockfrost_context
 from wallet.wallet_manager import WalletManager
 from config.logging_config import logger
@@ -32,7 +33,7 @@ class MintService:
     
     def __init__(self, wallet: Optional[WalletManager] = None):
         self.wallet = wallet or WalletManager()
-        self.context = get_blockfrost_context()
+        self.context = get_blockfrost_context(self.wallet.network_name)
         self.payment_skey = self.wallet.get_signing_key()
         self.payment_vkey = PaymentVerificationKey.from_signing_key(self.payment_skey)
         self.address = ensure_address(self.wallet.get_address())
@@ -80,8 +81,8 @@ class MintService:
 
     def _select_utxo_for_burn(self, policy_id: str, token_name: str, amount: int):
         """Chọn UTxO chứa asset cần burn."""
-        policy_hash = bytes.fromhex(policy_id)
-        asset_name_bytes = token_name.encode("utf-8")
+        policy_hash = ScriptHash(bytes.fromhex(policy_id))
+        asset_name_bytes = AssetName(token_name.encode("utf-8"))
         for utxo in self.utxos:
             assets = utxo.output.amount.multi_asset
             if assets and policy_hash in assets and asset_name_bytes in assets[policy_hash] and assets[policy_hash][asset_name_bytes] >= amount:
@@ -118,7 +119,7 @@ class MintService:
             })
 
             # Tính min ADA và thêm output
-            min_ada = self.context.min_lovelace(TransactionOutput(self.address, multi_asset))
+            min_ada = min_lovelace_post_alonzo(TransactionOutput(self.address, Value(0, multi_asset)), self.context)
             builder.add_output(TransactionOutput(self.address, Value(min_ada, multi_asset)))
 
             # Thêm metadata
@@ -147,7 +148,6 @@ class MintService:
             builder.native_scripts = [policy_script]
             builder.required_signers = [self.policy_vkey.hash()]
             builder.ttl = self.context.last_block_slot + 3600
-            builder.add_change_if_needed(self.address)
 
             # Ký và submit
             signed_tx = builder.build_and_sign([self.payment_skey, self.policy_skey], change_address=self.address)
@@ -159,7 +159,7 @@ class MintService:
             with open(f"data/policies/{policy_id}.policy", "w") as f:
                 f.write(policy_script.to_cbor_hex())
 
-            logger.success(f"✅ Minted {amount} {token_name} ({'NFT' if is_nft else 'FT'})! Tx ID: {tx_id}")
+            logger.info(f"✅ Minted {amount} {token_name} ({'NFT' if is_nft else 'FT'})! Tx ID: {tx_id}")
             logger.info(f"🧱 Policy ID: {policy_id} | Asset name (hex): {asset_name.payload.hex()}")
             return tx_id
 
@@ -191,10 +191,10 @@ class MintService:
                     k: v.encode("utf-8", errors="replace").decode("utf-8") if isinstance(v, str) else v
                     for k, v in asset.items()
                 }
-            multi_asset[bytes.fromhex(policy_id)] = my_asset
+            multi_asset[ScriptHash(bytes.fromhex(policy_id))] = my_asset
 
             # Tính min ADA và thêm output
-            min_ada = self.context.min_lovelace(TransactionOutput(self.address, multi_asset))
+            min_ada = min_lovelace_post_alonzo(TransactionOutput(self.address, Value(0, multi_asset)), self.context)
             builder.add_output(TransactionOutput(self.address, Value(min_ada, multi_asset)))
 
             # Thêm metadata CIP-25
@@ -207,7 +207,6 @@ class MintService:
             builder.native_scripts = [policy_script]
             builder.required_signers = [self.policy_vkey.hash()]
             builder.ttl = self.context.last_block_slot + 3600
-            builder.add_change_if_needed(self.address)
 
             # Ký và submit
             signed_tx = builder.build_and_sign([self.payment_skey, self.policy_skey], change_address=self.address)
@@ -219,7 +218,7 @@ class MintService:
             with open(f"data/policies/{policy_id}.policy", "w") as f:
                 f.write(policy_script.to_cbor_hex())
 
-            logger.success(f"✅ Minted {len(assets)} NFTs! Tx ID: {tx_id}")
+            logger.info(f"✅ Minted {len(assets)} NFTs! Tx ID: {tx_id}")
             logger.info(f"🧱 Policy ID: {policy_id}")
             return tx_id
 
@@ -245,6 +244,8 @@ class MintService:
 
             builder = TransactionBuilder(self.context)
             builder.add_input(self._select_utxo_for_burn(policy_id, token_name, amount))
+            # UTxO chứa token thường chỉ có min ADA: thêm một UTxO ADA thuần để trả phí + min ADA cho change
+            builder.add_input(self._select_utxo_for_input())
 
             # Tạo multi-asset để burn
             asset_name = AssetName(token_name.encode("utf-8"))
@@ -256,7 +257,6 @@ class MintService:
             builder.native_scripts = [policy_script]
             builder.required_signers = [self.policy_vkey.hash()]
             builder.ttl = self.context.last_block_slot + 3600
-            builder.add_change_if_needed(self.address)
 
             # Ký và submit
             signed_tx = builder.build_and_sign([self.payment_skey, self.policy_skey], change_address=self.address)
@@ -24,6 +24,9 @@ from pycardano import (
     InvalidHereAfter,
     ScriptAll,
     NativeScript,
+    AuxiliaryData,
+    AlonzoMetadata,
+    Metadata,
 )
 from config.blockfrost import get_blockfrost_context
 from wallet.wallet_manager import WalletManager
@@ -37,7 +40,7 @@ class NFTService:
 
     def __init__(self, wallet: Optional[WalletManager] = None):
         self.wallet = wallet or WalletManager()
-        self.context = get_blockfrost_context()
+        self.context = get_blockfrost_context(self.wallet.network_name)
         logger.info("✅ NFTService đã được khởi tạo.")
 
     # ======================================================================
@@ -47,7 +50,7 @@ class NFTService:
         policy_skey = PaymentSigningKey.generate()
         policy_vkey = PaymentVerificationKey.from_signing_key(policy_skey)
 
-        slot = self.context.last_block_slot() + expire_in_minutes * 60
+        slot = self.context.last_block_slot + expire_in_minutes * 60
         script_pubkey = ScriptPubkey(policy_vkey.hash())
         timelock = InvalidHereAfter(slot)
         policy_script = ScriptAll([script_pubkey, timelock])
@@ -106,15 +109,15 @@ class NFTService:
         builder.add_output(TransactionOutput(sender_addr, Value(2_000_000, multi_asset)))
         builder.mint = multi_asset
         builder.native_scripts = [policy_script]
-        builder.auxiliary_data = full_metadata
+        builder.auxiliary_data = AuxiliaryData(AlonzoMetadata(metadata=Metadata(full_metadata)))
 
         signed_tx = builder.build_and_sign(
             [self.wallet.get_signing_key(), policy_skey],
-            self.wallet.get_verify_key()
+            change_address=sender_addr
         )
 
         tx_id = self.context.submit_tx(signed_tx.to_cbor())
-        logger.success(f"✅ Mint NFT {nft_name} thành công! Tx: {tx_id}")
+        logger.info(f"✅ Mint NFT {nft_name} thành công! Tx: {tx_id}")
         return tx_id
 
     # ======================================================================
@@ -155,15 +158,15 @@ class NFTService:
         builder.add_output(TransactionOutput(sender_addr, Value(2_000_000, multi_asset)))
         builder.mint = multi_asset
         builder.native_scripts = [policy_script]
-        builder.auxiliary_data = cip68_metadata
+        builder.auxiliary_data = AuxiliaryData(AlonzoMetadata(metadata=Metadata(cip68_metadata)))
 
         signed_tx = builder.build_and_sign(
             [self.wallet.get_signing_key(), policy_skey],
-            self.wallet.get_verify_key()
+            change_address=sender_addr
         )
 
         tx_id = self.context.submit_tx(signed_tx.to_cbor())
-        logger.success(f"🧠 Mint Dynamic NFT {nft_name} thành công! Tx: {tx_id}")
+        logger.info(f"🧠 Mint Dynamic NFT {nft_name} thành công! Tx: {tx_id}")
         return tx_id
 
     # ======================================================================
@@ -193,11 +196,11 @@ class NFTService:
             }
         }
 
-        builder.auxiliary_data = update_metadata
+        builder.auxiliary_data = AuxiliaryData(AlonzoMetadata(metadata=Metadata(update_metadata)))
 
         signed_tx = builder.build_and_sign(
             [self.wallet.get_signing_key()],
-            self.wallet.get_verify_key()
+            change_address=sender_addr
         )
 
         tx_id = self.context.submit_tx(signed_tx.to_cbor())
@@ -239,7 +242,7 @@ class NFTService:
 
         signed_tx = builder.build_and_sign(
             [self.wallet.get_signing_key()],
-            self.wallet.get_verify_key()
+            change_address=sender_addr
         )
 
         tx_id = self.context.submit_tx(signed_tx.to_cbor())
@@ -9,6 +9,9 @@ Các hàm tiện ích để truy vấn dữ liệu từ blockchain:
 
 from typing import Optional, Dict, Any, List
 from pycardano import Address, Value
+from chain.scheduler import background
+from chain.utxo_stream import iter_utxos
+from config.settings import UTXO_PAGE_CONCURRENCY
 from config.blockfrost import get_blockfrost_context
 from wallet.wallet_manager import WalletManager
 from config.logging_config import logger
@@ -21,7 +24,7 @@ class QueryService:
 
     def __init__(self, wallet: Optional[WalletManager] = None):
         self.wallet = wallet or WalletManager()
-        self.context = get_blockfrost_context()
+        self.context = get_blockfrost_context(self.wallet.network_name)
         logger.info("✅ QueryService đã được khởi tạo.")
 
     def get_address_info(self, address: Optional[str] = None) -> Dict[str, Any]:
@@ -35,18 +38,19 @@ class QueryService:
             dict chứa số dư ADA và token list.
         """
         addr = address or self.wallet.get_address_bech32()
-        utxos = self.context.utxos(addr)
-
         total_ada = 0
         tokens = {}
 
-        for utxo in utxos:
-            total_ada += utxo.output.amount.coin
-            if utxo.output.amount.multi_asset:
-                for policy_id, assets in utxo.output.amount.multi_asset.items():
-                    for asset_name, qty in assets.items():
-                        token_id = f"{policy_id.hex()}:{asset_name.decode('utf-8')}"
-                        tokens[token_id] = tokens.get(token_id, 0) + qty
+        # Truy vấn số dư là lời gọi nền: nhường rate limit cho submit/build.
+        # Cộng dồn theo từng trang UTxO, không giữ cả danh sách trong bộ nhớ.
+        with background():
+            for utxo in iter_utxos(self.context, addr, concurrency=UTXO_PAGE_CONCURRENCY):
+                total_ada += utxo.output.amount.coin
+                if utxo.output.amount.multi_asset:
+                    for policy_id, assets in utxo.output.amount.multi_asset.items():
+                        for asset_name, qty in assets.items():
+                            token_id = f"{policy_id.hex()}:{asset_name.decode('utf-8')}"
+                            tokens[token_id] = tokens.get(token_id, 0) + qty
 
         logger.info(f"📫 Địa chỉ {addr}... có {total_ada/1_000_000} ADA và {len(tokens)} token.")
         return {
@@ -63,7 +67,8 @@ class QueryService:
             address: bech32 address hoặc None để dùng ví mặc định.
         """
         addr = address or self.wallet.get_address_bech32()
-        utxos = self.context.utxos(addr)
+        with background():
+            utxos = self.context.utxos(addr)
         logger.info(f"🔍 Tìm thấy {len(utxos)} UTXO cho {addr}...")
         for i, utxo in enumerate(utxos, 1):
             print(f"{i}. TxHash: {utxo.input.transaction_id}, Index: {utxo.input.index}, Amount: {utxo.output.amount}")
@@ -29,7 +29,7 @@ from config.logging_config import logger
 class TransactionService:
     def __init__(self, wallet: Optional[WalletManager] = None):
         self.wallet = wallet or WalletManager()
-        self.context = get_blockfrost_context()
+        self.context = get_blockfrost_context(self.wallet.network_name)
         logger.info("✅ TransactionService đã được khởi tạo.")
 
     def get_balance(self) -> int:
@@ -0,0 +1,15 @@
+"""
+Cấu hình pytest chung
+=====================
+Repo root (config/, chain/, wallet/) và course_final/cip68 (offchain/, backend/)
+được đưa vào sys.path giống run_backend.py, để test import như khi chạy thật.
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CIP68_ROOT = os.path.join(REPO_ROOT, "course_final", "cip68")
+
+for path in (REPO_ROOT, CIP68_ROOT):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,115 @@
+"""AsyncBlockFrostChainContext (chain/async_context.py) trên httpx.MockTransport."""
+import asyncio
+import os
+import threading
+from fractions import Fraction
+from types import SimpleNamespace
+
+import cbor2
+import httpx
+from blockfrost.utils import convert_json_to_object
+from pycardano import Address, BlockFrostChainContext, Network, VerificationKeyHash, plutus_script_hash
+
+from chain.async_context import AsyncBlockFrostChainContext, AsyncChainContextBridge, protocol_param_from_json
+from chain.local_evaluator import slot_to_posix_ms
+from conftest import CIP68_ROOT
+from offchain.cip68_utils import load_store_script
+
+STORE_SCRIPT = load_store_script(os.path.join(CIP68_ROOT, "cip68_dynamic_asset", "plutus.json"))
+SCRIPT_HASH = str(plutus_script_hash(STORE_SCRIPT))
+ADDRESS = str(Address(VerificationKeyHash(bytes(28)), network=Network.TESTNET))
+TX_HASH = "ab" * 32
+
+PARAMS = {
+    "min_fee_a": 44, "min_fee_b": 155381, "max_block_size": 90112, "max_tx_size": 16384,
+    "max_block_header_size": 1100, "key_deposit": "2000000", "pool_deposit": "500000000",
+    "a0": 0.3, "rho": 0.003, "tau": 0.2, "decentralisation_param": 0, "extra_entropy": None,
+    "protocol_major_ver": 10, "protocol_minor_ver": 0, "min_utxo": "4310", "min_pool_cost": "170000000",
+    "price_mem": 0.0577, "price_step": 0.0000721, "max_tx_ex_mem": "14000000",
+    "max_tx_ex_steps": "10000000000", "max_block_ex_mem": "62000000", "max_block_ex_steps": "20000000000",
+    "max_val_size": "5000", "collateral_percent": 150, "max_collateral_inputs": 3,
+    "coins_per_utxo_size": "4310", "coins_per_utxo_word": "4310",
+    "cost_models": {"PlutusV3": {"addInteger-cpu-arguments-intercept": 100788}},
+    "min_fee_ref_script_cost_per_byte": 15,
+}
+
+# /genesis của preview
+GENESIS = {
+    "active_slots_coefficient": 0.05, "update_quorum": 5, "max_lovelace_supply": "45000000000000000",
+    "network_magic": 2, "epoch_length": 86400, "system_start": 1666656000, "slots_per_kes_period": 129600,
+    "slot_length": 1, "max_kes_evolutions": 62, "security_param": 432,
+}
+
+
+def _context(routes, calls=None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/v0", 1)[1]
+        if calls is not None:
+            calls.append(path)
+        if path not in routes:
+            return httpx.Response(404, json={"status_code": 404, "error": "Not Found", "message": path})
+        return httpx.Response(200, json=routes[path])
+
+    return AsyncBlockFrostChainContext("test", "https://cardano-preview.blockfrost.io/api",
+                                       transport=httpx.MockTransport(handler))
+
+
+def test_protocol_param_matches_pycardano_parser():
+    params = protocol_param_from_json(PARAMS)
+    assert params.min_fee_constant == 155381 and params.min_fee_coefficient == 44
+    assert params.max_tx_ex_mem == 14_000_000 and params.max_tx_ex_steps == 10_000_000_000
+    assert params.price_mem == Fraction(0.0577)
+    assert params.coins_per_utxo_byte == 4310
+    assert params.cost_models == {"PlutusV3": {"addInteger-cpu-arguments-intercept": 100788}}
+    assert params.min_fee_reference_scripts["base"] == 15
+
+    # Cùng kết quả với BlockFrostChainContext (test này hỏng nếu pycardano đổi cách map trường)
+    context = BlockFrostChainContext.__new__(BlockFrostChainContext)
+    context._protocol_param = None
+    context._check_epoch_and_update = lambda: False
+    context.api = SimpleNamespace(epoch_latest_parameters=lambda: convert_json_to_object(PARAMS))
+    assert context.protocol_param == params
+
+
+def test_reference_script_double_wrapped_is_repaired():
+    # Blockfrost trả CBOR của script bọc thêm một lớp bytestring
+    double_wrapped = cbor2.dumps(bytes(STORE_SCRIPT)).hex()
+    context = _context({
+        f"/addresses/{ADDRESS}/utxos": [{
+            "tx_hash": TX_HASH, "output_index": 0,
+            "amount": [{"unit": "lovelace", "quantity": "20000000"}],
+            "reference_script_hash": SCRIPT_HASH,
+        }],
+        f"/scripts/{SCRIPT_HASH}": {"type": "plutusV3"},
+        f"/scripts/{SCRIPT_HASH}/cbor": {"cbor": double_wrapped},
+    })
+
+    async def run():
+        try:
+            return await context.utxos(ADDRESS)
+        finally:
+            await context.aclose()
+
+    [utxo] = asyncio.run(run())
+    assert str(plutus_script_hash(utxo.output.script)) == SCRIPT_HASH
+    assert bytes(utxo.output.script) == bytes(STORE_SCRIPT)
+
+
+def test_bridge_genesis_param_for_local_evaluation():
+    # LocalEvaluationChainContext đổi slot → POSIX time qua genesis_param của bridge
+    calls = []
+    context = _context({"/genesis": GENESIS}, calls)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        bridge = AsyncChainContextBridge(context, loop)
+        genesis = bridge.genesis_param
+        assert genesis.network_magic == 2 and genesis.slot_length == 1
+        assert slot_to_posix_ms(bridge)(100) == (1666656000 + 100) * 1000
+        assert bridge.genesis_param is genesis
+        assert calls == ["/genesis"]
+    finally:
+        asyncio.run_coroutine_threadsafe(context.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
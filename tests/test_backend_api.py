@@ -0,0 +1,264 @@
+"""
+Endpoint của backend (course_final/cip68/backend/main.py)
+=========================================================
+ETag / If-None-Match của /api/metadata và /api/tokens, phân trang bằng cursor
+của /api/tokens, /api/metadata/batch, kiểm tra datum của /api/update và /api/burn, server-sent
+events của /api/update/batch và /api/events. ref_index được nạp từ UTxO giả và tx được build
+trên OfflineLedgerContext nên không gọi Blockfrost.
+"""
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from pycardano import (
+    Address,
+    Asset,
+    MultiAsset,
+    Network,
+    TransactionInput,
+    TransactionOutput,
+    UTxO,
+    Value,
+    VerificationKeyHash,
+)
+
+import backend.main as main
+from chain.offline_ledger import OfflineLedgerContext
+from conftest import CIP68_ROOT
+from offchain.cip68_events import ReferenceEventHub
+from offchain.cip68_index import ReferenceTokenIndex
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import (
+    create_cip68_asset_names,
+    create_cip68_datum,
+    get_policy_id,
+    get_script_address,
+    load_mint_script,
+    load_store_script,
+)
+
+BLUEPRINT_PATH = os.path.join(CIP68_ROOT, "cip68_dynamic_asset", "plutus.json")
+OWNER_A = bytes(28)
+OWNER_B = bytes(range(28))
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    policy_id = get_policy_id(load_mint_script(BLUEPRINT_PATH))
+    store_address = get_script_address(load_store_script(BLUEPRINT_PATH), Network.TESTNET)
+    monkeypatch.setattr(main, "policy_id", policy_id)
+    monkeypatch.setattr(main, "store_address", store_address)
+    index = ReferenceTokenIndex(policy_id, store_address)
+    # 20 token, owner xen kẽ A / B
+    index.load(_ref_utxo(policy_id, store_address, i, OWNER_A if i % 2 else OWNER_B) for i in range(20))
+    monkeypatch.setattr(main, "ref_index", index)
+    return main
+
+
+def _token_name(i: int) -> bytes:
+    return f"Token{i:03d}".encode()
+
+
+def _ref_utxo(policy_id, store_address: Address, i: int, owner: bytes, version: int = 1, tx_index: int = 0) -> UTxO:
+    name = _token_name(i)
+    ref_asset_name, _ = create_cip68_asset_names(name)
+    datum = create_cip68_datum(bytes(policy_id), name, owner, f"Token #{i}", version=version)
+    return UTxO(
+        TransactionInput.from_primitive([i.to_bytes(32, "big").hex(), tx_index]),
+        TransactionOutput(
+            store_address,
+            Value(2_000_000, MultiAsset({policy_id: Asset({ref_asset_name: 1})})),
+            datum=datum,
+        ),
+    )
+
+
+def _get(path: str, **headers) -> httpx.Response:
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+
+    return asyncio.run(run())
+
+
+def _post(path: str, body: dict) -> httpx.Response:
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=body)
+
+    return asyncio.run(run())
+
+
+def test_metadata_etag(backend):
+    response = _get("/api/metadata/Token003")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200 and response.json()["version"] == 1
+
+    assert _get("/api/metadata/Token003", **{"If-None-Match": etag}).status_code == 304
+    assert _get("/api/metadata/Token003", **{"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert _get("/api/metadata/Token003", **{"If-None-Match": "*"}).status_code == 304
+    assert _get("/api/metadata/Token003", **{"If-None-Match": '"other"'}).status_code == 200
+
+    # Update: reference token chuyển sang UTxO mới với version 2 → ETag mới
+    old = _ref_utxo(backend.policy_id, backend.store_address, 3, OWNER_A)
+    new = _ref_utxo(backend.policy_id, backend.store_address, 3, OWNER_A, version=2, tx_index=1)
+    backend.ref_index.on_change([new], [old])
+    response = _get("/api/metadata/Token003", **{"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["version"] == 2
+    assert response.headers["ETag"] != etag
+
+
+def test_tokens_etag_follows_index_revision(backend):
+    response = _get("/api/tokens?limit=5")
+    etag = response.headers["ETag"]
+    assert _get("/api/tokens?limit=5", **{"If-None-Match": etag}).status_code == 304
+    # Tham số truy vấn khác → ETag khác
+    assert _get("/api/tokens?limit=6", **{"If-None-Match": etag}).status_code == 200
+
+    backend.ref_index.on_change([_ref_utxo(backend.policy_id, backend.store_address, 25, OWNER_A)], [])
+    assert _get("/api/tokens?limit=5", **{"If-None-Match": etag}).status_code == 200
+
+
+def _walk(query: str):
+    names, cursor, pages = [], None, 0
+    while True:
+        path = f"/api/tokens?{query}" + (f"&cursor={cursor}" if cursor else "")
+        body = _get(path).json()
+        assert body["success"], body
+        names += [token["token_name"] for token in body["tokens"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return names, pages
+
+
+def test_cursor_pagination_walks_every_token_once(backend):
+    names, pages = _walk("limit=6")
+    assert names == [_token_name(i).decode() for i in range(20)]
+    assert pages == 4
+
+    # Lọc owner + min_version qua nhiều trang
+    names, _ = _walk(f"limit=3&owner={OWNER_A.hex()}")
+    assert names == [_token_name(i).decode() for i in range(1, 20, 2)]
+    assert _walk("limit=3&min_version=2")[0] == []
+
+    assert _get("/api/tokens?cursor=!!").status_code == 400
+
+
+def test_metadata_batch_keeps_request_order(backend):
+    broken = _ref_utxo(backend.policy_id, backend.store_address, 30, OWNER_A)
+    broken.output.datum = 42
+    backend.ref_index.on_change([broken], [])
+    names = ["Token007", "Missing", "Token002", "Token030", "Token007"]
+
+    body = _post("/api/metadata/batch", {"token_names": names}).json()
+    assert body["success"] and body["found"] == 3
+    assert [(item["token_name"], item["found"]) for item in body["results"]] == [
+        ("Token007", True), ("Missing", False), ("Token002", True), ("Token030", False), ("Token007", True),
+    ]
+    assert body["results"][2]["metadata"]["description"] == "Token #2" and body["results"][2]["version"] == 1
+
+
+def test_metadata_batch_validates_size(backend):
+    assert _post("/api/metadata/batch", {"token_names": []}).status_code == 422
+    too_many = [f"Token{i}" for i in range(main.MAX_METADATA_BATCH + 1)]
+    assert _post("/api/metadata/batch", {"token_names": too_many}).status_code == 422
+
+
+def test_events_stream_reference_changes(backend, monkeypatch):
+    hub = ReferenceEventHub()
+    backend.ref_index.subscribe(hub.publish)
+    monkeypatch.setattr(main, "event_hub", hub)
+    monkeypatch.setattr(main, "EVENT_KEEPALIVE", 0.01)
+    old = _ref_utxo(backend.policy_id, backend.store_address, 3, OWNER_A)
+    new = _ref_utxo(backend.policy_id, backend.store_address, 3, OWNER_A, version=2, tx_index=1)
+
+    async def run():
+        # Stream không tự kết thúc: đọc thẳng body của StreamingResponse thay vì qua HTTP client
+        response = await main.stream_events(tokens="Token003,Token004", owners=None)
+        chunks = response.body_iterator
+        received = [await chunks.__anext__(), await chunks.__anext__()]
+        # Token005 không nằm trong bộ lọc: client chỉ nhận event của Token003
+        backend.ref_index.on_change([], [_ref_utxo(backend.policy_id, backend.store_address, 5, OWNER_A)])
+        backend.ref_index.on_change([new], [old])
+        while len(received) < 3 or received[-1].startswith(":"):
+            received.append(await chunks.__anext__())
+        await chunks.aclose()
+        return received
+
+    received = asyncio.run(run())
+    assert received[:2] == ["retry: 5000\n\n", ": keep-alive\n\n"]
+    [(kind, data)] = _events(received[-1])
+    assert kind == "updated" and data["token_name"] == "Token003"
+    assert (data["previous_version"], data["version"], data["metadata"]["description"]) == (1, 2, "Token #3")
+    assert data["utxo"].endswith("#1") and data["owner"] == OWNER_A.hex()
+    # Stream đóng thì client được huỷ đăng ký
+    assert hub.stats()["subscribers"] == 0
+
+    assert _get("/api/events?owners=zz").status_code == 400
+    monkeypatch.setattr(main, "event_hub", None)
+    assert _get("/api/events").status_code == 503
+
+
+def test_update_and_burn_reject_undecodable_datum(backend, monkeypatch):
+    # Không giải mã được datum thì không kiểm tra được owner: từ chối trước khi build tx
+    monkeypatch.setattr(main, "mint_script", load_mint_script(BLUEPRINT_PATH))
+    monkeypatch.setattr(main, "store_script", load_store_script(BLUEPRINT_PATH))
+    broken = _ref_utxo(backend.policy_id, backend.store_address, 30, OWNER_A)
+    broken.output.datum = 42
+    backend.ref_index.on_change([broken], [])
+    wallet = str(Address(VerificationKeyHash(OWNER_A), network=Network.TESTNET))
+
+    response = _post("/api/update", {"wallet_address": wallet, "token_name": "Token030", "new_description": "v2"})
+    assert response.status_code == 422
+    response = _post("/api/burn", {"wallet_address": wallet, "token_name": "Token030"})
+    assert response.status_code == 422
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_update_batch_streams_transactions(backend, monkeypatch):
+    ledger = OfflineLedgerContext()
+    owner = Address(VerificationKeyHash(OWNER_A), network=Network.TESTNET)
+    ledger.fund(owner, 1_000_000_000)
+    templates = CIP68TxTemplates(load_mint_script(BLUEPRINT_PATH), load_store_script(BLUEPRINT_PATH), Network.TESTNET)
+    monkeypatch.setattr(main, "tx_templates", templates)
+    monkeypatch.setattr(main, "chain_context", ledger)
+
+    items = [{"token_name": f"Token{i:03d}", "new_description": "v2"} for i in (1, 3, 5)]
+    response = _post("/api/update/batch", {"wallet_address": str(owner), "items": items, "max_items_per_tx": 2})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert [kind for kind, _ in events] == ["transaction", "transaction", "done"]
+    assert [data["token_names"] for _, data in events[:2]] == [["Token001", "Token003"], ["Token005"]]
+    assert events[1][1]["chained"] and events[-1][1] == {
+        "transactions": 2, "total": 3, "policy_id": str(backend.policy_id)
+    }
+
+
+def test_batch_events_report_errors_mid_stream(backend, capsys):
+    def plan():
+        yield SimpleNamespace(
+            tx=SimpleNamespace(to_cbor_hex=lambda: "84"), token_names=[b"Token001"], chained=False, fee=1, size=2
+        )
+        raise RuntimeError("evaluate failed")
+
+    async def run():
+        return [chunk async for chunk in main._batch_events(plan(), 3)]
+
+    events = _events("".join(asyncio.run(run())))
+    assert [kind for kind, _ in events] == ["transaction", "error"]
+    assert events[1][1] == {"message": "evaluate failed", "done": 1, "total": 3}
+    assert "RuntimeError" in capsys.readouterr().err
@@ -0,0 +1,112 @@
+"""Provider Blockfrost dùng chung (config/blockfrost.py): cache context và connection pool."""
+import time
+
+import pytest
+from blockfrost import ApiUrls, BlockFrostApi
+
+import config.blockfrost as provider
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class _FakeSession:
+    """Thay requests.Session: ghi lại URL, trả epoch hiện tại cho mọi request."""
+
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return _FakeResponse({"epoch": 1, "end_time": int(time.time()) + 3600})
+
+    post = get
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Provider sạch, không cassette / snapshot / evaluate local, session giả."""
+    created = []
+
+    def make_session(pool_size):
+        created.append(_FakeSession())
+        return created[-1]
+
+    monkeypatch.setattr(provider, "_contexts", {})
+    monkeypatch.setattr(provider, "_sessions", {})
+    monkeypatch.setattr(provider, "_override", None)
+    monkeypatch.setattr(provider, "_cassette", None)
+    monkeypatch.setattr(provider.Cassette, "from_env", staticmethod(lambda: None))
+    monkeypatch.setattr(provider, "UTXO_SNAPSHOT_DIR", "")
+    monkeypatch.setattr(provider, "PLUTUS_LOCAL_EVAL", False)
+    monkeypatch.setattr(provider, "_make_session", make_session)
+    return created
+
+
+def test_pooled_requests_patch_routes_blockfrost_through_session(sessions):
+    context = provider.get_blockfrost_context("preview", project_id="preview-a")
+    assert context is not None
+    # blockfrost-python gọi requests ở cấp module: phải đi qua session của pool
+    assert provider._install_pooled_requests()
+    assert len(sessions) == 1
+    assert sessions[0].urls and all(url.startswith(ApiUrls.preview.value) for url in sessions[0].urls)
+
+    calls = len(sessions[0].urls)
+    BlockFrostApi(project_id="preview-a", base_url=ApiUrls.preview.value).root()
+    assert len(sessions[0].urls) == calls + 1
+
+
+def test_context_cached_per_network_and_project_id(sessions):
+    a = provider.get_blockfrost_context("preview", project_id="preview-a")
+    assert provider.get_blockfrost_context("PREVIEW", project_id="preview-a") is a
+    assert provider.get_blockfrost_context("testnet", project_id="preview-a") is a
+    # project ID khác không bị bỏ qua: context riêng, vẫn dùng chung session của base URL
+    b = provider.get_blockfrost_context("preview", project_id="preview-b")
+    assert b is not a
+    assert len(sessions) == 1
+    c = provider.get_blockfrost_context("preprod", project_id="preview-a")
+    assert c is not a
+    assert len(sessions) == 2
+
+
+def test_network_names_normalized():
+    assert provider.normalize_network("Preview") == "PREVIEW"
+    assert provider.normalize_network("testnet") == "PREVIEW"
+    assert provider.get_network_enum("Preview").name == "TESTNET"
+    assert provider.get_network_enum("Preprod").name == "TESTNET"
+    assert provider.get_network_enum("mainnet").name == "MAINNET"
+    with pytest.raises(ValueError):
+        provider.normalize_network("sanchonet")
+
+
+def test_wallet_manager_creates_context_lazily(sessions, monkeypatch, caplog):
+    from chain.offline_ledger import OfflineLedgerContext
+    from pycardano.crypto.bip32 import HDWallet
+    from wallet import wallet_manager
+
+    monkeypatch.setattr(provider, "BLOCKFROST_PROJECT_ID", "")
+    monkeypatch.setattr(wallet_manager, "BLOCKFROST_PROJECT_ID", "")
+    mnemonic = HDWallet.generate_mnemonic()
+
+    # Thiếu project ID: vẫn tạo được ví (chỉ cảnh báo), lỗi khi thực sự cần Blockfrost
+    wallet = wallet_manager.WalletManager(mnemonic=mnemonic, network="preview")
+    assert "BLOCKFROST_PROJECT_ID not set" in caplog.text
+    with pytest.raises(ValueError, match="BLOCKFROST_PROJECT_ID"):
+        wallet.get_utxos()
+
+    ledger = OfflineLedgerContext()
+    ledger.fund(wallet.get_address(), 5_000_000)
+    provider.set_chain_context(ledger)
+    wallet = wallet_manager.WalletManager(mnemonic=mnemonic, network="preview")
+    assert wallet.context is ledger
+    assert wallet.get_balance() == 5_000_000
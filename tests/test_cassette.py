@@ -0,0 +1,86 @@
+"""Record/replay request Blockfrost (chain/cassette.py)."""
+import pytest
+
+from chain.cassette import RECORD, REPLAY, Cassette, CassetteMissError
+
+BASE = "https://cardano-preview.blockfrost.io/api/v0"
+ADDRESS = "addr_test1" + "q" * 53
+
+
+class _FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+class _FakeSession:
+    """Trả về body đánh số theo thứ tự gọi để kiểm tra replay đúng thứ tự."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return _FakeResponse(200, f'{{"n": {self.calls}}}')
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        return _FakeResponse(400, '{"message": "bad tx"}')
+
+
+def _record(path):
+    cassette = Cassette(str(path), mode=RECORD)
+    session = _FakeSession()
+    cassette.request(session, "get", f"{BASE}/addresses/{ADDRESS}/utxos", params={"page": 1})
+    cassette.request(session, "get", f"{BASE}/addresses/{ADDRESS}/utxos", params={"page": 1})
+    cassette.request(session, "get", f"{BASE}/addresses/{ADDRESS}/utxos", params={"page": 2})
+    cassette.request(session, "post", f"{BASE}/tx/submit", data=b"\x84")
+    cassette.meta["demo"] = "test"
+    cassette.save()
+    return cassette
+
+
+def test_replay_returns_recorded_responses_in_order(tmp_path):
+    path = tmp_path / "nested" / "run.json.gz"
+    recorded = _record(path)
+    assert recorded.stats() == {
+        "mode": RECORD, "calls": {"get /addresses/{}/utxos": 3, "post /tx/submit": 1}, "total": 4,
+    }
+
+    cassette = Cassette(str(path))
+    assert cassette.replaying and cassette.meta == {"demo": "test"}
+    utxos = f"{BASE}/addresses/{ADDRESS}/utxos"
+    # Cùng (method, url, params): phát lại theo thứ tự ghi, hết thì lặp lại response cuối
+    assert [cassette.request(None, "get", utxos, params={"page": 1}).json()["n"] for _ in range(3)] == [1, 2, 2]
+    assert cassette.request(None, "get", utxos, params={"page": 2}).json() == {"n": 3}
+    # Body POST không nằm trong key
+    submit = cassette.request(None, "post", f"{BASE}/tx/submit", data=b"\x00")
+    assert submit.status_code == 400 and submit.json() == {"message": "bad tx"}
+
+    stats = cassette.stats()
+    assert stats["calls"] == {"get /addresses/{}/utxos": 4, "post /tx/submit": 1}
+    assert stats["recorded_total"] == 4
+
+
+def test_replay_miss_raises(tmp_path):
+    path = tmp_path / "run.json.gz"
+    _record(path)
+    cassette = Cassette(str(path), mode=REPLAY)
+    with pytest.raises(CassetteMissError):
+        cassette.request(None, "get", f"{BASE}/addresses/{ADDRESS}/utxos", params={"page": 3})
+
+
+def test_from_env_and_invalid_mode(tmp_path, monkeypatch):
+    monkeypatch.delenv("BLOCKFROST_CASSETTE", raising=False)
+    assert Cassette.from_env() is None
+
+    path = tmp_path / "run.json.gz"
+    _record(path)
+    monkeypatch.setenv("BLOCKFROST_CASSETTE", str(path))
+    monkeypatch.delenv("BLOCKFROST_CASSETTE_MODE", raising=False)
+    monkeypatch.setenv("BLOCKFROST_CASSETTE_REALTIME", "1")
+    cassette = Cassette.from_env()
+    assert cassette.replaying and cassette.realtime
+
+    with pytest.raises(ValueError):
+        Cassette(str(path), mode="rewind")
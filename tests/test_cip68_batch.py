@@ -0,0 +1,232 @@
+"""Chia batch update thành transaction (course_final/cip68/offchain/cip68_batch.py)."""
+import logging
+import os
+
+import pytest
+from pycardano import (
+    Address,
+    Asset,
+    ExecutionUnits,
+    MultiAsset,
+    Network,
+    PaymentSigningKey,
+    Value,
+    VerificationKeyWitness,
+)
+
+from chain import local_evaluator
+from chain.local_evaluator import LocalPlutusEvaluator, slot_to_posix_ms
+from chain.offline_ledger import OfflineLedgerContext
+from conftest import CIP68_ROOT
+from offchain.cip68_batch import CIP68BatchUpdater, _BatchPlanner
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import (
+    create_cip68_asset_names,
+    create_cip68_datum,
+    decode_cip68_datum,
+    load_mint_script,
+    load_store_script,
+)
+
+BLUEPRINT_PATH = os.path.join(CIP68_ROOT, "cip68_dynamic_asset", "plutus.json")
+
+
+class _OverfitUpdater(CIP68BatchUpdater):
+    """Ước lượng luôn nhét hết phần còn lại vào một tx: mọi giới hạn chỉ được phát hiện khi build."""
+
+    def _fit(self, sizes, model, fixed_size, overhead, params) -> int:
+        return len(sizes) if self.max_items_per_tx is None else min(len(sizes), self.max_items_per_tx)
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return CIP68TxTemplates(load_mint_script(BLUEPRINT_PATH), load_store_script(BLUEPRINT_PATH), Network.TESTNET)
+
+
+@pytest.fixture
+def wallet():
+    skey = PaymentSigningKey.generate()
+    return skey, Address(skey.to_verification_key().hash(), network=Network.TESTNET)
+
+
+@pytest.fixture
+def quiet_pycardano():
+    # Các lần build vượt giới hạn là dự kiến: tắt log WARNING (dump builder) của pycardano
+    logger = logging.getLogger("PyCardano")
+    logger.disabled = True
+    yield
+    logger.disabled = False
+
+
+def _ledger(owner, funds: int = 4, **kwargs) -> OfflineLedgerContext:
+    ledger = OfflineLedgerContext(**kwargs)
+    for _ in range(funds):
+        ledger.fund(owner, 1_000_000_000)
+    return ledger
+
+
+def _datum(templates, owner, name: bytes, metadata: str, version: int = 1):
+    return create_cip68_datum(
+        bytes(templates.policy_id), name, owner.payment_part.to_primitive(), metadata, version=version
+    )
+
+
+def _items(templates, ledger, owner, count: int, metadata: str = "Collection item", start: int = 0):
+    """Reference token đã mint sẵn (version 1) tại store address → item update sang version 2."""
+    items = []
+    for i in range(start, start + count):
+        name = f"Batch{i:04d}".encode()
+        ref_asset_name, _ = create_cip68_asset_names(name)
+        ref_utxo = ledger.fund(
+            templates.store_address,
+            Value(2_000_000, MultiAsset({templates.policy_id: Asset({ref_asset_name: 1})})),
+            datum=_datum(templates, owner, name, f"{name.decode()} v1"),
+        )
+        items.append((ref_utxo, name, _datum(templates, owner, name, f"{metadata} {name.decode()}", version=2)))
+    return items
+
+
+def _spend_keys(tx):
+    """Key "spend:index" của các redeemer trong tx (index theo vị trí input đã sắp xếp)."""
+    return [f"spend:{key.index}" for key in tx.transaction_witness_set.redeemer]
+
+
+def _submit_all(ledger, skey, batch_txs):
+    for batch_tx in batch_txs:
+        tx = batch_tx.tx
+        tx.transaction_witness_set.vkey_witnesses = [
+            VerificationKeyWitness(skey.to_verification_key(), skey.sign(tx.transaction_body.hash()))
+        ]
+        ledger.submit_tx_cbor(tx.to_cbor())
+
+
+def _assert_updated(templates, ledger, items):
+    for _, name, _ in items:
+        ref_asset_name, _ = create_cip68_asset_names(name)
+        utxo = ledger.utxo_for_asset(templates.policy_id, ref_asset_name)
+        assert utxo.output.address == templates.store_address
+        assert decode_cip68_datum(utxo.output.datum).version == 2
+
+
+def test_shrinks_batch_that_exceeds_max_tx_size(templates, wallet, quiet_pycardano):
+    skey, owner = wallet
+    ledger = _ledger(owner)
+    items = _items(templates, ledger, owner, 16, metadata="x" * 1500)
+    updater = _OverfitUpdater(templates)
+
+    txs = list(updater.plan(ledger, owner, items))
+
+    max_tx_size = ledger.protocol_param.max_tx_size
+    assert len(txs) > 1
+    assert all(batch_tx.size <= max_tx_size for batch_tx in txs)
+    # Mỗi item đúng một lần, đúng thứ tự
+    assert [name for batch_tx in txs for name in batch_tx.token_names] == [name for _, name, _ in items]
+    # Có các lần build thất bại trước khi bớt item
+    assert updater.builds > len(txs) + 2
+    # Các tx nối tiếp hợp lệ khi submit theo thứ tự
+    _submit_all(ledger, skey, txs)
+    _assert_updated(templates, ledger, items)
+
+
+def test_shrinks_batch_that_exceeds_max_ex_units(templates, wallet, quiet_pycardano):
+    # Mỗi redeemer UpdateMetadata tốn 1M mem cho mỗi reference token trong tx (tổng tăng bậc hai):
+    # max_tx_ex_mem 14M chỉ đủ 3 token (9M), 4 token cần 16M
+    def evaluate(tx):
+        keys = _spend_keys(tx)
+        return {key: ExecutionUnits(1_000_000 * len(keys), 100_000_000 * len(keys)) for key in keys}
+
+    skey, owner = wallet
+    ledger = _ledger(owner, evaluator=evaluate)
+    items = _items(templates, ledger, owner, 10)
+    updater = _OverfitUpdater(templates)
+
+    txs = list(updater.plan(ledger, owner, items))
+
+    params = ledger.protocol_param
+    assert len(txs) >= 4
+    assert all(batch_tx.ex_units.mem <= params.max_tx_ex_mem for batch_tx in txs)
+    assert [name for batch_tx in txs for name in batch_tx.token_names] == [name for _, name, _ in items]
+    assert updater.builds > len(txs) + 2
+    _submit_all(ledger, skey, txs)
+    _assert_updated(templates, ledger, items)
+
+
+def test_item_larger_than_a_transaction_is_rejected(templates, wallet, quiet_pycardano):
+    _, owner = wallet
+    ledger = _ledger(owner)
+    items = _items(templates, ledger, owner, 2, metadata="x" * 20_000)
+
+    with pytest.raises(ValueError, match="vượt giới hạn một transaction"):
+        list(CIP68BatchUpdater(templates).plan(ledger, owner, items))
+
+
+def test_update_items_are_checked_off_chain(templates, wallet):
+    _, owner = wallet
+    ledger = _ledger(owner)
+    first, second = _items(templates, ledger, owner, 2)
+    other = Address(PaymentSigningKey.generate().to_verification_key().hash(), network=Network.TESTNET)
+    [foreign] = _items(templates, ledger, other, 1, start=2)
+    renamed = (second[0], b"Batch0001", _datum(templates, owner, b"Other", "x", version=2))
+    not_ref = (ledger.fund(owner, 5_000_000), b"Batch0003", _datum(templates, owner, b"Batch0003", "x", version=2))
+
+    with pytest.raises(ValueError) as error:
+        list(CIP68BatchUpdater(templates).plan(ledger, owner, [first, foreign, renamed, not_ref]))
+    message = str(error.value)
+    assert "Batch0002: ví không phải owner" in message
+    assert "Batch0001: datum mới đổi" in message
+    assert "Batch0003: reference UTxO không nằm ở store address" in message
+    assert "Batch0000" not in message
+
+
+def test_planner_hooks_are_abstract(templates):
+    with pytest.raises(TypeError):
+        _BatchPlanner(templates)
+
+
+def _underreporting_ledger(owner):
+    # Evaluate "remote" báo ex-units quá thấp: mô hình của planner ước lượng thấp cho các tx sau.
+    # Chỉ một UTxO trong ví: mọi tx sau tx đầu tiên phải nối tiếp vào change của tx trước.
+    return _ledger(owner, funds=1, evaluator=lambda tx: {key: ExecutionUnits(1_000, 1_000) for key in _spend_keys(tx)})
+
+
+@pytest.mark.skipif(local_evaluator.uplc_eval is None, reason="cần package `uplc`")
+def test_preset_ex_units_are_checked_locally(templates, wallet, quiet_pycardano):
+    skey, owner = wallet
+    ledger = _underreporting_ledger(owner)
+    updater = CIP68BatchUpdater(templates, max_items_per_tx=2)
+    items = _items(templates, ledger, owner, 5)
+
+    txs = list(updater.plan(ledger, owner, items))
+
+    assert len(txs) == 3 and all(batch_tx.chained for batch_tx in txs[1:])
+    assert updater.stats()["preset_verified"] == 2
+    # Ex-units đặt sẵn của tx nối tiếp không thấp hơn chi phí thật của script
+    evaluator = LocalPlutusEvaluator()
+    to_posix = slot_to_posix_ms(ledger)
+    _submit_all(ledger, skey, txs[:1])
+    for batch_tx in txs[1:]:
+        inputs = set(batch_tx.tx.transaction_body.inputs)
+        utxos = [
+            utxo for address in (owner, templates.store_address)
+            for utxo in ledger.utxos(address) if utxo.input in inputs
+        ]
+        actual = evaluator.evaluate(batch_tx.tx, utxos, slot_to_posix=to_posix)
+        for redeemer in batch_tx.tx.transaction_witness_set.redeemer.values():
+            assert all(
+                redeemer.ex_units.mem >= units.mem and redeemer.ex_units.steps >= units.steps
+                for units in actual.values()
+            )
+        _submit_all(ledger, skey, [batch_tx])
+    _assert_updated(templates, ledger, items)
+
+
+def test_unverified_preset_ex_units_are_logged(templates, wallet, quiet_pycardano, caplog):
+    _, owner = wallet
+    ledger = _ledger(owner, funds=1)
+    updater = CIP68BatchUpdater(templates, max_items_per_tx=2)
+    updater._evaluator = None
+
+    txs = list(updater.plan(ledger, owner, _items(templates, ledger, owner, 4)))
+
+    assert len(txs) == 2 and updater.stats()["preset_unverified"] == 1
+    assert "chưa được kiểm tra" in caplog.text
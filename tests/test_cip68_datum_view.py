@@ -0,0 +1,68 @@
+"""Giải mã datum CIP-68 (course_final/cip68/offchain/cip68_datum_view.py và cip68_datum_cache.py)."""
+import cbor2
+import pytest
+from pycardano import RawCBOR
+
+from offchain.cip68_datum_cache import DatumCache, metadata_to_dict
+from offchain.cip68_datum_view import CIP68DatumView
+from offchain.cip68_utils import CIP68Datum, create_cip68_datum
+
+POLICY = b"\xab" * 28
+OWNER = b"\xa1" * 28
+
+
+def _datum(**metadata) -> CIP68Datum:
+    return create_cip68_datum(POLICY, b"Alpha", OWNER, metadata or "Alpha", version=3)
+
+
+def _constr(fields, tag: int = 121) -> bytes:
+    return cbor2.dumps(cbor2.CBORTag(tag, fields))
+
+
+@pytest.mark.parametrize("datum", [
+    _datum(),
+    _datum(name="Alpha", image="ipfs://" + "x" * 200, key="é"),
+    create_cip68_datum(POLICY, b"", OWNER, {b"hash": b"\xff" * 28, b"count": 7}, version=0),
+])
+def test_view_matches_generic_decoder(datum):
+    # pycardano mã hoá list/map độ dài không xác định và chia bytes dài thành chunk
+    cbor = datum.to_cbor()
+    view = CIP68DatumView.parse(cbor)
+    expected = CIP68Datum.from_cbor(cbor)
+    assert view.to_datum() == expected
+    assert view.metadata_dict() == metadata_to_dict(expected)
+    assert (view.owner, view.version) == (OWNER, expected.version)
+
+
+def test_view_reads_definite_length_encoding():
+    cbor = _constr([POLICY, b"Alpha", OWNER, {b"name": b"Alpha", b"rank": -2}, 1])
+    view = CIP68DatumView.parse(cbor)
+    assert view.metadata == {b"name": b"Alpha", b"rank": -2}
+    assert view.to_datum() == CIP68Datum.from_cbor(cbor)
+
+
+@pytest.mark.parametrize("cbor", [
+    _constr([POLICY, b"Alpha", OWNER, {}, 1], tag=122),               # Constr 1
+    _constr([POLICY, b"Alpha", OWNER, {}]),                            # thiếu field
+    _constr([POLICY, b"Alpha", OWNER, {b"k": cbor2.CBORTag(121, [])}, 1]),  # metadata lồng PlutusData
+    _constr([POLICY, b"Alpha", OWNER, {}, 2 ** 70]),                   # số nguyên lớn (bignum)
+    _constr([POLICY, b"Alpha", OWNER, {}, 1]) + b"\x00",               # thừa bytes
+    _constr([POLICY, b"Alpha", OWNER, {}, 1])[:-3],                    # thiếu bytes
+])
+def test_view_rejects_unsupported_shapes(cbor):
+    assert CIP68DatumView.parse(cbor) is None
+
+
+def test_cache_falls_back_and_remembers_failures():
+    cache = DatumCache(max_entries=2)
+    nested = _constr([POLICY, b"Alpha", OWNER, {b"k": cbor2.CBORTag(121, [])}, 1])
+
+    # Fast path từ chối: giải mã qua CIP68Datum.from_cbor
+    decoded = cache.decode(RawCBOR(nested))
+    assert decoded.datum == CIP68Datum.from_cbor(nested) and "k" in decoded.metadata
+    assert cache.decode(b"\x01") is None and cache.decode(None) is None
+    assert cache.decode(RawCBOR(nested)) is decoded and cache.decode(b"\x01") is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 2)
+
+    cache.decode(_datum())
+    assert cache.stats()["evictions"] == 1 and cache.stats()["entries"] == 2
@@ -0,0 +1,68 @@
+"""Phát event reference token tới nhiều client (course_final/cip68/offchain/cip68_events.py)."""
+import asyncio
+import threading
+
+import pytest
+from pycardano import Address, Network, ScriptHash, TransactionId, TransactionInput, TransactionOutput, UTxO
+
+from offchain.cip68_datum_cache import decode_datum_cached
+from offchain.cip68_events import ReferenceEventHub
+from offchain.cip68_index import ReferenceEntry, ReferenceEvent
+from offchain.cip68_utils import create_cip68_datum
+
+STORE = Address(ScriptHash(b"\x5c" * 28), network=Network.TESTNET)
+ALICE = b"\xa1" * 28
+BOB = b"\xb0" * 28
+
+
+def _event(kind: str, name: bytes, owner: bytes) -> ReferenceEvent:
+    datum = create_cip68_datum(bytes(28), name, owner, name.decode())
+    utxo = UTxO(TransactionInput(TransactionId(bytes(32)), 0), TransactionOutput(STORE, 2_000_000))
+    entry = ReferenceEntry(name, utxo, decode_datum_cached(datum))
+    return ReferenceEvent(kind, name, entry, None) if kind == "minted" else ReferenceEvent(kind, name, None, entry)
+
+
+def test_subscriptions_filter_by_token_and_owner():
+    async def run():
+        hub = ReferenceEventHub()
+        everything = hub.subscribe()
+        by_name = hub.subscribe(token_names={b"Beta"})
+        by_owner = hub.subscribe(owners={ALICE})
+
+        # publish từ thread khác (như chain follower)
+        events = [_event("minted", b"Alpha", ALICE), _event("burned", b"Beta", BOB)]
+        thread = threading.Thread(target=lambda: [hub.publish(e) for e in events])
+        thread.start()
+        thread.join()
+
+        received = {}
+        for label, subscription in (("all", everything), ("name", by_name), ("owner", by_owner)):
+            names = []
+            while (event := await subscription.next(timeout=0.05)) is not None:
+                names.append(event.token_name)
+            received[label] = names
+        by_name.close()
+        return received, hub.stats()
+
+    received, stats = asyncio.run(run())
+    assert received == {"all": [b"Alpha", b"Beta"], "name": [b"Beta"], "owner": [b"Alpha"]}
+    assert stats == {"subscribers": 2, "published": 2, "delivered": 4, "dropped": 0}
+
+
+def test_slow_client_overflows_and_subscriber_limit():
+    async def run():
+        hub = ReferenceEventHub(queue_size=2, max_subscribers=1)
+        subscription = hub.subscribe()
+        with pytest.raises(OverflowError):
+            hub.subscribe()
+        for i in range(4):
+            hub.publish(_event("minted", f"Token{i}".encode(), ALICE))
+        await asyncio.sleep(0)
+        first = await subscription.next(timeout=0.05)
+        subscription.close()
+        hub.subscribe()
+        return subscription.overflowed, first, hub.stats()
+
+    overflowed, first, stats = asyncio.run(run())
+    assert overflowed and first.token_name == b"Token0"
+    assert (stats["delivered"], stats["dropped"], stats["subscribers"]) == (2, 1, 1)
@@ -0,0 +1,191 @@
+"""Chỉ mục reference token, theo owner và theo địa chỉ giữ user token (course_final/cip68/offchain/cip68_index.py)."""
+from pycardano import (
+    Address,
+    Asset,
+    MultiAsset,
+    Network,
+    ScriptHash,
+    Transaction,
+    TransactionBody,
+    TransactionId,
+    TransactionInput,
+    TransactionOutput,
+    TransactionWitnessSet,
+    UTxO,
+    Value,
+    VerificationKeyHash,
+)
+
+from offchain.cip68_index import HolderIndex, ReferenceTokenIndex
+from offchain.cip68_utils import create_cip68_asset_names, create_cip68_datum
+
+POLICY = ScriptHash(b"\xab" * 28)
+STORE = Address(ScriptHash(b"\x5c" * 28), network=Network.TESTNET)
+ALICE = b"\xa1" * 28
+BOB = b"\xb0" * 28
+
+
+def _ref_output(name: bytes, owner: bytes = ALICE, version: int = 1) -> TransactionOutput:
+    ref_asset_name, _ = create_cip68_asset_names(name)
+    datum = create_cip68_datum(bytes(POLICY), name, owner, f"{name.decode()} v{version}", version=version)
+    return TransactionOutput(STORE, Value(2_000_000, MultiAsset({POLICY: Asset({ref_asset_name: 1})})), datum=datum)
+
+
+def _ref_utxo(tx: int, name: bytes, owner: bytes = ALICE, version: int = 1) -> UTxO:
+    return UTxO(TransactionInput(TransactionId(tx.to_bytes(32, "big")), 0), _ref_output(name, owner, version))
+
+
+def _index(*utxos) -> ReferenceTokenIndex:
+    index = ReferenceTokenIndex(POLICY, STORE)
+    index.load(utxos)
+    return index
+
+
+def test_get_ignores_foreign_and_user_tokens():
+    _, user_asset_name = create_cip68_asset_names(b"Alpha")
+    wallet = Address(VerificationKeyHash(ALICE), network=Network.TESTNET)
+    user_utxo = UTxO(
+        TransactionInput(TransactionId(bytes(32)), 1),
+        TransactionOutput(wallet, Value(2_000_000, MultiAsset({POLICY: Asset({user_asset_name: 1})}))),
+    )
+    # Reference token cùng tên nhưng của policy khác
+    foreign = UTxO(TransactionInput(TransactionId(bytes(32)), 2), TransactionOutput(
+        STORE, Value(2_000_000, MultiAsset({ScriptHash(bytes(28)): Asset({create_cip68_asset_names(b"Beta")[0]: 1})}))
+    ))
+    index = _index(_ref_utxo(1, b"Alpha"), user_utxo, foreign)
+
+    entry = index.get("Alpha")
+    assert entry.utxo.input.transaction_id.payload[-1] == 1
+    assert entry.datum.owner == ALICE and entry.metadata["description"] == "Alpha v1"
+    assert index.get(b"Beta") is None and len(index) == 1
+    assert (index.stats()["hits"], index.stats()["misses"]) == (1, 1)
+
+
+def test_on_change_moves_and_burns_tokens_with_events():
+    old_alpha, beta = _ref_utxo(1, b"Alpha"), _ref_utxo(2, b"Beta")
+    index = _index(old_alpha, beta)
+    events = []
+    index.subscribe(events.append)
+    revision = index.revision()
+
+    new_alpha = _ref_utxo(3, b"Alpha", version=2)
+    index.on_change([new_alpha, _ref_utxo(4, b"Gamma")], [old_alpha, beta])
+
+    assert index.get(b"Alpha").utxo == new_alpha and index.get(b"Alpha").datum.version == 2
+    assert index.get(b"Beta") is None and index.get(b"Gamma") is not None
+    assert sorted((e.kind, e.token_name) for e in events) == [
+        ("burned", b"Beta"), ("minted", b"Gamma"), ("updated", b"Alpha"),
+    ]
+    assert index.revision() != revision
+    # Rollback rồi áp dụng lại cùng UTxO: không sinh event
+    index.on_change([new_alpha], [new_alpha])
+    assert len(events) == 3
+
+
+def test_submitted_tx_is_pending_until_observed_or_expired():
+    alpha = _ref_utxo(1, b"Alpha")
+    index = _index(alpha, _ref_utxo(2, b"Beta"))
+
+    update = Transaction(
+        TransactionBody(inputs=[alpha.input], outputs=[_ref_output(b"Alpha", version=2)], fee=0),
+        TransactionWitnessSet(),
+    )
+    index.apply_submitted(update)
+    pending = index.get(b"Alpha")
+    assert pending.utxo.input == TransactionInput(update.id, 0) and pending.datum.version == 2
+    assert index.stats()["pending"] == 1 and index.stats()["tokens"] == 2
+
+    # Follower thấy transaction on-chain: thay pending bằng trạng thái đã xác nhận
+    index.on_change([UTxO(TransactionInput(update.id, 0), update.transaction_body.outputs[0])], [alpha])
+    assert index.stats()["pending"] == 0 and index.get(b"Alpha").datum.version == 2
+
+    # Transaction burn không vào được block: hết pending_ttl thì token hiện lại
+    index.pending_ttl = 0
+    beta = index.get(b"Beta")
+    index.apply_submitted(Transaction(
+        TransactionBody(inputs=[beta.utxo.input], outputs=[], fee=0), TransactionWitnessSet()
+    ))
+    assert index.get(b"Beta") == beta
+
+
+def test_page_by_cursor_and_prefix():
+    index = _index(*[_ref_utxo(i, f"Item{i:02d}".encode(), version=1 + i % 2) for i in range(1, 8)])
+    # Token pending (vừa mint) cũng xuất hiện đúng thứ tự
+    index.apply_submitted(Transaction(
+        TransactionBody(inputs=[], outputs=[_ref_output(b"Item04x")], fee=0), TransactionWitnessSet()
+    ))
+
+    names, cursor = [], None
+    while True:
+        entries, cursor = index.page(after=cursor, limit=3)
+        names.append([e.token_name for e in entries])
+        if cursor is None:
+            break
+    assert names == [
+        [b"Item01", b"Item02", b"Item03"], [b"Item04", b"Item04x", b"Item05"], [b"Item06", b"Item07"],
+    ]
+    entries, cursor = index.page(prefix=b"Item04", limit=5)
+    assert [e.token_name for e in entries] == [b"Item04", b"Item04x"] and cursor is None
+    entries, _ = index.page(min_version=2, limit=10)
+    assert [e.token_name for e in entries] == [b"Item01", b"Item03", b"Item05", b"Item07"]
+
+
+def test_by_owner_follows_updates_and_pending():
+    alpha, beta = _ref_utxo(1, b"Alpha"), _ref_utxo(2, b"Beta", owner=BOB)
+    index = _index(alpha, beta, _ref_utxo(3, b"Gamma"))
+    assert sorted(e.token_name for e in index.by_owner(ALICE)) == [b"Alpha", b"Gamma"]
+
+    # Alpha chuyển sang Bob (đã xác nhận), Beta chuyển sang Alice (pending)
+    index.on_change([_ref_utxo(4, b"Alpha", owner=BOB)], [alpha])
+    index.apply_submitted(Transaction(
+        TransactionBody(inputs=[beta.input], outputs=[_ref_output(b"Beta", owner=ALICE)], fee=0),
+        TransactionWitnessSet(),
+    ))
+    assert sorted(e.token_name for e in index.by_owner(ALICE)) == [b"Beta", b"Gamma"]
+    assert [e.token_name for e in index.by_owner(BOB)] == [b"Alpha"]
+    entries, cursor = index.page(owner=ALICE, limit=1)
+    assert [e.token_name for e in entries] == [b"Beta"] and cursor == b"Beta"
+    entries, cursor = index.page(owner=ALICE, after=cursor, limit=1)
+    assert [e.token_name for e in entries] == [b"Gamma"] and cursor is None
+
+
+def _user_utxo(tx: int, address: Address, *names: bytes) -> UTxO:
+    assets = Asset({create_cip68_asset_names(name)[1]: 1 for name in names})
+    return UTxO(
+        TransactionInput(TransactionId(tx.to_bytes(32, "big")), 0),
+        TransactionOutput(address, Value(2_000_000, MultiAsset({POLICY: assets}))),
+    )
+
+
+def test_holder_index_tracks_user_tokens_of_loaded_addresses():
+    alice = Address(VerificationKeyHash(ALICE), network=Network.TESTNET)
+    bob = Address(VerificationKeyHash(BOB), network=Network.TESTNET)
+    holders = HolderIndex(POLICY, ttl=60)
+    assert holders.names(alice) is None
+
+    held = _user_utxo(1, alice, b"Alpha", b"Beta")
+    holders.load(alice, [held, _ref_utxo(2, b"Gamma")])
+    holders.load(bob, [])
+    assert holders.names(alice) == {b"Alpha", b"Beta"} and holders.names(bob) == set()
+
+    # Alice chuyển Alpha cho Bob và burn Beta trong cùng một transaction
+    burn = MultiAsset({POLICY: Asset({create_cip68_asset_names(b"Beta")[1]: -1})})
+    holders.apply_submitted(Transaction(
+        TransactionBody(inputs=[held.input], outputs=[_user_utxo(3, bob, b"Alpha").output], fee=0, mint=burn),
+        TransactionWitnessSet(),
+    ))
+    assert holders.names(alice) == set() and holders.names(bob) == {b"Alpha"}
+    assert holders.stats()["tokens"] == 1
+
+    holders.ttl = 0
+    holders.load(alice, [])
+    assert holders.names(alice) is None
+
+
+def test_holder_index_evicts_oldest_address():
+    holders = HolderIndex(POLICY, max_addresses=2)
+    addresses = [Address(VerificationKeyHash(bytes([i]) * 28), network=Network.TESTNET) for i in range(3)]
+    for i, address in enumerate(addresses):
+        holders.load(address, [_user_utxo(i, address, f"Token{i}".encode())])
+    assert holders.names(addresses[0]) is None
+    assert holders.names(addresses[2]) == {b"Token2"} and holders.stats()["addresses"] == 2
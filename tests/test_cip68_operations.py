@@ -0,0 +1,93 @@
+"""Hàm off-chain dùng chung (course_final/cip68/offchain/cip68_operations.py)."""
+import logging
+
+import pytest
+from pycardano import Address, Asset, MultiAsset, Network, PaymentSigningKey, Value
+
+from chain.base import ChainContextWrapper
+from chain.offline_ledger import OfflineLedgerContext
+from offchain import cip68_operations
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import create_cip68_asset_names, create_cip68_datum, decode_cip68_datum
+
+
+class _CountingContext(ChainContextWrapper):
+    """Ghi lại các lời gọi tra UTxO (mỗi lời gọi là một request Blockfrost trên network thật)."""
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.calls = []
+
+    def utxos(self, address):
+        self.calls.append(("utxos", str(address)))
+        return super().utxos(address)
+
+    def utxo_for_asset(self, policy_id, asset_name):
+        self.calls.append(("utxo_for_asset", asset_name))
+        return self._inner.utxo_for_asset(policy_id, asset_name)
+
+
+def test_get_scripts_parses_blueprint_once(monkeypatch):
+    cip68_operations._load_scripts.cache_clear()
+    calls = []
+    load = cip68_operations.load_mint_script
+    monkeypatch.setattr(cip68_operations, "load_mint_script", lambda path: calls.append(path) or load(path))
+
+    first = cip68_operations.get_scripts()
+    second = cip68_operations.get_scripts()
+    assert len(calls) == 1
+    assert first[2] == second[2] and first[3] == second[3]
+    cip68_operations._load_scripts.cache_clear()
+
+
+def test_update_metadata_batch_reads_store_address_once(monkeypatch):
+    monkeypatch.setenv("NETWORK", "Preprod")
+    logging.getLogger("PyCardano").disabled = True
+    try:
+        mint_script, store_script, policy_id, store_address = cip68_operations.get_scripts()
+        skey = PaymentSigningKey.generate()
+        vkey = skey.to_verification_key()
+        owner = Address(vkey.hash(), network=Network.TESTNET)
+        ledger = OfflineLedgerContext()
+        for _ in range(3):
+            ledger.fund(owner, 1_000_000_000)
+        names = [f"Upd{i:03d}".encode() for i in range(5)]
+        items = [(name, create_cip68_datum(bytes(policy_id), name, bytes(vkey.hash()), "v1")) for name in names]
+        templates = CIP68TxTemplates(mint_script, store_script, Network.TESTNET)
+        for name, datum in items:
+            signed = templates.mint(ledger, owner, name, datum).build_and_sign([skey], change_address=owner)
+            ledger.submit_tx_cbor(signed.to_cbor())
+
+        context = _CountingContext(ledger)
+        results = cip68_operations.update_metadata_batch(
+            context, skey, vkey, owner, [(name.decode(), "v2") for name in names]
+        )
+    finally:
+        logging.getLogger("PyCardano").disabled = False
+
+    assert [name for result in results for name in result["token_names"]] == [name.decode() for name in names]
+    assert context.calls.count(("utxos", str(store_address))) == 1
+    assert not [call for call in context.calls if call[0] == "utxo_for_asset"]
+    for name in names:
+        ref_asset_name, _ = create_cip68_asset_names(name)
+        assert decode_cip68_datum(ledger.utxo_for_asset(policy_id, ref_asset_name).output.datum).version == 2
+
+
+def test_update_and_burn_reject_undecodable_datum(monkeypatch):
+    # Datum không đúng CIP68Datum: không kiểm tra được owner nên phải từ chối, không build tx
+    monkeypatch.setenv("NETWORK", "Preprod")
+    _, _, policy_id, store_address = cip68_operations.get_scripts()
+    skey = PaymentSigningKey.generate()
+    vkey = skey.to_verification_key()
+    owner = Address(vkey.hash(), network=Network.TESTNET)
+    ledger = OfflineLedgerContext()
+    ledger.fund(owner, 100_000_000)
+    ref_asset_name, user_asset_name = create_cip68_asset_names(b"Broken")
+    ledger.fund(store_address, Value(2_000_000, MultiAsset({policy_id: Asset({ref_asset_name: 1})})), datum=42)
+    ledger.fund(owner, Value(2_000_000, MultiAsset({policy_id: Asset({user_asset_name: 1})})))
+
+    with pytest.raises(ValueError, match="Không giải mã được datum"):
+        cip68_operations.update_metadata(ledger, skey, vkey, owner, "Broken", "v2")
+    with pytest.raises(ValueError, match="Không giải mã được datum"):
+        cip68_operations.burn_cip68_token(ledger, skey, vkey, owner, "Broken")
+    assert ledger.stats()["transactions"] == 0
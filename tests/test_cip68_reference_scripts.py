@@ -0,0 +1,66 @@
+"""Deploy reference script và build tx qua reference input (course_final/cip68/offchain/cip68_reference_scripts.py)."""
+import os
+
+import pytest
+from pycardano import Address, Network, PaymentSigningKey, TransactionBuilder, TransactionOutput
+
+from chain.offline_ledger import OfflineLedgerContext
+from conftest import CIP68_ROOT
+from offchain.cip68_reference_scripts import deploy_reference_scripts, load_reference_scripts
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import create_cip68_asset_names, create_cip68_datum, load_mint_script, load_store_script
+
+BLUEPRINT_PATH = os.path.join(CIP68_ROOT, "cip68_dynamic_asset", "plutus.json")
+MINT_SCRIPT = load_mint_script(BLUEPRINT_PATH)
+STORE_SCRIPT = load_store_script(BLUEPRINT_PATH)
+
+
+@pytest.fixture
+def deployed():
+    skey = PaymentSigningKey.generate()
+    owner = Address(skey.to_verification_key().hash(), network=Network.TESTNET)
+    ledger = OfflineLedgerContext()
+    ledger.fund(owner, 1_000_000_000)
+    scripts = deploy_reference_scripts(ledger, skey, owner, MINT_SCRIPT, STORE_SCRIPT)
+    return ledger, skey, owner, scripts
+
+
+def test_deploy_save_and_load(deployed, tmp_path):
+    ledger, skey, owner, scripts = deployed
+    path = str(tmp_path / "reference_scripts.json")
+    assert load_reference_scripts(path) is None
+
+    assert scripts.matches(MINT_SCRIPT, STORE_SCRIPT) and not scripts.matches(STORE_SCRIPT, MINT_SCRIPT)
+    assert scripts.address == owner and scripts.unspent_in(ledger.utxos(owner))
+    scripts.save(path)
+    loaded = load_reference_scripts(path, context=ledger)
+    assert (loaded.mint, loaded.store) == (scripts.mint, scripts.store)
+
+    # Tiêu UTxO giữ mint script: thông tin deploy không còn dùng được
+    builder = TransactionBuilder(ledger)
+    builder.add_input(scripts.mint)
+    builder.add_input_address(owner)
+    builder.add_output(TransactionOutput(owner, 5_000_000))
+    ledger.submit_tx(builder.build_and_sign([skey], change_address=owner))
+    assert load_reference_scripts(path) is not None
+    with pytest.raises(ValueError, match="đã bị tiêu"):
+        load_reference_scripts(path, context=ledger)
+
+
+def test_mint_references_scripts_instead_of_attaching_them(deployed):
+    ledger, skey, owner, scripts = deployed
+    plain = CIP68TxTemplates(MINT_SCRIPT, STORE_SCRIPT, Network.TESTNET)
+    referenced = CIP68TxTemplates(MINT_SCRIPT, STORE_SCRIPT, Network.TESTNET, reference_scripts=scripts)
+    datum = create_cip68_datum(bytes(plain.policy_id), b"Alpha", bytes(owner.payment_part), "Alpha")
+
+    inline_tx = plain.mint(ledger, owner, b"Alpha", datum).build_and_sign([skey], change_address=owner)
+    tx = referenced.mint(ledger, owner, b"Alpha", datum).build_and_sign([skey], change_address=owner)
+
+    assert scripts.mint.input in tx.transaction_body.reference_inputs
+    assert not tx.transaction_witness_set.plutus_v3_script
+    assert inline_tx.transaction_witness_set.plutus_v3_script
+    assert len(tx.to_cbor()) < len(inline_tx.to_cbor()) - len(MINT_SCRIPT) // 2
+    assert referenced.stats() == {"reference_scripts": True}
+    ledger.submit_tx(tx)
+    ref_asset_name, _ = create_cip68_asset_names(b"Alpha")
+    assert ledger.utxo_for_asset(plain.policy_id, ref_asset_name).output.address == plain.store_address
@@ -0,0 +1,99 @@
+"""Cache ex-units theo cấu trúc transaction (chain/exunits_cache.py)."""
+import os
+
+import pytest
+from pycardano import Address, ExecutionUnits, Network, PaymentSigningKey, Transaction
+
+from chain.exunits_cache import ExUnitsCache, ExUnitsCacheChainContext
+from chain.offline_ledger import OfflineLedgerContext
+from conftest import CIP68_ROOT
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import create_cip68_datum, load_mint_script, load_store_script
+
+BLUEPRINT_PATH = os.path.join(CIP68_ROOT, "cip68_dynamic_asset", "plutus.json")
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return CIP68TxTemplates(load_mint_script(BLUEPRINT_PATH), load_store_script(BLUEPRINT_PATH), Network.TESTNET)
+
+
+@pytest.fixture
+def owner():
+    return Address(PaymentSigningKey.generate().to_verification_key().hash(), network=Network.TESTNET)
+
+
+@pytest.fixture
+def evaluations():
+    # Ex-units tăng dần theo số lần evaluate thật (để kiểm tra cache giữ giá trị lớn nhất)
+    return []
+
+
+@pytest.fixture
+def ledger(owner, evaluations):
+    def evaluate(tx):
+        evaluations.append(tx)
+        units = 1_000_000 * len(evaluations)
+        return {"mint:0": ExecutionUnits(units, units * 100)}
+
+    ledger = OfflineLedgerContext(evaluator=evaluate)
+    ledger.fund(owner, 100_000_000)
+    return ledger
+
+
+def _mint_tx(templates, context, owner, name: bytes, metadata: str = "metadata") -> Transaction:
+    datum = create_cip68_datum(bytes(templates.policy_id), name, owner.payment_part.to_primitive(), metadata)
+    builder = templates.mint(context, owner, name, datum)
+    return Transaction(builder.build(change_address=owner), builder.build_witness_set())
+
+
+def test_key_ignores_values_but_not_shape(templates, ledger, owner):
+    cache = ExUnitsCache()
+    first = cache.keys(_mint_tx(templates, ledger, owner, b"TokenA1"))
+    # Cùng cấu trúc, khác tên token / metadata cùng độ dài → cùng key
+    assert cache.keys(_mint_tx(templates, ledger, owner, b"TokenB2", "metadatb")) == first
+    # Datum lớn hơn một bucket → output khác kích thước → key khác
+    assert cache.keys(_mint_tx(templates, ledger, owner, b"TokenC3", "x" * 500)) != first
+    assert list(first) == ["mint:0"]
+
+
+def test_hit_requires_every_redeemer_and_adds_margin():
+    cache = ExUnitsCache(margin=0.1)
+    keys = {"spend:0": ("spend", 1), "spend:1": ("spend", 2)}
+    cache.put({"spend:0": keys["spend:0"]}, {"spend:0": ExecutionUnits(1000, 2000)})
+    assert cache.get(keys) is None
+
+    cache.put(keys, {"spend:0": ExecutionUnits(900, 2500), "spend:1": ExecutionUnits(10, 20)})
+    hit = cache.get(keys)
+    # Giá trị lớn nhất từng đo của mỗi key, cộng margin và làm tròn lên
+    assert hit == {"spend:0": ExecutionUnits(1100, 2750), "spend:1": ExecutionUnits(11, 22)}
+    # Object mới mỗi lần (TransactionBuilder sửa trực tiếp ExecutionUnits)
+    assert cache.get(keys)["spend:0"] is not hit["spend:0"]
+    assert cache.stats()["skipped"] == 2 and cache.stats()["evaluations"] == 2
+
+
+def test_lru_eviction_and_disabled_cache():
+    cache = ExUnitsCache(max_entries=2)
+    for i in range(3):
+        cache.put({"mint:0": i}, {"mint:0": ExecutionUnits(i, i)})
+    assert cache.get({"mint:0": 0}) is None
+    assert cache.get({"mint:0": 2}) is not None
+
+    disabled = ExUnitsCache(max_entries=0)
+    disabled.put({"mint:0": 1}, {"mint:0": ExecutionUnits(1, 1)})
+    assert disabled.get({"mint:0": 1}) is None
+
+
+def test_context_evaluates_each_shape_once(templates, ledger, owner, evaluations):
+    context = ExUnitsCacheChainContext(ledger, cache=ExUnitsCache(margin=0.1))
+    _mint_tx(templates, context, owner, b"TokenA1")
+    second = _mint_tx(templates, context, owner, b"TokenB2")
+
+    assert len(evaluations) == 1
+    assert context.exunits_cache.covers(second)
+    [redeemer] = second.transaction_witness_set.redeemer.values()
+    assert redeemer.ex_units.mem >= 1_100_000
+
+    _mint_tx(templates, context, owner, b"TokenC3", "x" * 500)
+    assert len(evaluations) == 2
+    assert context.exunits_stats()["skipped"] == 1
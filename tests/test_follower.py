@@ -0,0 +1,107 @@
+"""Theo dõi chain từng block (chain/follower.py) trên httpx.MockTransport."""
+import asyncio
+
+import httpx
+from pycardano import Address, Network, VerificationKeyHash
+
+from chain.async_context import AsyncBlockFrostChainContext, utxo_from_json
+from chain.follower import AddressIndex, BlockRef, ChainFollower
+from chain.utxo_cache import UTxOCache
+
+ADDRESS = str(Address(VerificationKeyHash(bytes(28)), network=Network.TESTNET))
+OTHER = str(Address(VerificationKeyHash(b"\x01" * 28), network=Network.TESTNET))
+
+
+def _output(tx_hash: str, index: int, lovelace: int) -> dict:
+    return {
+        "tx_hash": tx_hash, "output_index": index, "address": ADDRESS,
+        "amount": [{"unit": "lovelace", "quantity": str(lovelace)}],
+        "data_hash": None, "inline_datum": None, "reference_script_hash": None,
+    }
+
+
+def _block(height: int, previous=None) -> dict:
+    return {"height": height, "hash": f"{height:064x}", "previous_block": previous}
+
+
+def _context(routes, **kwargs):
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/v0", 1)[1]
+        if path not in routes:
+            return httpx.Response(404, json={"status_code": 404, "error": "Not Found", "message": path})
+        return httpx.Response(200, json=routes[path])
+
+    return AsyncBlockFrostChainContext("test", "https://cardano-preview.blockfrost.io/api",
+                                       transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_bootstrap_ignores_stale_utxo_cache():
+    routes = {
+        "/blocks/latest": _block(10),
+        f"/addresses/{ADDRESS}/utxos": [_output("aa" * 32, 0, 5_000_000)],
+    }
+    cache = UTxOCache(ttl=60)
+    # Cache còn giữ UTxO cũ hơn tip (đã bị tiêu ở block <= 10)
+    cache.put(ADDRESS, [utxo_from_json(ADDRESS, _output("bb" * 32, 0, 1_000_000))])
+    context = _context(routes, cache=cache)
+    index = AddressIndex([ADDRESS])
+
+    asyncio.run(ChainFollower(context, index).bootstrap())
+    assert index.tip == BlockRef(10, _block(10)["hash"])
+    assert [u.input.transaction_id.payload.hex() for u in index.utxos()] == ["aa" * 32]
+
+
+def test_poll_applies_next_blocks():
+    spend_hash = "cc" * 32
+    routes = {
+        "/blocks/latest": _block(10),
+        f"/addresses/{ADDRESS}/utxos": [_output("aa" * 32, 0, 5_000_000)],
+        f"/blocks/{_block(10)['hash']}/next": [_block(11, _block(10)["hash"])],
+        "/blocks/10": _block(10),
+        f"/addresses/{ADDRESS}/transactions": [
+            {"tx_hash": spend_hash, "tx_index": 0, "block_height": 11},
+        ],
+        f"/txs/{spend_hash}/utxos": {
+            "inputs": [dict(_output("aa" * 32, 0, 5_000_000))],
+            "outputs": [_output(spend_hash, 0, 3_000_000), dict(_output(spend_hash, 1, 1_800_000), address=OTHER)],
+        },
+    }
+    context = _context(routes)
+    index = AddressIndex([ADDRESS])
+    follower = ChainFollower(context, index)
+    seen = []
+    index.subscribe(lambda added, removed: seen.append((len(added), len(removed))))
+
+    async def run():
+        assert await follower.poll() == 0
+        routes["/blocks/latest"] = _block(11, _block(10)["hash"])
+        return await follower.poll()
+
+    assert asyncio.run(run()) == 1
+    assert index.tip.height == 11
+    assert [(u.input.transaction_id.payload.hex(), u.output.amount.coin) for u in index.utxos()] == [
+        (spend_hash, 3_000_000)
+    ]
+    assert seen == [(1, 0), (1, 1)]
+
+
+def test_rollback_restores_index():
+    index = AddressIndex([ADDRESS])
+    index.reset(BlockRef(9, _block(9)["hash"]), [utxo_from_json(ADDRESS, _output("aa" * 32, 0, 5_000_000))])
+    index.apply_block(BlockRef(10, _block(10)["hash"]), [])
+    index.apply_block(BlockRef(11, "ff" * 32), [
+        ([("aa" * 32, 0)], [utxo_from_json(ADDRESS, _output("cc" * 32, 0, 3_000_000))]),
+    ])
+    # Block 11 đã bị fork thay, block 10 vẫn còn trên chain
+    routes = {
+        "/blocks/latest": _block(11, _block(10)["hash"]),
+        "/blocks/11": _block(11, _block(10)["hash"]),
+        "/blocks/10": _block(10),
+        f"/blocks/{_block(10)['hash']}/next": [_block(11, _block(10)["hash"])],
+    }
+    follower = ChainFollower(_context(routes), index)
+
+    assert asyncio.run(follower.poll()) == 1
+    assert index.tip == BlockRef(11, _block(11)["hash"])
+    assert [u.input.transaction_id.payload.hex() for u in index.utxos()] == ["aa" * 32]
+    assert index.stats()["rollbacks"] == 1
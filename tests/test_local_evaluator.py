@@ -0,0 +1,154 @@
+"""
+Evaluator Plutus local (chain/local_evaluator.py)
+=================================================
+Mint → update → burn trên OfflineLedgerContext với LocalEvaluationChainContext
+(trước đây là phần offline của benchmarks/check_local_evaluator.py), và các
+đường evaluate remote khi evaluator local không dùng được.
+"""
+import logging
+import os
+
+import pytest
+from pycardano import (
+    Address,
+    Network,
+    PaymentSigningKey,
+    Transaction,
+    TransactionFailedException,
+    VerificationKeyWitness,
+)
+
+from chain import local_evaluator
+from chain.base import ChainContextWrapper
+from chain.local_evaluator import (
+    LocalEvaluationChainContext,
+    LocalPlutusEvaluator,
+    evaluate_many,
+    slot_to_posix_ms,
+)
+from chain.offline_ledger import OfflineLedgerContext
+from conftest import CIP68_ROOT
+from offchain.cip68_templates import CIP68TxTemplates
+from offchain.cip68_utils import create_cip68_asset_names, create_cip68_datum, load_mint_script, load_store_script
+
+BLUEPRINT_PATH = os.path.join(CIP68_ROOT, "cip68_dynamic_asset", "plutus.json")
+TOKEN_NAME = b"CheckNFT"
+
+
+class _NoGenesisContext(ChainContextWrapper):
+    """Như AsyncChainContextBridge trước đây: không có genesis_param."""
+
+    @property
+    def genesis_param(self):
+        raise NotImplementedError()
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return CIP68TxTemplates(load_mint_script(BLUEPRINT_PATH), load_store_script(BLUEPRINT_PATH), Network.TESTNET)
+
+
+@pytest.fixture
+def wallet():
+    skey = PaymentSigningKey.generate()
+    return skey, Address(skey.to_verification_key().hash(), network=Network.TESTNET)
+
+
+@pytest.fixture
+def ledger(wallet):
+    ledger = OfflineLedgerContext()
+    for _ in range(3):
+        ledger.fund(wallet[1], 50_000_000)
+    return ledger
+
+
+@pytest.fixture
+def quiet_pycardano():
+    # Lỗi dự kiến: tắt log WARNING (dump toàn bộ builder) của pycardano
+    logger = logging.getLogger("PyCardano")
+    logger.disabled = True
+    yield
+    logger.disabled = False
+
+
+def _datum(templates, owner, metadata, version):
+    return create_cip68_datum(
+        bytes(templates.policy_id), TOKEN_NAME, owner.payment_part.to_primitive(), metadata, version=version
+    )
+
+
+def _build(builder, change_address) -> Transaction:
+    return Transaction(builder.build(change_address=change_address), builder.build_witness_set())
+
+
+def _submit(ledger, skey, builder, owner):
+    tx = _build(builder, owner)
+    tx.transaction_witness_set.vkey_witnesses = [
+        VerificationKeyWitness(skey.to_verification_key(), skey.sign(tx.transaction_body.hash()))
+    ]
+    ledger.submit_tx_cbor(tx.to_cbor())
+    return tx, list(builder.inputs) + [u for u in builder.reference_inputs if not isinstance(u, bytes)]
+
+
+@pytest.mark.skipif(local_evaluator.uplc_eval is None, reason="cần package `uplc`")
+def test_lifecycle_evaluates_locally(templates, ledger, wallet, quiet_pycardano):
+    skey, owner = wallet
+    context = LocalEvaluationChainContext(ledger)
+    ref_name, user_name = create_cip68_asset_names(TOKEN_NAME)
+
+    builds = [_submit(ledger, skey, templates.mint(context, owner, TOKEN_NAME, _datum(templates, owner, "v1", 1)), owner)]
+    ref = ledger.utxo_for_asset(templates.policy_id, ref_name)
+    builds.append(_submit(
+        ledger, skey, templates.update(context, owner, ref, TOKEN_NAME, _datum(templates, owner, "v2", 2)), owner
+    ))
+
+    # Validator từ chối update đổi owner trong datum
+    ref = ledger.utxo_for_asset(templates.policy_id, ref_name)
+    stolen = create_cip68_datum(bytes(templates.policy_id), TOKEN_NAME, bytes(28), "stolen", version=3)
+    with pytest.raises(TransactionFailedException):
+        _build(templates.update(context, owner, ref, TOKEN_NAME, stolen), owner)
+
+    user = ledger.utxo_for_asset(templates.policy_id, user_name)
+    builds.append(_submit(ledger, skey, templates.burn(context, owner, ref, user, TOKEN_NAME), owner))
+
+    stats = context.local_eval_stats()
+    assert stats["remote_fallbacks"] == 0
+    assert stats["local"] == 3
+
+    # evaluate_many (nhiều process) cho cùng kết quả với evaluate tuần tự
+    evaluator = LocalPlutusEvaluator()
+    to_posix = slot_to_posix_ms(ledger)
+    expected = [evaluator.evaluate(tx, utxos, slot_to_posix=to_posix) for tx, utxos in builds]
+    assert all(units.mem > 0 and units.steps > 0 for result in expected for units in result.values())
+    assert evaluate_many(builds, max_workers=2, slot_to_posix=to_posix) == expected
+
+
+def test_falls_back_without_genesis_param(templates, ledger, wallet):
+    # TransactionBuilder luôn đặt ttl/validity_start → cần slot → POSIX time
+    _, owner = wallet
+    context = LocalEvaluationChainContext(_NoGenesisContext(ledger))
+    tx = _build(templates.mint(context, owner, TOKEN_NAME, _datum(templates, owner, "v1", 1)), owner)
+
+    assert tx.transaction_body.ttl is not None
+    assert context.local_eval_stats()["remote_fallbacks"] == 1
+    assert context.local_eval_stats()["local"] == 0
+
+
+def test_falls_back_without_uplc(templates, ledger, wallet, monkeypatch):
+    monkeypatch.setattr(local_evaluator, "uplc_eval", None)
+    _, owner = wallet
+    context = LocalEvaluationChainContext(ledger)
+    assert context.evaluator is None
+
+    _build(templates.mint(context, owner, TOKEN_NAME, _datum(templates, owner, "v1", 1)), owner)
+    assert context.local_eval_stats()["remote_fallbacks"] == 1
+
+
+def test_falls_back_for_unknown_inputs(templates, ledger, wallet):
+    # Ví đọc thẳng từ ledger nên evaluator không biết UTxO của input
+    _, owner = wallet
+    context = LocalEvaluationChainContext(ledger)
+    tx = _build(templates.mint(ledger, owner, TOKEN_NAME, _datum(templates, owner, "v1", 1)), owner)
+
+    assert context.evaluate_tx(tx) == ledger.evaluate_tx(tx)
+    assert context.local_eval_stats()["remote_fallbacks"] == 1
@@ -0,0 +1,112 @@
+"""Services chạy end-to-end trên OfflineLedgerContext (chain/offline_ledger.py) qua set_chain_context."""
+import pytest
+from pycardano import (
+    Address,
+    AssetName,
+    NativeScript,
+    PaymentSigningKey,
+    ScriptHash,
+    TransactionBuilder,
+    TransactionFailedException,
+    TransactionOutput,
+)
+from pycardano.crypto.bip32 import HDWallet
+
+from chain.offline_ledger import OfflineLedgerContext
+from config.blockfrost import set_chain_context
+from services.consolidation_service import ConsolidationService
+from services.mint_service import MintService
+from services.nft_service import NFTService
+from services.transaction_service import TransactionService
+from wallet.wallet_manager import WalletManager
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    # Services ghi keys/ và data/policies/ theo thư mục hiện tại
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "keys").mkdir()
+    ledger = OfflineLedgerContext()
+    set_chain_context(ledger)
+    yield ledger
+    set_chain_context(None)
+
+
+def _wallet(ledger, *amounts):
+    wallet = WalletManager(mnemonic=HDWallet.generate_mnemonic())
+    for amount in amounts:
+        ledger.fund(wallet.get_address(), amount)
+    return wallet
+
+
+def _quantity(ledger, address, policy_id: str, name: str) -> int:
+    asset = AssetName(name.encode())
+    policy = ScriptHash(bytes.fromhex(policy_id))
+    return sum(u.output.amount.multi_asset.get(policy, {}).get(asset, 0) for u in ledger.utxos(address))
+
+
+def test_mint_and_burn_token(ledger):
+    wallet = _wallet(ledger, 50_000_000, 50_000_000)
+    mint = MintService(wallet)
+    assert mint.context is ledger
+    policy_id = mint._create_policy()[1]
+
+    assert ledger.transaction(mint.mint_token("Coin", 1000)) is not None
+    assert _quantity(ledger, wallet.get_address(), policy_id, "Coin") == 1000
+    assert ledger.transaction(mint.burn_token(policy_id, "Coin", 400)) is not None
+    assert _quantity(ledger, wallet.get_address(), policy_id, "Coin") == 600
+    assert ledger.stats()["transactions"] == 2
+
+
+def test_nft_service_mints_with_time_locked_policy(ledger, tmp_path):
+    wallet = _wallet(ledger, 50_000_000)
+    tx_id = NFTService(wallet).mint_nft("Art", "ipfs://art")
+
+    [nft_utxo] = [u for u in ledger.utxos(wallet.get_address()) if u.output.amount.multi_asset]
+    [(policy, assets)] = nft_utxo.output.amount.multi_asset.items()
+    assert dict(assets) == {AssetName(b"Art"): 1}
+    assert ledger.transaction(tx_id)["slot"] == 1
+    # Policy hết hạn 60 phút sau slot lúc mint (slot 0)
+    policy_file = tmp_path / "data" / "policies" / f"{policy.payload.hex()}.policy"
+    [_, timelock] = NativeScript.from_cbor(policy_file.read_text()).native_scripts
+    assert timelock.after == 3600
+
+
+def test_send_and_consolidate_ada(ledger):
+    sender = _wallet(ledger, 20_000_000, 20_000_000)
+    receiver = _wallet(ledger, *[3_000_000] * 4)
+
+    TransactionService(sender).send_ada(receiver.get_address(), 10_000_000, wait_confirm=False)
+    receiver_utxos = ledger.utxos(receiver.get_address())
+    assert len(receiver_utxos) == 5 and sum(u.output.amount.coin for u in receiver_utxos) == 22_000_000
+
+    tx_hash = ConsolidationService(receiver).consolidate(min_utxo_threshold=5, wait_confirm=False)
+    # Output hợp nhất + change
+    merged = ledger.utxos(receiver.get_address())
+    fee = int(ledger.transaction(tx_hash)["fees"])
+    assert len(merged) == 2 and sum(u.output.amount.coin for u in merged) == 22_000_000 - fee
+    assert ConsolidationService(receiver).consolidate(min_utxo_threshold=3, wait_confirm=False) is None
+
+
+def test_ledger_rejects_double_spend_and_bad_witness(ledger):
+    skey = PaymentSigningKey.generate()
+    owner = Address(skey.to_verification_key().hash(), network=ledger.network)
+    funded = ledger.fund(owner, 10_000_000)
+
+    def transfer(signing_key):
+        builder = TransactionBuilder(ledger)
+        builder.add_input(funded)
+        builder.add_output(TransactionOutput(owner, 3_000_000))
+        return builder.build_and_sign([signing_key], change_address=owner)
+
+    with pytest.raises(TransactionFailedException, match="MissingVKeyWitnessesUTXOW"):
+        ledger.submit_tx(transfer(PaymentSigningKey.generate()))
+    tx = transfer(skey)
+    ledger.submit_tx(tx)
+    with pytest.raises(TransactionFailedException, match="đã được submit"):
+        ledger.submit_tx(tx)
+    builder = TransactionBuilder(ledger)
+    builder.add_input(funded)
+    builder.add_output(TransactionOutput(owner, 2_000_000))
+    with pytest.raises(TransactionFailedException, match="BadInputsUTxO"):
+        ledger.submit_tx(builder.build_and_sign([skey], change_address=owner))
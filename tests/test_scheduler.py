@@ -0,0 +1,103 @@
+"""Điều phối request Blockfrost (chain/scheduler.py): ưu tiên, token bucket, retry 429/5xx."""
+import asyncio
+
+import pytest
+
+from chain.scheduler import BlockfrostScheduler, background
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(status_code)
+        self.status_code = status_code
+
+
+def _flaky(*statuses):
+    """fn() raise lần lượt các status trong `statuses`, sau đó trả về "ok"."""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(statuses):
+            raise _HTTPError(statuses[len(calls) - 1])
+        return "ok"
+
+    return fn, calls
+
+
+def test_retries_429_and_5xx_then_succeeds():
+    scheduler = BlockfrostScheduler(base_delay=0.001, max_delay=0.002)
+    fn, calls = _flaky(429, 503)
+    assert scheduler.call(fn) == "ok" and len(calls) == 3
+    stats = scheduler.stats()
+    assert stats["throttled"] == 1 and stats["retries"] == 2 and stats["failures"] == 0
+
+
+def test_gives_up_after_max_retries_and_does_not_retry_client_errors():
+    scheduler = BlockfrostScheduler(max_retries=2, base_delay=0.001, max_delay=0.002)
+    fn, calls = _flaky(500, 500, 500, 500)
+    with pytest.raises(_HTTPError):
+        scheduler.call(fn)
+    assert len(calls) == 3 and scheduler.stats()["failures"] == 1
+
+    fn, calls = _flaky(404)
+    with pytest.raises(_HTTPError):
+        scheduler.call(fn)
+    assert len(calls) == 1
+
+
+def test_async_call_retries_response_status():
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    responses = iter([Response(502), Response(200)])
+
+    async def fn():
+        return next(responses)
+
+    scheduler = BlockfrostScheduler(base_delay=0.001, max_delay=0.002)
+    assert asyncio.run(scheduler.call_async(fn)).status_code == 200
+    assert scheduler.stats()["retries"] == 1
+
+
+def test_interactive_requests_jump_the_queue():
+    async def run():
+        scheduler = BlockfrostScheduler(rate=200, burst=1)
+        await scheduler.acquire_async()  # Hết token: mọi request sau phải xếp hàng
+        order = []
+
+        async def request(name):
+            await scheduler.acquire_async()
+            order.append(name)
+
+        # Task chép context lúc tạo: ba request nền xếp hàng trước request tương tác
+        with background():
+            waiting = [asyncio.create_task(request(f"background{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        waiting.append(asyncio.create_task(request("interactive")))
+        await asyncio.gather(*waiting)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(run())
+    assert order[0] == "interactive" and order[1:] == ["background0", "background1", "background2"]
+    assert stats["classes"]["background"]["queued"] == 3
+    assert stats["classes"]["interactive"]["queued"] == 1
+    assert all(level["queue_depth"] == 0 for level in stats["classes"].values())
+
+
+def test_cancelled_request_leaves_the_queue():
+    async def run():
+        scheduler = BlockfrostScheduler(rate=50, burst=1)
+        await scheduler.acquire_async()
+        waiter = asyncio.create_task(scheduler.acquire_async())
+        await asyncio.sleep(0)
+        assert scheduler.stats()["classes"]["interactive"]["queue_depth"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["classes"]["interactive"]["queue_depth"] == 0
+
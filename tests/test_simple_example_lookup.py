@@ -0,0 +1,61 @@
+"""
+utxo_for_asset của course/cip68_simple_example qua chain.AssetLookupChainContext
+==================================================================================
+Ví dụ có config.py riêng (trùng tên package config/ của repo) nên chạy trong
+process con, với off_chain/ đứng đầu sys.path như khi chạy script thật.
+"""
+import os
+import subprocess
+import sys
+
+from conftest import REPO_ROOT
+
+OFF_CHAIN = os.path.join(REPO_ROOT, "course", "cip68_simple_example", "off_chain")
+
+SCRIPT = r'''
+import config, utils
+import burn_nft, query_nft, update_nft
+from pycardano import Address, Network, VerificationKeyHash
+
+POLICY, NAME = "ab" * 28, "000643b0" + "cd" * 28
+HOLDER = str(Address(VerificationKeyHash(bytes(28)), network=Network.TESTNET))
+
+
+class Api:
+    calls = 0
+
+    def asset_addresses(self, unit, return_type=None):
+        Api.calls += 1
+        assert unit == POLICY + NAME
+        return [{"address": HOLDER, "quantity": "1"}]
+
+    def address_utxos_asset(self, address, unit, return_type=None):
+        Api.calls += 1
+        return [{
+            "tx_hash": "ef" * 32, "output_index": 1,
+            "amount": [{"unit": "lovelace", "quantity": "2000000"}, {"unit": unit, "quantity": "1"}],
+            "data_hash": None, "inline_datum": None, "reference_script_hash": None,
+        }]
+
+
+class Blockfrost:
+    api = Api()
+
+
+context = utils.asset_lookup_context(Blockfrost())
+utxo = context.utxo_for_asset(POLICY, NAME)
+assert str(utxo.output.address) == HOLDER and utxo.input.index == 1, utxo
+assert context.utxo_for_asset(POLICY, NAME) == utxo and Api.calls == 2
+assert context.asset_stats()["hits"] == 1
+assert config.__file__.startswith(utils.__file__.rsplit("utils.py", 1)[0])
+print("ok")
+'''
+
+
+def test_simple_example_uses_shared_asset_lookup():
+    env = dict(os.environ, PYTHONPATH=OFF_CHAIN + os.pathsep + os.path.dirname(OFF_CHAIN))
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=OFF_CHAIN, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("ok")
@@ -0,0 +1,136 @@
+"""Gộp truy vấn trùng đang chạy đồng thời (chain/singleflight.py)."""
+import asyncio
+import threading
+import time
+
+import pytest
+from pycardano import Address, Network, VerificationKeyHash
+
+from chain.offline_ledger import OfflineLedgerContext
+from chain.singleflight import SingleFlight, SingleFlightChainContext
+
+ADDRESS = Address(VerificationKeyHash(bytes(28)), network=Network.TESTNET)
+
+
+def test_threads_share_one_upstream_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "utxos"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", fetch)))
+    leader.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(flight.do("key", fetch))) for _ in range(4)]
+    for thread in waiters:
+        thread.start()
+    while flight.stats()["saved_calls"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader, *waiters]:
+        thread.join(5)
+
+    assert results == ["utxos"] * 5 and len(calls) == 1
+    assert flight.stats() == {"upstream_calls": 1, "saved_calls": 4, "in_flight": 0}
+    # Lời gọi đã xong không được cache: gọi lại thì gọi upstream
+    assert flight.do("key", fetch) == "utxos" and len(calls) == 2
+
+
+def test_thread_error_reaches_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("429")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("key", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["saved_calls"] + flight.stats()["upstream_calls"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert errors == ["429"] * 3
+
+
+def test_async_callers_share_one_task():
+    async def run():
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"slot": 42}
+
+        results = await asyncio.gather(*(flight.do_async(("slot",), fetch) for _ in range(5)))
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(run())
+    assert results == [{"slot": 42}] * 5 and len(calls) == 1
+    assert stats == {"upstream_calls": 1, "saved_calls": 4, "in_flight": 0}
+
+
+def test_cancelled_leader_does_not_fail_waiters():
+    async def run():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "utxos"
+
+        leader = asyncio.create_task(flight.do_async("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do_async("key", fetch))
+        await asyncio.sleep(0)
+        # Client của caller đầu tiên ngắt kết nối
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter, flight.stats()
+
+    result, stats = asyncio.run(run())
+    assert result == "utxos"
+    assert stats["upstream_calls"] == 1 and stats["in_flight"] == 0
+
+
+def test_async_error_reaches_every_caller():
+    async def run():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("503")
+
+        return await asyncio.gather(*(flight.do_async("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [str(e) for e in results] == ["503"] * 3
+
+
+def test_chain_context_returns_separate_lists():
+    ledger = OfflineLedgerContext()
+    ledger.fund(ADDRESS, 5_000_000)
+    context = SingleFlightChainContext(ledger)
+    first, second = context.utxos(ADDRESS), context.utxos(ADDRESS)
+    assert first == second and first is not second
+    assert context.last_block_slot == ledger.last_block_slot
@@ -0,0 +1,83 @@
+"""Cache UTxO theo địa chỉ (chain/utxo_cache.py): TTL, LRU và invalidate khi submit."""
+from pycardano import Address, Network, PaymentSigningKey, TransactionBuilder, TransactionOutput
+
+from chain import utxo_cache
+from chain.offline_ledger import OfflineLedgerContext
+from chain.utxo_cache import CachedChainContext, UTxOCache
+
+
+def _wallet():
+    skey = PaymentSigningKey.generate()
+    return skey, Address(skey.to_verification_key().hash(), network=Network.TESTNET)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(utxo_cache.time, "monotonic", clock)
+    _, owner = _wallet()
+    ledger = OfflineLedgerContext()
+    ledger.fund(owner, 5_000_000)
+    context = CachedChainContext(ledger, ttl=5)
+
+    first = context.utxos(owner)
+    ledger.fund(owner, 7_000_000)
+    clock.now += 4.9
+    # Còn hạn: vẫn là kết quả cũ, và là bản sao (caller sửa list không ảnh hưởng cache)
+    cached = context.utxos(owner)
+    assert cached == first and cached is not first
+    cached.clear()
+    assert context.utxos(owner) == first
+    clock.now += 0.2
+    assert len(context.utxos(owner)) == 2
+    assert context.stats()["hits"] == 2 and context.stats()["misses"] == 2
+
+
+def test_least_recently_used_address_is_evicted():
+    cache = UTxOCache(ttl=60, max_addresses=2)
+    addresses = [_wallet()[1] for _ in range(3)]
+    cache.put(addresses[0], [])
+    cache.put(addresses[1], [])
+    assert cache.get(addresses[0]) == []
+    cache.put(addresses[2], [])
+    assert cache.get(addresses[1]) is None
+    assert cache.get(addresses[0]) == [] and cache.get(addresses[2]) == []
+
+
+def test_submit_invalidates_spent_and_paid_addresses():
+    skey, sender = _wallet()
+    _, receiver = _wallet()
+    _, bystander = _wallet()
+    ledger = OfflineLedgerContext()
+    for address in (sender, receiver, bystander):
+        ledger.fund(address, 50_000_000)
+    context = CachedChainContext(ledger, ttl=60)
+    for address in (sender, receiver, bystander):
+        context.utxos(address)
+
+    builder = TransactionBuilder(context)
+    builder.add_input_address(sender)
+    builder.add_output(TransactionOutput(receiver, 10_000_000))
+    context.submit_tx(builder.build_and_sign([skey], change_address=sender))
+
+    assert context.cache.get(sender) is None and context.cache.get(receiver) is None
+    assert context.cache.get(bystander) is not None
+    assert context.stats()["invalidations"] == 2
+    assert sum(u.output.amount.coin for u in context.utxos(receiver)) == 60_000_000
+
+
+def test_zero_ttl_disables_cache():
+    _, owner = _wallet()
+    ledger = OfflineLedgerContext()
+    ledger.fund(owner, 5_000_000)
+    context = CachedChainContext(ledger, ttl=0)
+    context.utxos(owner)
+    ledger.fund(owner, 5_000_000)
+    assert len(context.utxos(owner)) == 2 and context.stats()["addresses"] == 0
@@ -0,0 +1,131 @@
+"""Snapshot UTxO SQLite (chain/utxo_store.py): full sync, delta sync theo block height, ẩn UTxO đã submit."""
+from pycardano import (
+    Address,
+    Network,
+    Transaction,
+    TransactionBody,
+    TransactionInput,
+    TransactionOutput,
+    TransactionWitnessSet,
+    VerificationKeyHash,
+)
+
+from chain.async_context import utxo_from_json
+from chain.utxo_store import SnapshotChainContext, SQLiteUTxOStore
+
+ADDRESS = str(Address(VerificationKeyHash(bytes(28)), network=Network.TESTNET))
+OTHER = str(Address(VerificationKeyHash(b"\x01" * 28), network=Network.TESTNET))
+POLICY = "ab" * 28
+
+
+def _item(tx_hash: str, index: int, lovelace: int, address: str = ADDRESS, **extra) -> dict:
+    return dict({
+        "tx_hash": tx_hash, "output_index": index, "address": address,
+        "amount": [{"unit": "lovelace", "quantity": str(lovelace)}],
+        "data_hash": None, "inline_datum": None, "reference_script_hash": None,
+    }, **extra)
+
+
+class _FakeApi:
+    """BlockFrostApi giả: tip, UTxO theo trang và transaction theo block height."""
+
+    def __init__(self, height, utxos):
+        self.height = height
+        self.utxos = utxos
+        self.txs = []  # (block_height, tx_hash, {"inputs": [...], "outputs": [...]})
+        self.calls = []
+
+    def block_latest(self, return_type=None):
+        return {"height": self.height}
+
+    def address_utxos(self, address, count=100, page=1, return_type=None):
+        self.calls.append(("utxos", page))
+        return self.utxos[(page - 1) * count:page * count]
+
+    def address_transactions(self, address, from_block, to_block, gather_pages=False, return_type=None):
+        self.calls.append(("transactions", from_block, to_block))
+        return [
+            {"tx_hash": tx_hash, "block_height": height}
+            for height, tx_hash, _ in self.txs if int(from_block) <= height <= int(to_block)
+        ]
+
+    def transaction_utxos(self, tx_hash, return_type=None):
+        return next(utxos for _, h, utxos in self.txs if h == tx_hash)
+
+
+class _FakeBlockfrost:
+    def __init__(self, api):
+        self.api = api
+
+
+def _hashes(utxos):
+    return [(u.input.transaction_id.payload.hex(), u.input.index) for u in utxos]
+
+
+def test_full_then_delta_sync_and_reopen(tmp_path):
+    path = str(tmp_path / "snapshots" / "preview.sqlite")
+    api = _FakeApi(10, [_item("aa" * 32, 0, 5_000_000), _item("aa" * 32, 1, 2_000_000)])
+    context = SnapshotChainContext(_FakeBlockfrost(api), SQLiteUTxOStore(path), min_interval=0)
+
+    assert _hashes(context.utxos(ADDRESS)) == [("aa" * 32, 0), ("aa" * 32, 1)]
+    assert context.store.height(ADDRESS) == 10
+
+    # Block 12: tiêu aa#0, trả một output về ADDRESS và một output sang địa chỉ khác
+    api.height = 12
+    api.txs.append((12, "cc" * 32, {
+        "inputs": [_item("aa" * 32, 0, 5_000_000), _item("ee" * 32, 0, 9_000_000, OTHER, collateral=True)],
+        "outputs": [_item("cc" * 32, 0, 3_000_000), _item("cc" * 32, 1, 1_800_000, OTHER)],
+    }))
+    assert _hashes(context.utxos(ADDRESS)) == [("aa" * 32, 1), ("cc" * 32, 0)]
+    # Không tải lại trang đầu: chỉ hỏi các transaction từ block 11
+    assert api.calls.count(("utxos", 1)) == 1 and ("transactions", "11", "12") in api.calls
+    stats = context.stats()
+    assert (stats["full_syncs"], stats["delta_syncs"], stats["applied_txs"]) == (1, 1, 1)
+
+    # Mở lại file: snapshot còn nguyên, không cần mạng khi còn mới
+    reopened = SnapshotChainContext(_FakeBlockfrost(None), SQLiteUTxOStore(path), min_interval=60)
+    assert reopened.utxos(ADDRESS) == context.utxos(ADDRESS)
+
+
+def test_assets_and_inline_datum_round_trip():
+    unit = POLICY + "000643b0" + "cd" * 4
+    item = _item("aa" * 32, 0, 2_000_000, inline_datum="d87980", data_hash="11" * 32)
+    item["amount"].append({"unit": unit, "quantity": "1"})
+    utxo = utxo_from_json(ADDRESS, item)
+    store = SQLiteUTxOStore()
+    store.replace(ADDRESS, [utxo], 5)
+
+    [stored] = store.utxos(ADDRESS)
+    assert stored == utxo
+    assert stored.output.datum.cbor == bytes.fromhex("d87980")
+
+
+def test_submitted_inputs_hidden_until_seen_on_chain():
+    api = _FakeApi(10, [_item("aa" * 32, 0, 5_000_000), _item("aa" * 32, 1, 2_000_000)])
+    store = SQLiteUTxOStore()
+    context = SnapshotChainContext(_FakeBlockfrost(api), store, min_interval=60)
+    [spent, kept] = context.utxos(ADDRESS)
+
+    body = TransactionBody(
+        inputs=[spent.input], outputs=[TransactionOutput(Address.from_primitive(OTHER), 4_800_000)], fee=200_000
+    )
+    touched = store.mark_spent(Transaction(body, TransactionWitnessSet()).to_cbor())
+    assert touched == {ADDRESS, OTHER}
+    # Địa chỉ liên quan bị buộc sync lại; tx chưa vào block thì UTxO vẫn bị ẩn
+    assert not store.is_fresh(ADDRESS, 60)
+    assert context.utxos(ADDRESS) == [kept] and store.stats()["pending_spent"] == 1
+
+    api.height = 11
+    api.txs.append((11, "cc" * 32, {"inputs": [_item("aa" * 32, 0, 5_000_000)], "outputs": []}))
+    assert context.sync(ADDRESS) == 1
+    assert context.utxos(ADDRESS) == [kept] and store.stats()["pending_spent"] == 0
+
+
+def test_pending_spent_expires():
+    store = SQLiteUTxOStore(pending_ttl=0)
+    utxo = utxo_from_json(ADDRESS, _item("aa" * 32, 0, 5_000_000))
+    store.replace(ADDRESS, [utxo], 1)
+    body = TransactionBody(inputs=[TransactionInput.from_primitive(["aa" * 32, 0])], outputs=[], fee=0)
+    store.mark_spent(Transaction(body, TransactionWitnessSet()).to_cbor())
+    # Transaction không vào được block: hết hạn thì UTxO hiện lại
+    assert store.utxos(ADDRESS) == [utxo]
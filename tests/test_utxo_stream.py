@@ -0,0 +1,100 @@
+"""Stream UTxO theo trang Blockfrost (chain/utxo_stream.py) qua các wrapper của chain/."""
+import os
+
+import requests
+from blockfrost import ApiError
+from pycardano import Address, Network, VerificationKeyHash, plutus_script_hash
+
+from chain.offline_ledger import OfflineLedgerContext
+from chain.singleflight import SingleFlightChainContext
+from chain.utxo_cache import CachedChainContext
+from chain.utxo_stream import iter_address_utxos, iter_utxos
+from conftest import CIP68_ROOT
+from offchain.cip68_utils import load_store_script
+
+ADDRESS = Address(VerificationKeyHash(bytes(28)), network=Network.TESTNET)
+STORE_SCRIPT = load_store_script(os.path.join(CIP68_ROOT, "cip68_dynamic_asset", "plutus.json"))
+SCRIPT_HASH = str(plutus_script_hash(STORE_SCRIPT))
+
+
+def _item(i: int, script_hash=None) -> dict:
+    return {
+        "tx_hash": i.to_bytes(32, "big").hex(), "output_index": 0,
+        "amount": [{"unit": "lovelace", "quantity": str(1_000_000 + i)}],
+        "data_hash": None, "inline_datum": None, "reference_script_hash": script_hash,
+    }
+
+
+class _FakeApi:
+    """BlockFrostApi giả: address_utxos theo trang, script / script_cbor cho reference script."""
+
+    def __init__(self, items):
+        self.items = items
+        self.calls = []
+
+    def address_utxos(self, address, count=100, page=1, return_type=None):
+        self.calls.append(("page", page))
+        if not self.items:
+            response = requests.Response()
+            response.status_code = 404
+            response._content = b'{"status_code": 404, "error": "Not Found", "message": "address"}'
+            raise ApiError(response)
+        return self.items[(page - 1) * count:page * count]
+
+    def script(self, script_hash, return_type=None):
+        self.calls.append(("script", script_hash))
+        return {"type": "plutusV3"}
+
+    def script_cbor(self, script_hash, return_type=None):
+        return {"cbor": bytes(STORE_SCRIPT).hex()}
+
+
+class _FakeBlockfrost:
+    """Đáy của stack: chỉ có `api` (như BlockFrostChainContext), không được gọi `utxos`."""
+
+    def __init__(self, api):
+        self.api = api
+
+    def utxos(self, address):
+        raise AssertionError("stream phải đi theo trang")
+
+
+def test_pages_in_order_and_stop_at_short_page():
+    api = _FakeApi([_item(i) for i in range(250)])
+    items = list(iter_address_utxos(api, ADDRESS, page_size=100, concurrency=3, return_type="json"))
+    assert [item["tx_hash"] for item in items] == [_item(i)["tx_hash"] for i in range(250)]
+    # Trang 3 ngắn: dừng ở đó (có thể đã tải trước trang 4, 5 nhưng bỏ đi)
+    assert sorted(page for kind, page in api.calls)[:3] == [1, 2, 3]
+    assert list(iter_address_utxos(_FakeApi([]), ADDRESS)) == []
+
+
+def test_stream_fills_cache_and_resolves_scripts_publicly():
+    api = _FakeApi([_item(i, SCRIPT_HASH if i % 50 == 0 else None) for i in range(120)])
+    context = CachedChainContext(SingleFlightChainContext(_FakeBlockfrost(api)), ttl=60)
+
+    utxos = list(iter_utxos(context, ADDRESS, page_size=50, concurrency=2))
+    assert [u.output.amount.coin for u in utxos] == [1_000_000 + i for i in range(120)]
+    with_script = [u for u in utxos if u.output.script is not None]
+    assert len(with_script) == 3 and str(plutus_script_hash(with_script[0].output.script)) == SCRIPT_HASH
+
+    # Lần sau: từ cache UTxO, không gọi Blockfrost
+    calls = len(api.calls)
+    assert context.utxos(ADDRESS) == utxos
+    assert list(iter_utxos(context, ADDRESS)) == utxos
+    assert len(api.calls) == calls and context.stats()["hits"] == 2
+
+
+def test_partial_stream_does_not_fill_cache():
+    api = _FakeApi([_item(i) for i in range(120)])
+    context = CachedChainContext(_FakeBlockfrost(api), ttl=60)
+    stream = iter_utxos(context, ADDRESS, page_size=50, concurrency=1)
+    next(stream)
+    stream.close()
+    assert context.cache.get(ADDRESS) is None
+
+
+def test_non_blockfrost_context_uses_utxos():
+    ledger = OfflineLedgerContext()
+    ledger.fund(ADDRESS, 5_000_000)
+    assert list(iter_utxos(ledger, ADDRESS)) == ledger.utxos(ADDRESS)
+    assert list(iter_utxos(CachedChainContext(ledger), ADDRESS)) == ledger.utxos(ADDRESS)
@@ -26,8 +26,9 @@ from pycardano.address import Address
 from pycardano.network import Network
 from pycardano import BlockFrostChainContext, TransactionOutput, Value
 
-from config.settings import MNEMONIC, NETWORK, BLOCKFROST_PROJECT_ID
-from config.blockfrost import get_blockfrost_context, get_network_enum
+from config.settings import MNEMONIC, NETWORK, BLOCKFROST_PROJECT_ID, UTXO_PAGE_CONCURRENCY
+from config.blockfrost import get_blockfrost_context, get_network_enum, normalize_network
+from chain.utxo_stream import iter_utxos
 # logging
 from config.logging_config import logger
 
@@ -47,12 +48,12 @@ class WalletManager:
     PAYMENT_PATH = "m/1852'/1815'/0'/0/0"
     STAKE_PATH = "m/1852'/1815'/0'/2/0"
 
-    def __init__(self, mnemonic: Optional[str] = None, auto_create: bool = True):
+    def __init__(self, mnemonic: Optional[str] = None, auto_create: bool = True, network: Optional[str] = None):
         load_dotenv()
 
-        # network normalizing
-        self.context = get_blockfrost_context()
-        self.network = get_network_enum()
+        # network normalizing (preview | preprod | mainnet | testnet, mặc định NETWORK trong settings)
+        self.network_name = normalize_network(network)
+        self.network = get_network_enum(self.network_name)
 
         # mnemonic
         mnemonic_to_use = mnemonic or MNEMONIC
@@ -90,12 +91,10 @@ class WalletManager:
             network=self.network,
         )
 
-        # Blockfrost context (pycardano)
+        # Blockfrost context (pycardano): tạo lần đầu khi cần (xem `context`)
+        self._context = None
         if not BLOCKFROST_PROJECT_ID:
             logger.warning("BLOCKFROST_PROJECT_ID not set; Blockfrost calls will fail.")
-            self._context = None
-        else:
-            self._context = get_blockfrost_context()
 
         logger.info("✅ WalletManager initialized.")
         logger.debug(f"Address: {str(self.address)}")
@@ -162,27 +161,31 @@ class WalletManager:
         return str(stake_addr)
 
     # ---------------- BLOCKFROST / UTXO ----------------
-    def _ensure_context(self) -> BlockFrostChainContext:
+    @property
+    def context(self) -> BlockFrostChainContext:
+        """
+        Chain context của network ví, tạo ở lần dùng đầu tiên.
+        get_blockfrost_context raise ValueError nếu thiếu BLOCKFROST_PROJECT_ID
+        (trừ khi đã set_chain_context, vd: OfflineLedgerContext).
+        """
         if self._context is None:
-            if not BLOCKFROST_PROJECT_ID:
-                raise ValueError("Missing BLOCKFROST_PROJECT_ID")
-            self._context = BlockFrostChainContext(project_id=BLOCKFROST_PROJECT_ID, network=self.network)
+            self._context = get_blockfrost_context(self.network_name)
         return self._context
 
     def get_balance(self) -> int:
         """
         Return total lovelace (int) of the address.
-        Uses pycardano BlockFrostChainContext => returns pycardano.UTxO objects, sum u.output.amount.coin
+        Streams pycardano.UTxO objects page by page (iter_utxos), sum u.output.amount.coin
         """
-        ctx = self._ensure_context()
-        utxos = ctx.utxos(self.get_address())
+        ctx = self.context
+        utxos = iter_utxos(ctx, self.get_address(), concurrency=UTXO_PAGE_CONCURRENCY)
         total = sum(u.output.amount.coin for u in utxos)
         logger.info(f"💰 Balance of {self.get_address_bech32()}: {total / 1_000_000} ADA")
         return total
 
     def get_utxos(self) -> List:
         """Return list of pycardano.UTxO for the wallet's payment address."""
-        ctx = self._ensure_context()
+        ctx = self.context
         utxos = ctx.utxos(self.get_address())
         logger.info(f"🔍 Found {len(utxos)} UTxOs for {self.get_address_bech32()}")
         return utxos